@@ -0,0 +1,10 @@
+"""
+Orchestration engine benchmarks
+
+Measures engine overhead separately from model latency by running the
+protocol engines against deterministic fake Claude/Grok clients.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --compare baseline.json
+"""
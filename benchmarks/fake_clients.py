@@ -0,0 +1,135 @@
+"""
+Fake Model Clients
+
+Deterministic stand-ins for ClaudeClient and GrokClient. Latency, token
+counts and failures are drawn from a seeded RNG so repeated runs of a
+benchmark make identical calls.
+"""
+
+import asyncio
+import math
+import random
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+@dataclass
+class LatencyProfile:
+    """
+    Simulated model latency distribution
+
+    distribution: "constant", "uniform" (mean ± spread), "exponential"
+    (mean) or "lognormal" (mean, spread = sigma of the underlying normal)
+    """
+    distribution: str = "constant"
+    mean: float = 0.0
+    spread: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds"""
+        if self.mean <= 0:
+            return 0.0
+        if self.distribution == "constant":
+            return self.mean
+        if self.distribution == "uniform":
+            return max(0.0, rng.uniform(self.mean - self.spread, self.mean + self.spread))
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.mean)
+        if self.distribution == "lognormal":
+            # Parameterised so the distribution's mean equals self.mean
+            mu = math.log(self.mean) - self.spread ** 2 / 2
+            return rng.lognormvariate(mu, self.spread)
+        raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+
+class FakeModelClient:
+    """
+    Fake chat client with configurable latency, usage and failure rate
+
+    Failures raise ConnectionError, which the engine treats as transient
+    and retries.
+    """
+
+    def __init__(
+        self,
+        name: str = "fake",
+        latency: Optional[LatencyProfile] = None,
+        completion_tokens: int = 200,
+        response_chars: int = 800,
+        failure_rate: float = 0.0,
+        stream_chunks: int = 8,
+        seed: int = 0
+    ):
+        self.name = name
+        self.latency = latency or LatencyProfile()
+        self.completion_tokens = completion_tokens
+        self.response_chars = response_chars
+        self.failure_rate = failure_rate
+        self.stream_chunks = stream_chunks
+        self.model = name
+        self._rng = random.Random(seed)
+
+        # Bookkeeping for the benchmark report
+        self.calls = 0
+        self.failures = 0
+        self.simulated_latency = 0.0
+
+    async def chat(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Tuple[str, Dict[str, int]]:
+        """Return a canned response after the simulated latency"""
+        delay = self._next_call()
+        await asyncio.sleep(delay)
+        self._maybe_fail()
+        return self._response(prompt), self._usage(prompt)
+
+    async def chat_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Yield the canned response in evenly spaced chunks"""
+        delay = self._next_call()
+        self._maybe_fail()
+
+        response = self._response(prompt)
+        size = max(1, len(response) // self.stream_chunks)
+        chunks: List[str] = [response[i:i + size] for i in range(0, len(response), size)]
+
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            yield chunk
+
+        if usage is not None:
+            usage.update(self._usage(prompt))
+
+    async def close(self) -> None:
+        """Nothing to release"""
+
+    def _next_call(self) -> float:
+        self.calls += 1
+        delay = self.latency.sample(self._rng)
+        self.simulated_latency += delay
+        return delay
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise ConnectionError(f"{self.name}: simulated transient failure")
+
+    def _response(self, prompt: str) -> str:
+        header = f"[{self.name} call {self.calls}] "
+        return (header + "lorem ipsum " * (self.response_chars // 12 + 1))[:self.response_chars]
+
+    def _usage(self, prompt: str) -> Dict[str, int]:
+        prompt_tokens = max(1, len(prompt) // 4)
+        return {
+            "prompt": prompt_tokens,
+            "completion": self.completion_tokens,
+            "total": prompt_tokens + self.completion_tokens
+        }
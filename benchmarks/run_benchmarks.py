@@ -0,0 +1,385 @@
+"""
+Engine Benchmark Runner
+
+Runs every turn structure (sequential/parallel/mixed/dag), a streaming
+run and DynamicProtocolEngine cycles against fake model clients, plus
+StateManager persistence micro-benchmarks, and writes the results as
+JSON so they can be compared across commits.
+
+Per scenario:
+- overhead_ms_per_turn: engine time per turn with zero model latency
+- wall_time_s / turns_per_sec: end-to-end under the latency profile
+- model_time_s: simulated model latency summed over all calls
+- peak_memory_kb: tracemalloc peak during one run
+
+Usage:
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --quick --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fake_clients import FakeModelClient, LatencyProfile
+from src.dynamic_protocol import CycleConfig, DynamicProtocolEngine
+from src.protocol import ProtocolEngine, Turn
+from src.rate_limit import RateLimiter
+from src.sqlite_state import SQLiteStateManager
+from src.state import StateManager
+
+# Effectively unlimited so the limiter's bookkeeping is measured, not its waits
+UNLIMITED_RATE = {"rpm": 10 ** 9, "tpm": 10 ** 12}
+
+
+def build_config(structure: str, turns: int) -> Dict:
+    """
+    Synthetic mode config alternating Claude and Grok turns
+
+    sequential/dag: each turn takes context from the previous one (dag
+    adds fan-out: even turns depend on turn 1 only); mixed: a parallel
+    opening phase of half the turns followed by a sequential phase.
+    """
+    prompts = {}
+    for n in range(1, turns + 1):
+        if structure == "parallel" or n == 1:
+            context_from = []
+        elif structure == "dag" and n % 2 == 0:
+            context_from = [1]
+        elif structure == "mixed" and n <= turns // 2:
+            context_from = []
+        else:
+            context_from = [n - 1]
+
+        template = "Turn {n} on {{topic}}".format(n=n)
+        template += "".join(f" {{turn_{c}}}" for c in context_from)
+
+        prompts[f"turn_{n}"] = {
+            "role": f"role_{n}",
+            "participant": "claude" if n % 2 else "grok",
+            "template": template,
+            "context_from": context_from,
+        }
+
+    config = {"structure": structure, "turns": turns, "prompts": prompts}
+    if structure == "mixed":
+        split = turns // 2
+        config["phases"] = [
+            {"type": "parallel", "turns": list(range(1, split + 1))},
+            {"type": "sequential", "turns": list(range(split + 1, turns + 1))},
+        ]
+    return config
+
+
+def make_clients(latency: LatencyProfile, failure_rate: float, seed: int):
+    """Fresh deterministic fake clients"""
+    claude = FakeModelClient("claude", latency, failure_rate=failure_rate, seed=seed)
+    grok = FakeModelClient("grok", latency, failure_rate=failure_rate, seed=seed + 1)
+    return claude, grok
+
+
+async def run_structure(
+    structure: str,
+    turns: int,
+    latency: LatencyProfile,
+    failure_rate: float = 0.0,
+    stream: bool = False,
+    seed: int = 0
+) -> Dict:
+    """One protocol run; returns wall time and client bookkeeping"""
+    claude, grok = make_clients(latency, failure_rate, seed)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = ProtocolEngine(
+            claude, grok, StateManager(tmpdir),
+            retry_backoff_base=1.0,
+            stream_handler=(lambda n, chunk: None) if stream else None,
+            rate_limiter=RateLimiter(limits={}, default_limits=UNLIMITED_RATE,
+                                     max_in_flight=turns)
+        )
+
+        start = time.perf_counter()
+        conversation = await engine.run_protocol(
+            mode="custom", topic="benchmark", custom_config=build_config(structure, turns)
+        )
+        wall_time = time.perf_counter() - start
+
+    return {
+        "wall_time": wall_time,
+        "turns": len(conversation.turns),
+        "calls": claude.calls + grok.calls,
+        "failures": claude.failures + grok.failures,
+        "model_time": claude.simulated_latency + grok.simulated_latency,
+    }
+
+
+async def run_dynamic(
+    cycles: int,
+    latency: LatencyProfile,
+    failure_rate: float = 0.0,
+    seed: int = 0
+) -> Dict:
+    """DynamicProtocolEngine pipeline run over several cycles"""
+    claude, grok = make_clients(latency, failure_rate, seed)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = DynamicProtocolEngine(claude, grok, StateManager(tmpdir))
+        engine.retry_backoff_base = 1.0
+        engine.rate_limiter = RateLimiter(limits={}, default_limits=UNLIMITED_RATE)
+
+        start = time.perf_counter()
+        conversation = await engine.run_dynamic_protocol(
+            mode="pipeline",
+            task="benchmark",
+            cycle_config=CycleConfig(max_cycles=cycles)
+        )
+        wall_time = time.perf_counter() - start
+
+    return {
+        "wall_time": wall_time,
+        "turns": len(conversation.turns),
+        "calls": claude.calls + grok.calls,
+        "failures": claude.failures + grok.failures,
+        "model_time": claude.simulated_latency + grok.simulated_latency,
+    }
+
+
+def measure_scenario(run: Callable[[LatencyProfile], Dict], latency: LatencyProfile,
+                     repeats: int) -> Dict:
+    """
+    Measure one scenario
+
+    Engine overhead comes from the median of zero-latency runs; wall time
+    and throughput from one run under the latency profile; memory from a
+    separate traced run (tracemalloc slows execution).
+    """
+    zero = LatencyProfile()
+    overhead_runs = [asyncio.run(run(zero)) for _ in range(repeats)]
+    overhead = statistics.median(r["wall_time"] / max(r["turns"], 1) for r in overhead_runs)
+
+    timed = asyncio.run(run(latency))
+
+    tracemalloc.start()
+    asyncio.run(run(zero))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "turns": timed["turns"],
+        "calls": timed["calls"],
+        "failures": timed["failures"],
+        "overhead_ms_per_turn": round(overhead * 1000, 4),
+        "wall_time_s": round(timed["wall_time"], 4),
+        "model_time_s": round(timed["model_time"], 4),
+        "turns_per_sec": (
+            round(timed["turns"] / timed["wall_time"], 2) if timed["wall_time"] else None
+        ),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def _bench_turn(number: int) -> Turn:
+    return Turn(
+        number=number,
+        role="bench",
+        participant="claude" if number % 2 else "grok",
+        prompt="p" * 2000,
+        response="r" * 4000,
+        tokens={"prompt": 500, "completion": 1000, "total": 1500},
+        latency=1.0,
+        timestamp=datetime.now().isoformat(),
+        context_from=[number - 1] if number > 1 else [],
+        cost=0.001,
+        model="bench-model"
+    )
+
+
+def measure_persistence(backend: str, turns: int, repeats: int) -> Dict:
+    """Per-operation cost of a state backend (microseconds)"""
+    from src.protocol import Conversation
+
+    timings: Dict[str, List[float]] = {
+        "save_turn_us": [], "save_conversation_us": [], "load_conversation_us": [],
+        "list_sessions_us": [],
+    }
+
+    for rep in range(repeats):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state = SQLiteStateManager(tmpdir) if backend == "sqlite" else StateManager(tmpdir)
+            session_id = f"bench-{rep}"
+            conversation = Conversation(
+                session_id=session_id, mode="bench", topic="benchmark", turns=[],
+                metadata={}, started_at=datetime.now().isoformat()
+            )
+            state.start_session(conversation)
+
+            start = time.perf_counter()
+            for n in range(1, turns + 1):
+                turn = _bench_turn(n)
+                state.save_turn(session_id, turn)
+                conversation.turns.append(turn)
+            timings["save_turn_us"].append((time.perf_counter() - start) / turns)
+
+            start = time.perf_counter()
+            state.load_conversation(session_id)
+            timings["load_conversation_us"].append(time.perf_counter() - start)
+
+            conversation.completed_at = datetime.now().isoformat()
+            start = time.perf_counter()
+            state.save_conversation(conversation)
+            timings["save_conversation_us"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            state.list_sessions()
+            timings["list_sessions_us"].append(time.perf_counter() - start)
+
+            if backend == "sqlite":
+                state.close()
+
+    return {name: round(statistics.median(values) * 1e6, 1) for name, values in timings.items()}
+
+
+def run_suite(
+    turns: int = 16,
+    cycles: int = 3,
+    repeats: int = 5,
+    latency: Optional[LatencyProfile] = None,
+    failure_rate: float = 0.0,
+    seed: int = 0
+) -> Dict:
+    """
+    Run every benchmark scenario
+
+    Returns:
+        Dict with "meta" and "results" (scenario name -> metrics)
+    """
+    latency = latency or LatencyProfile("lognormal", mean=0.02, spread=0.5)
+    results = {}
+
+    for structure in ("sequential", "parallel", "mixed", "dag"):
+        results[structure] = measure_scenario(
+            lambda lat, s=structure: run_structure(s, turns, lat, failure_rate, seed=seed),
+            latency, repeats
+        )
+
+    results["sequential_stream"] = measure_scenario(
+        lambda lat: run_structure("sequential", turns, lat, failure_rate, stream=True, seed=seed),
+        latency, repeats
+    )
+
+    results["dynamic_cycles"] = measure_scenario(
+        lambda lat: run_dynamic(cycles, lat, failure_rate, seed=seed),
+        latency, repeats
+    )
+
+    for backend in ("json", "sqlite"):
+        results[f"persistence_{backend}"] = measure_persistence(backend, turns, repeats)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "turns": turns, "cycles": cycles, "repeats": repeats, "seed": seed,
+                "failure_rate": failure_rate,
+                "latency": {"distribution": latency.distribution, "mean": latency.mean,
+                            "spread": latency.spread},
+            },
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """Format percentage changes of every numeric metric against a baseline"""
+    lines = [
+        f"Baseline {baseline['meta'].get('commit') or '?'} -> "
+        f"current {current['meta'].get('commit') or '?'}"
+    ]
+
+    for scenario, metrics in current["results"].items():
+        base_metrics = baseline["results"].get(scenario)
+        if not base_metrics:
+            continue
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            numeric = isinstance(value, (int, float)) and isinstance(base, (int, float))
+            if not numeric or not base:
+                continue
+            change = (value - base) / base * 100
+            lines.append(f"  {scenario:<20} {name:<22} {base:>12} -> {value:>12} ({change:+.1f}%)")
+
+    return lines
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the orchestration engine")
+    parser.add_argument("--turns", type=int, default=16, help="Turns per protocol run")
+    parser.add_argument("--cycles", type=int, default=3, help="DynamicProtocolEngine cycles")
+    parser.add_argument("--repeats", type=int, default=5, help="Zero-latency runs per scenario")
+    parser.add_argument("--latency", default="lognormal",
+                        choices=["constant", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-mean", type=float, default=0.02, help="Mean model latency (s)")
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability a model call fails transiently (retried after 1s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="Small run for smoke testing")
+    parser.add_argument("--output", "-o", type=Path, help="Write JSON results here")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to diff against")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.quick:
+        args.turns, args.cycles, args.repeats = 4, 2, 1
+
+    report = run_suite(
+        turns=args.turns,
+        cycles=args.cycles,
+        repeats=args.repeats,
+        latency=LatencyProfile(args.latency, args.latency_mean, args.latency_spread),
+        failure_rate=args.failure_rate,
+        seed=args.seed
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+        print(f"Results written to {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print("\n".join(compare(report, baseline)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,9 +13,17 @@ from pathlib import Path
 import click
 
 from src.protocol import ProtocolEngine
+from src.budget import BudgetExceededError, BudgetGuard
+from src.cache import ResponseCache
+from src.context import STRATEGIES as CONTEXT_STRATEGIES, ContextBudgeter, client_summarizer
+from src.hedging import Hedger
+from src.mode_registry import get_mode_registry
+from src.tracing import JSONFileExporter, Tracer
 from src.clients.claude import ClaudeClient
+from src.clients.claude_pool import ClaudeWorkerPool
 from src.clients.grok import GrokClient
-from src.state import StateManager
+from src.clients.transport import close_shared_transport
+from src.state import create_state_manager
 
 
 # Configure logging
@@ -25,18 +33,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Mode files in src/modes, plus custom (a --config file)
+MODE_CHOICES = get_mode_registry().names() + ['custom']
+
+# Day spend for --daily-budget (not *.json, so it is never taken for a session)
+BUDGET_LEDGER = 'sessions/budget.ledger'
+
 
 @click.group()
 @click.option('--debug', is_flag=True, help='Enable debug logging')
-def cli(debug):
+@click.option('--store', type=click.Choice(['json', 'sqlite']), default='json',
+              envvar='AI_DIALOGUE_STORE', show_default=True,
+              help='Session storage backend')
+@click.pass_context
+def cli(ctx, debug, store):
     """AI Dialogue - Async AI orchestration protocol"""
     if debug:
         logging.getLogger().setLevel(logging.DEBUG)
+    ctx.ensure_object(dict)
+    ctx.obj['store'] = store
+
+
+def _state_manager(ctx):
+    """Create the state manager selected by the --store option"""
+    return create_state_manager((ctx.obj or {}).get('store', 'json'))
 
 
 @cli.command()
 @click.option('--mode', '-m', required=True,
-              type=click.Choice(['loop', 'debate', 'podcast', 'dialogue', 'synthesis', 'custom']),
+              type=click.Choice(MODE_CHOICES),
               help='Interaction mode')
 @click.option('--topic', '-t', required=True, help='Topic to discuss')
 @click.option('--turns', '-n', type=int, help='Number of turns (overrides mode default)')
@@ -44,7 +69,29 @@ def cli(debug):
 @click.option('--output', '-o', type=click.Path(), help='Output markdown file path')
 @click.option('--claude-model', default='sonnet', help='Claude model (sonnet, opus, haiku)')
 @click.option('--grok-model', default='grok-4-fast', help='Grok model (grok-4, grok-4-fast, grok-3)')
-def run(mode, topic, turns, config, output, claude_model, grok_model):
+@click.option('--claude-workers', default=0, type=click.IntRange(min=0),
+              help='Persistent Claude CLI workers (0 = one process per turn)')
+@click.option('--stream', is_flag=True, help='Print tokens as they arrive')
+@click.option('--cache/--no-cache', default=False,
+              help='Reuse cached responses for identical requests')
+@click.option('--prompt-cache/--no-prompt-cache', default=False,
+              help='Order prompts for provider prompt caching (shared context first)')
+@click.option('--speculative', is_flag=True,
+              help='Start turns as soon as their context is ready (results commit in order)')
+@click.option('--hedge-percentile', type=click.FloatRange(0, 1, min_open=True, max_open=True),
+              help='Send a duplicate Grok request once a call outlasts this latency percentile')
+@click.option('--hedge-budget', type=float, help='Cap on estimated duplicate-request spend (USD)')
+@click.option('--trace', type=click.Path(), help='Write tracing spans to this JSONL file')
+@click.option('--max-cost', type=float, help='Hard spending cap for this run (USD)')
+@click.option('--daily-budget', type=float, help='Hard spending cap per day (USD)')
+@click.option('--max-context-tokens', type=click.IntRange(min=0),
+              help='Token budget for earlier-turn context injected into each prompt')
+@click.option('--context-strategy', type=click.Choice(CONTEXT_STRATEGIES), default='head_tail',
+              show_default=True, help='How to shrink injected context over budget')
+@click.pass_context
+def run(ctx, mode, topic, turns, config, output, claude_model, grok_model, claude_workers,
+        stream, cache, prompt_cache, speculative, hedge_percentile, hedge_budget, trace, max_cost,
+        daily_budget, max_context_tokens, context_strategy):
     """
     Run a new AI dialogue protocol
 
@@ -52,18 +99,86 @@ def run(mode, topic, turns, config, output, claude_model, grok_model):
         ai-dialogue run --mode loop --topic "quantum computing" --turns 8
         ai-dialogue run --mode debate --topic "AGI safety vs capability"
         ai-dialogue run --mode podcast --topic "Future of work"
+        ai-dialogue run --mode loop --topic "LLM evals" --max-cost 0.25
     """
-    asyncio.run(_run_protocol(mode, topic, turns, config, output, claude_model, grok_model))
-
-
-async def _run_protocol(mode, topic, turns, config, output, claude_model, grok_model):
+    state_manager = _state_manager(ctx)
+    asyncio.run(_run_protocol(
+        mode, topic, turns, config, output, claude_model, grok_model, state_manager,
+        claude_workers, stream, cache, trace, _budget_guard(max_cost, daily_budget),
+        max_context_tokens, context_strategy, prompt_cache, speculative,
+        _hedger(hedge_percentile, hedge_budget, state_manager)
+    ))
+
+
+def _budget_guard(max_cost=None, daily_budget=None, batch_budget=None):
+    """BudgetGuard for the given caps (None when no cap is set)"""
+    if max_cost is None and daily_budget is None and batch_budget is None:
+        return None
+    return BudgetGuard(
+        per_run=max_cost,
+        per_batch=batch_budget,
+        per_day=daily_budget,
+        ledger_path=BUDGET_LEDGER if daily_budget is not None else None
+    )
+
+
+def _hedger(percentile, max_spend, state_manager):
+    """Hedger seeded with latencies from recent sessions (None when unset)"""
+    if percentile is None:
+        return None
+    hedger = Hedger(percentile=percentile, max_spend=max_spend)
+    learned = hedger.learn_from_sessions(state_manager)
+    logger.info(f"Hedging at p{percentile * 100:g} with {learned} recorded Grok latencies")
+    return hedger
+
+
+def _context_budgeter(max_context_tokens, strategy, grok_client):
+    """ContextBudgeter for the given context budget (None when unset)"""
+    if max_context_tokens is None:
+        return None
+    summarizer = None
+    if strategy == 'summary':
+        summarizer = client_summarizer(grok_client, model='grok-4-fast-non-reasoning-latest')
+    return ContextBudgeter(max_context_tokens, strategy=strategy, summarizer=summarizer)
+
+
+def _make_stream_printer():
+    """Stream handler that echoes tokens, printing a header when the turn changes"""
+    current = {"turn": None}
+
+    def on_token(turn_num, chunk):
+        if current["turn"] != turn_num:
+            click.echo(f"\n\n── Turn {turn_num} ──\n")
+            current["turn"] = turn_num
+        click.echo(chunk, nl=False)
+
+    return on_token
+
+
+async def _run_protocol(mode, topic, turns, config, output, claude_model, grok_model,
+                        state_manager, claude_workers=0, stream=False, cache=False, trace=None,
+                        budget=None, max_context_tokens=None, context_strategy='head_tail',
+                        prompt_cache=False, speculative=False, hedger=None):
     """Async protocol execution"""
+    exporter = JSONFileExporter(trace) if trace else None
     try:
         # Initialize components
-        claude_client = ClaudeClient(model=claude_model)
+        pool = ClaudeWorkerPool(size=claude_workers, model=claude_model) if claude_workers else None
+        claude_client = ClaudeClient(model=claude_model, pool=pool)
         grok_client = GrokClient(model=grok_model)
-        state_manager = StateManager()
-        engine = ProtocolEngine(claude_client, grok_client, state_manager)
+        engine = ProtocolEngine(
+            claude_client,
+            grok_client,
+            state_manager,
+            stream_handler=_make_stream_printer() if stream else None,
+            response_cache=ResponseCache() if cache else None,
+            tracer=Tracer(exporter) if exporter else None,
+            budget=budget,
+            context_budgeter=_context_budgeter(max_context_tokens, context_strategy, grok_client),
+            prompt_caching=prompt_cache,
+            speculative=speculative,
+            hedger=hedger
+        )
 
         click.echo(f"\n🚀 Starting {mode} mode dialogue")
         click.echo(f"📝 Topic: {topic}")
@@ -99,6 +214,8 @@ async def _run_protocol(mode, topic, turns, config, output, claude_model, grok_m
 
         md_file = state_manager.export_markdown(conversation, md_path)
         click.echo(f"📄 Markdown: {md_file}")
+        if trace:
+            click.echo(f"🔍 Trace: {trace}")
 
         # Summary
         click.echo(f"\n📊 Summary:")
@@ -110,46 +227,308 @@ async def _run_protocol(mode, topic, turns, config, output, claude_model, grok_m
         )
         click.echo(f"   Total tokens: {total_tokens:,}")
 
+        speculation = conversation.metadata.get("speculation")
+        if speculation:
+            click.echo(f"   Speculation: {speculation['wins']}/{speculation['launched']} "
+                       f"early turns kept, {speculation['head_start_seconds']:.1f}s head start, "
+                       f"${speculation['wasted_cost']:.6f} wasted")
+
         click.echo(f"\n✨ Done!")
 
     except KeyboardInterrupt:
         click.echo("\n\n⚠️  Interrupted by user")
         sys.exit(1)
+    except BudgetExceededError as e:
+        click.echo(f"\n💸 Stopped: {e}", err=True)
+        click.echo(
+            f"   Resume later with: ai-dialogue resume {engine.current_session_id}", err=True
+        )
+        sys.exit(1)
     except Exception as e:
         click.echo(f"\n❌ Error: {e}", err=True)
         logger.exception("Protocol execution failed")
         sys.exit(1)
     finally:
         # Cleanup
+        if 'claude_client' in locals():
+            await claude_client.close()
         if 'grok_client' in locals():
             await grok_client.close()
+        await close_shared_transport()
+        if exporter:
+            exporter.close()
+
+
+@cli.command()
+@click.option('--mode', '-m', required=True,
+              type=click.Choice(MODE_CHOICES),
+              help='Interaction mode')
+@click.option('--topics', 'topics_file', required=True, type=click.Path(exists=True),
+              help='Topic file (.jsonl with a "topic" field, .csv with a topic column, '
+                   'or one topic per line)')
+@click.option('--turns', '-n', type=int, help='Number of turns (overrides mode default)')
+@click.option('--config', '-c', type=click.Path(exists=True), help='Custom mode config (JSON)')
+@click.option('--concurrency', '-j', default=4, type=click.IntRange(min=1),
+              help='Protocols running at once')
+@click.option('--max-in-flight', default=8, type=click.IntRange(min=1),
+              help='Model requests in flight across all protocols')
+@click.option('--results', type=click.Path(), default='sessions/batch-results.jsonl',
+              help='JSONL file receiving one summary line per completed topic')
+@click.option('--claude-model', default='sonnet', help='Claude model (sonnet, opus, haiku)')
+@click.option('--grok-model', default='grok-4-fast',
+              help='Grok model (grok-4, grok-4-fast, grok-3)')
+@click.option('--claude-workers', default=0, type=click.IntRange(min=0),
+              help='Persistent Claude CLI workers (0 = one process per turn)')
+@click.option('--cache/--no-cache', default=False,
+              help='Reuse cached responses for identical requests')
+@click.option('--prompt-cache/--no-prompt-cache', default=False,
+              help='Order prompts for provider prompt caching (shared context first)')
+@click.option('--speculative', is_flag=True,
+              help='Start turns as soon as their context is ready (results commit in order)')
+@click.option('--hedge-percentile', type=click.FloatRange(0, 1, min_open=True, max_open=True),
+              help='Send a duplicate Grok request once a call outlasts this latency percentile')
+@click.option('--hedge-budget', type=float, help='Cap on estimated duplicate-request spend (USD)')
+@click.option('--max-cost', type=float, help='Hard spending cap per topic (USD)')
+@click.option('--batch-budget', type=float, help='Hard spending cap for the whole batch (USD)')
+@click.option('--daily-budget', type=float, help='Hard spending cap per day (USD)')
+@click.option('--max-context-tokens', type=click.IntRange(min=0),
+              help='Token budget for earlier-turn context injected into each prompt')
+@click.option('--context-strategy', type=click.Choice(CONTEXT_STRATEGIES), default='head_tail',
+              show_default=True, help='How to shrink injected context over budget')
+@click.pass_context
+def batch(ctx, mode, topics_file, turns, config, concurrency, max_in_flight, results,
+          claude_model, grok_model, claude_workers, cache, prompt_cache, speculative,
+          hedge_percentile, hedge_budget, max_cost, batch_budget, daily_budget, max_context_tokens,
+          context_strategy):
+    """
+    Run one mode over many topics concurrently
+
+    Examples:
+        ai-dialogue batch --mode debate --topics topics.jsonl -j 8
+        ai-dialogue batch --mode loop --topics topics.txt --results out.jsonl
+        ai-dialogue batch --mode debate --topics topics.jsonl --batch-budget 5
+    """
+    topics = _load_topics(topics_file)
+    if not topics:
+        click.echo(f"❌ No topics found in {topics_file}", err=True)
+        sys.exit(1)
+
+    state_manager = _state_manager(ctx)
+    asyncio.run(_run_batch(
+        mode, topics, turns, config, concurrency, max_in_flight, results,
+        claude_model, grok_model, claude_workers, cache, state_manager,
+        _budget_guard(max_cost, daily_budget, batch_budget),
+        max_context_tokens, context_strategy, prompt_cache, speculative,
+        _hedger(hedge_percentile, hedge_budget, state_manager)
+    ))
+
+
+def _load_topics(path):
+    """Read topics from a JSONL, CSV or plain-text file"""
+    import csv
+    import json
+
+    path = Path(path)
+    with open(path, newline='') as f:
+        if path.suffix == '.jsonl':
+            return [json.loads(line)['topic'] for line in f if line.strip()]
+        if path.suffix == '.csv':
+            return [row['topic'] for row in csv.DictReader(f) if row.get('topic')]
+        return [line.strip() for line in f if line.strip()]
+
+
+async def _run_batch(mode, topics, turns, config, concurrency, max_in_flight, results,
+                     claude_model, grok_model, claude_workers, cache, state_manager,
+                     budget=None, max_context_tokens=None, context_strategy='head_tail',
+                     prompt_cache=False, speculative=False, hedger=None):
+    """Async batch execution"""
+    import json
+    import time
+
+    from src.rate_limit import RateLimiter
+
+    try:
+        pool = ClaudeWorkerPool(size=claude_workers, model=claude_model) if claude_workers else None
+        claude_client = ClaudeClient(model=claude_model, pool=pool)
+        grok_client = GrokClient(model=grok_model)
+        engine = ProtocolEngine(
+            claude_client,
+            grok_client,
+            state_manager,
+            rate_limiter=RateLimiter(max_in_flight=max_in_flight),
+            response_cache=ResponseCache() if cache else None,
+            budget=budget,
+            context_budgeter=_context_budgeter(max_context_tokens, context_strategy, grok_client),
+            prompt_caching=prompt_cache,
+            speculative=speculative,
+            hedger=hedger
+        )
+
+        custom_config = None
+        if config:
+            with open(config) as f:
+                custom_config = json.load(f)
+
+        click.echo(f"\n🚀 Starting batch: {len(topics)} topics in {mode} mode "
+                   f"(concurrency {concurrency})")
+
+        results_path = Path(results)
+        results_path.parent.mkdir(parents=True, exist_ok=True)
+        counts = {"done": 0}
+
+        with open(results_path, 'a') as results_file:
+            def on_complete(index, result):
+                counts["done"] += 1
+                if isinstance(result, Exception):
+                    record = {"index": index, "topic": topics[index], "status": "failed",
+                              "error": str(result)}
+                    click.echo(f"  ❌ [{counts['done']}/{len(topics)}] {topics[index]}: {result}")
+                else:
+                    record = {"index": index, "topic": topics[index], "status": "completed",
+                              "session_id": result.session_id, "turns": len(result.turns),
+                              "total_tokens": result.total_tokens, "total_cost": result.total_cost}
+                    click.echo(f"  ✅ [{counts['done']}/{len(topics)}] {topics[index]} "
+                               f"→ {result.session_id}")
+                results_file.write(json.dumps(record) + "\n")
+                results_file.flush()
+
+            start = time.monotonic()
+            outcomes = await engine.run_many(
+                mode, topics,
+                turns=turns,
+                custom_config=custom_config,
+                max_concurrent=concurrency,
+                on_complete=on_complete
+            )
+            elapsed = max(time.monotonic() - start, 1e-6)
+
+        completed = [c for c in outcomes if not isinstance(c, Exception)]
+        total_turns = sum(len(c.turns) for c in completed)
+
+        click.echo("\n📊 Batch summary:")
+        click.echo(f"   Completed: {len(completed)}/{len(topics)}")
+        click.echo(f"   Wall time: {elapsed:.1f}s")
+        click.echo(f"   Throughput: {len(completed) / elapsed * 60:.1f} sessions/min, "
+                   f"{total_turns / elapsed:.2f} turns/s")
+        click.echo(f"   Total tokens: {sum(c.total_tokens for c in completed):,}")
+        click.echo(f"   Total cost: ${sum(c.total_cost for c in completed):.4f}")
+        click.echo(f"📄 Results: {results_path}")
+
+        if len(completed) < len(topics):
+            sys.exit(1)
+
+    except KeyboardInterrupt:
+        click.echo("\n\n⚠️  Interrupted by user")
+        sys.exit(1)
+    finally:
+        if 'claude_client' in locals():
+            await claude_client.close()
+        if 'grok_client' in locals():
+            await grok_client.close()
+        await close_shared_transport()
 
 
 @cli.command()
 @click.argument('session_id')
-def resume(session_id):
+@click.option('--output', '-o', type=click.Path(), help='Output markdown file path')
+@click.option('--claude-model', default='sonnet', help='Claude model (sonnet, opus, haiku)')
+@click.option('--grok-model', default='grok-4-fast',
+              help='Grok model (grok-4, grok-4-fast, grok-3)')
+@click.option('--stream', is_flag=True, help='Print tokens as they arrive')
+@click.option('--cache/--no-cache', default=False,
+              help='Reuse cached responses for identical requests')
+@click.option('--max-cost', type=float,
+              help='Hard spending cap for the run (USD, counting turns already paid for)')
+@click.option('--daily-budget', type=float, help='Hard spending cap per day (USD)')
+@click.pass_context
+def resume(ctx, session_id, output, claude_model, grok_model, stream, cache, max_cost,
+           daily_budget):
     """
     Resume an incomplete session
 
+    Turns persisted before the interruption are kept; the remaining
+    turns, and turns that failed, are executed. Other run options
+    (context budget, prompt caching, speculation, hedging, tracing) are
+    not applied on resume.
+
     Example:
         ai-dialogue resume 20250109-143052
     """
-    click.echo(f"Resuming session: {session_id}")
-    click.echo("⚠️  Resume functionality coming soon")
+    asyncio.run(_resume_protocol(
+        session_id, output, claude_model, grok_model, _state_manager(ctx),
+        stream, cache, _budget_guard(max_cost, daily_budget)
+    ))
+
+
+async def _resume_protocol(session_id, output, claude_model, grok_model, state_manager,
+                           stream=False, cache=False, budget=None):
+    """Async session resume"""
+    try:
+        prior = state_manager.load_conversation(session_id)
+        reused = sum(1 for turn in prior.turns if not turn.error)
+
+        claude_client = ClaudeClient(model=claude_model)
+        grok_client = GrokClient(model=grok_model)
+        engine = ProtocolEngine(
+            claude_client,
+            grok_client,
+            state_manager,
+            stream_handler=_make_stream_printer() if stream else None,
+            response_cache=ResponseCache() if cache else None,
+            budget=budget
+        )
+
+        click.echo(f"\n🔁 Resuming session: {session_id}")
+        conversation = await engine.resume_protocol(session_id)
+
+        session_path = state_manager.save_conversation(conversation)
+        click.echo("\n✅ Conversation completed")
+        click.echo(f"   Turns reused: {reused}")
+        # Failed turns were run again and replaced, so they count as executed
+        click.echo(f"   Turns executed: {len(conversation.turns) - reused}")
+        click.echo(f"💾 Saved to: {session_path}")
+
+        md_file = state_manager.export_markdown(conversation, Path(output) if output else None)
+        click.echo(f"📄 Markdown: {md_file}")
+
+    except FileNotFoundError:
+        click.echo(f"❌ Session not found: {session_id}", err=True)
+        sys.exit(1)
+    except BudgetExceededError as e:
+        click.echo(f"\n💸 Stopped: {e}", err=True)
+        click.echo(f"   Resume later with: ai-dialogue resume {session_id}", err=True)
+        sys.exit(1)
+    except ValueError as e:
+        click.echo(f"❌ {e}", err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\n\n⚠️  Interrupted by user")
+        sys.exit(1)
+    finally:
+        if 'claude_client' in locals():
+            await claude_client.close()
+        if 'grok_client' in locals():
+            await grok_client.close()
+        await close_shared_transport()
 
 
 @cli.command()
 @click.option('--limit', '-n', default=20, help='Number of sessions to show')
-def list(limit):
+@click.option('--mode', '-m', help='Only show sessions in this mode')
+@click.option('--status', type=click.Choice(['completed', 'in_progress']),
+              help='Only show sessions with this status')
+@click.pass_context
+def list(ctx, limit, mode, status):
     """
     List recent sessions
 
     Example:
         ai-dialogue list
         ai-dialogue list --limit 10
+        ai-dialogue --store sqlite list --mode debate --status completed
     """
-    state_manager = StateManager()
-    sessions = state_manager.list_sessions(limit=limit)
+    state_manager = _state_manager(ctx)
+    sessions = state_manager.list_sessions(limit=limit, mode=mode, status=status)
 
     if not sessions:
         click.echo("No sessions found")
@@ -172,7 +551,8 @@ def list(limit):
 @cli.command()
 @click.argument('session_id')
 @click.option('--output', '-o', type=click.Path(), help='Output markdown file path')
-def export(session_id, output):
+@click.pass_context
+def export(ctx, session_id, output):
     """
     Export session to markdown
 
@@ -181,7 +561,7 @@ def export(session_id, output):
         ai-dialogue export 20250109-143052 --output report.md
     """
     try:
-        state_manager = StateManager()
+        state_manager = _state_manager(ctx)
         conversation = state_manager.load_conversation(session_id)
 
         output_path = Path(output) if output else None
@@ -200,14 +580,15 @@ def export(session_id, output):
 @cli.command()
 @click.argument('session_id')
 @click.confirmation_option(prompt='Are you sure you want to delete this session?')
-def delete(session_id):
+@click.pass_context
+def delete(ctx, session_id):
     """
     Delete a session
 
     Example:
         ai-dialogue delete 20250109-143052
     """
-    state_manager = StateManager()
+    state_manager = _state_manager(ctx)
 
     if state_manager.delete_session(session_id):
         click.echo(f"✅ Deleted: {session_id}")
@@ -216,24 +597,48 @@ def delete(session_id):
         sys.exit(1)
 
 
+@cli.command()
+@click.option('--source', '-s', type=click.Path(exists=True, file_okay=False),
+              default='sessions', show_default=True, help='Directory of JSON sessions')
+def migrate(source):
+    """
+    Import JSON sessions into the SQLite store
+
+    Example:
+        ai-dialogue migrate
+        ai-dialogue migrate --source old_sessions
+    """
+    from src.sqlite_state import SQLiteStateManager
+
+    state_manager = SQLiteStateManager()
+    imported = state_manager.migrate_from_json(source)
+    state_manager.close()
+
+    click.echo(f"✅ Migrated {imported} sessions to {state_manager.db_path}")
+
+
 @cli.command()
 def modes():
     """
     List available interaction modes
 
-    Shows all built-in modes and their descriptions
+    Shows all built-in modes and their descriptions, and any validation
+    errors that would stop a mode from running
     """
-    from pathlib import Path
-    import json
-
-    modes_dir = Path(__file__).parent / "src" / "modes"
+    registry = get_mode_registry()
+    errors = registry.preload()
 
     click.echo("\n📋 Available Modes:\n")
 
-    for mode_file in sorted(modes_dir.glob("*.json")):
-        with open(mode_file) as f:
-            config = json.load(f)
+    for name in registry.names():
+        if name in errors:
+            click.echo(f"⚠️  {name} (invalid)")
+            for error in errors[name]:
+                click.echo(f"   - {error}")
+            click.echo()
+            continue
 
+        config = registry.get(name).config
         click.echo(f"🎯 {config['name']}")
         click.echo(f"   {config['description']}")
         click.echo(f"   Default turns: {config['turns']}")
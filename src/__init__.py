@@ -9,8 +9,20 @@ __version__ = "1.0.0"
 
 from .protocol import ProtocolEngine, Conversation, Turn
 from .dynamic_protocol import DynamicProtocolEngine, CycleConfig
-from .intelligent_orchestrator import IntelligentOrchestrator, Subtask, ExecutionStrategy
-from .state import StateManager
+from .convergence import ConvergenceTracker
+from .intelligent_orchestrator import (
+    IntelligentOrchestrator, Subtask, ExecutionStrategy, DependencyCycleError
+)
+from .rate_limit import RateLimiter
+from .budget import BudgetExceededError, BudgetGuard
+from .context import ContextBudgeter
+from .hedging import Hedger
+from .resilience import EndpointGuard, CircuitOpenError
+from .mode_registry import ModeRegistry, ModeValidationError
+from .cache import ResponseCache
+from .tracing import Tracer, JSONFileExporter
+from .state import StateManager, create_state_manager
+from .sqlite_state import SQLiteStateManager
 from .clients.claude import ClaudeClient
 from .clients.grok import GrokClient
 
@@ -22,8 +34,24 @@ __all__ = [
     "Turn",
     "Subtask",
     "ExecutionStrategy",
+    "DependencyCycleError",
     "CycleConfig",
+    "ConvergenceTracker",
+    "RateLimiter",
+    "BudgetGuard",
+    "BudgetExceededError",
+    "ContextBudgeter",
+    "Hedger",
+    "EndpointGuard",
+    "CircuitOpenError",
+    "ModeRegistry",
+    "ModeValidationError",
+    "ResponseCache",
+    "Tracer",
+    "JSONFileExporter",
     "StateManager",
+    "SQLiteStateManager",
+    "create_state_manager",
     "ClaudeClient",
     "GrokClient",
 ]
@@ -0,0 +1,264 @@
+"""
+Spending Budgets
+
+Cost caps enforced before each model call:
+- Per-run, per-batch and per-day budgets (USD)
+- Soft cap: switch the turn to a cheaper model (MODEL_DOWNGRADES)
+- Hard cap: refuse the turn with BudgetExceededError
+
+Each turn's cost is predicted from its prompt tokens plus its max_tokens
+allowance (priced with MODEL_PRICING) and reserved until the actual cost
+is known, so concurrent turns cannot jointly overshoot a cap.
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: ledger access is not locked
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Completion allowance when a turn sets no max_tokens (the clients' default)
+DEFAULT_MAX_TOKENS = 4096
+
+
+class BudgetExceededError(Exception):
+    """Raised when a turn would push spending past a hard cap"""
+
+    def __init__(self, scope: str, limit: float, committed: float, predicted: float = 0.0):
+        super().__init__(
+            f"{scope} budget exceeded: ${committed:.4f} committed + ${predicted:.4f} "
+            f"predicted > ${limit:.4f} hard cap"
+        )
+        self.scope = scope
+        self.limit = limit
+        self.committed = committed
+        self.predicted = predicted
+
+
+class Budget:
+    """
+    Spending caps for one scope (run, batch or day)
+
+    committed = settled spend + reservations of turns still in flight.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        hard_limit: Optional[float] = None,
+        soft_limit: Optional[float] = None,
+        spent: float = 0.0
+    ):
+        self.scope = scope
+        self.hard_limit = hard_limit
+        self.soft_limit = soft_limit
+        self.spent = spent
+        self.reserved = 0.0
+
+    @property
+    def committed(self) -> float:
+        return self.spent + self.reserved
+
+    @property
+    def exhausted(self) -> bool:
+        """True once nothing more can be spent under the hard cap"""
+        return self.hard_limit is not None and self.committed >= self.hard_limit
+
+    def over_soft(self, amount: float) -> bool:
+        """True if spending amount more would reach the soft cap"""
+        return self.soft_limit is not None and self.committed + amount >= self.soft_limit
+
+    def check(self, amount: float) -> None:
+        """Raise BudgetExceededError if spending amount more would pass the hard cap"""
+        if self.hard_limit is not None and self.committed + amount > self.hard_limit:
+            raise BudgetExceededError(self.scope, self.hard_limit, self.committed, amount)
+
+
+class Reservation:
+    """Predicted cost of one turn held against its budgets until settled"""
+
+    def __init__(self, guard: "BudgetGuard", budgets: List[Budget], model: str,
+                 amount: float, downgraded: bool = False):
+        self.guard = guard
+        self.budgets = budgets
+        self.model = model
+        self.amount = amount
+        self.downgraded = downgraded
+        self.settled = False
+
+    def settle(self, actual_cost: float) -> None:
+        """Replace the reservation with the turn's actual cost"""
+        if self.settled:
+            return
+        self.settled = True
+
+        for budget in self.budgets:
+            budget.reserved -= self.amount
+            budget.spent += actual_cost
+
+        if actual_cost > 0:
+            self.guard.record_day_spend(actual_cost)
+
+
+class BudgetGuard:
+    """
+    Hard and soft spending caps for protocol runs
+
+    Usage:
+        guard = BudgetGuard(per_run=0.50, per_batch=5.0, per_day=20.0)
+        engine = ProtocolEngine(claude, grok, state, budget=guard)
+
+    Soft caps default to soft_ratio of each hard cap. Day spend is kept
+    in ledger_path (JSON, date -> USD) when given, so the daily cap holds
+    across processes and restarts; otherwise it is tracked in memory.
+    Inside a sessions directory, give the ledger a name that is not
+    *.json so it is not listed as a session.
+    The ledger is updated and re-read before each reservation under a
+    file lock. Other processes' in-flight reservations are not in it, so
+    concurrent processes can together pass the daily cap by at most the
+    predicted cost of the turns they have in flight.
+    """
+
+    def __init__(
+        self,
+        per_run: Optional[float] = None,
+        per_batch: Optional[float] = None,
+        per_day: Optional[float] = None,
+        soft_ratio: float = 0.8,
+        ledger_path: Optional[str] = None,
+        downgrades: Optional[Dict[str, str]] = None
+    ):
+        from .protocol import MODEL_DOWNGRADES
+
+        self.per_run = per_run
+        self.per_batch = per_batch
+        self.per_day = per_day
+        self.soft_ratio = soft_ratio
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self.downgrades = downgrades if downgrades is not None else MODEL_DOWNGRADES
+        self._day: Optional[str] = None
+        self._day_budget: Optional[Budget] = None
+
+    def run_budget(self, spent: float = 0.0) -> Budget:
+        """New budget for one protocol run (spent: cost of turns already done)"""
+        return self._make_budget("run", self.per_run, spent)
+
+    def batch_budget(self) -> Budget:
+        """New budget for one batch of runs"""
+        return self._make_budget("batch", self.per_batch)
+
+    def day_budget(self) -> Budget:
+        """Budget for today (rolls over at midnight)"""
+        today = date.today().isoformat()
+        if self._day != today:
+            self._day = today
+            spent = self._read_ledger().get(today, 0.0)
+            self._day_budget = self._make_budget("day", self.per_day, spent)
+        return self._day_budget
+
+    def reserve(
+        self,
+        budgets: List[Budget],
+        model: str,
+        prompt_tokens: int,
+        max_tokens: int,
+        allow_downgrade: bool = True
+    ) -> Reservation:
+        """
+        Predict a turn's cost and hold it against every budget
+
+        Switches to the model's cheaper fallback when any budget would
+        reach its soft cap.
+
+        Raises:
+            BudgetExceededError: If the (possibly downgraded) turn would pass a hard cap
+        """
+        if self.ledger_path is not None and self._day_budget in budgets:
+            # Pick up what other processes have spent today
+            with self._ledger_lock():
+                self._day_budget.spent = self._read_ledger().get(self._day, 0.0)
+
+        predicted = self.predict_cost(model, prompt_tokens, max_tokens)
+        downgraded = False
+
+        if allow_downgrade and any(b.over_soft(predicted) for b in budgets):
+            cheaper = self.downgrades.get(self._resolve(model))
+            if cheaper:
+                logger.info(f"Near soft budget cap: downgrading {model} -> {cheaper}")
+                model = cheaper
+                predicted = self.predict_cost(model, prompt_tokens, max_tokens)
+                downgraded = True
+
+        for budget in budgets:
+            budget.check(predicted)
+
+        for budget in budgets:
+            budget.reserved += predicted
+
+        return Reservation(self, budgets, model, predicted, downgraded)
+
+    def predict_cost(self, model: str, prompt_tokens: int, max_tokens: int) -> float:
+        """Worst-case cost of a call: full prompt plus max_tokens of completion"""
+        from .protocol import calculate_cost
+        return calculate_cost(
+            self._resolve(model), {"prompt": prompt_tokens, "completion": max_tokens}
+        )
+
+    def record_day_spend(self, cost: float) -> None:
+        """Add settled spend to the day ledger"""
+        if self.ledger_path is None:
+            return
+
+        with self._ledger_lock():
+            ledger = self._read_ledger()
+            today = date.today().isoformat()
+            ledger[today] = ledger.get(today, 0.0) + cost
+
+            tmp_path = self.ledger_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(ledger, f, indent=2)
+            os.replace(tmp_path, self.ledger_path)
+
+    @contextmanager
+    def _ledger_lock(self):
+        """Exclusive lock on the day ledger, held across processes (a sidecar .lock file)"""
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.ledger_path.with_name(self.ledger_path.name + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _make_budget(self, scope: str, hard_limit: Optional[float], spent: float = 0.0) -> Budget:
+        soft_limit = hard_limit * self.soft_ratio if hard_limit is not None else None
+        return Budget(scope, hard_limit, soft_limit, spent)
+
+    def _read_ledger(self) -> Dict[str, float]:
+        if self.ledger_path is None or not self.ledger_path.exists():
+            return {}
+        try:
+            with open(self.ledger_path) as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Unreadable budget ledger {self.ledger_path}: {e}")
+            return {}
+
+    @staticmethod
+    def _resolve(model: str) -> str:
+        """Map friendly model aliases to API ids (pricing is keyed by id)"""
+        from .clients.grok import MODEL_IDS
+        return MODEL_IDS.get(model, model)
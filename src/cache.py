@@ -0,0 +1,169 @@
+"""
+Response Cache
+
+Opt-in, content-addressed on-disk cache of model responses for turn
+execution. Keys hash everything that determines a response (participant,
+resolved model, sampling parameters, system prompt, final prompt), so
+replaying a mode on the same topic is near-instant and zero-cost.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    On-disk response cache with TTL and LRU size eviction
+
+    One JSON file per entry, named by the SHA-256 of the request. File
+    mtime tracks last use; when the cache grows past max_entries or
+    max_bytes the least recently used entries are evicted. Entry count and
+    size are kept as running totals, so the directory is only scanned on
+    the first put and when a limit is crossed (which also resyncs the
+    totals with entries written by other processes).
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "sessions/.cache",
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 1024 * 1024
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[int] = None  # Running totals, None until first scan
+        self._bytes = 0
+        logger.info(f"Response cache initialized: {self.cache_dir}")
+
+    @staticmethod
+    def make_key(
+        participant: str,
+        model: str,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_prompt: Optional[str] = None
+    ) -> str:
+        """Hash the request parameters into a cache key"""
+        payload = json.dumps(
+            {
+                "participant": participant,
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "system_prompt": system_prompt,
+                "prompt": prompt,
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, int]]]:
+        """
+        Look up a cached response
+
+        Returns:
+            (response_text, token_usage_dict) or None on miss/expiry
+        """
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry["created_at"] > self.ttl_seconds:
+            self._remove(path)
+            self.misses += 1
+            logger.debug(f"Cache entry expired: {key[:12]}")
+            return None
+
+        # Touch for LRU ordering
+        os.utime(path)
+        self.hits += 1
+        return entry["response"], entry["tokens"]
+
+    def put(self, key: str, response: str, tokens: Dict[str, int]) -> None:
+        """Store a response and evict old entries if over budget"""
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+
+        with open(tmp_path, "w") as f:
+            json.dump({"created_at": time.time(), "response": response, "tokens": tokens}, f)
+
+        if self._entries is None:
+            self._scan()
+        try:
+            self._bytes -= path.stat().st_size  # Overwrite replaces an entry
+        except FileNotFoundError:
+            self._entries += 1
+        self._bytes += tmp_path.stat().st_size
+        os.replace(tmp_path, path)
+
+        if self._entries > self.max_entries or self._bytes > self.max_bytes:
+            self._evict()
+
+    def clear(self) -> int:
+        """Remove all entries, returning how many were deleted"""
+        removed = 0
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        self._entries, self._bytes = 0, 0
+        return removed
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _remove(self, path: Path) -> None:
+        """Delete one entry, keeping the running totals in step"""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if self._entries is not None:
+            self._entries -= 1
+            self._bytes -= size
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """Stat every entry and reset the running totals from the result"""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        self._entries = len(entries)
+        self._bytes = sum(size for _, size, _ in entries)
+        return entries
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within max_entries/max_bytes"""
+        entries = self._scan()
+        if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        entries.sort(key=lambda e: e[0])  # oldest use first
+        while entries and (self._entries > self.max_entries or self._bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            self._entries -= 1
+            self._bytes -= size
+            logger.debug(f"Evicted cache entry {path.stem[:12]}")
@@ -1,6 +1,21 @@
 """AI clients for Claude and Grok"""
 
 from .claude import ClaudeClient
+from .claude_pool import ClaudeWorkerPool
 from .grok import GrokClient
+from .transport import (
+    TransportConfig,
+    XAITransport,
+    close_shared_transport,
+    get_shared_transport,
+)
 
-__all__ = ["ClaudeClient", "GrokClient"]
+__all__ = [
+    "ClaudeClient",
+    "ClaudeWorkerPool",
+    "GrokClient",
+    "TransportConfig",
+    "XAITransport",
+    "get_shared_transport",
+    "close_shared_transport",
+]
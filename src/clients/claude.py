@@ -7,7 +7,10 @@ Async wrapper around Claude Code CLI for protocol integration
 import asyncio
 import json
 import logging
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+from ..tokenizer import usage_for
+from .claude_pool import ClaudeWorker, ClaudeWorkerPool
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +21,24 @@ class ClaudeClient:
 
     Simple subprocess-based integration. Can be enhanced
     later with direct API access if needed.
+
+    Pass a ClaudeWorkerPool to reuse warm CLI processes instead of
+    spawning one subprocess per request.
+
+    Token usage comes from the CLI's JSON output; when the CLI reports
+    none, prompt and completion are counted with the local tokenizer.
     """
 
-    def __init__(self, model: str = "sonnet"):
+    def __init__(
+        self,
+        model: str = "sonnet",
+        pool: Optional[ClaudeWorkerPool] = None,
+        timeout: float = 300
+    ):
         self.model = model
         self.default_temperature = 0.7
+        self.pool = pool
+        self.timeout = timeout
 
     async def chat(
         self,
@@ -45,10 +61,21 @@ class ClaudeClient:
 
         logger.debug(f"Claude request: model={self.model}, temp={temp}")
 
+        if self.pool is not None:
+            response, tokens = await self.pool.chat(prompt)
+            if not tokens.get("total"):
+                tokens = usage_for(prompt, response)
+            logger.info(
+                f"Claude response: {len(response)} chars, {tokens['total']} tokens (pooled)"
+            )
+            return response, tokens
+
         try:
             # Create subprocess - pass prompt via stdin
             proc = await asyncio.create_subprocess_exec(
-                "claude",
+                "claude", "-p",
+                "--output-format", "json",
+                "--model", self.model,
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
@@ -58,25 +85,21 @@ class ClaudeClient:
             try:
                 stdout, stderr = await asyncio.wait_for(
                     proc.communicate(input=prompt.encode()),
-                    timeout=300  # 5 minutes max
+                    timeout=self.timeout
                 )
             except asyncio.TimeoutError:
                 proc.kill()
                 await proc.wait()
-                raise TimeoutError("Claude CLI request timed out after 5 minutes")
+                raise TimeoutError(f"Claude CLI request timed out after {self.timeout}s")
 
             # Check for errors
             if proc.returncode != 0:
                 error_msg = stderr.decode() if stderr else "Unknown error"
                 raise RuntimeError(f"Claude CLI error: {error_msg}")
 
-            response = stdout.decode().strip()
-
-            # Extract tokens from response if possible
-            # Claude CLI may include metadata - parse if available
-            tokens = self._parse_token_usage(response)
+            response, tokens = self._parse_output(stdout.decode(), prompt)
 
-            logger.info(f"Claude response: {len(response)} chars, ~{tokens['total']} tokens")
+            logger.info(f"Claude response: {len(response)} chars, {tokens['total']} tokens")
 
             return response, tokens
 
@@ -88,21 +111,43 @@ class ClaudeClient:
             logger.error(f"Claude client error: {e}")
             raise
 
-    def _parse_token_usage(self, response: str) -> Dict[str, int]:
+    def _parse_output(self, output: str, prompt: str) -> Tuple[str, Dict[str, int]]:
+        """
+        Parse CLI output into (response_text, token_usage_dict)
+
+        Expects the ``--output-format json`` result object; plain-text
+        output (older CLIs) is taken as the response verbatim.
+        """
+        try:
+            result = json.loads(output)
+        except json.JSONDecodeError:
+            result = None
+
+        if not isinstance(result, dict) or "result" not in result:
+            response = output.strip()
+            return response, self._parse_token_usage({}, prompt, response)
+
+        if result.get("is_error"):
+            raise RuntimeError(f"Claude CLI error: {result.get('result', 'Unknown error')}")
+
+        response = result["result"].strip()
+        return response, self._parse_token_usage(result.get("usage") or {}, prompt, response)
+
+    def _parse_token_usage(self, usage: Dict, prompt: str, response: str) -> Dict[str, int]:
         """
-        Parse token usage from Claude response
+        Convert the CLI usage block to the protocol's token dict
 
-        Claude CLI may include metadata. For now, estimate tokens.
-        Can be enhanced later with actual usage data.
+        Falls back to local tokenizer counts when usage is missing.
         """
-        # Rough estimation: 1 token ≈ 4 characters
-        response_tokens = len(response) // 4
-
-        return {
-            "prompt": 0,  # Not available from CLI
-            "completion": response_tokens,
-            "total": response_tokens
-        }
+        tokens = ClaudeWorker._parse_usage(usage)
+        if tokens["total"] == 0:
+            tokens = usage_for(prompt, response)
+        return tokens
+
+    async def close(self):
+        """Stop pooled workers (no-op without a pool)"""
+        if self.pool is not None:
+            await self.pool.close()
 
     async def chat_stream(
         self,
@@ -0,0 +1,278 @@
+"""
+Claude CLI Worker Pool
+
+Keeps a pool of long-lived ``claude`` processes running in streaming JSON
+mode so turns get a warm worker instead of paying process startup,
+auth and model warm-up on every request.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Streamed result lines can be large; asyncio's default limit is 64 KiB
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class ClaudeWorker:
+    """
+    Single persistent Claude CLI process
+
+    Speaks the CLI's stream-json protocol: one JSON user message per
+    stdin line, JSON events on stdout ending with a ``result`` event.
+    """
+
+    def __init__(self, command: Sequence[str], worker_id: int):
+        self.command = list(command)
+        self.worker_id = worker_id
+        self.requests_served = 0
+        self.in_flight = False  # A prompt was sent and its result event not yet read
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self._stderr_tail: deque = deque(maxlen=20)
+        self._stderr_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_alive(self) -> bool:
+        """True while the process is running"""
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self) -> None:
+        """Spawn the CLI process"""
+        try:
+            self.proc = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "Claude CLI not found. Please ensure 'claude' command is available in PATH."
+            )
+
+        self.requests_served = 0
+        self.in_flight = False
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+        logger.debug(f"Claude worker {self.worker_id} started (pid={self.proc.pid})")
+
+    async def request(self, prompt: str) -> Tuple[str, Dict[str, int]]:
+        """
+        Send one prompt and wait for its result event
+
+        Returns:
+            (response_text, token_usage_dict)
+        """
+        message = {"type": "user", "message": {"role": "user", "content": prompt}}
+        self.in_flight = True
+        self.proc.stdin.write((json.dumps(message) + "\n").encode())
+        await self.proc.stdin.drain()
+
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                await self.proc.wait()
+                stderr = "\n".join(self._stderr_tail) or "process exited"
+                raise RuntimeError(f"Claude CLI error: {stderr}")
+
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if event.get("type") != "result":
+                continue
+
+            self.requests_served += 1
+            self.in_flight = False
+
+            if event.get("is_error"):
+                raise RuntimeError(f"Claude CLI error: {event.get('result', 'Unknown error')}")
+
+            return event.get("result", "").strip(), self._parse_usage(event.get("usage", {}))
+
+    async def stop(self, force: bool = False) -> None:
+        """Terminate the process (force=True kills without waiting)"""
+        if self.is_alive and force:
+            self.proc.kill()
+            await self.proc.wait()
+        elif self.is_alive:
+            self.proc.stdin.close()
+            try:
+                await asyncio.wait_for(self.proc.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+                await self.proc.wait()
+
+        if self._stderr_task:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+
+        logger.debug(f"Claude worker {self.worker_id} stopped")
+
+    async def _drain_stderr(self) -> None:
+        """Keep stderr from filling its pipe; remember the tail for errors"""
+        while True:
+            line = await self.proc.stderr.readline()
+            if not line:
+                return
+            self._stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    @staticmethod
+    def _parse_usage(usage: Dict) -> Dict[str, int]:
+        """Convert CLI usage block to the protocol's token dict"""
+        prompt_tokens = (
+            usage.get("input_tokens", 0)
+            + usage.get("cache_creation_input_tokens", 0)
+            + usage.get("cache_read_input_tokens", 0)
+        )
+        completion_tokens = usage.get("output_tokens", 0)
+
+        tokens = {
+            "prompt": prompt_tokens,
+            "completion": completion_tokens,
+            "total": prompt_tokens + completion_tokens
+        }
+        # Prompt tokens read from Claude's prompt cache (billed at the cached rate)
+        if usage.get("cache_read_input_tokens"):
+            tokens["cached"] = usage["cache_read_input_tokens"]
+        return tokens
+
+
+class ClaudeWorkerPool:
+    """
+    Pool of warm Claude CLI workers
+
+    Features:
+    - Configurable pool size (workers started lazily on first use)
+    - Health check before each request (dead workers are respawned)
+    - Recycling after max_requests_per_worker requests; the replacement
+      is spawned in the background so the next request finds it warm
+    - Workers interrupted mid-request (timeout, error, cancellation) are
+      killed, so no caller ever reads another prompt's result
+
+    A CLI worker keeps its conversation history between requests, so
+    by default each worker serves one request: every prompt starts a
+    fresh conversation. Raise max_requests_per_worker only when all
+    requests belong to one conversation.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        model: str = "sonnet",
+        max_requests_per_worker: int = 1,
+        request_timeout: float = 300,
+        command: Optional[Sequence[str]] = None
+    ):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1 (got {size})")
+
+        self.size = size
+        self.model = model
+        self.max_requests_per_worker = max_requests_per_worker
+        self.request_timeout = request_timeout
+        self.command = list(command) if command else [
+            "claude", "-p",
+            "--input-format", "stream-json",
+            "--output-format", "stream-json",
+            "--verbose",
+            "--model", model,
+        ]
+
+        self._workers: List[ClaudeWorker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._recycling: Set[asyncio.Task] = set()
+
+    async def chat(self, prompt: str) -> Tuple[str, Dict[str, int]]:
+        """
+        Run a prompt on the next idle worker
+
+        Returns:
+            (response_text, token_usage_dict)
+        """
+        if self._idle is None:
+            self._start_pool()
+
+        worker = await self._idle.get()
+        released = False
+        try:
+            await self._ensure_healthy(worker)
+
+            try:
+                response = await asyncio.wait_for(
+                    worker.request(prompt),
+                    timeout=self.request_timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Claude CLI request timed out after {self.request_timeout}s"
+                )
+
+            if worker.requests_served >= self.max_requests_per_worker:
+                self._recycle_in_background(worker)
+                released = True
+            return response
+        finally:
+            if not released:
+                try:
+                    if worker.in_flight or not worker.is_alive:
+                        # Mid-response or dead: its output stream can't be trusted
+                        await worker.stop(force=True)
+                finally:
+                    self._idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        """Stop all workers"""
+        for task in list(self._recycling):
+            task.cancel()
+        await asyncio.gather(*self._recycling, return_exceptions=True)
+        for worker in self._workers:
+            await worker.stop()
+
+        self._workers = []
+        self._idle = None
+        logger.info("Claude worker pool closed")
+
+    def _start_pool(self) -> None:
+        """Create the idle queue (processes spawn on first request)"""
+        self._idle = asyncio.Queue()
+        self._workers = [ClaudeWorker(self.command, i) for i in range(self.size)]
+        for worker in self._workers:
+            self._idle.put_nowait(worker)
+
+        logger.info(
+            f"Claude worker pool initialized: size={self.size}, "
+            f"recycle_after={self.max_requests_per_worker}"
+        )
+
+    def _recycle_in_background(self, worker: ClaudeWorker) -> None:
+        """Replace a worn-out worker, returning it to the pool once restarted"""
+        async def recycle():
+            try:
+                logger.debug(f"Recycling Claude worker {worker.worker_id}")
+                await worker.stop(force=True)
+                await worker.start()
+            except Exception as e:
+                # Left dead: the next request's health check respawns it (or raises)
+                logger.warning(f"Could not restart Claude worker {worker.worker_id}: {e}")
+            finally:
+                if self._idle is not None:
+                    self._idle.put_nowait(worker)
+
+        task = asyncio.create_task(recycle())
+        self._recycling.add(task)
+        task.add_done_callback(self._recycling.discard)
+
+    async def _ensure_healthy(self, worker: ClaudeWorker) -> None:
+        """Respawn dead workers and recycle worn-out ones"""
+        if worker.is_alive and worker.requests_served >= self.max_requests_per_worker:
+            logger.debug(f"Recycling Claude worker {worker.worker_id}")
+            await worker.stop()
+
+        if not worker.is_alive:
+            await worker.start()
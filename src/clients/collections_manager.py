@@ -16,7 +16,8 @@ from typing import Optional, List, Dict
 from pathlib import Path
 import asyncio
 import logging
-from openai import AsyncOpenAI
+
+from .transport import XAITransport, get_shared_transport
 
 logger = logging.getLogger(__name__)
 
@@ -28,11 +29,9 @@ class CollectionsManager:
     Provides high-level interface for knowledge base management
     """
 
-    def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url="https://api.x.ai/v1"
-        )
+    def __init__(self, api_key: str, transport: Optional[XAITransport] = None):
+        self.transport = transport or get_shared_transport()
+        self.client = self.transport.create_openai_client(api_key)
         self.collections_cache = {}
         logger.info("Collections manager initialized")
 
@@ -7,7 +7,8 @@ Async wrapper around XAI Grok API using OpenAI SDK
 import os
 import logging
 from typing import Dict, Tuple, Optional
-from openai import AsyncOpenAI
+
+from .transport import XAITransport, get_shared_transport
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +73,12 @@ class GrokClient:
     - Client will auto-upgrade to grok-4-1 models when released
     """
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "grok-4"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "grok-4",
+        transport: Optional[XAITransport] = None
+    ):
         self.api_key = api_key or os.environ.get("XAI_API_KEY")
         if not self.api_key:
             raise ValueError(
@@ -80,10 +86,9 @@ class GrokClient:
             )
 
         self.default_model = model
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url="https://api.x.ai/v1"
-        )
+        # Connections come from the shared pool; the transport owns their lifecycle
+        self.transport = transport or get_shared_transport()
+        self.client = self.transport.create_openai_client(self.api_key)
 
         # Validate model on init
         resolved_model = self._resolve_model(model)
@@ -116,7 +121,8 @@ class GrokClient:
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        conversation_id: Optional[str] = None
     ) -> Tuple[str, Dict[str, int]]:
         """
         Send chat request to Grok API
@@ -127,9 +133,12 @@ class GrokClient:
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
             system_prompt: Optional system prompt
+            conversation_id: Optional id sent as x-grok-conv-id so requests
+                sharing a prompt prefix are routed to the same prompt cache
 
         Returns:
-            (response_text, token_usage_dict)
+            (response_text, token_usage_dict); "cached" counts prompt tokens
+            served from the prompt cache
         """
         use_model = self._resolve_model(model or self.default_model)
 
@@ -146,15 +155,12 @@ class GrokClient:
                 model=use_model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **self._cache_options(conversation_id)
             )
 
             content = response.choices[0].message.content
-            tokens = {
-                "prompt": response.usage.prompt_tokens,
-                "completion": response.usage.completion_tokens,
-                "total": response.usage.total_tokens
-            }
+            tokens = self._parse_usage(response.usage)
 
             logger.info(
                 f"Grok response: {len(content)} chars, "
@@ -174,12 +180,16 @@ class GrokClient:
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+        conversation_id: Optional[str] = None
     ):
         """
         Stream chat response from Grok
 
-        Yields chunks as they arrive
+        Yields chunks as they arrive. If a ``usage`` dict is passed, it is
+        filled with prompt/completion/total (and cached) token counts once
+        the stream ends. conversation_id works as in chat().
         """
         use_model = self._resolve_model(model or self.default_model)
 
@@ -196,17 +206,42 @@ class GrokClient:
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                stream=True
+                stream=True,
+                **({"stream_options": {"include_usage": True}} if usage is not None else {}),
+                **self._cache_options(conversation_id)
             )
 
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
+                if usage is not None and getattr(chunk, "usage", None):
+                    usage.update(self._parse_usage(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
 
         except Exception as e:
             logger.error(f"Grok streaming error: {e}")
             raise
 
+    @staticmethod
+    def _cache_options(conversation_id: Optional[str]) -> Dict:
+        """Request options routing a conversation to one prompt cache"""
+        if not conversation_id:
+            return {}
+        return {"extra_headers": {"x-grok-conv-id": conversation_id}}
+
+    @staticmethod
+    def _parse_usage(usage) -> Dict[str, int]:
+        """Convert API usage to the protocol's token dict"""
+        tokens = {
+            "prompt": usage.prompt_tokens,
+            "completion": usage.completion_tokens,
+            "total": usage.total_tokens
+        }
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None)
+        if isinstance(cached, int) and cached > 0:
+            tokens["cached"] = cached
+        return tokens
+
     async def close(self):
-        """Close the async client"""
+        """Close the async client (the shared connection pool stays open)"""
         await self.client.close()
@@ -14,7 +14,9 @@ import logging
 from typing import Dict, Tuple, Optional, List
 from pathlib import Path
 import base64
-from openai import AsyncOpenAI
+
+from .grok import GrokClient
+from .transport import XAITransport, get_shared_transport
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +35,8 @@ class EnhancedGrokClient:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "grok-4-fast-reasoning"
+        model: str = "grok-4-fast-reasoning",
+        transport: Optional[XAITransport] = None
     ):
         self.api_key = api_key or os.environ.get("XAI_API_KEY")
         if not self.api_key:
@@ -42,10 +45,9 @@ class EnhancedGrokClient:
             )
 
         self.default_model = model
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url="https://api.x.ai/v1"
-        )
+        # Connections come from the shared pool; the transport owns their lifecycle
+        self.transport = transport or get_shared_transport()
+        self.client = self.transport.create_openai_client(self.api_key)
 
         # Initialize collections manager (lazy loading)
         self._collections_manager = None
@@ -57,7 +59,7 @@ class EnhancedGrokClient:
         """Lazy-load collections manager"""
         if self._collections_manager is None:
             from .collections_manager import CollectionsManager
-            self._collections_manager = CollectionsManager(self.api_key)
+            self._collections_manager = CollectionsManager(self.api_key, transport=self.transport)
         return self._collections_manager
 
     async def chat(
@@ -68,7 +70,8 @@ class EnhancedGrokClient:
         max_tokens: int = 4096,
         system_prompt: Optional[str] = None,
         files: Optional[List[str]] = None,
-        server_side_tools: Optional[List[str]] = None
+        server_side_tools: Optional[List[str]] = None,
+        conversation_id: Optional[str] = None
     ) -> Tuple[str, Dict[str, int]]:
         """
         Enhanced chat with file and tool support
@@ -82,9 +85,12 @@ class EnhancedGrokClient:
             files: Optional list of file paths to include
             server_side_tools: Optional list of server-side tools
                              ['web_search', 'x_search', 'code_execution']
+            conversation_id: Optional id sent as x-grok-conv-id so requests
+                sharing a prompt prefix are routed to the same prompt cache
 
         Returns:
-            (response_text, token_usage_dict)
+            (response_text, token_usage_dict); "cached" counts prompt tokens
+            served from the prompt cache
         """
         use_model = model or self.default_model
 
@@ -163,15 +169,12 @@ class EnhancedGrokClient:
             # Add search_parameters if live_search is requested
             if search_parameters:
                 api_kwargs["extra_body"] = {"search_parameters": search_parameters}
+            api_kwargs.update(GrokClient._cache_options(conversation_id))
 
             response = await self.client.chat.completions.create(**api_kwargs)
 
             content = response.choices[0].message.content
-            tokens = {
-                "prompt": response.usage.prompt_tokens,
-                "completion": response.usage.completion_tokens,
-                "total": response.usage.total_tokens
-            }
+            tokens = GrokClient._parse_usage(response.usage)
 
             logger.info(
                 f"Grok response: {len(content)} chars, "
@@ -191,12 +194,16 @@ class EnhancedGrokClient:
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+        conversation_id: Optional[str] = None
     ):
         """
         Stream chat response from Grok
 
-        Yields chunks as they arrive
+        Yields chunks as they arrive. If a ``usage`` dict is passed, it is
+        filled with prompt/completion/total (and cached) token counts once
+        the stream ends. conversation_id works as in chat().
 
         Note: Streaming not yet supported with files or tools
         """
@@ -215,11 +222,15 @@ class EnhancedGrokClient:
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                stream=True
+                stream=True,
+                **({"stream_options": {"include_usage": True}} if usage is not None else {}),
+                **GrokClient._cache_options(conversation_id)
             )
 
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
+                if usage is not None and getattr(chunk, "usage", None):
+                    usage.update(GrokClient._parse_usage(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
 
         except Exception as e:
@@ -368,7 +379,7 @@ class EnhancedGrokClient:
         )
 
     async def close(self):
-        """Close async clients"""
+        """Close async clients (the shared connection pool stays open)"""
         await self.client.close()
         if self._collections_manager:
             await self._collections_manager.close()
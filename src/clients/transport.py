@@ -0,0 +1,156 @@
+"""
+Shared xAI HTTP Transport
+
+One pooled HTTP client reused by every xAI client (GrokClient,
+EnhancedGrokClient, CollectionsManager) instead of each building its own
+AsyncOpenAI connection pool.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+XAI_BASE_URL = "https://api.x.ai/v1"
+
+
+@dataclass
+class TransportConfig:
+    """
+    Connection pool settings for the shared transport
+
+    All xAI clients talk to a single host, so max_connections is
+    effectively the per-host connection limit.
+    """
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    http2: bool = True
+    base_url: str = XAI_BASE_URL
+
+
+class _PooledAsyncClient(httpx.AsyncClient):
+    """
+    httpx client whose pool is owned by XAITransport
+
+    AsyncOpenAI.close() closes its http client; borrowers calling it
+    must not tear down the pool that other clients share.
+    """
+
+    async def aclose(self) -> None:
+        logger.debug("Ignoring aclose() on shared transport (owned by XAITransport)")
+
+    async def _close_pool(self) -> None:
+        await super().aclose()
+
+
+class XAITransport:
+    """
+    Owner of the pooled HTTP client shared by xAI API clients
+
+    Clients borrow the pool via create_openai_client(); only
+    XAITransport.aclose() actually closes connections.
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        self.config = config or TransportConfig()
+        self._http_client: Optional[_PooledAsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client (created on first use, recreated after close)"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._create_http_client()
+        return self._http_client
+
+    def create_openai_client(self, api_key: str) -> AsyncOpenAI:
+        """
+        Create an AsyncOpenAI client that reuses the shared pool
+
+        Args:
+            api_key: XAI API key
+
+        Returns:
+            AsyncOpenAI client bound to the xAI endpoint
+        """
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.config.base_url,
+            http_client=self.http_client
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled connections"""
+        if self._http_client is not None:
+            await self._http_client._close_pool()
+            self._http_client = None
+            logger.info("xAI transport closed")
+
+    def _create_http_client(self) -> _PooledAsyncClient:
+        """Build the pooled httpx client from config"""
+        http2 = self.config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry
+        )
+
+        logger.info(
+            f"xAI transport initialized: max_connections={limits.max_connections}, "
+            f"keepalive={limits.max_keepalive_connections}, http2={http2}"
+        )
+
+        return _PooledAsyncClient(
+            limits=limits,
+            http2=http2,
+            timeout=httpx.Timeout(None, connect=self.config.connect_timeout),
+            follow_redirects=True
+        )
+
+
+_shared_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, XAITransport]" = (
+    weakref.WeakKeyDictionary()
+)
+_unbound_transport: Optional[XAITransport] = None
+
+
+def get_shared_transport() -> XAITransport:
+    """
+    Transport shared by every client created on the running event loop
+
+    An httpx pool is tied to the loop that opened its connections, so each
+    loop gets its own. Clients built outside a loop share one fallback
+    transport, which binds to whichever loop first uses it.
+    """
+    global _unbound_transport
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        if _unbound_transport is None:
+            _unbound_transport = XAITransport()
+        return _unbound_transport
+
+    transport = _shared_transports.get(loop)
+    if transport is None:
+        transport = XAITransport()
+        _shared_transports[loop] = transport
+    return transport
+
+
+async def close_shared_transport() -> None:
+    """Close the running loop's shared transport (call once at shutdown)"""
+    transport = _shared_transports.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport.aclose()
@@ -0,0 +1,342 @@
+"""
+Context Budgeting
+
+Fits the earlier-turn responses injected into a template ({turn_N}) into
+a per-model token budget, so prompts stop growing with every turn:
+- head / tail / head_tail truncation
+- extractive compression (highest-scoring sentences, in original order)
+- summaries from a summarizer callable, made once per response and
+  reused by every turn that consumes it
+
+Context windows come from MODEL_CONTEXT_WINDOWS (alongside MODEL_PRICING
+in protocol.py).
+"""
+
+import asyncio
+import hashlib
+import inspect
+import logging
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .budget import DEFAULT_MAX_TOKENS, BudgetExceededError
+from .tokenizer import count_tokens, count_tokens_batch, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("head", "tail", "head_tail", "extractive", "summary")
+SUMMARY_CACHE_SIZE = 256
+
+# Injected context keys look like "turn_3" (participant keys are left alone)
+_CONTEXT_KEY = re.compile(r"^turn_\d+$")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9]{3,}")
+
+OMISSION_MARKER = "\n\n[... {omitted} tokens omitted ...]\n\n"
+
+# summarizer(text, max_tokens) -> summary or (summary, cost) (sync or async)
+Summarizer = Callable[[str, int], Any]
+
+
+class ClientSummarizer:
+    """
+    Summarizer backed by a chat client
+
+    Called on its own it goes straight to client.chat. A ProtocolEngine
+    whose budgeter holds one makes the call itself instead, inside the
+    rate limit and budgets, and charges its cost to the turn.
+    """
+
+    def __init__(self, client, model: Optional[str] = None):
+        self.client = client
+        self.model = model
+
+    @staticmethod
+    def prompt(text: str, max_tokens: int) -> str:
+        return (
+            f"Summarize the following in at most {max_tokens} tokens. Keep key facts, "
+            f"figures, names and conclusions; drop repetition.\n\n{text}"
+        )
+
+    async def call(self, text: str, max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """Summarize text; returns (summary, token_usage_dict)"""
+        kwargs = {"model": self.model} if self.model else {}
+        return await self.client.chat(
+            self.prompt(text, max_tokens), max_tokens=max_tokens, **kwargs
+        )
+
+    async def __call__(self, text: str, max_tokens: int) -> str:
+        response, _ = await self.call(text, max_tokens)
+        return response
+
+
+def client_summarizer(client, model: Optional[str] = None) -> ClientSummarizer:
+    """
+    Summarizer backed by a chat client
+
+    Usage:
+        summarize = client_summarizer(grok, model="grok-4-fast-non-reasoning-latest")
+        budgeter = ContextBudgeter(strategy="summary", summarizer=summarize)
+    """
+    return ClientSummarizer(client, model)
+
+
+class ContextBudgeter:
+    """
+    Per-model token budget for injected turn context
+
+    The budget for a turn is the smaller of max_context_tokens (or the
+    turn's own max_context_tokens) and what the model's context window
+    leaves after the template and output_reserve. It is split across the
+    injected responses so short ones stay whole and long ones share the
+    rest; only responses over their share are compressed.
+
+    Summaries (strategy="summary") target summary_tokens and are cached
+    by response text, so a response consumed by several later turns is
+    summarized once; its cost (when the summarizer reports one) is
+    charged to the fit that made it. Without a summarizer, or if it
+    fails, head_tail is used instead; BudgetExceededError is not a failure
+    to fall back from and propagates.
+    """
+
+    def __init__(
+        self,
+        max_context_tokens: Optional[int] = None,
+        strategy: str = "head_tail",
+        summarizer: Optional[Summarizer] = None,
+        summary_tokens: int = 1024,
+        output_reserve: int = DEFAULT_MAX_TOKENS,
+        context_windows: Optional[Dict[str, int]] = None
+    ):
+        from .protocol import MODEL_CONTEXT_WINDOWS
+
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown context strategy: {strategy} (expected one of {STRATEGIES})")
+
+        self.max_context_tokens = max_context_tokens
+        self.strategy = strategy
+        self.summarizer = summarizer
+        self.summary_tokens = summary_tokens
+        self.output_reserve = output_reserve
+        self.context_windows = (
+            context_windows if context_windows is not None else MODEL_CONTEXT_WINDOWS
+        )
+        self._summaries: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+
+    def budget_for(
+        self,
+        model: str,
+        template_tokens: int = 0,
+        max_context_tokens: Optional[int] = None
+    ) -> Optional[int]:
+        """Token budget for a turn's injected context (None = unlimited)"""
+        from .clients.grok import MODEL_IDS
+
+        limits = []
+        cap = max_context_tokens if max_context_tokens is not None else self.max_context_tokens
+        if cap is not None:
+            limits.append(cap)
+
+        window = self.context_windows.get(MODEL_IDS.get(model, model))
+        if window is not None:
+            limits.append(window - self.output_reserve - template_tokens)
+
+        return max(0, min(limits)) if limits else None
+
+    async def fit(
+        self,
+        context: Dict[str, Any],
+        model: str,
+        template_tokens: int = 0,
+        max_context_tokens: Optional[int] = None,
+        strategy: Optional[str] = None,
+        summarizer: Optional[Summarizer] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict]]:
+        """
+        Fit injected responses into the model's context budget
+
+        Args:
+            summarizer: Used instead of self.summarizer for this fit
+
+        Returns:
+            (context, compression_record) - the record is None when
+            everything fit and nothing was changed
+        """
+        strategy = strategy or self.strategy
+        budget = self.budget_for(model, template_tokens, max_context_tokens)
+        keys = [key for key in context if _CONTEXT_KEY.match(key) and isinstance(context[key], str)]
+        if budget is None or not keys:
+            return context, None
+
+        sizes = dict(zip(keys, count_tokens_batch([context[key] for key in keys])))
+        total = sum(sizes.values())
+        if total <= budget:
+            return context, None
+
+        allotments = self._allocate(sizes, budget)
+        fitted = dict(context)
+        turns = {}
+        cost = 0.0
+
+        for key in keys:
+            if sizes[key] <= allotments[key]:
+                continue
+            text, method, summary_cost = await self._compress(
+                context[key], allotments[key], strategy, summarizer or self.summarizer
+            )
+            cost += summary_cost
+            fitted[key] = text
+            turns[key] = {
+                "original_tokens": sizes[key],
+                "tokens": count_tokens(text),
+                "method": method
+            }
+
+        record = {
+            "strategy": strategy,
+            "budget": budget,
+            "original_tokens": total,
+            "tokens": sum(turns[k]["tokens"] if k in turns else sizes[k] for k in keys),
+            "turns": turns,
+            "cost": round(cost, 6)
+        }
+        logger.info(
+            f"Context compressed {record['original_tokens']} -> {record['tokens']} tokens "
+            f"({strategy}, budget {budget})"
+        )
+        return fitted, record
+
+    async def compress(self, text: str, max_tokens: int, strategy: str) -> Tuple[str, str]:
+        """
+        Compress one response to at most max_tokens
+
+        Returns:
+            (text, method actually used)
+        """
+        text, method, _ = await self._compress(text, max_tokens, strategy, self.summarizer)
+        return text, method
+
+    async def _compress(
+        self,
+        text: str,
+        max_tokens: int,
+        strategy: str,
+        summarizer: Optional[Summarizer]
+    ) -> Tuple[str, str, float]:
+        """compress(), also returning the cost of a summary made for it"""
+        if strategy == "head":
+            return truncate_tokens(text, max_tokens), "head", 0.0
+        if strategy == "tail":
+            return truncate_tokens(text, max_tokens, from_end=True), "tail", 0.0
+        if strategy == "extractive":
+            return self._extract(text, max_tokens), "extractive", 0.0
+        if strategy == "summary" and summarizer is not None:
+            try:
+                summary, cost = await self._summary(text, summarizer)
+                return truncate_tokens(summary, max_tokens), "summary", cost
+            except BudgetExceededError:
+                # A hard cap refuses the turn too, not just its summary
+                raise
+            except Exception as e:
+                logger.warning(f"Context summary failed ({e}); truncating instead")
+        return self._head_tail(text, max_tokens), "head_tail", 0.0
+
+    @staticmethod
+    def _allocate(sizes: Dict[str, int], budget: int) -> Dict[str, int]:
+        """Split budget so responses under the fair share keep their size"""
+        allotments = {}
+        remaining = budget
+        pending = sorted(sizes, key=sizes.get)
+
+        while pending:
+            share = remaining // len(pending)
+            if sizes[pending[0]] > share:
+                for key in pending:
+                    allotments[key] = share
+                break
+            key = pending.pop(0)
+            allotments[key] = sizes[key]
+            remaining -= sizes[key]
+
+        return allotments
+
+    @staticmethod
+    def _head_tail(text: str, max_tokens: int) -> str:
+        """Keep the opening and the conclusion, marking the cut"""
+        total = count_tokens(text)
+        keep = max_tokens - count_tokens(OMISSION_MARKER.format(omitted=total))
+
+        # Pieces re-tokenize slightly differently once joined; shrink until it fits
+        while keep > 0:
+            head = truncate_tokens(text, keep - keep // 2)
+            tail = truncate_tokens(text, keep // 2, from_end=True)
+            omitted = total - count_tokens(head) - count_tokens(tail)
+            result = head.rstrip() + OMISSION_MARKER.format(omitted=omitted) + tail.lstrip()
+
+            overflow = count_tokens(result) - max_tokens
+            if overflow <= 0:
+                return result
+            keep -= overflow
+
+        return truncate_tokens(text, max_tokens)
+
+    @staticmethod
+    def _extract(text: str, max_tokens: int) -> str:
+        """Keep the highest-scoring sentences that fit, in original order"""
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+        if not sentences:
+            return ""
+
+        frequencies = Counter(_WORD.findall(text.lower()))
+        lengths = count_tokens_batch(sentences)
+
+        def score(index: int) -> float:
+            words = _WORD.findall(sentences[index].lower())
+            value = sum(frequencies[w] for w in words) / (len(words) or 1)
+            return value * (1.5 if index == 0 else 1.0)  # openings carry the gist
+
+        chosen: List[int] = []
+        used = 0
+        for index in sorted(range(len(sentences)), key=score, reverse=True):
+            if used + lengths[index] <= max_tokens:
+                chosen.append(index)
+                used += lengths[index]
+
+        return "\n".join(sentences[i] for i in sorted(chosen))
+
+    async def _summary(self, text: str, summarizer: Summarizer) -> Tuple[str, float]:
+        """
+        Summary of a response, shared by every consumer of the same text
+
+        Returns:
+            (summary, cost) - cost is 0 for consumers reusing a summary
+        """
+        key = hashlib.sha256(text.encode()).hexdigest()
+        future = self._summaries.get(key)
+        made_here = future is None
+
+        if made_here:
+            future = asyncio.ensure_future(self._summarize(text, summarizer))
+            self._summaries[key] = future
+            while len(self._summaries) > SUMMARY_CACHE_SIZE:
+                self._summaries.popitem(last=False)
+            # Failed summaries are not cached; the next consumer retries
+            future.add_done_callback(lambda f: self._forget_failed(key, f))
+        else:
+            self._summaries.move_to_end(key)
+
+        summary, cost = await asyncio.shield(future)
+        return summary, cost if made_here else 0.0
+
+    def _forget_failed(self, key: str, future: asyncio.Future) -> None:
+        if (future.cancelled() or future.exception()) and self._summaries.get(key) is future:
+            del self._summaries[key]
+
+    async def _summarize(self, text: str, summarizer: Summarizer) -> Tuple[str, float]:
+        result = summarizer(text, self.summary_tokens)
+        if inspect.isawaitable(result):
+            result = await result
+        if isinstance(result, tuple):
+            return result
+        return result, 0.0
@@ -0,0 +1,166 @@
+"""
+Cycle Convergence Detection
+
+Incremental similarity between consecutive cycles of a cyclic run.
+Each cycle keeps a fixed-size sketch that is updated as its turns
+commit, so comparing two cycles costs O(sketch size) no matter how long
+the run gets, and only the previous and current cycle are held in memory.
+
+Metrics:
+- jaccard: MinHash estimate of Jaccard similarity over word shingles
+- cosine: cosine similarity of hashed (signed) term-count vectors
+
+Other metrics plug in as a factory returning an object with
+update(text) and similarity(other).
+"""
+
+import math
+import random
+import re
+import zlib
+from typing import Callable, Dict, List, Optional, Union
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Mersenne prime modulus for the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def _hash(token: str) -> int:
+    """Stable 32-bit hash (the same across processes, unlike hash())"""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+class MinHashSketch:
+    """
+    MinHash signature of the word shingles seen so far
+
+    Merging a turn takes the element-wise minimum, so a cycle's
+    signature equals the signature of all its text at once.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        rng = random.Random(seed)
+        self.shingle_size = shingle_size
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self.signature = [MERSENNE_PRIME] * num_perm
+        self.empty = True
+
+    def _shingles(self, text: str) -> set:
+        words = _words(text)
+        size = self.shingle_size
+        if len(words) <= size:
+            return {_hash(" ".join(words))} if words else set()
+        return {_hash(" ".join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+    def update(self, text: str) -> None:
+        hashes = self._shingles(text)
+        if not hashes:
+            return
+        self.empty = False
+        self.signature = [
+            min(current, min((a * x + b) % MERSENNE_PRIME for x in hashes))
+            for current, (a, b) in zip(self.signature, self.permutations)
+        ]
+
+    def similarity(self, other: "MinHashSketch") -> float:
+        """Estimated Jaccard similarity (0.0 if either side saw no text)"""
+        if self.empty or other.empty:
+            return 0.0
+        matches = sum(1 for a, b in zip(self.signature, other.signature) if a == b)
+        return matches / len(self.signature)
+
+
+class TermVectorSketch:
+    """
+    Hashed term-count vector (feature hashing into dimensions buckets)
+
+    Each term adds +1 or -1 to its bucket depending on a hash bit, which
+    keeps collisions from biasing cosine similarity upward.
+    """
+
+    def __init__(self, dimensions: int = 1 << 18):
+        self.dimensions = dimensions
+        self.vector: Dict[int, int] = {}
+
+    def update(self, text: str) -> None:
+        vector = self.vector
+        for word in _words(text):
+            h = _hash(word)
+            bucket = (h >> 1) % self.dimensions
+            vector[bucket] = vector.get(bucket, 0) + (1 if h & 1 else -1)
+
+    def norm(self) -> float:
+        return math.sqrt(sum(v * v for v in self.vector.values()))
+
+    def similarity(self, other: "TermVectorSketch") -> float:
+        """Cosine similarity (0.0 if either side saw no text)"""
+        norms = self.norm() * other.norm()
+        if not norms:
+            return 0.0
+        small, large = sorted((self.vector, other.vector), key=len)
+        dot = sum(v * large.get(k, 0) for k, v in small.items())
+        return dot / norms
+
+
+METRICS: Dict[str, Callable[[], object]] = {
+    "jaccard": MinHashSketch,
+    "cosine": TermVectorSketch,
+}
+
+
+class ConvergenceTracker:
+    """
+    Similarity between consecutive cycles, updated as turns complete
+
+    Call start_cycle(), add() each turn's response, then end_cycle() to
+    get the similarity to the previous cycle (None for the first cycle).
+
+    Args:
+        metric: Name in METRICS or a factory returning a sketch with
+            update(text) and similarity(other)
+    """
+
+    def __init__(self, metric: Union[str, Callable[[], object]] = "jaccard"):
+        if callable(metric):
+            self.metric = getattr(metric, "__name__", "custom")
+            self._factory = metric
+        elif metric in METRICS:
+            self.metric = metric
+            self._factory = METRICS[metric]
+        else:
+            raise ValueError(
+                f"Unknown convergence metric: {metric} (choose from {', '.join(METRICS)})"
+            )
+        self.similarities: List[Optional[float]] = []
+        self._previous = None
+        self._current = None
+
+    def start_cycle(self) -> None:
+        self._current = self._factory()
+
+    def add(self, text: str) -> None:
+        """Fold one response into the current cycle's sketch"""
+        if self._current is None:
+            self.start_cycle()
+        self._current.update(text)
+
+    def end_cycle(self) -> Optional[float]:
+        """Close the current cycle; similarity to the previous cycle"""
+        current = self._current or self._factory()
+        similarity = None
+        if self._previous is not None:
+            similarity = round(current.similarity(self._previous), 4)
+        self.similarities.append(similarity)
+        self._previous, self._current = current, None
+        return similarity
+
+    def to_dict(self) -> Dict:
+        return {"metric": self.metric, "similarities": list(self.similarities)}
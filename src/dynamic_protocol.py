@@ -4,12 +4,13 @@ Dynamic Protocol Engine
 Supports adaptive workflows with template chains, cycles, and self-modifying prompts
 """
 
-import re
 import logging
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
 from .protocol import ProtocolEngine, Conversation, Turn
+from .convergence import ConvergenceTracker
+from .mode_registry import VARIABLE_PATTERN, compile_template
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ class CycleConfig:
     max_cycles: int = 3
     convergence_threshold: Optional[float] = None
     cycle_prompt_template: Optional[str] = None
+    convergence_metric: str = "jaccard"  # jaccard (MinHash) or cosine
 
 
 class DynamicProtocolEngine(ProtocolEngine):
@@ -32,11 +34,22 @@ class DynamicProtocolEngine(ProtocolEngine):
     - Cycle support (loops of loops)
     - Conditional step execution
     - Adaptive workflows that modify themselves
+
+    With a BudgetGuard, all cycles of a run share one per-run budget.
+
+    Cycle convergence is tracked incrementally: each committed response
+    updates its cycle's sketch, and each cycle is compared with the one
+    before it; per-cycle similarities go in metadata["convergence"].
+
+    The context store is updated as turns commit, in turn order, so
+    speculative execution sees the same <VARIABLES> a sequential run would.
     """
 
-    def __init__(self, claude_client, grok_client, state_manager):
-        super().__init__(claude_client, grok_client, state_manager)
+    def __init__(self, claude_client, grok_client, state_manager, **engine_options):
+        super().__init__(claude_client, grok_client, state_manager, **engine_options)
         self.context_store = {}  # Persistent context across turns
+        self._cycle_budget = None
+        self._convergence: Optional[ConvergenceTracker] = None
 
     async def run_dynamic_protocol(
         self,
@@ -63,6 +76,8 @@ class DynamicProtocolEngine(ProtocolEngine):
             "CYCLE": 0,
             **(variables or {})
         }
+        self._cycle_budget = None
+        self._convergence = None
 
         if cycle_config and cycle_config.max_cycles > 1:
             return await self._execute_cycles(mode, task, cycle_config)
@@ -78,6 +93,11 @@ class DynamicProtocolEngine(ProtocolEngine):
         """Execute multiple cycles until convergence or max cycles"""
         all_turns = []
         cycle = 1
+        self._convergence = ConvergenceTracker(cycle_config.convergence_metric)
+
+        # Each cycle is its own protocol run; cap them together
+        if self.budget is not None:
+            self._cycle_budget = self.budget.run_budget()
 
         while cycle <= cycle_config.max_cycles:
             logger.info(f"Starting cycle {cycle}/{cycle_config.max_cycles}")
@@ -86,13 +106,17 @@ class DynamicProtocolEngine(ProtocolEngine):
             self.context_store["CYCLE"] = cycle
             self.context_store["PREVIOUS_CYCLE_SUMMARY"] = self._get_previous_cycle_summary(all_turns)
 
-            # Run single cycle
+            # Run single cycle (its turns update the convergence sketch as they commit)
+            self._convergence.start_cycle()
             conversation = await self._execute_single_run(mode, task)
             all_turns.extend(conversation.turns)
 
-            # Check convergence
-            if cycle_config.convergence_threshold:
-                if self._check_convergence(all_turns, cycle_config.convergence_threshold):
+            # Check convergence against the previous cycle
+            similarity = self._convergence.end_cycle()
+            if similarity is not None:
+                logger.debug(f"Cycle {cycle} similarity to previous: {similarity:.3f}")
+            if cycle_config.convergence_threshold and similarity is not None:
+                if similarity >= cycle_config.convergence_threshold:
                     logger.info(f"Convergence reached at cycle {cycle}")
                     break
 
@@ -105,30 +129,33 @@ class DynamicProtocolEngine(ProtocolEngine):
             mode=f"{mode}-cyclic",
             topic=task,
             turns=all_turns,
-            metadata={"cycles": cycle - 1, "config": cycle_config.__dict__},
+            metadata={
+                "cycles": len(self._convergence.similarities),
+                "config": cycle_config.__dict__,
+                "convergence": self._convergence.to_dict()
+            },
             started_at=all_turns[0].timestamp if all_turns else datetime.now().isoformat(),
             completed_at=datetime.now().isoformat()
         )
+        self._convergence = None
 
         return final_conversation
 
+    def _start_run_budget(self, conversation: Conversation):
+        """Run budget shared across cycles, else a fresh one per run"""
+        if self._cycle_budget is not None:
+            return self._cycle_budget
+        return super()._start_run_budget(conversation)
+
     async def _execute_single_run(
         self,
         mode: str,
         task: str
     ) -> Conversation:
         """Execute single run with dynamic templates"""
-        config = self.load_mode(mode)
-
-        # Execute using base protocol but with dynamic template substitution
-        conversation = await self.run_protocol(
-            mode=mode,
-            topic=task,
-            turns=config.get("turns"),
-            custom_config=None
-        )
-
-        return conversation
+        # Execute using base protocol (mode compiled once by the registry)
+        # but with dynamic template substitution
+        return await self.run_protocol(mode=mode, topic=task)
 
     async def _execute_turn(
         self,
@@ -142,11 +169,10 @@ class DynamicProtocolEngine(ProtocolEngine):
 
         Overrides base method to add template variable support
         """
-        # Build prompt with template substitution
-        template = turn_config.get("template", "")
+        context, compression = await self._fit_context(turn_config, context)
 
         # Substitute context variables first
-        prompt = template.format(topic=topic, **context)
+        prompt = compile_template(turn_config.get("template", "")).render(topic=topic, **context)
 
         # Substitute stored context variables (TASK, RESULT, etc.)
         prompt = self._substitute_variables(prompt, self.context_store)
@@ -155,9 +181,9 @@ class DynamicProtocolEngine(ProtocolEngine):
         if turn_config.get("dynamic", False):
             prompt = await self._apply_dynamic_modifications(prompt, turn_num)
 
-        # Update turn config with modified prompt
+        # Update turn config with modified prompt (already rendered: braces are literal)
         modified_config = turn_config.copy()
-        modified_config["template"] = prompt
+        modified_config["template"] = prompt.replace("{", "{{").replace("}", "}}")
 
         # Execute turn using base implementation
         turn = await super()._execute_turn(
@@ -166,11 +192,24 @@ class DynamicProtocolEngine(ProtocolEngine):
             topic,
             {}  # Context already substituted
         )
+        if compression:
+            self._record_compression(turn, compression)
+
+        return turn
 
-        # Store results for future template substitution
+    def _commit_turn(self, conversation: Conversation, turn: Turn) -> None:
+        """Commit the turn, then store its results for future template substitution"""
+        super()._commit_turn(conversation, turn)
         self._update_context_store(turn)
+        if self._convergence is not None and not turn.error:
+            self._convergence.add(turn.response)
 
-        return turn
+    def _speculation_snapshot(self, turn_num: int, turn_config: Dict) -> Any:
+        """Context-store values the turn's prompt substitutes"""
+        names = sorted(compile_template(turn_config.get("template", "")).variables)
+        if turn_config.get("dynamic", False):
+            names.append("ADAPTIVE_INSTRUCTION")
+        return tuple(self.context_store.get(name) for name in names)
 
     def _substitute_variables(self, template: str, variables: Dict[str, Any]) -> str:
         """
@@ -180,13 +219,14 @@ class DynamicProtocolEngine(ProtocolEngine):
             "Analyze <TASK> and synthesize <PREVIOUS_RESULT>"
             -> "Analyze quantum computing and synthesize [previous result]"
         """
-        pattern = r'<([A-Z_]+)>'
+        if "<" not in template:
+            return template
 
         def replacer(match):
             var_name = match.group(1)
             return str(variables.get(var_name, match.group(0)))
 
-        return re.sub(pattern, replacer, template)
+        return VARIABLE_PATTERN.sub(replacer, template)
 
     async def _apply_dynamic_modifications(self, prompt: str, turn_num: int) -> str:
         """
@@ -254,27 +294,38 @@ class DynamicProtocolEngine(ProtocolEngine):
 
         return summary
 
-    def _check_convergence(self, all_turns: List[Turn], threshold: float) -> bool:
+    def _check_convergence(
+        self,
+        all_turns: List[Turn],
+        threshold: float,
+        metric: str = "jaccard"
+    ) -> bool:
         """
-        Check if cycles have converged
+        Check if the last two cycles in a list of turns have converged
 
-        Simple implementation: compare last two cycles
+        Cycles are split where turn numbers restart; a list without
+        restarts is compared half against half. Cyclic runs track
+        convergence incrementally instead (see ConvergenceTracker).
         """
-        if len(all_turns) < 10:  # Need at least 2 cycles of 5+ turns
+        cycles = [[]]
+        for turn in all_turns:
+            if cycles[-1] and turn.number <= cycles[-1][-1].number:
+                cycles.append([])
+            cycles[-1].append(turn)
+        if len(cycles) == 1:
+            mid_point = len(all_turns) // 2
+            cycles = [all_turns[:mid_point], all_turns[mid_point:]]
+        if not cycles[-2]:
             return False
 
-        # Compare similarity of last cycle vs previous cycle
-        # This is a placeholder - could be enhanced with semantic similarity
-        mid_point = len(all_turns) // 2
-        prev_cycle_responses = " ".join(t.response for t in all_turns[:mid_point])
-        curr_cycle_responses = " ".join(t.response for t in all_turns[mid_point:])
-
-        # Simple word overlap metric
-        prev_words = set(prev_cycle_responses.lower().split())
-        curr_words = set(curr_cycle_responses.lower().split())
-
-        overlap = len(prev_words & curr_words) / len(prev_words | curr_words)
+        tracker = ConvergenceTracker(metric)
+        for cycle_turns in cycles[-2:]:
+            tracker.start_cycle()
+            for turn in cycle_turns:
+                if not turn.error:
+                    tracker.add(turn.response)
+            similarity = tracker.end_cycle()
 
-        logger.debug(f"Convergence check: overlap={overlap:.3f}, threshold={threshold}")
+        logger.debug(f"Convergence check: similarity={similarity:.3f}, threshold={threshold}")
 
-        return overlap >= threshold
+        return similarity >= threshold
@@ -0,0 +1,217 @@
+"""
+Hedged Requests
+
+Cuts tail latency on Grok turns: when a call has not returned by a
+percentile of the latencies observed for its model, a duplicate request
+is sent (optionally to an alternate model from MODEL_IDS), the first
+success wins and the rest are cancelled.
+
+Latencies are learned from completed calls and from Turn.latency in
+saved sessions. Hedge spend (the worst-case cost of each duplicate: its
+prompt plus max_tokens of completion) is capped.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 200
+
+
+class LatencyTracker:
+    """Recent latencies per model (a sliding window of window samples)"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model: str, seconds: float) -> None:
+        samples = self._samples.get(model)
+        if samples is None:
+            samples = self._samples[model] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def count(self, model: str) -> int:
+        return len(self._samples.get(model, ()))
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        """q-th percentile (0-1, nearest rank) of the model's latencies; None without samples"""
+        samples = self._samples.get(model)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        rank = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        return ordered[rank]
+
+
+class Hedger:
+    """
+    Hedging policy for model calls
+
+    A hedge is sent once a call has been outstanding for the percentile
+    latency of its model (never sooner than min_delay), only after
+    min_samples latencies were seen for it, at most max_hedges times per
+    call, and while the total estimated hedge spend stays under max_spend
+    (USD across every call using this hedger; None = no cap).
+
+    alternates maps a model (any MODEL_IDS alias) to the alias hedges
+    are sent to; models without an entry are hedged to themselves.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        min_delay: float = 1.0,
+        max_hedges: int = 1,
+        alternates: Optional[Dict[str, str]] = None,
+        max_spend: Optional[float] = None,
+        window: int = DEFAULT_WINDOW
+    ):
+        from .clients.grok import MODEL_IDS
+
+        if not 0 < percentile < 1:
+            raise ValueError(f"percentile must be between 0 and 1, got {percentile}")
+        for alias in (alternates or {}).values():
+            if alias not in MODEL_IDS:
+                raise ValueError(f"Unknown alternate model: {alias}")
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_hedges = max_hedges
+        self.alternates = {MODEL_IDS.get(k, k): v for k, v in (alternates or {}).items()}
+        self.max_spend = max_spend
+        self.latencies = LatencyTracker(window)
+        self.stats = {"calls": 0, "hedges": 0, "hedge_wins": 0, "spend": 0.0}
+
+    @staticmethod
+    def _model_id(model: str) -> str:
+        from .clients.grok import MODEL_IDS
+        return MODEL_IDS.get(model, model)
+
+    def record(self, model: str, seconds: float) -> None:
+        """Record one call latency for a model"""
+        self.latencies.record(self._model_id(model), seconds)
+
+    def learn(self, turns: Iterable) -> int:
+        """
+        Learn latencies from completed turns (e.g. from saved sessions)
+
+        Failed and cache-served turns are skipped.
+
+        Returns:
+            Number of latencies recorded
+        """
+        learned = 0
+        for turn in turns:
+            if turn.error or turn.cache_hit or not turn.model or turn.participant != "grok":
+                continue
+            self.record(turn.model, turn.latency)
+            learned += 1
+        return learned
+
+    def learn_from_sessions(self, state_manager, limit: int = 20) -> int:
+        """Learn latencies from the most recent saved sessions"""
+        learned = 0
+        for session in state_manager.list_sessions(limit=limit):
+            try:
+                conversation = state_manager.load_conversation(session["session_id"])
+            except Exception as e:
+                logger.debug(
+                    f"Skipping session {session.get('session_id')} for latency history: {e}"
+                )
+                continue
+            learned += self.learn(conversation.turns)
+        return learned
+
+    def delay_for(self, model: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to model (None = do not hedge)"""
+        model_id = self._model_id(model)
+        if self.latencies.count(model_id) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(model_id, self.percentile))
+
+    def alternate_for(self, model: str) -> str:
+        """Model a hedge of model is sent to"""
+        return self.alternates.get(self._model_id(model), model)
+
+    def _can_spend(self, amount: float) -> bool:
+        return self.max_spend is None or self.stats["spend"] + amount <= self.max_spend
+
+    async def run(
+        self,
+        model: str,
+        call: Callable[[str], Awaitable[Any]],
+        estimated_cost: Callable[[str], float] = lambda model: 0.0
+    ) -> Tuple[Any, str, int]:
+        """
+        Call model, hedging if it is slow
+
+        Args:
+            model: Model of the primary request
+            call: call(model) -> awaitable result
+            estimated_cost: Worst-case cost of one duplicate request to a model
+
+        Returns:
+            (result, model that answered, hedges sent)
+
+        Raises:
+            The first error if every request fails
+        """
+        self.stats["calls"] += 1
+        loop = asyncio.get_running_loop()
+        delay = self.delay_for(model)
+
+        started: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+        def launch(target: str) -> None:
+            started[asyncio.ensure_future(call(target))] = (target, loop.time())
+
+        launch(model)
+        pending = set(started)
+        errors: List[BaseException] = []
+        hedges = 0
+
+        try:
+            while pending:
+                can_hedge = delay is not None and hedges < self.max_hedges
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if task.exception() is None:
+                        target, start = started[task]
+                        self.record(target, loop.time() - start)
+                        if hedges and task is not next(iter(started)):
+                            self.stats["hedge_wins"] += 1
+                        return task.result(), target, hedges
+                    errors.append(task.exception())
+
+                if not done and can_hedge:
+                    target = self.alternate_for(model)
+                    cost = estimated_cost(target)
+                    if not self._can_spend(cost):
+                        logger.info(f"Hedge budget exhausted; waiting on {model}")
+                        delay = None
+                        continue
+                    hedges += 1
+                    self.stats["hedges"] += 1
+                    self.stats["spend"] = round(self.stats["spend"] + cost, 6)
+                    logger.info(f"Hedging {model} call after {delay:.2f}s with {target}")
+                    launch(target)
+                    pending = {task for task in started if not task.done()}
+
+            raise errors[0]
+        finally:
+            losers = [task for task in started if not task.done()]
+            for task in losers:
+                task.cancel()
+            # Let cancelled calls release their rate-limit slots and reservations
+            await asyncio.gather(*losers, return_exceptions=True)
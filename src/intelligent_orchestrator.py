@@ -6,13 +6,43 @@ Provides tools for Claude to analyze tasks, generate loops, and orchestrate exec
 """
 
 import json
+import math
 import re
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# STATUS values of the validator prompt (dynamic.json validator_template)
+VALIDATION_STATUSES = ("complete", "needs_refinement", "needs_rework")
+
+# Assumed seconds per turn until turn latencies have been recorded
+DEFAULT_TURN_SECONDS = 30.0
+# Recorded turn latencies kept per complexity
+LATENCY_WINDOW = 100
+# Assumed output of one simple subtask, and Grok output rate, until measured
+DEFAULT_SUBTASK_OUTPUT_TOKENS = 400
+DEFAULT_OUTPUT_TOKENS_PER_SECOND = 50.0
+# Assumed description length of a simple subtask, and how far a subtask's
+# output estimate may move from the mean because of its description
+DEFAULT_DESCRIPTION_WORDS = 25
+OUTPUT_SCALE_RANGE = (0.5, 2.0)
+# Generation time a batch turn of simple subtasks is sized to
+BATCH_TARGET_SECONDS = 30.0
+
+# "3", "#3", "Subtask 3", "Task 3": references to subtasks by number
+_NUMBER_REFERENCE = re.compile(r"(?:sub)?(?:task)?\s*#?\s*(\d+)", re.IGNORECASE)
+
+
+class DependencyCycleError(ValueError):
+    """Raised when subtask dependencies form a cycle"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependency cycle between subtasks: {' -> '.join(cycle)}")
+
 
 @dataclass
 class Subtask:
@@ -30,8 +60,178 @@ class ExecutionStrategy:
     """Strategy for executing subtasks"""
     strategy_type: str  # single_loop, one_loop_per_task, mixed
     total_estimated_turns: int
+    # Dependency levels, in run order
     parallel_groups: List[List[str]] = field(default_factory=list)
     reasoning: str = ""
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+
+
+# Line patterns for DecompositionParser (anchored, one line at a time)
+_SUBTASK_LINE = re.compile(
+    r"\s*\**\s*\d+\.\s*(?P<name>.+?)\s*-\s*\[?\**Complexity:?\**\s*(?P<complexity>\w+)",
+    re.IGNORECASE
+)
+_FIELD_LINE = re.compile(
+    r"\s*[-*]*\s*\**(?P<field>Description|Dependencies)\**:\s*(?P<value>.*)",
+    re.IGNORECASE
+)
+# "LOOP_STRATEGY: mixed" (decomposer) or "- Strategy: mixed" (assessor's EXECUTION_PLAN)
+_STRATEGY = re.compile(
+    r"(?:LOOP_)?STRATEGY:\**\s*\[?\**\s*(single_loop|one_loop_per_task|mixed)\b", re.IGNORECASE
+)
+_REASONING = re.compile(r"REASONING:\**\s*(.*)")
+# "### RESULT: Name" headings separating subtasks in a batch turn's response
+_RESULT_HEADING = re.compile(r"\s*#{1,6}\s*\**RESULT:\**\s*(?P<name>.+?)[\s*]*$", re.IGNORECASE)
+
+
+def split_batch_results(text: str) -> Dict[str, str]:
+    """
+    Per-subtask results of a batch turn, keyed by the names in its headings
+
+    Text before the first RESULT heading is dropped; a name repeated in
+    a later heading replaces the earlier section.
+    """
+    results: Dict[str, str] = {}
+    name: Optional[str] = None
+    lines: List[str] = []
+    for line in text.splitlines():
+        heading = _RESULT_HEADING.match(line)
+        if heading:
+            if name is not None:
+                results[name] = "\n".join(lines).strip()
+            name, lines = heading.group("name").strip(" []*"), []
+        elif name is not None:
+            lines.append(line)
+    if name is not None:
+        results[name] = "\n".join(lines).strip()
+    return results
+
+
+class DecompositionParser:
+    """
+    Incremental, line-oriented parser for decomposition responses
+
+    feed() takes streamed text in any chunking and returns the Subtasks
+    completed by it: a block (number, name and complexity line, then
+    Description: and Dependencies: lines) is complete at its
+    Dependencies: line, or when the next block or section starts. Each
+    line is examined once, so parsing is linear in the response length.
+
+    Accepted format (LOOP_STRATEGY and REASONING may come before or after
+    the SUBTASKS section; a LOOP_STRATEGY line after it ends the section):
+
+        SUBTASKS:
+        1. Name - Complexity: simple
+           Description: ...
+           Dependencies: Other name, ... (or none)
+
+        LOOP_STRATEGY: single_loop
+        REASONING: ...
+
+    Any heading ending in SUBTASKS: starts the section (e.g. an
+    assessor's VALIDATED_SUBTASKS:) and "Strategy: <name>" lines count as
+    LOOP_STRATEGY. strategy_stated and stated_fields record what the
+    text actually said, so a refined list can be completed from the
+    original one (see IntelligentOrchestrator.parse_refined_decomposition).
+    """
+
+    def __init__(self):
+        self.subtasks: List[Subtask] = []
+        self.strategy_type = "single_loop"  # default
+        self.strategy_stated = False
+        self.stated_fields: Dict[str, set] = {}  # Subtask name -> {"description", "dependencies"}
+        self.reasoning = ""
+        self._pending: List[str] = []  # Text of the current, unfinished line
+        self._in_subtasks = False
+        self._block: Optional[Subtask] = None
+        self._reasoning_lines: Optional[List[str]] = None  # Collecting until a blank line
+
+    def feed(self, chunk: str) -> List[Subtask]:
+        """Consume streamed text; returns subtasks completed by it"""
+        if "\n" not in chunk:
+            self._pending.append(chunk)
+            return []
+        lines = ("".join(self._pending) + chunk).split("\n")
+        self._pending = [lines.pop()]
+        completed: List[Subtask] = []
+        for line in lines:
+            self._line(line, completed)
+        return completed
+
+    def close(self) -> List[Subtask]:
+        """End of response: parse the last line and flush the open block"""
+        completed: List[Subtask] = []
+        self._line("".join(self._pending), completed)
+        self._pending = []
+        self._finish_block(completed)
+        if self._reasoning_lines is not None:
+            self._end_reasoning()
+        return completed
+
+    def _line(self, line: str, completed: List[Subtask]) -> None:
+        if self._reasoning_lines is not None:
+            if line.strip():
+                self._reasoning_lines.append(line.strip())
+                return
+            if self._reasoning_lines:
+                self._end_reasoning()
+            return
+
+        strategy = _STRATEGY.search(line)
+        if strategy:
+            self.strategy_type = strategy.group(1).lower()
+            self.strategy_stated = True
+            if self._in_subtasks:
+                self._finish_block(completed)
+                self._in_subtasks = False
+            return
+
+        reasoning = _REASONING.search(line)
+        if reasoning:
+            text = reasoning.group(1).strip()
+            self._reasoning_lines = [text] if text else []
+            return
+
+        if "SUBTASKS:" in line:
+            self._in_subtasks = True
+            return
+        if not self._in_subtasks:
+            return
+
+        header = _SUBTASK_LINE.match(line)
+        if header:
+            self._finish_block(completed)
+            self._block = Subtask(
+                name=header.group("name").strip(" []*"),
+                description="",
+                complexity=header.group("complexity").lower()
+            )
+            self.stated_fields[self._block.name] = set()
+            return
+
+        field_line = _FIELD_LINE.match(line)
+        if field_line and self._block is not None:
+            value = field_line.group("value").strip()
+            field_name = field_line.group("field").lower()
+            self.stated_fields[self._block.name].add(field_name)
+            if field_name == "description":
+                self._block.description = value
+            else:
+                self._block.dependencies = [
+                    d.strip() for d in value.split(",") if d.strip() and d.strip().lower() != "none"
+                ]
+                self._finish_block(completed)
+
+    def _finish_block(self, completed: List[Subtask]) -> None:
+        if self._block is not None:
+            self.subtasks.append(self._block)
+            completed.append(self._block)
+            self._block = None
+
+    def _end_reasoning(self) -> None:
+        self.reasoning = "\n".join(self._reasoning_lines)
+        self._reasoning_lines = None
 
 
 class IntelligentOrchestrator:
@@ -43,12 +243,31 @@ class IntelligentOrchestrator:
     - Generate dynamic prompts
     - Decide on execution strategies
     - Adapt workflows based on results
+    - Parse and predict validator outcomes, for callers that branch on
+      them with ProtocolEngine.speculate
+
+    Subtask dependencies are solved into topological levels (every
+    subtask in a level can run at once); execution prompts are generated
+    level by level so dependencies always come first. The critical path
+    is estimated from recorded per-complexity turn latencies (pass the
+    same turn_latencies dict to share history between orchestrators).
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        turn_latencies: Optional[Dict[str, Deque[float]]] = None,
+        output_stats: Optional[Dict[str, Deque[float]]] = None,
+        batch_seconds: float = BATCH_TARGET_SECONDS
+    ):
         self.subtasks: List[Subtask] = []
         self.execution_strategy: Optional[ExecutionStrategy] = None
         self.execution_results: Dict[str, Any] = {}
+        self.status_counts: Dict[str, Counter] = {}  # complexity -> observed STATUS counts
+        self.turn_latencies = turn_latencies if turn_latencies is not None else {}
+        # "tokens_per_second" (Grok output rate), "subtask_tokens" (output per simple
+        # subtask) and "description_words" (description length of those subtasks)
+        self.output_stats = output_stats if output_stats is not None else {}
+        self.batch_seconds = batch_seconds
 
     def parse_decomposition(self, decomposition_text: str) -> Tuple[List[Subtask], ExecutionStrategy]:
         """
@@ -61,62 +280,96 @@ class IntelligentOrchestrator:
            Dependencies: task1, task2
 
         LOOP_STRATEGY: single_loop
+
+        (see DecompositionParser for the accepted format). Raises
+        DependencyCycleError if the dependencies form a cycle.
         """
-        subtasks = []
-        strategy_type = "single_loop"  # default
-
-        # Extract subtasks section
-        subtasks_match = re.search(r'SUBTASKS:(.*?)(?:LOOP_STRATEGY:|$)', decomposition_text, re.DOTALL)
-        if subtasks_match:
-            subtasks_text = subtasks_match.group(1)
-
-            # Parse each subtask
-            subtask_pattern = r'\d+\.\s*(.+?)\s*-\s*Complexity:\s*(\w+)(.*?)(?=\d+\.|$)'
-            for match in re.finditer(subtask_pattern, subtasks_text, re.DOTALL):
-                name = match.group(1).strip()
-                complexity = match.group(2).strip().lower()
-                details = match.group(3).strip()
-
-                # Extract description
-                desc_match = re.search(r'Description:\s*(.+?)(?:\n|Dependencies:|$)', details, re.DOTALL)
-                description = desc_match.group(1).strip() if desc_match else ""
-
-                # Extract dependencies
-                deps_match = re.search(r'Dependencies:\s*(.+?)(?:\n|$)', details)
-                dependencies = []
-                if deps_match:
-                    deps_text = deps_match.group(1).strip()
-                    dependencies = [d.strip() for d in deps_text.split(',') if d.strip() and d.strip().lower() != 'none']
-
-                subtasks.append(Subtask(
-                    name=name,
-                    description=description,
-                    complexity=complexity,
-                    dependencies=dependencies
-                ))
+        parser = DecompositionParser()
+        parser.feed(decomposition_text)
+        parser.close()
+
+        return self.plan(parser.subtasks, parser.strategy_type, parser.reasoning)
 
-        # Extract strategy
-        strategy_match = re.search(r'LOOP_STRATEGY:\s*(\w+)', decomposition_text)
-        if strategy_match:
-            strategy_type = strategy_match.group(1).strip()
+    def parse_refined_decomposition(
+        self,
+        texts: List[str]
+    ) -> Optional[Tuple[List[Subtask], ExecutionStrategy]]:
+        """
+        Plan from a decomposition and its refinements (oldest text first)
 
+        The latest text listing subtasks supplies them (e.g. an assessor's
+        VALIDATED_SUBTASKS over the decomposer's SUBTASKS); a description
+        or dependency list it leaves out is taken from the same-named
+        subtask in an earlier list. The strategy and reasoning are the
+        latest ones stated in any text.
+
+        Returns:
+            As plan(), or None if no text lists subtasks
+        """
+        parsers = []
+        for text in texts:
+            parser = DecompositionParser()
+            parser.feed(text)
+            parser.close()
+            parsers.append(parser)
+
+        listed = [parser for parser in parsers if parser.subtasks]
+        if not listed:
+            return None
+        final = listed[-1]
+
+        earlier = {st.name.lower(): st for parser in listed[:-1] for st in parser.subtasks}
+        for subtask in final.subtasks:
+            original = earlier.get(subtask.name.lower())
+            stated = final.stated_fields.get(subtask.name, set())
+            if original is not None and "description" not in stated:
+                subtask.description = original.description
+            if original is not None and "dependencies" not in stated:
+                subtask.dependencies = list(original.dependencies)
+
+        strategy = next(
+            (p.strategy_type for p in reversed(parsers) if p.strategy_stated), final.strategy_type
+        )
+        reasoning = next((p.reasoning for p in reversed(parsers) if p.reasoning), "")
+        return self.plan(final.subtasks, strategy, reasoning)
+
+    def plan(
+        self,
+        subtasks: List[Subtask],
+        strategy_type: str = "single_loop",
+        reasoning: str = ""
+    ) -> Tuple[List[Subtask], ExecutionStrategy]:
+        """
+        Plan execution of subtasks (parsed or built directly)
+
+        Raises:
+            DependencyCycleError: If subtask dependencies form a cycle
+        """
         # Calculate estimated turns
+        for subtask in subtasks:
+            subtask.estimated_turns = self._estimated_turns(subtask, strategy_type)
         total_turns = self._estimate_total_turns(subtasks, strategy_type)
 
-        # Identify parallel opportunities
+        # Identify parallel opportunities (raises DependencyCycleError)
         parallel_groups = self._identify_parallel_groups(subtasks)
+        critical_path, critical_seconds = self.estimate_critical_path(subtasks)
 
         strategy = ExecutionStrategy(
             strategy_type=strategy_type,
             total_estimated_turns=total_turns,
             parallel_groups=parallel_groups,
-            reasoning=self._extract_reasoning(decomposition_text)
+            reasoning=reasoning,
+            critical_path=critical_path,
+            critical_path_seconds=critical_seconds
         )
 
         self.subtasks = subtasks
         self.execution_strategy = strategy
 
-        logger.info(f"Parsed {len(subtasks)} subtasks, strategy: {strategy_type}")
+        logger.info(
+            f"Planned {len(subtasks)} subtasks in {len(parallel_groups)} levels, "
+            f"strategy: {strategy_type}"
+        )
         return subtasks, strategy
 
     def generate_execution_prompts(self) -> List[Dict[str, Any]]:
@@ -146,16 +399,21 @@ class IntelligentOrchestrator:
     def _generate_single_loop_prompts(self) -> List[Dict[str, Any]]:
         """Generate prompts for single loop execution"""
         prompts = []
+        dependencies = self._dependency_graph(self.subtasks)
+        result_turns: Dict[str, int] = {}
 
-        for i, subtask in enumerate(self.subtasks):
+        for i, subtask in enumerate(self._ordered_subtasks()):
             # Executor prompt
             prompts.append({
                 "role": f"execute_{subtask.name}",
                 "participant": "grok" if i % 2 == 0 else "claude",
                 "template": self._create_executor_prompt(subtask),
-                "context_from": self._get_dependency_turn_numbers(subtask, prompts),
+                "context_from": self._get_dependency_turn_numbers(
+                    dependencies[subtask.name], result_turns
+                ),
                 "subtask_name": subtask.name
             })
+            result_turns[subtask.name] = len(prompts)
 
             # Quick validation for moderate/complex tasks
             if subtask.complexity in ["moderate", "complex"]:
@@ -180,20 +438,27 @@ class IntelligentOrchestrator:
     def _generate_per_task_loop_prompts(self) -> List[Dict[str, Any]]:
         """Generate prompts for one loop per complex task"""
         prompts = []
+        dependencies = self._dependency_graph(self.subtasks)
+        result_turns: Dict[str, int] = {}
 
-        for subtask in self.subtasks:
+        for subtask in self._ordered_subtasks():
+            context_from = self._get_dependency_turn_numbers(
+                dependencies[subtask.name], result_turns
+            )
             if subtask.complexity == "simple":
                 # Simple tasks get single execution
                 prompts.append({
                     "role": f"execute_{subtask.name}",
                     "participant": "grok",
                     "template": self._create_executor_prompt(subtask),
-                    "context_from": self._get_dependency_turn_numbers(subtask, prompts)
+                    "context_from": context_from,
+                    "subtask_name": subtask.name
                 })
+                result_turns[subtask.name] = len(prompts)
             else:
                 # Complex tasks get full loop: Research → Execute → Validate → Refine (if needed)
-                loop_prompts = self._create_task_loop(subtask, len(prompts))
-                prompts.extend(loop_prompts)
+                prompts.extend(self._create_task_loop(subtask, len(prompts), context_from))
+                result_turns[subtask.name] = len(prompts) - 1  # The loop's execute turn
 
         # Final synthesis
         prompts.append({
@@ -206,24 +471,49 @@ class IntelligentOrchestrator:
         return prompts
 
     def _generate_mixed_prompts(self) -> List[Dict[str, Any]]:
-        """Generate prompts for mixed strategy"""
-        prompts = []
-
-        # Batch simple tasks
-        simple_tasks = [st for st in self.subtasks if st.complexity == "simple"]
-        if simple_tasks:
-            prompts.append({
-                "role": "batch_simple_tasks",
-                "participant": "grok",
-                "template": self._create_batch_prompt(simple_tasks),
-                "context_from": []
-            })
+        """
+        Generate prompts for mixed strategy
 
-        # Individual loops for complex tasks
-        complex_tasks = [st for st in self.subtasks if st.complexity in ["moderate", "complex"]]
-        for subtask in complex_tasks:
-            loop_prompts = self._create_task_loop(subtask, len(prompts))
-            prompts.extend(loop_prompts)
+        Level by level, simple tasks are packed into parallel batch turns
+        (see pack_simple_batches) and complex tasks get their own loops.
+        Turns depending on a batched task take only its RESULT section of
+        the batch response (context_sections).
+        """
+        prompts = []
+        dependencies = self._dependency_graph(self.subtasks)
+        result_turns: Dict[str, int] = {}
+        batched: Dict[str, int] = {}  # Simple task -> its batch turn
+        by_name = {st.name: st for st in self.subtasks}
+
+        for level in self._identify_parallel_groups(self.subtasks):
+            subtasks = [by_name[name] for name in level]
+
+            # Batch simple tasks
+            simple = [st for st in subtasks if st.complexity == "simple"]
+            for batch in self.pack_simple_batches(simple):
+                needed = [dep for st in batch for dep in dependencies[st.name]]
+                prompt = {
+                    "role": "batch_simple_tasks",
+                    "participant": "grok",
+                    "template": self._create_batch_prompt(batch),
+                    "context_from": self._get_dependency_turn_numbers(needed, result_turns),
+                    "batch_subtasks": [st.name for st in batch]
+                }
+                sections = self._batch_sections(needed, batched)
+                if sections:
+                    prompt["context_sections"] = sections
+                prompts.append(prompt)
+                for st in batch:
+                    result_turns[st.name] = batched[st.name] = len(prompts)
+
+            # Individual loops for complex tasks
+            for subtask in (st for st in subtasks if st.complexity in ["moderate", "complex"]):
+                needed = dependencies[subtask.name]
+                context_from = self._get_dependency_turn_numbers(needed, result_turns)
+                prompts.extend(self._create_task_loop(
+                    subtask, len(prompts), context_from, self._batch_sections(needed, batched)
+                ))
+                result_turns[subtask.name] = len(prompts) - 1  # The loop's execute turn
 
         # Final synthesis
         prompts.append({
@@ -235,21 +525,40 @@ class IntelligentOrchestrator:
 
         return prompts
 
-    def _create_task_loop(self, subtask: Subtask, start_index: int) -> List[Dict[str, Any]]:
-        """Create a mini-loop for a complex subtask"""
+    def _create_task_loop(
+        self,
+        subtask: Subtask,
+        start_index: int,
+        context_from: List[int],
+        context_sections: Optional[Dict[int, List[str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Create a mini-loop for a complex subtask
+
+        The loop's research turn takes context_from (the subtask's
+        dependencies); its execute turn is the one later subtasks depend on.
+        """
+        research = {
+            "role": f"research_{subtask.name}",
+            "participant": "grok",
+            "grok_model": "grok-4-fast",
+            "template": (
+                f"**RESEARCH: {subtask.name}**\n\n{subtask.description}\n\n"
+                "Research necessary background and gather information needed to "
+                "complete this subtask effectively."
+            ),
+            "context_from": context_from
+        }
+        if context_sections:
+            research["context_sections"] = context_sections
         return [
-            {
-                "role": f"research_{subtask.name}",
-                "participant": "grok",
-                "grok_model": "grok-4-fast",
-                "template": f"**RESEARCH: {subtask.name}**\n\n{subtask.description}\n\nResearch necessary background and gather information needed to complete this subtask effectively.",
-                "context_from": self._get_dependency_turn_numbers(subtask, [])
-            },
+            research,
             {
                 "role": f"execute_{subtask.name}",
                 "participant": "claude",
                 "template": self._create_executor_prompt(subtask, with_research=True),
-                "context_from": [start_index + 1]
+                "context_from": [start_index + 1],
+                "subtask_name": subtask.name
             },
             {
                 "role": f"validate_{subtask.name}",
@@ -300,9 +609,9 @@ Review the execution results and validate:
 3. **Decision**
    Provide structured response:
    ```
-   STATUS: [complete | needs_refinement | incomplete]
+   STATUS: [complete | needs_refinement | needs_rework]
    ISSUES: [list any problems or none]
-   RECOMMENDATION: [proceed | refine | redo]
+   NEXT: [proceed | refine | restart]
    ```
 
 Be thorough but fair."""
@@ -356,7 +665,9 @@ For each task:
 2. Provide clear output
 3. Note any issues
 
-Batch results in structured format."""
+Start each task's result with a heading line naming the task exactly:
+
+### RESULT: <task name>"""
 
     def _estimate_total_turns(self, subtasks: List[Subtask], strategy: str) -> int:
         """Estimate total turns needed"""
@@ -369,38 +680,275 @@ Batch results in structured format."""
             return simple + (complex * 3) + 1  # 3 turns per complex task + synthesis
 
         elif strategy == "mixed":
-            simple = len([st for st in subtasks if st.complexity == "simple"])
+            by_name = {st.name: st for st in subtasks}
+            batches = sum(
+                len(self.pack_simple_batches(
+                    [by_name[name] for name in level if by_name[name].complexity == "simple"]
+                ))
+                for level in self._identify_parallel_groups(subtasks)
+            )
             complex = len([st for st in subtasks if st.complexity in ["moderate", "complex"]])
-            return 1 + (complex * 3) + 1  # 1 batch turn + complex loops + synthesis
+            return batches + (complex * 3) + 1  # batch turns + complex loops + synthesis
 
         return len(subtasks) + 1
 
     def _identify_parallel_groups(self, subtasks: List[Subtask]) -> List[List[str]]:
-        """Identify which subtasks can run in parallel"""
-        # Simple implementation: tasks with no dependencies can run in parallel
-        no_deps = [st.name for st in subtasks if not st.dependencies]
+        """
+        Group subtasks into dependency levels (Kahn layering)
+
+        Level 0 holds subtasks without dependencies, level N those whose
+        dependencies are all in earlier levels; every subtask in a level
+        can run at once.
+
+        Raises:
+            DependencyCycleError: If dependencies form a cycle
+        """
+        dependencies = self._dependency_graph(subtasks)
+        waiting = {name: len(deps) for name, deps in dependencies.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in dependencies}
+        for name, deps in dependencies.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        levels = []
+        level = [name for name, count in waiting.items() if count == 0]
+        while level:
+            levels.append(level)
+            next_level = []
+            for name in level:
+                for dependent in dependents[name]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        next_level.append(dependent)
+            level = next_level
+
+        if sum(len(level) for level in levels) < len(dependencies):
+            blocked = {name for name, count in waiting.items() if count > 0}
+            raise DependencyCycleError(self._find_cycle(dependencies, blocked))
+        return levels
+
+    @staticmethod
+    def _find_cycle(dependencies: Dict[str, List[str]], blocked: set) -> List[str]:
+        """One dependency cycle among subtasks Kahn layering could not place"""
+        # Every blocked subtask waits on another blocked one: walk until a repeat
+        path = [next(name for name in dependencies if name in blocked)]
+        seen = {path[0]: 0}
+        while True:
+            step = next(dep for dep in dependencies[path[-1]] if dep in blocked)
+            if step in seen:
+                return path[seen[step]:] + [step]
+            seen[step] = len(path)
+            path.append(step)
+
+    def _dependency_graph(self, subtasks: List[Subtask]) -> Dict[str, List[str]]:
+        """
+        Subtask name -> names of the subtasks it depends on
 
-        if len(no_deps) > 1:
-            return [no_deps]
-        return []
+        Dependencies match subtask names case-insensitively, or by number
+        ("2", "Subtask 2"); anything else (e.g. external prerequisites)
+        is ignored.
+        """
+        by_name = {st.name.lower(): st.name for st in subtasks}
+        graph: Dict[str, List[str]] = {}
+        for subtask in subtasks:
+            deps = []
+            for reference in subtask.dependencies:
+                name = by_name.get(reference.strip().lower())
+                if name is None:
+                    number = _NUMBER_REFERENCE.fullmatch(reference.strip())
+                    if number and 1 <= int(number.group(1)) <= len(subtasks):
+                        name = subtasks[int(number.group(1)) - 1].name
+                if name is None:
+                    logger.debug(f"Ignoring unknown dependency {reference!r} of {subtask.name}")
+                elif name != subtask.name and name not in deps:
+                    deps.append(name)
+            graph[subtask.name] = deps
+        return graph
+
+    def _ordered_subtasks(self) -> List[Subtask]:
+        """Subtasks level by level, so every dependency comes first"""
+        by_name = {st.name: st for st in self.subtasks}
+        levels = self._identify_parallel_groups(self.subtasks)
+        return [by_name[name] for level in levels for name in level]
+
+    def _get_dependency_turn_numbers(
+        self,
+        dependencies: List[str],
+        result_turns: Dict[str, int]
+    ) -> List[int]:
+        """Turn numbers holding the results of dependency subtasks"""
+        return sorted({result_turns[name] for name in dependencies if name in result_turns})
+
+    @staticmethod
+    def _batch_sections(dependencies: List[str], batched: Dict[str, int]) -> Dict[int, List[str]]:
+        """Batch turn -> the dependency subtasks whose RESULT sections to take from it"""
+        sections: Dict[int, List[str]] = {}
+        for name in dependencies:
+            if name in batched and name not in sections.get(batched[name], []):
+                sections.setdefault(batched[name], []).append(name)
+        return sections
+
+    def estimate_output_tokens(self, subtask: Subtask) -> float:
+        """
+        Expected output tokens of a simple subtask
 
-    def _get_dependency_turn_numbers(self, subtask: Subtask, existing_prompts: List[Dict]) -> List[int]:
-        """Get turn numbers for subtask dependencies"""
-        turn_numbers = []
+        The mean output per simple subtask (measured, else the default),
+        scaled by the subtask's description length against the measured
+        subtasks' (the default until measured), within OUTPUT_SCALE_RANGE.
+        Subtasks without a description get the mean.
+        """
+        samples = self.output_stats.get("subtask_tokens")
+        mean = sum(samples) / len(samples) if samples else DEFAULT_SUBTASK_OUTPUT_TOKENS
+
+        words = len(subtask.description.split())
+        if not words:
+            return mean
+        lengths = self.output_stats.get("description_words")
+        typical = sum(lengths) / len(lengths) if lengths else DEFAULT_DESCRIPTION_WORDS
+        low, high = OUTPUT_SCALE_RANGE
+        return mean * min(high, max(low, words / typical))
+
+    def output_tokens_per_second(self) -> float:
+        """Expected Grok output rate (measured mean, else the default)"""
+        samples = self.output_stats.get("tokens_per_second")
+        return sum(samples) / len(samples) if samples else DEFAULT_OUTPUT_TOKENS_PER_SECOND
+
+    def pack_simple_batches(self, subtasks: List[Subtask]) -> List[List[Subtask]]:
+        """
+        Bin-pack simple subtasks into batch turns that run in parallel
 
-        for dep_name in subtask.dependencies:
-            # Find the turn that executed this dependency
-            for i, prompt in enumerate(existing_prompts):
-                if prompt.get("subtask_name") == dep_name:
-                    turn_numbers.append(i + 1)
-                    break
+        A batch is sized to what the model generates in batch_seconds, so
+        the number of batches is the fewest that fit the token budget
+        (fewer calls); tasks go largest first onto the least-loaded batch,
+        which keeps the longest batch, and so the level, short.
+        """
+        if not subtasks:
+            return []
+        sizes = {st.name: self.estimate_output_tokens(st) for st in subtasks}
+        budget = self.output_tokens_per_second() * self.batch_seconds
+        count = min(len(subtasks), max(1, math.ceil(sum(sizes.values()) / budget)))
+
+        batches: List[List[Subtask]] = [[] for _ in range(count)]
+        loads = [0.0] * count
+        for subtask in sorted(subtasks, key=lambda st: sizes[st.name], reverse=True):
+            index = loads.index(min(loads))
+            batches[index].append(subtask)
+            loads[index] += sizes[subtask.name]
+
+        # Keep the decomposition's order inside each batch
+        position = {st.name: i for i, st in enumerate(subtasks)}
+        for batch in batches:
+            batch.sort(key=lambda st: position[st.name])
+        return batches
+
+    @staticmethod
+    def _estimated_turns(subtask: Subtask, strategy: str) -> int:
+        """Turns a subtask takes under a strategy (batched simple tasks count one)"""
+        if subtask.complexity == "simple":
+            return 1
+        return 2 if strategy == "single_loop" else 3
+
+    def record_turn_latency(self, complexity: str, seconds: float) -> None:
+        """Record how long one turn of a subtask of this complexity took"""
+        samples = self.turn_latencies.get(complexity)
+        if samples is None:
+            samples = self.turn_latencies[complexity] = deque(maxlen=LATENCY_WINDOW)
+        samples.append(seconds)
+
+    def _record_output(self, key: str, value: float) -> None:
+        samples = self.output_stats.get(key)
+        if samples is None:
+            samples = self.output_stats[key] = deque(maxlen=LATENCY_WINDOW)
+        samples.append(value)
+
+    def _record_subtask_output(self, name: str, tokens: float) -> None:
+        """Record one simple subtask's output, with its description length"""
+        self._record_output("subtask_tokens", tokens)
+        subtask = next((st for st in self.subtasks if st.name == name), None)
+        if subtask is not None and subtask.description.strip():
+            self._record_output("description_words", len(subtask.description.split()))
+
+    def learn_latencies(self, turns: List[Any]) -> int:
+        """
+        Record latencies of generated turns (roles like execute_<subtask>)
 
-        return turn_numbers
+        Grok turns also record output tokens per second, and batch turns
+        (split by the length of each RESULT section) and simple execute
+        turns the output tokens per simple subtask, which size later
+        batches.
 
-    def _extract_reasoning(self, text: str) -> str:
-        """Extract reasoning from decomposition"""
-        reasoning_match = re.search(r'REASONING:\s*(.+?)(?:\n\n|$)', text, re.DOTALL)
-        return reasoning_match.group(1).strip() if reasoning_match else ""
+        Returns:
+            Number of latencies recorded
+        """
+        complexity = {st.name: st.complexity for st in self.subtasks}
+        learned = 0
+        for turn in turns:
+            if turn.error or turn.cache_hit:
+                continue
+            completion = turn.tokens.get("completion", 0)
+            if turn.participant == "grok" and completion and turn.latency > 0:
+                self._record_output("tokens_per_second", completion / turn.latency)
+
+            if turn.role == "batch_simple_tasks":
+                results = split_batch_results(turn.response)
+                total_chars = sum(len(text) for text in results.values())
+                if completion and results:
+                    for result_name, text in results.items():
+                        share = len(text) / total_chars if total_chars else 1 / len(results)
+                        self._record_subtask_output(result_name, completion * share)
+                continue
+
+            name = turn.role.partition("_")[2]
+            if name in complexity:
+                self.record_turn_latency(complexity[name], turn.latency)
+                learned += 1
+                if complexity[name] == "simple" and turn.role.startswith("execute_") and completion:
+                    self._record_subtask_output(name, completion)
+        return learned
+
+    def turn_seconds(self, complexity: str) -> float:
+        """Expected turn latency: mean for the complexity, else for any, else the default"""
+        samples = self.turn_latencies.get(complexity)
+        if not samples:
+            samples = [s for values in self.turn_latencies.values() for s in values]
+        return sum(samples) / len(samples) if samples else DEFAULT_TURN_SECONDS
+
+    def estimate_critical_path(
+        self,
+        subtasks: Optional[List[Subtask]] = None
+    ) -> Tuple[List[str], float]:
+        """
+        Longest chain of dependent subtasks and its expected duration
+
+        Each subtask takes estimated_turns x the expected turn latency
+        for its complexity; independent subtasks are assumed to overlap.
+
+        Returns:
+            (subtask names along the path, expected seconds)
+        """
+        subtasks = self.subtasks if subtasks is None else subtasks
+        if not subtasks:
+            return [], 0.0
+        by_name = {st.name: st for st in subtasks}
+        dependencies = self._dependency_graph(subtasks)
+
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for level in self._identify_parallel_groups(subtasks):
+            for name in level:
+                before = max(dependencies[name], key=lambda dep: finish[dep], default=None)
+                subtask = by_name[name]
+                own = subtask.estimated_turns * self.turn_seconds(subtask.complexity)
+                finish[name] = own + (finish[before] if before else 0.0)
+                previous[name] = before
+
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], round(total, 3)
 
     def adapt_on_failure(self, subtask_name: str, failure_reason: str) -> Dict[str, Any]:
         """
@@ -418,7 +966,7 @@ Batch results in structured format."""
                 "action": "refine",
                 "prompt": self._create_refinement_prompt(subtask, failure_reason)
             }
-        elif "error" in failure_reason.lower() or "incorrect" in failure_reason.lower():
+        elif any(word in failure_reason.lower() for word in ("error", "incorrect", "needs_rework")):
             return {
                 "action": "redo",
                 "prompt": self._create_executor_prompt(subtask)
@@ -429,6 +977,41 @@ Batch results in structured format."""
                 "note": "Minor issues, proceeding"
             }
 
+    def parse_validation_status(self, text: str) -> Optional[str]:
+        """Extract the STATUS decision from a validator response"""
+        match = re.search(
+            r'STATUS:\s*\[?\s*(' + "|".join(VALIDATION_STATUSES) + r')\b', text, re.IGNORECASE
+        )
+        return match.group(1).lower() if match else None
+
+    def record_validation(self, subtask_name: str, status: Optional[str]) -> None:
+        """Remember a validator outcome to sharpen later predictions"""
+        subtask = next((st for st in self.subtasks if st.name == subtask_name), None)
+        complexity = subtask.complexity if subtask else "unknown"
+        if status is not None:
+            self.status_counts.setdefault(complexity, Counter())[status] += 1
+
+    def likely_status(self, subtask_name: str) -> str:
+        """
+        Most likely validator outcome for a subtask
+
+        Uses outcomes seen so far for subtasks of the same complexity
+        (then any complexity); "complete" until something was observed.
+        """
+        subtask = next((st for st in self.subtasks if st.name == subtask_name), None)
+        complexity = subtask.complexity if subtask else "unknown"
+
+        counts = self.status_counts.get(complexity)
+        if not counts:
+            counts = sum(self.status_counts.values(), Counter())
+        if not counts:
+            return "complete"
+        # Ties go to the earlier (more optimistic) status
+        return max(
+            VALIDATION_STATUSES,
+            key=lambda status: (counts[status], -VALIDATION_STATUSES.index(status)),
+        )
+
     def _create_refinement_prompt(self, subtask: Subtask, issues: str) -> str:
         """Create prompt for refining previous attempt"""
         return f"""**REFINE: {subtask.name}**
@@ -0,0 +1,420 @@
+"""
+Mode Registry
+
+Loads, validates and precompiles mode configs from src/modes once:
+- templates parsed into literal/field segments, so rendering a turn is a
+  join instead of a str.format parse
+- the {field} and <VARIABLE> names each template uses
+- the context_from dependency graph, resolved and checked for cycles
+
+Compiled modes are cached by file mtime; an edited mode file is picked
+up on its next lookup. Bad configs (unknown context_from turns, template
+fields no turn provides, cycles) fail at load time, before any turn is
+paid for.
+"""
+
+import json
+import logging
+import re
+import string
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODES_DIR = Path(__file__).parent / "modes"
+STRUCTURES = ("sequential", "parallel", "mixed", "dag")
+PARTICIPANTS = ("claude", "grok")
+
+# Dynamic template variables (<TASK>, <PREVIOUS_RESULT>, ...)
+VARIABLE_PATTERN = re.compile(r"<([A-Z_]+)>")
+
+_TURN_KEY = re.compile(r"^turn_(\d+)$")
+_FORMATTER = string.Formatter()
+
+
+class ModeValidationError(ValueError):
+    """Raised when a mode config cannot run as written"""
+
+    def __init__(self, mode: str, errors: List[str]):
+        self.mode = mode
+        self.errors = list(errors)
+        details = "\n".join(f"  - {error}" for error in self.errors)
+        super().__init__(f"Invalid mode '{mode}':\n{details}")
+
+
+class CompiledTemplate:
+    """
+    Prompt template parsed once into literal text and field names
+
+    render(**values) matches template.format(**values), including the
+    KeyError for a missing field; templates using format specs,
+    conversions or attribute access fall back to str.format.
+    """
+
+    __slots__ = ("source", "fields", "variables", "_segments", "_simple")
+
+    def __init__(self, source: str):
+        self.source = source
+        self._segments: List[Tuple[str, Optional[str]]] = []
+        self._simple = True
+        fields = set()
+
+        for literal, name, spec, conversion in _FORMATTER.parse(source):
+            if name is not None:
+                root = re.split(r"[.\[]", name, maxsplit=1)[0]
+                fields.add(root)
+                if spec or conversion or not name.isidentifier():
+                    self._simple = False
+            self._segments.append((literal, name))
+
+        self.fields = frozenset(fields)
+        self.variables = frozenset(VARIABLE_PATTERN.findall(source))
+
+    def render(self, **values) -> str:
+        """Fill the template's {fields} from values"""
+        if not self._simple:
+            return self.source.format(**values)
+
+        parts = []
+        for literal, name in self._segments:
+            parts.append(literal)
+            if name is not None:
+                parts.append(format(values[name]))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> CompiledTemplate:
+    """Compiled template for source (cached; raises ValueError if malformed)"""
+    return CompiledTemplate(source)
+
+
+@dataclass
+class CompiledMode:
+    """A validated mode config with its templates and dependency graph"""
+    name: str
+    config: Dict
+    templates: Dict[int, CompiledTemplate]
+    dependencies: Dict[int, List[int]]
+    order: List[int]
+    fields: Set[str] = field(default_factory=set)
+    variables: Set[str] = field(default_factory=set)
+    path: Optional[Path] = None
+    mtime_ns: Optional[int] = None
+
+
+def mode_prompts(config: Dict) -> Dict[str, Dict]:
+    """
+    Turn prompts of a mode, including turn_N prompts declared inside phases
+
+    Named phase prompts (e.g. a dynamic mode's final_synthesis) are filled
+    from generated context and are not turn prompts.
+    """
+    prompts = {}
+    for phase in config.get("phases", []):
+        if isinstance(phase, dict) and isinstance(phase.get("prompts"), dict):
+            prompts.update(
+                (key, prompt) for key, prompt in phase["prompts"].items() if _TURN_KEY.match(key)
+            )
+    if isinstance(config.get("prompts"), dict):
+        prompts.update(config["prompts"])
+    return prompts
+
+
+def build_dependency_graph(config: Dict) -> Tuple[Dict[int, List[int]], List[Tuple[int, int]]]:
+    """
+    Turn dependency graph from context_from declarations
+
+    Only turns that run (1..turns with a prompt) are nodes.
+
+    Returns:
+        (turn number -> turn numbers it depends on,
+         [(turn, unknown dependency), ...])
+    """
+    prompts = config.get("prompts", {})
+    turn_nums = [
+        turn_num for turn_num in range(1, config.get("turns", 0) + 1)
+        if f"turn_{turn_num}" in prompts
+    ]
+    known = set(turn_nums)
+
+    dependencies = {}
+    unknown = []
+    for turn_num in turn_nums:
+        deps = []
+        for dep in prompts[f"turn_{turn_num}"].get("context_from", []):
+            if dep in known:
+                deps.append(dep)
+            else:
+                unknown.append((turn_num, dep))
+        dependencies[turn_num] = deps
+
+    return dependencies, unknown
+
+
+def topological_order(dependencies: Dict[int, List[int]]) -> List[int]:
+    """
+    Order turns so each comes after all its dependencies
+
+    Raises:
+        ValueError: If the dependency graph has a cycle
+    """
+    order = []
+    state = {}  # turn -> "visiting" | "done"
+
+    def visit(turn_num: int, path: List[int]):
+        if state.get(turn_num) == "done":
+            return
+        if state.get(turn_num) == "visiting":
+            cycle = " -> ".join(map(str, path + [turn_num]))
+            raise ValueError(f"Dependency cycle in context_from: {cycle}")
+
+        state[turn_num] = "visiting"
+        for dep in dependencies[turn_num]:
+            visit(dep, path + [turn_num])
+        state[turn_num] = "done"
+        order.append(turn_num)
+
+    for turn_num in sorted(dependencies):
+        visit(turn_num, [])
+
+    return order
+
+
+def _run_positions(config: Dict, prompts: Dict[str, Dict]) -> Tuple[Dict[int, int], Set[int]]:
+    """
+    When each turn runs relative to the others, and which run without context
+
+    Returns:
+        (turn number -> position, turns run in parallel with empty context);
+        turns sharing a position run concurrently
+    """
+    structure = config.get("structure", "sequential")
+    turn_nums = sorted(
+        int(match.group(1)) for match in map(_TURN_KEY.match, prompts) if match
+    )
+
+    if structure == "parallel":
+        return {turn_num: 0 for turn_num in turn_nums}, set(turn_nums)
+    if structure != "mixed":
+        return {turn_num: turn_num for turn_num in turn_nums}, set()
+
+    positions = {}
+    no_context = set()
+    position = 0
+    for phase in config.get("phases", []):
+        phase_turns = [t for t in phase.get("turns", []) if isinstance(t, int)]
+        if phase.get("type") == "parallel":
+            position += 1
+            for turn_num in phase_turns:
+                positions.setdefault(turn_num, position)
+                no_context.add(turn_num)
+        else:
+            for turn_num in phase_turns:
+                position += 1
+                positions.setdefault(turn_num, position)
+    return positions, no_context
+
+
+def validate_mode(config: Dict) -> List[str]:
+    """
+    Problems that would make a mode fail or misbehave at run time
+
+    Returns:
+        Error messages (empty when the config is valid)
+    """
+    if not isinstance(config, dict):
+        return ["config must be a JSON object"]
+
+    errors = []
+    structure = config.get("structure", "sequential")
+    if structure not in STRUCTURES:
+        errors.append(f"unknown structure '{structure}' (expected one of {', '.join(STRUCTURES)})")
+
+    turns = config.get("turns")
+    if not isinstance(turns, int) or isinstance(turns, bool) or turns < 0:
+        errors.append(f"'turns' must be a non-negative integer, got {turns!r}")
+
+    prompts = mode_prompts(config)
+    if structure == "mixed":
+        for index, phase in enumerate(config.get("phases", []), 1):
+            for turn_num in phase.get("turns", []):
+                if f"turn_{turn_num}" not in prompts:
+                    errors.append(f"phase {index} lists turn {turn_num}, which has no prompt")
+    elif not isinstance(config.get("prompts"), dict):
+        errors.append("'prompts' must be an object of turn_N prompts")
+
+    positions, no_context = _run_positions(config, prompts)
+
+    for key, turn_config in prompts.items():
+        match = _TURN_KEY.match(key)
+        if not match:
+            errors.append(f"prompt key '{key}' is not of the form turn_N")
+            continue
+        if not isinstance(turn_config, dict):
+            errors.append(f"{key}: prompt must be an object")
+            continue
+
+        turn_num = int(match.group(1))
+        participant = turn_config.get("participant", "claude")
+        if participant not in PARTICIPANTS:
+            errors.append(f"{key}: unknown participant '{participant}'")
+
+        context_from = turn_config.get("context_from", [])
+        if not isinstance(context_from, list):
+            errors.append(f"{key}: context_from must be a list of turn numbers")
+            context_from = []
+
+        available = {"topic"}
+        for dep in context_from:
+            if not isinstance(dep, int) or isinstance(dep, bool) or f"turn_{dep}" not in prompts:
+                errors.append(f"{key}: context_from references unknown turn {dep!r}")
+            elif dep == turn_num:
+                errors.append(f"{key}: context_from references itself")
+            elif (
+                structure != "dag"
+                and positions.get(dep, -1) >= positions.get(turn_num, float("inf"))
+            ):
+                errors.append(f"{key}: context_from turn {dep} does not run before turn {turn_num}")
+            else:
+                available.update({f"turn_{dep}", f"turn_{dep}_participant"})
+        if turn_num in no_context:
+            available = {"topic"}
+
+        template = turn_config.get("template", "")
+        try:
+            compiled = compile_template(template)
+        except (TypeError, ValueError) as e:
+            errors.append(f"{key}: malformed template ({e})")
+            continue
+
+        missing = sorted(compiled.fields - available)
+        if missing:
+            errors.append(
+                f"{key}: template uses {', '.join('{' + name + '}' for name in missing)} "
+                f"but no turn provides it"
+                + (" (parallel turns only get {topic})" if turn_num in no_context else "")
+            )
+
+    if structure == "dag" and isinstance(config.get("prompts"), dict) and not errors:
+        try:
+            topological_order(build_dependency_graph(config)[0])
+        except ValueError as e:
+            errors.append(str(e))
+
+    return errors
+
+
+def compile_mode(
+    name: str,
+    config: Dict,
+    path: Optional[Path] = None,
+    mtime_ns: Optional[int] = None
+) -> CompiledMode:
+    """
+    Validate and precompile a mode config
+
+    Raises:
+        ModeValidationError: If the config is invalid
+    """
+    errors = validate_mode(config)
+    if errors:
+        raise ModeValidationError(name, errors)
+
+    templates = {}
+    for key, turn_config in mode_prompts(config).items():
+        turn_num = int(_TURN_KEY.match(key).group(1))
+        templates[turn_num] = compile_template(turn_config.get("template", ""))
+
+    dependencies, _ = build_dependency_graph(config)
+
+    return CompiledMode(
+        name=name,
+        config=config,
+        templates=templates,
+        dependencies=dependencies,
+        order=topological_order(dependencies),
+        fields=set().union(*(t.fields for t in templates.values())),
+        variables=set().union(*(t.variables for t in templates.values())),
+        path=path,
+        mtime_ns=mtime_ns
+    )
+
+
+class ModeRegistry:
+    """
+    Compiled mode configs from a modes directory
+
+    get(name) reads and compiles a mode on first use and again only when
+    its file's mtime changes. preload() compiles every mode up front and
+    reports the invalid ones.
+    """
+
+    def __init__(self, modes_dir: Optional[Path] = None):
+        self.modes_dir = Path(modes_dir) if modes_dir is not None else DEFAULT_MODES_DIR
+        self._modes: Dict[str, CompiledMode] = {}
+
+    def names(self) -> List[str]:
+        """Names of the mode files in the directory"""
+        return sorted(path.stem for path in self.modes_dir.glob("*.json"))
+
+    def get(self, name: str) -> CompiledMode:
+        """
+        Compiled mode by name
+
+        Raises:
+            ValueError: If the mode file does not exist
+            ModeValidationError: If the mode is invalid
+        """
+        path = self.modes_dir / f"{name}.json"
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise ValueError(f"Mode '{name}' not found at {path}") from None
+
+        compiled = self._modes.get(name)
+        if compiled is not None and compiled.mtime_ns == mtime_ns:
+            return compiled
+
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ModeValidationError(name, [f"invalid JSON: {e}"]) from e
+
+        compiled = compile_mode(name, config, path=path, mtime_ns=mtime_ns)
+        self._modes[name] = compiled
+        logger.debug(f"Compiled mode '{name}' ({len(compiled.templates)} templates)")
+        return compiled
+
+    def preload(self) -> Dict[str, List[str]]:
+        """
+        Compile every mode in the directory
+
+        Returns:
+            Mode name -> validation errors, for the modes that are invalid
+        """
+        errors = {}
+        for name in self.names():
+            try:
+                self.get(name)
+            except ModeValidationError as e:
+                errors[name] = e.errors
+                logger.warning(str(e))
+        return errors
+
+
+_registries: Dict[Path, ModeRegistry] = {}
+
+
+def get_mode_registry(modes_dir: Optional[Path] = None) -> ModeRegistry:
+    """Registry shared by every engine loading modes from modes_dir"""
+    key = Path(modes_dir if modes_dir is not None else DEFAULT_MODES_DIR).resolve()
+    registry = _registries.get(key)
+    if registry is None:
+        registry = ModeRegistry(key)
+        _registries[key] = registry
+    return registry
@@ -6,50 +6,124 @@ with configurable interaction modes.
 
 Phase 3 Features:
 - Parallel turn execution with dependency management
+- Dependency-graph (DAG) scheduling from context_from
 - Exponential backoff retry logic for transient failures
 - Per-turn timeout handling
 - Token and cost tracking per model
-- Streaming output support
+- Token-level streaming with partial-response checkpoints
+- Tracing spans (run -> phase -> turn -> attempt -> client call)
+- Per-run, per-batch and per-day spending caps
+- Token-budgeted injection of earlier-turn context
+- Prefix-stable prompts for provider prompt caching
+- Precompiled, validated mode configs (ModeRegistry)
+- Opt-in speculative execution of sequential turns and outcome branches
+- Hedged Grok requests against tail latency
+- Per-model circuit breakers, Retry-After handling and adaptive timeouts
+- Dynamic-generation modes: decomposition -> generated turn DAG -> synthesis
 """
 
 import asyncio
-import json
+import copy
+import functools
+import inspect
 import logging
 import random
+import re
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Awaitable, Tuple
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 
+from .budget import BudgetExceededError, DEFAULT_MAX_TOKENS
+from .context import ClientSummarizer
+from .intelligent_orchestrator import (
+    DecompositionParser, IntelligentOrchestrator, Subtask, split_batch_results
+)
+from .mode_registry import (
+    build_dependency_graph, compile_mode, compile_template, get_mode_registry, topological_order
+)
+from .rate_limit import get_shared_rate_limiter
+from .resilience import ErrorInfo, classify_error, get_shared_endpoint_guard
+from .tracing import NOOP_TRACER
+from .tokenizer import count_tokens, usage_for
+
 logger = logging.getLogger(__name__)
 
+_CONTEXT_TURN_KEY = re.compile(r"turn_(\d+)")
+
 
 # ============ MODEL PRICING (per 1M tokens) ============
+# "cached_input" applies to prompt tokens served from the provider's prompt
+# cache (defaults to "input" when a model has no cache pricing)
 MODEL_PRICING = {
-    "grok-4-fast-reasoning-latest": {"input": 2.0, "output": 10.0},
-    "grok-4-fast-reasoning": {"input": 2.0, "output": 10.0},
-    "grok-4-fast-non-reasoning-latest": {"input": 1.0, "output": 5.0},
-    "grok-4-fast-non-reasoning": {"input": 1.0, "output": 5.0},
-    "grok-code-fast-1": {"input": 3.0, "output": 15.0},
+    "grok-4-fast-reasoning-latest": {"input": 2.0, "cached_input": 0.5, "output": 10.0},
+    "grok-4-fast-reasoning": {"input": 2.0, "cached_input": 0.5, "output": 10.0},
+    "grok-4-fast-non-reasoning-latest": {"input": 1.0, "cached_input": 0.25, "output": 5.0},
+    "grok-4-fast-non-reasoning": {"input": 1.0, "cached_input": 0.25, "output": 5.0},
+    "grok-code-fast-1": {"input": 3.0, "cached_input": 0.3, "output": 15.0},
     "grok-2-vision-latest": {"input": 2.0, "output": 10.0},
     "grok-2-image-latest": {"input": 5.0, "output": 20.0},
 }
 
 # Claude models (from Anthropic)
 MODEL_PRICING.update({
-    "claude-3-opus-20240229": {"input": 15.0, "output": 75.0},
-    "claude-3-sonnet-20240229": {"input": 3.0, "output": 15.0},
-    "claude-3-haiku-20240307": {"input": 0.25, "output": 1.25},
+    "claude-3-opus-20240229": {"input": 15.0, "cached_input": 1.5, "output": 75.0},
+    "claude-3-sonnet-20240229": {"input": 3.0, "cached_input": 0.3, "output": 15.0},
+    "claude-3-haiku-20240307": {"input": 0.25, "cached_input": 0.03, "output": 1.25},
 })
 
 
+# ============ MODEL DOWNGRADES (cheaper fallback near a soft budget cap) ============
+# Only Grok turns are switched: the Claude CLI picks its model from the client
+MODEL_DOWNGRADES = {
+    "grok-4-fast-reasoning-latest": "grok-4-fast-non-reasoning-latest",
+    "grok-4-fast-reasoning": "grok-4-fast-non-reasoning",
+    "grok-code-fast-1": "grok-4-fast-non-reasoning-latest",
+}
+
+
+# ============ MODEL RATE LIMITS (requests / tokens per minute) ============
+# Adjust to your account tier. Optional "burst" caps back-to-back requests.
+MODEL_RATE_LIMITS = {
+    "grok-4-fast-reasoning-latest": {"rpm": 480, "tpm": 4_000_000},
+    "grok-4-fast-reasoning": {"rpm": 480, "tpm": 4_000_000},
+    "grok-4-fast-non-reasoning-latest": {"rpm": 480, "tpm": 4_000_000},
+    "grok-4-fast-non-reasoning": {"rpm": 480, "tpm": 4_000_000},
+    "grok-code-fast-1": {"rpm": 480, "tpm": 2_000_000},
+    "grok-2-vision-latest": {"rpm": 60, "tpm": 200_000},
+    "grok-2-image-latest": {"rpm": 60, "tpm": 200_000},
+    "claude-3-opus-20240229": {"rpm": 50, "tpm": 400_000},
+    "claude-3-sonnet-20240229": {"rpm": 50, "tpm": 400_000},
+    "claude-3-haiku-20240307": {"rpm": 50, "tpm": 400_000},
+}
+
+# Used for models missing from the table
+DEFAULT_RATE_LIMITS = {"rpm": 60, "tpm": 400_000}
+
+
+# ============ MODEL CONTEXT WINDOWS (tokens) ============
+MODEL_CONTEXT_WINDOWS = {
+    "grok-4-fast-reasoning-latest": 2_000_000,
+    "grok-4-fast-reasoning": 2_000_000,
+    "grok-4-fast-non-reasoning-latest": 2_000_000,
+    "grok-4-fast-non-reasoning": 2_000_000,
+    "grok-code-fast-1": 256_000,
+    "grok-2-vision-latest": 32_768,
+    "grok-2-image-latest": 32_768,
+    "claude-3-opus-20240229": 200_000,
+    "claude-3-sonnet-20240229": 200_000,
+    "claude-3-haiku-20240307": 200_000,
+}
+
+
 def calculate_cost(model: str, tokens: Dict[str, int]) -> float:
     """
     Calculate cost for a turn based on model and token usage.
 
     Args:
         model: Model identifier
-        tokens: Token usage dict with 'prompt' and 'completion' keys
+        tokens: Token usage dict with 'prompt' and 'completion' keys, plus
+            optional 'cached' (prompt tokens read from the prompt cache)
 
     Returns:
         Cost in USD (rounded to 4 decimal places)
@@ -60,10 +134,12 @@ def calculate_cost(model: str, tokens: Dict[str, int]) -> float:
 
     pricing = MODEL_PRICING[model]
     prompt_tokens = tokens.get("prompt", 0)
+    cached_tokens = min(tokens.get("cached", 0), prompt_tokens)
     completion_tokens = tokens.get("completion", 0)
 
     # Cost = (tokens / 1M) * price_per_1M
-    input_cost = (prompt_tokens / 1_000_000) * pricing["input"]
+    input_cost = ((prompt_tokens - cached_tokens) / 1_000_000) * pricing["input"]
+    input_cost += (cached_tokens / 1_000_000) * pricing.get("cached_input", pricing["input"])
     output_cost = (completion_tokens / 1_000_000) * pricing["output"]
 
     total_cost = input_cost + output_cost
@@ -86,6 +162,17 @@ class Turn:
     model: str = ""
     error: Optional[str] = None
     retry_count: int = 0
+    ttft: Optional[float] = None  # Time to first token (streaming only)
+    cache_hit: bool = False
+    context_compression: Optional[Dict] = None  # Set when injected context was cut to budget
+
+
+class StreamAbortedError(Exception):
+    """Raised when a stream handler stops a turn's generation early"""
+
+    def __init__(self, partial_response: str):
+        super().__init__("Stream aborted by handler")
+        self.partial_response = partial_response
 
 
 @dataclass
@@ -112,7 +199,9 @@ class ProtocolEngine:
     Core protocol orchestration engine
 
     Handles:
-    - Mode config loading
+    - Mode config loading (compiled and validated once by a ModeRegistry;
+      invalid modes and custom configs raise ModeValidationError before
+      any turn runs)
     - Turn execution (async) with retry logic and timeouts
     - Context management
     - State persistence
@@ -123,6 +212,84 @@ class ProtocolEngine:
     - Per-turn timeout (default: 30s)
     - Automatic cost calculation
     - Token usage tracking
+
+    Rate limiting:
+    - Every model call holds a slot from a RateLimiter (requests/min and
+      tokens/min per model, plus a global max in-flight cap)
+
+    Tracing:
+    - Pass a Tracer to emit spans for run -> phase -> turn -> attempt ->
+      client call, with model, tokens, retries, queue wait and cost
+
+    Budgets:
+    - Pass a BudgetGuard to cap spending per run, per batch and per day;
+      each turn's cost is predicted before dispatch, near a soft cap Grok
+      turns switch to a cheaper model, and at a hard cap the run stops
+      with BudgetExceededError after persisting completed turns
+
+    Context budgeting:
+    - Pass a ContextBudgeter to fit injected {turn_N} context into a
+      per-model token budget (turn config may set max_context_tokens and
+      context_strategy); Turn.context_compression records what was cut
+
+    Caching:
+    - Pass a ResponseCache to reuse responses for identical requests;
+      cached turns are flagged cache_hit and cost nothing
+    - prompt_caching=True lays prompts out as a stable prefix (topic, then
+      injected turns in turn order) followed by the turn's own role
+      instruction and task, so turns sharing context share a cacheable
+      prefix; Grok requests carry the session id as a cache routing hint.
+      Cached prompt tokens are recorded as tokens["cached"] and billed at
+      the model's cached_input price
+
+    Speculation:
+    - speculative=True starts each sequential turn as soon as its
+      context_from turns have finished instead of after the previous
+      turn; turns still commit in order, and a speculative turn whose
+      _speculation_snapshot changed by its commit point is rerun
+    - speculate() is for callers that branch on a turn's outcome (e.g. a
+      validator's STATUS); no built-in mode branches yet. It pre-launches
+      the likely continuation and cancels it if the outcome differs
+    - Wins and waste are recorded in conversation.metadata["speculation"]
+      and on the protocol.run span
+
+    Hedging:
+    - Pass a Hedger to send a duplicate Grok request (optionally to an
+      alternate model) when a call outlasts a percentile of that model's
+      observed latency; the first success wins and the rest are cancelled
+
+    Resilience:
+    - Failures are classified by exception type and status code; rate
+      limits and overloads wait for the provider's Retry-After when given
+    - Every model has a circuit breaker (EndpointGuard, shared by engines
+      on the event loop unless endpoint_guard is passed): after repeated
+      timeouts, connection or server errors its turns fail fast until a
+      probe call succeeds
+    - Without an explicit turn timeout_seconds, each attempt's timeout
+      follows the model's observed latency (capped by timeout_seconds)
+
+    Dynamic generation:
+    - Modes with dynamic_generation (e.g. dynamic) run their decomposition
+      phase, let IntelligentOrchestrator turn the SUBTASKS into execution
+      turns, run those as a dependency graph (at most
+      max_parallel_subtasks at once), then run the synthesis phase over
+      every execution turn; the plan is recorded in
+      conversation.metadata["execution_plan"]
+    - Under the mixed strategy, simple subtasks are bin-packed into
+      batch turns that run in parallel; turns depending on a batched
+      subtask get only its section of the batch response
+    - stream_decomposition=True plans from the decomposer turn (the first
+      turn before the dynamic phase) and parses it as it streams: each
+      subtask without dependencies starts as soon as its block is written.
+      An early turn is kept if the final plan contains the identical turn,
+      otherwise it is cancelled (counted in speculation stats as waste)
+
+    Streaming:
+    - Pass stream_handler(turn_num, chunk) (sync or async) to receive tokens
+      as they arrive; returning False aborts that turn's generation
+    - Turn.ttft records time to first token
+    - In-flight text is exposed in partial_responses and checkpointed to
+      the state manager every checkpoint_interval seconds
     """
 
     def __init__(
@@ -132,18 +299,80 @@ class ProtocolEngine:
         state_manager,
         max_retries: int = 3,
         timeout_seconds: int = 120,
-        retry_backoff_base: float = 2.0
+        retry_backoff_base: float = 2.0,
+        stream_handler: Optional[Callable[[int, str], Any]] = None,
+        checkpoint_interval: float = 1.0,
+        rate_limiter=None,
+        response_cache=None,
+        tracer=None,
+        budget=None,
+        context_budgeter=None,
+        prompt_caching: bool = False,
+        mode_registry=None,
+        speculative: bool = False,
+        hedger=None,
+        endpoint_guard=None,
+        max_parallel_subtasks: int = 4,
+        stream_decomposition: bool = False
     ):
         self.claude = claude_client
         self.grok = grok_client
         self.state = state_manager
         self.modes_dir = Path(__file__).parent / "modes"
 
+        # Compiled mode configs (None = registry shared by engines using modes_dir)
+        self.mode_registry = mode_registry or get_mode_registry(self.modes_dir)
+
         # Phase 3 configuration
         self.max_retries = max_retries
         self.timeout_seconds = timeout_seconds
         self.retry_backoff_base = retry_backoff_base
 
+        # Streaming
+        self.stream_handler = stream_handler
+        self.checkpoint_interval = checkpoint_interval
+        self.current_session_id: Optional[str] = None
+        self.partial_responses: Dict[int, str] = {}
+
+        # Rate limiting (None = limiter shared by all engines on the event loop)
+        self.rate_limiter = rate_limiter
+
+        # Opt-in response cache (ResponseCache or None)
+        self.response_cache = response_cache
+
+        # Tracing spans (disabled unless a Tracer with an exporter is given)
+        self.tracer = tracer or NOOP_TRACER
+
+        # Spending caps (BudgetGuard or None); run/batch budgets are per call
+        self.budget = budget
+        self._run_budget = None
+        self._batch_budget = None
+
+        # Token budget for injected turn context (ContextBudgeter or None)
+        self.context_budgeter = context_budgeter
+
+        # Prefix-stable prompt layout plus provider cache hints
+        self.prompt_caching = prompt_caching
+
+        # Speculative execution (counters are reset per run)
+        self.speculative = speculative
+        self.speculation_stats = self._new_speculation_stats()
+
+        # Hedged Grok requests (Hedger or None)
+        self.hedger = hedger
+
+        # Circuit breakers and adaptive timeouts (None = guard shared on the event loop)
+        self.endpoint_guard = endpoint_guard
+
+        # Concurrency cap for generated subtask turns (dynamic_generation modes)
+        # and per-complexity turn latencies behind critical-path estimates
+        self.max_parallel_subtasks = max_parallel_subtasks
+        self.subtask_latencies: Dict[str, Any] = {}
+        self.subtask_output_stats: Dict[str, Any] = {}
+
+        # Start dependency-free subtasks while the decomposer is still writing
+        self.stream_decomposition = stream_decomposition
+
         logger.info(
             f"ProtocolEngine initialized: "
             f"max_retries={max_retries}, "
@@ -152,13 +381,30 @@ class ProtocolEngine:
         )
 
     def load_mode(self, mode_name: str) -> Dict:
-        """Load mode configuration from JSON"""
-        mode_path = self.modes_dir / f"{mode_name}.json"
-        if not mode_path.exists():
-            raise ValueError(f"Mode '{mode_name}' not found at {mode_path}")
+        """Load mode configuration (a copy of the registry's compiled config)"""
+        return copy.deepcopy(self.mode_registry.get(mode_name).config)
 
-        with open(mode_path) as f:
-            return json.load(f)
+    def _resolve_config(
+        self,
+        mode: str,
+        turns: Optional[int],
+        custom_config: Optional[Dict]
+    ) -> Dict:
+        """
+        Validated config for a run, with the turn count override applied
+
+        Raises:
+            ModeValidationError: If the mode or custom config is invalid
+        """
+        if mode == "custom" and custom_config:
+            compile_mode(mode, custom_config)
+            config = custom_config
+        else:
+            config = self.mode_registry.get(mode).config
+
+        if turns:
+            config = {**config, "turns": turns}
+        return config
 
     async def run_protocol(
         self,
@@ -179,45 +425,199 @@ class ProtocolEngine:
         Returns:
             Completed conversation with all turns
         """
-        # Load config
-        if mode == "custom" and custom_config:
-            config = custom_config
-        else:
-            config = self.load_mode(mode)
+        config = self._resolve_config(mode, turns, custom_config)
 
-        # Override turns if specified
-        if turns:
-            config["turns"] = turns
+        return await self._start_protocol(mode, topic, config)
 
-        # Initialize conversation
-        session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    async def run_many(
+        self,
+        mode: str,
+        topics: List[str],
+        turns: Optional[int] = None,
+        custom_config: Optional[Dict] = None,
+        max_concurrent: int = 4,
+        on_complete: Optional[Callable[[int, Any], Any]] = None
+    ) -> List[Any]:
+        """
+        Run one mode over many topics with bounded concurrency
+
+        All runs share this engine's clients, state manager, rate limiter
+        (whose in-flight cap bounds model calls across every run), cache
+        and budget guard, whose per-batch cap covers all topics together.
+        Each conversation is saved as soon as it completes; a
+        failing topic does not stop the batch.
+
+        Args:
+            mode: Mode name or "custom"
+            topics: Topics to run
+            turns: Override number of turns
+            custom_config: Custom mode config (for mode="custom")
+            max_concurrent: Maximum protocols running at once
+            on_complete: Optional callback(index, conversation_or_exception)
+                (sync or async) invoked as each topic finishes
+
+        Returns:
+            Conversation (or the raised exception) per topic, in input order
+        """
+        config = self._resolve_config(mode, turns, custom_config)
+
+        batch_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        semaphore = asyncio.Semaphore(max_concurrent)
+        batch_budget = self.budget.batch_budget() if self.budget is not None else None
+
+        async def run_one(index: int, topic: str):
+            async with semaphore:
+                try:
+                    if batch_budget is not None and batch_budget.exhausted:
+                        raise BudgetExceededError(
+                            "batch", batch_budget.hard_limit, batch_budget.committed
+                        )
+
+                    # Per-run copy: own session id and partials, shared clients
+                    engine = copy.copy(self)
+                    engine._batch_budget = batch_budget
+                    result = await engine._start_protocol(
+                        mode, topic, config, session_id=f"{batch_id}-{index:04d}"
+                    )
+                    self.state.save_conversation(result)
+                except Exception as e:
+                    logger.error(f"Batch topic {index} failed ({topic!r}): {e}")
+                    result = e
+
+            if on_complete is not None:
+                callback_result = on_complete(index, result)
+                if inspect.isawaitable(callback_result):
+                    await callback_result
+            return result
+
+        logger.info(f"Starting batch {batch_id}: {len(topics)} topics, mode={mode}, "
+                    f"max_concurrent={max_concurrent}")
+
+        return await asyncio.gather(*(run_one(i, topic) for i, topic in enumerate(topics)))
+
+    async def _start_protocol(
+        self,
+        mode: str,
+        topic: str,
+        config: Dict,
+        session_id: Optional[str] = None
+    ) -> Conversation:
+        """Create and run a new conversation from a resolved mode config"""
+        # Initialize conversation (resolved config is kept for resume)
+        session_id = session_id or datetime.now().strftime("%Y%m%d-%H%M%S")
         conversation = Conversation(
             session_id=session_id,
             mode=mode,
             topic=topic,
             turns=[],
-            metadata=config.get("metadata", {}),
+            metadata={**config.get("metadata", {}), "config": config},
             started_at=datetime.now().isoformat()
         )
+        self.state.start_session(conversation)
 
         logger.info(f"Starting {mode} mode conversation: {topic}")
         logger.info(f"Session ID: {session_id}")
         logger.info(f"Turns: {config['turns']}")
 
+        return await self._run_turns(conversation, config)
+
+    async def resume_protocol(self, session_id: str) -> Conversation:
+        """
+        Continue an interrupted session from its last persisted turn
+
+        Completed turns are kept as-is (and not paid for again); their
+        responses provide context for the turns that still have to run.
+        Turns that failed are run again and replaced, so a finished
+        session with failed turns can be resumed too.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Completed conversation with all turns
+        """
+        conversation = self.state.load_conversation(session_id)
+
+        if conversation.completed_at and not any(t.error for t in conversation.turns):
+            raise ValueError(f"Session already completed: {session_id}")
+
+        config = conversation.metadata.get("config")
+        if config is None:
+            if conversation.mode in ("unknown", "custom"):
+                raise ValueError(f"Session {session_id} has no recorded mode config to resume")
+            config = self.mode_registry.get(conversation.mode).config
+
+        logger.info(
+            f"Resuming {conversation.mode} mode conversation: {conversation.topic} "
+            f"({sum(not t.error for t in conversation.turns)}/{config['turns']} turns done)"
+        )
+
+        return await self._run_turns(conversation, config)
+
+    async def _run_turns(self, conversation: Conversation, config: Dict) -> Conversation:
+        """Execute the turns a conversation is still missing"""
+        topic = conversation.topic
+        self.current_session_id = conversation.session_id
+        self.partial_responses = {}
+        self.speculation_stats = self._new_speculation_stats()
+        if self.budget is not None:
+            self._run_budget = self._start_run_budget(conversation)
+            conversation.metadata.pop("budget_exceeded", None)
+
         # Execute turns based on structure
         structure = config.get("structure", "sequential")
 
-        if structure == "sequential":
-            await self._execute_sequential(conversation, config, topic)
-        elif structure == "parallel":
-            await self._execute_parallel(conversation, config, topic)
-        elif structure == "mixed":
-            await self._execute_mixed(conversation, config, topic)
-        else:
-            raise ValueError(f"Unknown structure: {structure}")
-
-        conversation.completed_at = datetime.now().isoformat()
-        conversation.update_costs()
+        with self.tracer.span(
+            "protocol.run",
+            session_id=conversation.session_id,
+            mode=conversation.mode,
+            structure=structure,
+            resumed_turns=len(conversation.turns)
+        ) as run_span:
+            try:
+                if config.get("dynamic_generation"):
+                    # One phase span per configured phase, turns generated mid-run
+                    await self._execute_generated(conversation, config, topic)
+                elif structure == "mixed":
+                    # One phase span per configured phase
+                    await self._execute_mixed(conversation, config, topic)
+                else:
+                    with self.tracer.span("protocol.phase", type=structure):
+                        if structure == "sequential":
+                            await self._execute_sequential(conversation, config, topic)
+                        elif structure == "parallel":
+                            await self._execute_parallel(conversation, config, topic)
+                        elif structure == "dag":
+                            await self._execute_dag(conversation, config, topic)
+                        else:
+                            raise ValueError(f"Unknown structure: {structure}")
+
+            except BudgetExceededError as e:
+                # Stop cleanly: completed turns are kept and the session stays resumable
+                conversation.turns.sort(key=lambda t: t.number)
+                conversation.update_costs()
+                conversation.metadata["budget_exceeded"] = str(e)
+                self.state.save_conversation(conversation)
+                logger.error(
+                    f"Stopped {conversation.session_id} after {len(conversation.turns)} turns "
+                    f"(${conversation.total_cost:.6f}): {e}"
+                )
+                raise
+
+            conversation.turns.sort(key=lambda t: t.number)
+            conversation.completed_at = datetime.now().isoformat()
+            conversation.update_costs()
+
+            run_span.set_attributes({
+                "turns": len(conversation.turns),
+                "tokens.total": conversation.total_tokens,
+                "cost": conversation.total_cost
+            })
+            if self.speculation_stats["launched"]:
+                conversation.metadata["speculation"] = dict(self.speculation_stats)
+                run_span.set_attributes({
+                    f"speculation.{key}": value for key, value in self.speculation_stats.items()
+                })
 
         logger.info(f"Conversation completed: {len(conversation.turns)} turns")
         logger.info(f"Total tokens: {conversation.total_tokens:,}")
@@ -232,7 +632,9 @@ class ProtocolEngine:
         topic: str
     ):
         """Execute turns sequentially with context building"""
-        context_history = {}
+        if self.speculative:
+            await self._execute_speculative(conversation, config, topic)
+            return
 
         for turn_num in range(1, config["turns"] + 1):
             turn_key = f"turn_{turn_num}"
@@ -241,6 +643,9 @@ class ProtocolEngine:
                 logger.warning(f"No config for {turn_key}, using default")
                 continue
 
+            if self._is_completed(conversation, turn_num):
+                continue
+
             turn_config = config["prompts"][turn_key]
 
             # Build context from previous turns
@@ -257,11 +662,201 @@ class ProtocolEngine:
                 context
             )
 
-            conversation.turns.append(turn)
-            self.state.save_turn(conversation.session_id, turn)
+            self._commit_turn(conversation, turn)
 
             logger.info(f"Turn {turn_num} completed: {turn.participant}")
 
+    async def _execute_speculative(
+        self,
+        conversation: Conversation,
+        config: Dict,
+        topic: str
+    ):
+        """
+        Execute sequential turns, starting each once its context_from turns finish
+
+        Results commit in turn order. A turn started before its predecessor
+        committed is speculative; if its _speculation_snapshot differs at
+        its commit point, it and every turn that used it as context are
+        discarded and rerun.
+        """
+        prompts = config["prompts"]
+        order = [
+            turn_num for turn_num in range(1, config["turns"] + 1)
+            if f"turn_{turn_num}" in prompts and not self._is_completed(conversation, turn_num)
+        ]
+        pending = set(order)
+        # Only earlier turns provide context in sequential order
+        dependencies = {
+            turn_num: [
+                dep for dep in prompts[f"turn_{turn_num}"].get("context_from", [])
+                if dep in pending and dep < turn_num
+            ]
+            for turn_num in order
+        }
+
+        loop = asyncio.get_running_loop()
+        stats = self.speculation_stats
+        finished: Dict[int, Turn] = {t.number: t for t in conversation.turns if not t.error}
+        tasks: Dict[int, asyncio.Task] = {}
+        launches: Dict[int, Tuple[float, Any, bool]] = {}  # start time, snapshot, speculative
+        index = 0
+        last_commit = loop.time()
+
+        def launch_ready():
+            for turn_num in order[index:]:
+                if turn_num in tasks or any(dep not in finished for dep in dependencies[turn_num]):
+                    continue
+
+                turn_config = prompts[f"turn_{turn_num}"]
+                context = {}
+                for dep in turn_config.get("context_from", []):
+                    if dep in finished:
+                        context[f"turn_{dep}"] = finished[dep].response
+                        context[f"turn_{dep}_participant"] = finished[dep].participant
+
+                speculative = turn_num != order[index]
+                launches[turn_num] = (
+                    loop.time(), self._speculation_snapshot(turn_num, turn_config), speculative
+                )
+                tasks[turn_num] = asyncio.create_task(
+                    self._execute_turn(turn_num, turn_config, topic, context)
+                )
+                if speculative:
+                    stats["launched"] += 1
+                    logger.debug(
+                        f"Speculatively started turn {turn_num} (waiting on {order[index]})"
+                    )
+
+        def discard(turn_num: int):
+            for other in list(tasks):
+                if other in tasks and turn_num in dependencies[other]:
+                    discard(other)
+            task = tasks.pop(turn_num)
+            task.cancel()
+            launches.pop(turn_num)
+            turn = finished.pop(turn_num, None)
+            stats["wasted"] += 1
+            stats["wasted_cost"] = round(stats["wasted_cost"] + (turn.cost if turn else 0.0), 6)
+            logger.info(f"Discarded speculative turn {turn_num}")
+
+        def still_valid(turn_num: int) -> bool:
+            _, snapshot, speculative = launches[turn_num]
+            turn_config = prompts[f"turn_{turn_num}"]
+            return not speculative or self._speculation_snapshot(turn_num, turn_config) == snapshot
+
+        try:
+            while index < len(order):
+                launch_ready()
+                running = [task for turn_num, task in tasks.items() if turn_num not in finished]
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for turn_num, task in list(tasks.items()):
+                    if task.done() and turn_num not in finished:
+                        finished[turn_num] = task.result()
+
+                # Commit finished turns in order
+                while index < len(order) and order[index] in finished:
+                    turn_num = order[index]
+                    started, _, speculative = launches[turn_num]
+                    if not still_valid(turn_num):
+                        discard(turn_num)
+                        break
+                    if speculative:
+                        stats["wins"] += 1
+                        stats["head_start_seconds"] = round(
+                            stats["head_start_seconds"] + max(0.0, last_commit - started), 3
+                        )
+
+                    self._commit_turn(conversation, finished[turn_num])
+                    logger.info(f"Turn {turn_num} completed: {finished[turn_num].participant}")
+                    last_commit = loop.time()
+                    index += 1
+
+        except BaseException as e:
+            # Keep turns already paid for; in-flight turns finish only on a budget stop
+            for turn_num, task in tasks.items():
+                if not isinstance(e, BudgetExceededError) and not task.done():
+                    task.cancel()
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+            for turn_num, result in zip(list(tasks), results):
+                if isinstance(result, Turn):
+                    finished[turn_num] = result
+            for turn_num in order[index:]:
+                if turn_num in finished and turn_num in launches and still_valid(turn_num):
+                    self._commit_turn(conversation, finished[turn_num])
+            raise
+
+    def _speculation_snapshot(self, turn_num: int, turn_config: Dict) -> Any:
+        """
+        State outside context_from that a turn's prompt depends on
+
+        Compared at launch and at commit: a speculative turn whose snapshot
+        changed in between is rerun. Base prompts depend only on context_from.
+        """
+        return None
+
+    @staticmethod
+    def _new_speculation_stats() -> Dict[str, Any]:
+        return {
+            "launched": 0, "wins": 0, "wasted": 0, "wasted_cost": 0.0, "head_start_seconds": 0.0
+        }
+
+    async def speculate(
+        self,
+        decision: Awaitable,
+        resolve: Callable[[Any], Optional[str]],
+        continuations: Dict[str, Callable[[], Awaitable]],
+        likely: Optional[str] = None
+    ) -> Tuple[Any, Optional[str], Any]:
+        """
+        Run a branching turn, pre-launching its most likely continuation
+
+        With speculative=True, continuations[likely]() starts alongside
+        decision; if resolve(decision result) picks another outcome the
+        early continuation is cancelled (counted as waste) and the chosen
+        one runs. Without speculation the continuation starts afterwards.
+
+        Args:
+            decision: Awaitable producing the branching result (e.g. a Turn)
+            resolve: Maps that result to an outcome key (e.g. a STATUS)
+            continuations: Outcome key -> coroutine factory for what runs next
+            likely: Outcome to pre-launch
+
+        Returns:
+            (decision result, outcome, continuation result or None)
+        """
+        stats = self.speculation_stats
+        early = None
+        if self.speculative and likely in continuations:
+            early = asyncio.ensure_future(continuations[likely]())
+            stats["launched"] += 1
+
+        try:
+            result = await decision
+        except BaseException:
+            if early is not None:
+                early.cancel()
+            raise
+        outcome = resolve(result)
+
+        if early is not None:
+            if outcome == likely:
+                stats["wins"] += 1
+                return result, outcome, await early
+
+            early.cancel()
+            wasted = (await asyncio.gather(early, return_exceptions=True))[0]
+            stats["wasted"] += 1
+            if isinstance(wasted, Turn):
+                stats["wasted_cost"] = round(stats["wasted_cost"] + wasted.cost, 6)
+            logger.info(f"Speculated outcome {likely!r} lost to {outcome!r}")
+
+        if outcome not in continuations:
+            return result, outcome, None
+        return result, outcome, await continuations[outcome]()
+
     async def _execute_parallel(
         self,
         conversation: Conversation,
@@ -274,7 +869,7 @@ class ProtocolEngine:
         for turn_num in range(1, config["turns"] + 1):
             turn_key = f"turn_{turn_num}"
 
-            if turn_key not in config["prompts"]:
+            if turn_key not in config["prompts"] or self._is_completed(conversation, turn_num):
                 continue
 
             turn_config = config["prompts"][turn_key]
@@ -289,14 +884,28 @@ class ProtocolEngine:
             tasks.append(task)
 
         # Execute all turns concurrently
-        turns = await asyncio.gather(*tasks)
+        turns = await self._gather_turns(conversation, tasks)
+
+        logger.info(f"Parallel execution completed: {len(turns)} turns")
+
+    async def _gather_turns(self, conversation: Conversation, tasks: List) -> List[Turn]:
+        """
+        Run turns concurrently, adding and saving each one that finishes
 
-        # Add to conversation
+        Turns already paid for are kept even if a sibling fails (e.g. with
+        BudgetExceededError); the first failure is then re-raised.
+        """
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        turns = [r for r in results if isinstance(r, Turn)]
         for turn in turns:
-            conversation.turns.append(turn)
-            self.state.save_turn(conversation.session_id, turn)
+            self._commit_turn(conversation, turn)
 
-        logger.info(f"Parallel execution completed: {len(turns)} turns")
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        return turns
 
     async def _execute_mixed(
         self,
@@ -307,37 +916,494 @@ class ProtocolEngine:
         """Execute with mixed parallel/sequential phases"""
         phases = config.get("phases", [])
 
-        for phase in phases:
+        for phase_num, phase in enumerate(phases, 1):
             phase_type = phase.get("type", "sequential")
             turn_range = phase.get("turns", [])
 
-            if phase_type == "parallel":
-                # Execute phase turns in parallel
-                tasks = []
-                for turn_num in turn_range:
-                    turn_key = f"turn_{turn_num}"
-                    if turn_key in config["prompts"]:
-                        turn_config = config["prompts"][turn_key]
-                        task = self._execute_turn(turn_num, turn_config, topic, {})
-                        tasks.append(task)
-
-                phase_turns = await asyncio.gather(*tasks)
-                for turn in phase_turns:
-                    conversation.turns.append(turn)
-                    self.state.save_turn(conversation.session_id, turn)
-
-            else:  # sequential
-                for turn_num in turn_range:
-                    turn_key = f"turn_{turn_num}"
-                    if turn_key in config["prompts"]:
-                        turn_config = config["prompts"][turn_key]
-                        context = self._build_context(
+            with self.tracer.span("protocol.phase", type=phase_type, phase=phase_num):
+                await self._execute_phase(conversation, config, topic, phase_type, turn_range)
+
+    async def _execute_phase(
+        self,
+        conversation: Conversation,
+        config: Dict,
+        topic: str,
+        phase_type: str,
+        turn_range: List[int]
+    ):
+        """Execute one phase of a mixed-structure protocol"""
+        if phase_type == "parallel":
+            # Execute phase turns in parallel
+            tasks = []
+            for turn_num in turn_range:
+                turn_key = f"turn_{turn_num}"
+                if self._is_completed(conversation, turn_num):
+                    continue
+                if turn_key in config["prompts"]:
+                    turn_config = config["prompts"][turn_key]
+                    task = self._execute_turn(turn_num, turn_config, topic, {})
+                    tasks.append(task)
+
+            await self._gather_turns(conversation, tasks)
+
+        else:  # sequential
+            for turn_num in turn_range:
+                turn_key = f"turn_{turn_num}"
+                if self._is_completed(conversation, turn_num):
+                    continue
+                if turn_key in config["prompts"]:
+                    turn_config = config["prompts"][turn_key]
+                    context = self._build_context(
+                        conversation,
+                        turn_config.get("context_from", [])
+                    )
+                    turn = await self._execute_turn(turn_num, turn_config, topic, context)
+                    self._commit_turn(conversation, turn)
+
+    async def _execute_dag(
+        self,
+        conversation: Conversation,
+        config: Dict,
+        topic: str,
+        slots: Optional[asyncio.Semaphore] = None,
+        prefetched: Optional[Dict[int, asyncio.Future]] = None
+    ):
+        """
+        Execute turns as a dependency graph built from context_from
+
+        Each turn starts as soon as every turn it takes context from has
+        finished (and, with slots, a slot is free), so independent
+        branches run concurrently. Turns in prefetched were already started
+        elsewhere (holding their own slot); their results are awaited instead.
+        """
+        prefetched = prefetched or {}
+        dependencies = self._build_dependency_graph(config)
+        order = self._topological_order(dependencies)
+        tasks: Dict[int, asyncio.Task] = {}
+
+        async def run_node(turn_num: int) -> Optional[Turn]:
+            if self._is_completed(conversation, turn_num):
+                return None
+
+            deps = dependencies[turn_num]
+            if deps:
+                await asyncio.gather(*(tasks[dep] for dep in deps))
+
+            turn_config = config["prompts"][f"turn_{turn_num}"]
+            context = self._build_context(
+                conversation,
+                turn_config.get("context_from", [])
+            )
+
+            if turn_num in prefetched:
+                turn = await prefetched[turn_num]
+                turn.number = turn_num
+            elif slots is None:
+                turn = await self._execute_turn(turn_num, turn_config, topic, context)
+            else:
+                async with slots:
+                    turn = await self._execute_turn(turn_num, turn_config, topic, context)
+
+            self._commit_turn(conversation, turn)
+
+            logger.info(f"Turn {turn_num} completed: {turn.participant}")
+            return turn
+
+        for turn_num in order:
+            tasks[turn_num] = asyncio.create_task(run_node(turn_num))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BudgetExceededError:
+            # Let turns already in flight finish and persist; the rest hit the cap too
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        # Keep turns in declaration order regardless of completion order
+        conversation.turns.sort(key=lambda t: t.number)
+
+        logger.info(f"DAG execution completed: {len(tasks)} turns")
+
+    async def _execute_generated(
+        self,
+        conversation: Conversation,
+        config: Dict,
+        topic: str
+    ):
+        """
+        Execute a dynamic_generation mode phase by phase
+
+        Phases with prompts run as usual (named prompts such as
+        final_synthesis are numbered after the turns before them); a
+        "dynamic" phase is planned from the decomposition turns so far and
+        run as a dependency graph. Plans are deterministic given the
+        decomposition, so resumed sessions regenerate the same turn numbers.
+        Generated turns, including early-started ones, share
+        max_parallel_subtasks slots.
+        """
+        next_turn = 1
+        generated: List[int] = []
+        phases = config.get("phases", [])
+        slots = (
+            asyncio.Semaphore(self.max_parallel_subtasks) if self.max_parallel_subtasks else None
+        )
+        early: List[Tuple[Dict, asyncio.Future, float]] = []
+
+        for phase_num, phase in enumerate(phases, 1):
+            phase_type = phase.get("type", "sequential")
+            with self.tracer.span("protocol.phase", type=phase_type, phase=phase_num) as span:
+                if phase_type == "dynamic":
+                    later_phases = any(p.get("prompts") for p in phases[phase_num:])
+                    try:
+                        orchestrator, prompts = self._plan_generated_turns(
+                            conversation, next_turn, later_phases
+                        )
+                        generated = sorted(int(key[5:]) for key in prompts)
+                        span.set_attribute("generated_turns", len(generated))
+                        await self._execute_dag(
                             conversation,
-                            turn_config.get("context_from", [])
+                            {"turns": generated[-1] if generated else 0, "prompts": prompts},
+                            topic,
+                            slots=slots,
+                            prefetched=await self._claim_early_turns(early, prompts)
                         )
-                        turn = await self._execute_turn(turn_num, turn_config, topic, context)
-                        conversation.turns.append(turn)
-                        self.state.save_turn(conversation.session_id, turn)
+                    except BaseException:
+                        # Early turns the plan never claimed (or the DAG never awaited)
+                        await self._cancel_early_turns(early)
+                        raise
+                    early = []
+                    # Sharpen critical-path estimates for later plans
+                    done = set(generated)
+                    orchestrator.learn_latencies(
+                        [t for t in conversation.turns if t.number in done]
+                    )
+                else:
+                    prompts = self._number_phase_prompts(
+                        phase.get("prompts", {}), next_turn, generated
+                    )
+                    turn_nums = sorted(int(key[5:]) for key in prompts)
+                    next_is_dynamic = (
+                        phase_num < len(phases) and phases[phase_num].get("type") == "dynamic"
+                    )
+                    if self.stream_decomposition and next_is_dynamic and turn_nums:
+                        early = await self._stream_decomposition_phase(
+                            conversation, prompts, topic, phase_type, turn_nums, slots
+                        )
+                    else:
+                        await self._execute_phase(
+                            conversation, {"prompts": prompts}, topic, phase_type, turn_nums
+                        )
+
+            if prompts:
+                next_turn = max(int(key[5:]) for key in prompts) + 1
+
+    async def _stream_decomposition_phase(
+        self,
+        conversation: Conversation,
+        prompts: Dict[str, Dict],
+        topic: str,
+        phase_type: str,
+        turn_nums: List[int],
+        slots: Optional[asyncio.Semaphore] = None
+    ) -> List[Tuple[Dict, asyncio.Future, float]]:
+        """
+        Run the decomposition phase, starting subtasks as the decomposer streams
+
+        The decomposer is the phase's first turn. Each subtask block it
+        completes without dependencies is compiled the way the final plan
+        would compile it (under the LOOP_STRATEGY seen so far) and started
+        under a placeholder turn number, once a slot is free. Subtasks the
+        mixed strategy batches only start when the decomposer has finished
+        (a batch's members are known only then): each dependency-free batch
+        turn starts while the rest of a sequential phase runs. The plan itself still
+        comes from the latest decomposition (e.g. the assessor's refined
+        list); early turns it does not contain are cancelled.
+
+        Returns:
+            [(compiled turn config, task, start time), ...] for _claim_early_turns
+        """
+        decomposer = turn_nums[0]
+        if self._is_completed(conversation, decomposer):
+            await self._execute_phase(
+                conversation, {"prompts": prompts}, topic, phase_type, turn_nums
+            )
+            return []
+
+        loop = asyncio.get_running_loop()
+        parser = DecompositionParser()
+        ready: List[Subtask] = []
+        early: List[Tuple[Dict, asyncio.Future, float]] = []
+        handler = self.stream_handler
+
+        def ready_prompts() -> List[Dict]:
+            orchestrator = IntelligentOrchestrator(
+                self.subtask_latencies, self.subtask_output_stats
+            )
+            orchestrator.plan(list(ready), parser.strategy_type)
+            return [
+                p for p in orchestrator.generate_execution_prompts() if not p.get("context_from")
+            ]
+
+        def start(prompt: Dict, label: str) -> None:
+            turn_config = self._compile_generated_prompt(prompt, 0)
+            placeholder = -(len(early) + 1)
+            task = asyncio.ensure_future(
+                self._execute_early_turn(placeholder, turn_config, topic, slots)
+            )
+            early.append((turn_config, task, loop.time()))
+            self.speculation_stats["launched"] += 1
+            logger.info(f"Started {label} while decomposition runs")
+
+        def launch(subtask: Subtask) -> None:
+            if subtask.dependencies:
+                return
+            ready.append(subtask)
+            for prompt in ready_prompts():
+                if prompt["role"].partition("_")[2] == subtask.name:
+                    start(prompt, f"subtask {subtask.name!r}")
+                    return
+
+        def launch_batches() -> None:
+            for prompt in ready_prompts():
+                if prompt["role"] == "batch_simple_tasks":
+                    start(prompt, f"batch {prompt['batch_subtasks']}")
+
+        async def tap(turn_num: int, chunk: str):
+            if turn_num == decomposer:
+                for subtask in parser.feed(chunk):
+                    launch(subtask)
+            if handler is None or turn_num < 0:
+                return None
+            result = handler(turn_num, chunk)
+            return await result if inspect.isawaitable(result) else result
+
+        phase = {"prompts": prompts}
+        self.stream_handler = tap
+        try:
+            if phase_type == "parallel":
+                await self._execute_phase(conversation, phase, topic, phase_type, turn_nums)
+            else:
+                await self._execute_phase(conversation, phase, topic, phase_type, turn_nums[:1])
+            for subtask in parser.close():
+                launch(subtask)
+            launch_batches()
+            if phase_type != "parallel":
+                await self._execute_phase(conversation, phase, topic, phase_type, turn_nums[1:])
+        except BaseException:
+            await self._cancel_early_turns(early)
+            raise
+        finally:
+            self.stream_handler = handler
+        return early
+
+    async def _execute_early_turn(
+        self,
+        turn_num: int,
+        turn_config: Dict,
+        topic: str,
+        slots: Optional[asyncio.Semaphore]
+    ) -> Turn:
+        """Execute an early-started subtask turn within the subtask slots"""
+        if slots is None:
+            return await self._execute_turn(turn_num, turn_config, topic, {})
+        async with slots:
+            return await self._execute_turn(turn_num, turn_config, topic, {})
+
+    @staticmethod
+    async def _cancel_early_turns(early: List[Tuple[Dict, asyncio.Future, float]]) -> None:
+        """Cancel early-started turns and wait until they have stopped"""
+        for _, task, _ in early:
+            task.cancel()
+        await asyncio.gather(*(task for _, task, _ in early), return_exceptions=True)
+
+    async def _claim_early_turns(
+        self,
+        early: List[Tuple[Dict, asyncio.Future, float]],
+        prompts: Dict[str, Dict]
+    ) -> Dict[int, asyncio.Future]:
+        """
+        Match early-started subtask turns to the final plan
+
+        An early turn is used for the plan turn with the identical config;
+        the rest are cancelled and counted as waste.
+        """
+        stats = self.speculation_stats
+        now = asyncio.get_running_loop().time()
+        claimed: Dict[int, asyncio.Future] = {}
+        unclaimed = list(early)
+        for key, turn_config in prompts.items():
+            match = next((item for item in unclaimed if item[0] == turn_config), None)
+            if match is None:
+                continue
+            unclaimed.remove(match)
+            claimed[int(key[5:])] = match[1]
+            stats["wins"] += 1
+            head_start = max(0.0, now - match[2])
+            stats["head_start_seconds"] = round(stats["head_start_seconds"] + head_start, 3)
+
+        finished = [task.result() for _, task, _ in unclaimed
+                    if task.done() and not task.cancelled() and task.exception() is None]
+        await self._cancel_early_turns(unclaimed)
+        stats["wasted"] += len(unclaimed)
+        for wasted in finished:
+            stats["wasted_cost"] = round(stats["wasted_cost"] + wasted.cost, 6)
+        return claimed
+
+    def _plan_generated_turns(
+        self,
+        conversation: Conversation,
+        first_turn: int,
+        drop_synthesis: bool
+    ) -> Tuple[IntelligentOrchestrator, Dict[str, Dict]]:
+        """
+        Execution turns for the decomposition found in the conversation
+
+        The latest turn that lists subtasks wins (an assessor's refined
+        list over the decomposer's), completed from earlier turns (see
+        IntelligentOrchestrator.parse_refined_decomposition); without
+        subtasks the whole topic becomes a single subtask.
+
+        Returns:
+            (orchestrator holding the plan, turn_N-keyed prompts)
+        """
+        orchestrator = IntelligentOrchestrator(self.subtask_latencies, self.subtask_output_stats)
+        decomposition = [
+            turn.response for turn in sorted(conversation.turns, key=lambda t: t.number)
+            if turn.number < first_turn and not turn.error
+        ]
+        if orchestrator.parse_refined_decomposition(decomposition) is None:
+            logger.warning("No SUBTASKS found in decomposition; executing the topic as one subtask")
+            orchestrator.plan([Subtask("Complete task", conversation.topic, "moderate")])
+
+        generated = orchestrator.generate_execution_prompts()
+        if drop_synthesis and generated and generated[-1].get("role") == "final_synthesis":
+            generated.pop()  # The mode's own synthesis phase follows
+
+        offset = first_turn - 1
+        prompts = {
+            f"turn_{offset + index}": self._compile_generated_prompt(prompt, offset)
+            for index, prompt in enumerate(generated, 1)
+        }
+
+        strategy = orchestrator.execution_strategy
+        conversation.metadata["execution_plan"] = {
+            "strategy": strategy.strategy_type,
+            "subtasks": [asdict(subtask) for subtask in orchestrator.subtasks],
+            "levels": strategy.parallel_groups,
+            "critical_path": strategy.critical_path,
+            "critical_path_seconds": strategy.critical_path_seconds,
+            "turns": sorted(int(key[5:]) for key in prompts)
+        }
+        logger.info(
+            f"Generated {len(prompts)} execution turns for {len(orchestrator.subtasks)} subtasks "
+            f"({strategy.strategy_type}, {len(strategy.parallel_groups)} levels, "
+            f"critical path ~{strategy.critical_path_seconds:.0f}s)"
+        )
+        return orchestrator, prompts
+
+    @staticmethod
+    def _compile_generated_prompt(prompt: Dict, offset: int) -> Dict:
+        """Generated turn config with context_from shifted by offset and injected"""
+        context_from = [offset + dep for dep in prompt.get("context_from", [])]
+        # Subtask text comes from a model: keep its braces literal
+        template = prompt["template"].replace("{", "{{").replace("}", "}}")
+        template += "".join(f"\n\n--- Turn {n} ---\n{{turn_{n}}}" for n in context_from)
+        compiled = {**prompt, "template": template, "context_from": context_from}
+        if "context_sections" in prompt:
+            compiled["context_sections"] = {
+                offset + dep: names for dep, names in prompt["context_sections"].items()
+            }
+        return compiled
+
+    @staticmethod
+    def _select_batch_results(context: Dict, sections: Dict[int, List[str]]) -> Dict:
+        """
+        Narrow batch turns in context to the RESULT sections a turn needs
+
+        A batch response missing any wanted section is kept whole.
+        """
+        context = dict(context)
+        for turn_num, names in sections.items():
+            key = f"turn_{turn_num}"
+            if key not in context:
+                continue
+            results = {
+                name.lower(): text for name, text in split_batch_results(context[key]).items()
+            }
+            if all(name.lower() in results for name in names):
+                context[key] = "\n\n".join(
+                    f"### RESULT: {name}\n{results[name.lower()]}" for name in names
+                )
+        return context
+
+    @staticmethod
+    def _number_phase_prompts(
+        phase_prompts: Dict[str, Dict],
+        next_turn: int,
+        generated: List[int]
+    ) -> Dict[str, Dict]:
+        """
+        turn_N-keyed prompts for a dynamic mode phase
+
+        Named prompts get the next free turn numbers; <TASK> becomes the
+        topic, context_from "all_execution_turns" and the
+        {all_subtask_results} field refer to every generated turn.
+        """
+        prompts = {}
+        for key, prompt in phase_prompts.items():
+            match = _CONTEXT_TURN_KEY.fullmatch(key)
+            turn_num = int(match.group(1)) if match else next_turn
+            next_turn = max(next_turn, turn_num + 1)
+            context_from = []
+            for dep in prompt.get("context_from", []):
+                context_from.extend(generated if dep == "all_execution_turns" else [dep])
+            results = "\n\n".join(f"--- Turn {n} ---\n{{turn_{n}}}" for n in generated)
+            template = (
+                prompt.get("template", "")
+                .replace("<TASK>", "{topic}")
+                .replace("{all_subtask_results}", results)
+            )
+            prompts[f"turn_{turn_num}"] = {
+                **prompt, "template": template, "context_from": context_from
+            }
+        return prompts
+
+    def _commit_turn(self, conversation: Conversation, turn: Turn) -> None:
+        """Add a finished turn to the conversation (replacing a failed run of it) and persist it"""
+        conversation.turns = [t for t in conversation.turns if t.number != turn.number]
+        conversation.turns.append(turn)
+        self.state.save_turn(conversation.session_id, turn)
+
+    @staticmethod
+    def _is_completed(conversation: Conversation, turn_num: int) -> bool:
+        """True if the turn already ran without error (e.g. before a resume)"""
+        return any(t.number == turn_num and not t.error for t in conversation.turns)
+
+    def _build_dependency_graph(self, config: Dict) -> Dict[int, List[int]]:
+        """
+        Build turn dependency graph from context_from declarations
+
+        Returns:
+            Mapping of turn number -> turn numbers it depends on
+        """
+        dependencies, unknown = build_dependency_graph(config)
+        for turn_num, dep in unknown:
+            logger.warning(f"Turn {turn_num} depends on unknown turn {dep}, ignoring")
+
+        return dependencies
+
+    def _topological_order(self, dependencies: Dict[int, List[int]]) -> List[int]:
+        """
+        Order turns so each comes after all its dependencies
+
+        Raises:
+            ValueError: If the dependency graph has a cycle
+        """
+        return topological_order(dependencies)
 
     async def _execute_turn(
         self,
@@ -345,6 +1411,43 @@ class ProtocolEngine:
         turn_config: Dict,
         topic: str,
         context: Dict
+    ) -> Turn:
+        """Execute a single turn inside a protocol.turn span"""
+        with self.tracer.span(
+            "protocol.turn",
+            turn=turn_num,
+            participant=turn_config.get("participant", "claude"),
+            role=turn_config.get("role", "")
+        ) as span:
+            context, compression = await self._fit_context(turn_config, context)
+            turn = await self._run_turn(turn_num, turn_config, topic, context)
+            if compression:
+                self._record_compression(turn, compression)
+                span.set_attribute(
+                    "context.saved_tokens", compression["original_tokens"] - compression["tokens"]
+                )
+
+            span.set_attributes({
+                "model": turn.model,
+                "tokens.prompt": turn.tokens.get("prompt", 0),
+                "tokens.cached": turn.tokens.get("cached", 0),
+                "tokens.completion": turn.tokens.get("completion", 0),
+                "tokens.total": turn.tokens.get("total", 0),
+                "retry_count": turn.retry_count,
+                "cost": turn.cost,
+                "cache_hit": turn.cache_hit
+            })
+            if turn.error:
+                span.record_error(turn.error)
+
+            return turn
+
+    async def _run_turn(
+        self,
+        turn_num: int,
+        turn_config: Dict,
+        topic: str,
+        context: Dict
     ) -> Turn:
         """
         Execute a single turn with retry logic and timeout handling.
@@ -357,21 +1460,15 @@ class ProtocolEngine:
         """
         start_time = asyncio.get_event_loop().time()
 
-        # Build prompt from template
-        template = turn_config.get("template", "")
-        prompt = template.format(topic=topic, **context)
-
-        # Add role instruction if specified
-        if "role_instruction" in turn_config:
-            prompt = f"{turn_config['role_instruction']}\n\n{prompt}"
-
+        prompt = self._build_prompt(turn_config, topic, context)
         participant = turn_config.get("participant", "claude")
 
         logger.debug(f"Turn {turn_num}: {participant}")
         logger.debug(f"Prompt: {prompt[:100]}...")
 
         # Get timeout and retries from config or use defaults
-        timeout = turn_config.get("timeout_seconds", self.timeout_seconds)
+        explicit_timeout = turn_config.get("timeout_seconds")
+        timeout = explicit_timeout or self.timeout_seconds
         max_retries = turn_config.get("max_retries", self.max_retries)
 
         response = None
@@ -379,89 +1476,189 @@ class ProtocolEngine:
         error_msg = None
         retry_count = 0
         model_used = ""
-
-        # Execute with retry logic
-        for attempt in range(max_retries):
-            try:
-                # Select appropriate client
-                if participant == "claude":
-                    model_used = turn_config.get("claude_model", "claude-3-sonnet-20240229")
-                elif participant == "grok":
-                    model_used = turn_config.get("grok_model", "grok-4")
-                else:
-                    raise ValueError(f"Unknown participant: {participant}")
-
-                # Execute with timeout
-                if participant == "claude":
-                    response, tokens = await asyncio.wait_for(
-                        self.claude.chat(prompt),
-                        timeout=timeout
-                    )
-                else:  # grok
-                    response, tokens = await asyncio.wait_for(
-                        self.grok.chat(prompt, model=model_used),
-                        timeout=timeout
-                    )
-
-                logger.info(
-                    f"Turn {turn_num} ({participant}) succeeded on attempt {attempt + 1}"
+        ttft = None
+        alternate_answered = False
+        hedge_cost = 0.0
+
+        # Serve identical requests from the cache
+        cache_key = self._cache_key(participant, turn_config, prompt)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached:
+                response, tokens = cached
+                logger.info(f"Turn {turn_num} ({participant}) served from cache")
+                if self.stream_handler is not None:
+                    await self._emit_chunk(turn_num, response)
+                return Turn(
+                    number=turn_num,
+                    role=turn_config.get("role", ""),
+                    participant=participant,
+                    prompt=prompt,
+                    response=response,
+                    tokens=tokens,
+                    latency=asyncio.get_event_loop().time() - start_time,
+                    timestamp=datetime.now().isoformat(),
+                    context_from=turn_config.get("context_from", []),
+                    cost=0.0,
+                    model=self._select_model(participant, turn_config),
+                    cache_hit=True
                 )
-                error_msg = None
-                break
-
-            except asyncio.TimeoutError:
-                error_msg = f"Timeout after {timeout}s"
-                retry_count = attempt + 1
-
-                if attempt < max_retries - 1:
-                    # Calculate backoff with jitter
-                    wait_time = self.retry_backoff_base ** attempt
-                    jitter = random.uniform(0, wait_time * 0.1)
-                    wait_time += jitter
-
-                    logger.warning(
-                        f"Turn {turn_num} timed out. "
-                        f"Retrying in {wait_time:.2f}s (attempt {attempt + 1}/{max_retries})"
-                    )
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Turn {turn_num} failed after {max_retries} attempts: {error_msg}")
-
-            except Exception as e:
-                error_msg = str(e)
-                retry_count = attempt + 1
-
-                # Check if error is retryable (transient)
-                is_retryable = any([
-                    "ConnectionError" in str(type(e)),
-                    "TimeoutError" in str(type(e)),
-                    "429" in error_msg,  # Rate limit
-                ])
-
-                if is_retryable and attempt < max_retries - 1:
-                    # Calculate backoff with jitter
-                    wait_time = self.retry_backoff_base ** attempt
-                    jitter = random.uniform(0, wait_time * 0.1)
-                    wait_time += jitter
-
-                    logger.warning(
-                        f"Turn {turn_num} transient error. "
-                        f"Retrying in {wait_time:.2f}s (attempt {attempt + 1}/{max_retries}): {error_msg}"
-                    )
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Turn {turn_num} failed: {error_msg}")
-                    if not is_retryable:
-                        logger.debug(f"Error is not retryable, giving up")
-                    break
-
-        end_time = asyncio.get_event_loop().time()
-        latency = end_time - start_time
 
-        # Calculate cost if we got tokens
+        # Predict cost and check spending caps before paying for the call
+        reservation = self._reserve_budget(participant, turn_config, prompt)
         cost = 0.0
-        if tokens.get("total", 0) > 0:
-            cost = calculate_cost(model_used, tokens)
+        guard = self.endpoint_guard or get_shared_endpoint_guard()
+
+        try:
+            # Execute with retry logic
+            for attempt in range(max_retries):
+                with self.tracer.span("protocol.attempt", attempt=attempt + 1) as attempt_span:
+                    try:
+                        # Select appropriate client
+                        model_used = (
+                            reservation.model if reservation is not None
+                            else self._select_model(participant, turn_config)
+                        )
+
+                        # Fail fast while the model's circuit is open
+                        guard.check(model_used)
+                        timeout = explicit_timeout or guard.timeout_for(
+                            model_used, self.timeout_seconds, attempt
+                        )
+                        attempt_span.set_attribute("timeout_s", timeout)
+
+                        # Execute with timeout, inside the model's rate limit
+                        limiter = self.rate_limiter or get_shared_rate_limiter()
+                        estimated_tokens = count_tokens(prompt)
+                        queued_at = asyncio.get_event_loop().time()
+                        async with limiter.limit(model_used, estimated_tokens):
+                            attempt_span.set_attribute(
+                                "queue_wait_s", asyncio.get_event_loop().time() - queued_at
+                            )
+                            with self.tracer.span(
+                                "client.call",
+                                participant=participant,
+                                model=model_used,
+                                streaming=self.stream_handler is not None
+                            ) as call_span:
+                                called_at = asyncio.get_event_loop().time()
+                                if self._hedges(participant):
+                                    requested_model = model_used
+                                    result, model_used, hedges, hedge_cost = await asyncio.wait_for(
+                                        self._hedged_call(
+                                            turn_num, prompt, model_used, estimated_tokens,
+                                            turn_config.get("max_tokens") or DEFAULT_MAX_TOKENS
+                                        ),
+                                        timeout=timeout
+                                    )
+                                    response, tokens, ttft = result
+                                    alternate_answered = model_used != requested_model
+                                    call_span.set_attributes(
+                                        {"hedges": hedges, "model": model_used}
+                                    )
+                                else:
+                                    response, tokens, ttft = await asyncio.wait_for(
+                                        self._call_model(turn_num, participant, prompt, model_used),
+                                        timeout=timeout
+                                    )
+                                elapsed = asyncio.get_event_loop().time() - called_at
+                                guard.record_success(model_used, elapsed)
+                                call_span.set_attributes({
+                                    "tokens.prompt": tokens.get("prompt", 0),
+                                    "tokens.cached": tokens.get("cached", 0),
+                                    "tokens.completion": tokens.get("completion", 0),
+                                    "tokens.total": tokens.get("total", 0)
+                                })
+                                if ttft is not None:
+                                    call_span.set_attribute("ttft_s", ttft)
+                        limiter.record_usage(model_used, tokens.get("total", 0) - estimated_tokens)
+
+                        logger.info(
+                            f"Turn {turn_num} ({participant}) succeeded on attempt {attempt + 1}"
+                        )
+                        error_msg = None
+                        break
+
+                    except StreamAbortedError as e:
+                        response = e.partial_response
+                        tokens = self._estimate_tokens(prompt, response)
+                        error_msg = str(e)
+                        attempt_span.record_error(error_msg)
+                        logger.warning(f"Turn {turn_num} aborted by stream handler")
+                        break
+
+                    except asyncio.TimeoutError:
+                        error_msg = f"Timeout after {timeout:g}s"
+                        retry_count = attempt + 1
+                        attempt_span.record_error(error_msg)
+                        guard.record_failure(model_used, ErrorInfo("timeout", retryable=True))
+
+                        if attempt < max_retries - 1:
+                            # Calculate backoff with jitter
+                            wait_time = self.retry_backoff_base ** attempt
+                            jitter = random.uniform(0, wait_time * 0.1)
+                            wait_time += jitter
+                            attempt_span.set_attribute("backoff_s", wait_time)
+
+                            logger.warning(
+                                f"Turn {turn_num} timed out. "
+                                f"Retrying in {wait_time:.2f}s "
+                                f"(attempt {attempt + 1}/{max_retries})"
+                            )
+                            await asyncio.sleep(wait_time)
+                        else:
+                            logger.error(
+                                f"Turn {turn_num} failed after {max_retries} attempts: {error_msg}"
+                            )
+
+                    except Exception as e:
+                        error_msg = str(e)
+                        retry_count = attempt + 1
+                        attempt_span.record_error(error_msg)
+
+                        # Check if error is retryable (transient)
+                        info = classify_error(e)
+                        is_retryable = info.retryable
+                        attempt_span.set_attribute("error.kind", info.kind)
+                        guard.record_failure(model_used, info)
+
+                        if is_retryable and attempt < max_retries - 1:
+                            # Provider's Retry-After, else backoff with jitter
+                            wait_time = self.retry_backoff_base ** attempt
+                            jitter = random.uniform(0, wait_time * 0.1)
+                            wait_time = guard.retry_delay(info, wait_time + jitter)
+                            if info.retry_after is not None:
+                                attempt_span.set_attribute("retry_after_s", info.retry_after)
+                            attempt_span.set_attribute("backoff_s", wait_time)
+
+                            logger.warning(
+                                f"Turn {turn_num} transient error. "
+                                f"Retrying in {wait_time:.2f}s "
+                                f"(attempt {attempt + 1}/{max_retries}): {error_msg}"
+                            )
+                            await asyncio.sleep(wait_time)
+                        else:
+                            logger.error(f"Turn {turn_num} failed: {error_msg}")
+                            if not is_retryable:
+                                logger.debug("Error is not retryable, giving up")
+                            break
+
+            end_time = asyncio.get_event_loop().time()
+            latency = end_time - start_time
+
+            if cache_key and error_msg is None and response is not None:
+                # Downgraded and alternate-model responses are not what the key asks for
+                downgraded = reservation is not None and reservation.downgraded
+                if not downgraded and not alternate_answered:
+                    self.response_cache.put(cache_key, response, tokens)
+
+            # Calculate cost if we got tokens (plus the requests that lost a hedge race)
+            if tokens.get("total", 0) > 0:
+                cost = round(calculate_cost(model_used, tokens) + hedge_cost, 6)
+
+        finally:
+            if reservation is not None:
+                reservation.settle(cost)
 
         return Turn(
             number=turn_num,
@@ -476,9 +1673,339 @@ class ProtocolEngine:
             cost=cost,
             model=model_used,
             error=error_msg,
-            retry_count=retry_count
+            retry_count=retry_count,
+            ttft=ttft
+        )
+
+    def _select_model(self, participant: str, turn_config: Dict) -> str:
+        """Model configured for a participant's turn"""
+        if participant == "claude":
+            return turn_config.get("claude_model", "claude-3-sonnet-20240229")
+        elif participant == "grok":
+            return turn_config.get("grok_model", "grok-4")
+        raise ValueError(f"Unknown participant: {participant}")
+
+    async def _fit_context(self, turn_config: Dict, context: Dict):
+        """
+        Fit injected context into the turn model's token budget
+
+        Returns:
+            (context, compression_record_or_None)
+        """
+        participant = turn_config.get("participant", "claude")
+        if self.context_budgeter is None or not context or participant not in ("claude", "grok"):
+            return context, None
+
+        summarizer = self.context_budgeter.summarizer
+        if isinstance(summarizer, ClientSummarizer):
+            summarizer = functools.partial(self._summarize, summarizer)
+
+        template = f"{turn_config.get('role_instruction', '')}\n\n{turn_config.get('template', '')}"
+        return await self.context_budgeter.fit(
+            context,
+            self._select_model(participant, turn_config),
+            template_tokens=count_tokens(template),
+            max_context_tokens=turn_config.get("max_context_tokens"),
+            strategy=turn_config.get("context_strategy"),
+            summarizer=summarizer
+        )
+
+    async def _summarize(self, summarizer: ClientSummarizer, text: str, max_tokens: int):
+        """
+        Context summary call, made the way a turn's is: held against the
+        budgets and inside the model's rate limit
+
+        Returns:
+            (summary, cost)
+
+        Raises:
+            BudgetExceededError: If the summary would pass a hard cap
+        """
+        from .clients.grok import MODEL_IDS
+
+        model = (
+            summarizer.model
+            or getattr(summarizer.client, "default_model", None)
+            or "grok-4"
+        )
+        estimated_tokens = count_tokens(summarizer.prompt(text, max_tokens))
+        reservation = None
+        if self.budget is not None:
+            reservation = self.budget.reserve(
+                self._active_budgets(), model, estimated_tokens, max_tokens, allow_downgrade=False
+            )
+
+        cost = 0.0
+        try:
+            limiter = self.rate_limiter or get_shared_rate_limiter()
+            async with limiter.limit(model, estimated_tokens):
+                summary, tokens = await summarizer.call(text, max_tokens)
+            limiter.record_usage(model, tokens.get("total", 0) - estimated_tokens)
+            cost = calculate_cost(MODEL_IDS.get(model, model), tokens)
+        finally:
+            if reservation is not None:
+                reservation.settle(cost)
+
+        return summary, cost
+
+    @staticmethod
+    def _record_compression(turn: Turn, compression: Dict) -> None:
+        """Attach a compression record to its turn, charging any summary cost"""
+        turn.context_compression = compression
+        turn.cost = round(turn.cost + compression.get("cost", 0.0), 6)
+
+    def _start_run_budget(self, conversation: Conversation):
+        """Budget for one run, counting turns already paid for (resume)"""
+        return self.budget.run_budget(spent=sum(t.cost for t in conversation.turns))
+
+    def _reserve_budget(self, participant: str, turn_config: Dict, prompt: str):
+        """
+        Hold a turn's predicted cost against the run, batch and day budgets
+
+        Returns:
+            Reservation (carrying the model to use) or None without a guard
+
+        Raises:
+            BudgetExceededError: If the turn would pass a hard cap
+        """
+        if self.budget is None or participant not in ("claude", "grok"):
+            return None
+
+        return self.budget.reserve(
+            self._active_budgets(),
+            self._select_model(participant, turn_config),
+            prompt_tokens=count_tokens(prompt),
+            max_tokens=turn_config.get("max_tokens") or DEFAULT_MAX_TOKENS,
+            allow_downgrade=participant == "grok"
+        )
+
+    def _active_budgets(self) -> List:
+        """Run, batch and day budgets currently in force"""
+        return [
+            b for b in (self._run_budget, self._batch_budget, self.budget.day_budget())
+            if b is not None
+        ]
+
+    def _cache_key(self, participant: str, turn_config: Dict, prompt: str) -> Optional[str]:
+        """Response cache key for a turn (None when caching is off)"""
+        if self.response_cache is None or participant not in ("claude", "grok"):
+            return None
+
+        if participant == "claude":
+            # The CLI picks the model from the client, not the turn config
+            model = (
+                getattr(self.claude, "model", None)
+                or self._select_model(participant, turn_config)
+            )
+        else:
+            from .clients.grok import MODEL_IDS
+            model = self._select_model(participant, turn_config)
+            model = MODEL_IDS.get(model, model)
+
+        return self.response_cache.make_key(
+            participant=participant,
+            model=model,
+            prompt=prompt,
+            temperature=turn_config.get("temperature"),
+            max_tokens=turn_config.get("max_tokens"),
+            system_prompt=turn_config.get("system_prompt")
         )
 
+    def _hedges(self, participant: str) -> bool:
+        """True if this participant's calls are hedged (Grok, non-streaming)"""
+        return self.hedger is not None and participant == "grok" and self.stream_handler is None
+
+    async def _hedged_call(
+        self,
+        turn_num: int,
+        prompt: str,
+        model_used: str,
+        estimated_tokens: int,
+        max_tokens: int
+    ):
+        """
+        Grok call through the hedger
+
+        The primary request runs in the caller's rate-limit slot and
+        budget reservation; each duplicate acquires its own, holding its
+        worst-case cost until the race is over. What the losing requests
+        cost (their usage if they finished, else their prompt) is returned
+        for the turn to be charged; if every request fails the duplicates'
+        prompts are charged to their reservations instead.
+
+        Returns:
+            ((response_text, token_usage_dict, ttft_or_None), model that answered,
+            hedges sent, cost of the losing requests)
+        """
+        from .clients.grok import MODEL_IDS
+
+        limiter = self.rate_limiter or get_shared_rate_limiter()
+        requests: List[Dict[str, Any]] = []  # model and result of each request, in launch order
+        reservations = []
+
+        def worst_case_cost(model: str) -> float:
+            return calculate_cost(
+                MODEL_IDS.get(model, model), {"prompt": estimated_tokens, "completion": max_tokens}
+            )
+
+        def spent(model: str, result=None) -> float:
+            usage = result[1] if result else {"prompt": estimated_tokens}
+            return calculate_cost(MODEL_IDS.get(model, model), usage)
+
+        async def call(model: str):
+            request = {"model": model, "result": None}
+            requests.append(request)
+            if len(requests) == 1:
+                request["result"] = await self._call_model(turn_num, "grok", prompt, model)
+                return request["result"]
+
+            if self.budget is not None:
+                reservations.append(self.budget.reserve(
+                    self._active_budgets(), model, estimated_tokens, max_tokens,
+                    allow_downgrade=False,
+                ))
+            async with limiter.limit(model, estimated_tokens):
+                request["result"] = await self._call_model(turn_num, "grok", prompt, model)
+                return request["result"]
+
+        answered = False
+        try:
+            result, model, hedges = await self.hedger.run(model_used, call, worst_case_cost)
+            answered = True
+            lost_cost = sum(
+                spent(r["model"], r["result"]) for r in requests if r["result"] is not result
+            )
+            return result, model, hedges, round(lost_cost, 6)
+        finally:
+            # After an answer the turn is charged for every request, so the
+            # holds are released; if all failed, each duplicate pays its prompt
+            for reservation in reservations:
+                reservation.settle(0.0 if answered else spent(reservation.model))
+
+    async def _call_model(
+        self,
+        turn_num: int,
+        participant: str,
+        prompt: str,
+        model_used: str
+    ):
+        """
+        Call the participant's client, streaming when a handler is set
+
+        Returns:
+            (response_text, token_usage_dict, ttft_or_None)
+        """
+        if self.stream_handler is None:
+            if participant == "claude":
+                response, tokens = await self.claude.chat(prompt)
+            else:  # grok
+                response, tokens = await self.grok.chat(
+                    prompt, model=model_used, **self._grok_cache_options()
+                )
+            return response, tokens, None
+
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+
+        if participant == "claude":
+            # Claude CLI wrapper has no token stream: deliver the response as one chunk
+            response, tokens = await self.claude.chat(prompt)
+            ttft = loop.time() - start_time
+            if await self._emit_chunk(turn_num, response) is False:
+                raise StreamAbortedError(response)
+            return response, tokens, ttft
+
+        usage: Dict[str, int] = {}
+        chunks: List[str] = []
+        ttft = None
+        last_checkpoint = start_time
+
+        stream = self.grok.chat_stream(
+            prompt, model=model_used, usage=usage, **self._grok_cache_options()
+        )
+        try:
+            async for chunk in stream:
+                now = loop.time()
+                if ttft is None:
+                    ttft = now - start_time
+                chunks.append(chunk)
+
+                if await self._emit_chunk(turn_num, chunk) is False:
+                    raise StreamAbortedError("".join(chunks))
+
+                if now - last_checkpoint >= self.checkpoint_interval:
+                    self._checkpoint_partial(turn_num, "".join(chunks))
+                    last_checkpoint = now
+        finally:
+            await stream.aclose()
+            self.partial_responses.pop(turn_num, None)
+
+        response = "".join(chunks)
+        tokens = usage or self._estimate_tokens(prompt, response)
+        return response, tokens, ttft
+
+    def _build_prompt(self, turn_config: Dict, topic: str, context: Dict) -> str:
+        """
+        Render a turn's prompt from its template and injected context
+
+        With prompt_caching, content shared between turns comes first (topic,
+        then each injected turn in turn order) and the template refers back
+        to it, so every turn drawing on turns 1..N repeats the same prefix.
+        """
+        template = compile_template(turn_config.get("template", ""))
+        if turn_config.get("context_sections"):
+            context = self._select_batch_results(context, turn_config["context_sections"])
+
+        if not self.prompt_caching:
+            prompt = template.render(topic=topic, **context)
+
+            # Add role instruction if specified
+            if "role_instruction" in turn_config:
+                prompt = f"{turn_config['role_instruction']}\n\n{prompt}"
+            return prompt
+
+        turn_nums = sorted(
+            int(match.group(1)) for match in map(_CONTEXT_TURN_KEY.fullmatch, context) if match
+        )
+        prefix = [f"Topic: {topic}"]
+        references = {}
+        for turn_num in turn_nums:
+            participant = context.get(f"turn_{turn_num}_participant", "")
+            label = f"Turn {turn_num} ({participant})" if participant else f"Turn {turn_num}"
+            header = f"=== {label} ==="
+            prefix.append(f"{header}\n{context[f'turn_{turn_num}']}")
+            references[f"turn_{turn_num}"] = f"[Turn {turn_num}, above]"
+
+        suffix = template.render(topic=topic, **{**context, **references})
+        if "role_instruction" in turn_config:
+            suffix = f"{turn_config['role_instruction']}\n\n{suffix}"
+
+        return "\n\n".join(prefix) + "\n\n---\n\n" + suffix
+
+    def _grok_cache_options(self) -> Dict:
+        """Prompt-cache routing hint for Grok calls (empty when caching is off)"""
+        if not self.prompt_caching or not self.current_session_id:
+            return {}
+        return {"conversation_id": self.current_session_id}
+
+    async def _emit_chunk(self, turn_num: int, chunk: str):
+        """Deliver a chunk to the stream handler (sync or async)"""
+        result = self.stream_handler(turn_num, chunk)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def _checkpoint_partial(self, turn_num: int, text: str) -> None:
+        """Expose and persist the partial response of a streaming turn"""
+        self.partial_responses[turn_num] = text
+        if self.current_session_id and self.state is not None:
+            self.state.save_partial(self.current_session_id, turn_num, text)
+
+    @staticmethod
+    def _estimate_tokens(prompt: str, response: str) -> Dict[str, int]:
+        """Local tokenizer count when the provider reports no usage"""
+        return usage_for(prompt, response)
+
     def _build_context(
         self,
         conversation: Conversation,
@@ -529,10 +2056,25 @@ class ProtocolEngine:
             md += f"**Timestamp**: {turn.timestamp}\n"
             md += f"**Model**: {turn.model}\n"
             md += f"**Tokens**: {turn.tokens.get('prompt', 0)} prompt + "
-            md += f"{turn.tokens.get('completion', 0)} completion = {turn.tokens.get('total', 0)} total\n"
+            md += f"{turn.tokens.get('completion', 0)} completion = "
+            md += f"{turn.tokens.get('total', 0)} total"
+            if turn.tokens.get("cached"):
+                md += f" ({turn.tokens['cached']} prompt tokens cached)"
+            md += "\n"
             md += f"**Cost**: ${turn.cost:.6f}\n"
             md += f"**Latency**: {turn.latency:.2f}s\n"
 
+            if turn.ttft is not None:
+                md += f"**Time to First Token**: {turn.ttft:.2f}s\n"
+
+            if turn.cache_hit:
+                md += "**Cache**: hit\n"
+
+            if turn.context_compression:
+                compression = turn.context_compression
+                md += (f"**Context**: {compression['original_tokens']:,} → "
+                       f"{compression['tokens']:,} tokens ({compression['strategy']})\n")
+
             if turn.retry_count > 0:
                 md += f"**Retries**: {turn.retry_count}\n"
 
@@ -0,0 +1,150 @@
+"""
+Rate Limiting
+
+Provider-aware request/token rate limiting for turn execution:
+- Token buckets for requests/min and tokens/min per model
+- Global max in-flight request cap
+
+Limits come from MODEL_RATE_LIMITS (alongside MODEL_PRICING in protocol.py).
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket
+
+    Refills continuously at rate_per_minute up to capacity. consume()
+    may drive the balance negative (e.g. when actual usage exceeds the
+    estimate), delaying subsequent acquirers until it recovers.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """
+        Wait until amount tokens are available and take them
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def consume(self, amount: float) -> None:
+        """Take tokens without waiting (balance may go negative)"""
+        self._refill()
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Per-model rate limiter with a global in-flight cap
+
+    Usage:
+        async with limiter.limit("grok-4", estimated_tokens=500):
+            ...  # make the request
+        limiter.record_usage("grok-4", actual_tokens - 500)
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, float]]] = None,
+        max_in_flight: int = 8,
+        default_limits: Optional[Dict[str, float]] = None
+    ):
+        from .protocol import DEFAULT_RATE_LIMITS, MODEL_RATE_LIMITS
+
+        self.limits = limits if limits is not None else MODEL_RATE_LIMITS
+        self.default_limits = default_limits or DEFAULT_RATE_LIMITS
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._request_buckets: Dict[str, TokenBucket] = {}
+        self._token_buckets: Dict[str, TokenBucket] = {}
+
+    @asynccontextmanager
+    async def limit(self, model: str, estimated_tokens: int = 0):
+        """Hold an in-flight slot plus request/token budget for one call"""
+        key = self._resolve(model)
+        self._ensure_buckets(key)
+
+        waited = await self._request_buckets[key].acquire(1)
+        if estimated_tokens:
+            waited += await self._token_buckets[key].acquire(estimated_tokens)
+
+        if waited > 0:
+            logger.debug(f"Rate limited {key}: waited {waited:.2f}s")
+
+        async with self._semaphore:
+            yield
+
+    def record_usage(self, model: str, extra_tokens: int) -> None:
+        """Debit tokens used beyond the estimate passed to limit()"""
+        if extra_tokens <= 0:
+            return
+        key = self._resolve(model)
+        self._ensure_buckets(key)
+        self._token_buckets[key].consume(extra_tokens)
+
+    def _resolve(self, model: str) -> str:
+        """Map friendly model aliases to API ids so aliases share a budget"""
+        from .clients.grok import MODEL_IDS
+        return MODEL_IDS.get(model, model)
+
+    def _ensure_buckets(self, key: str) -> None:
+        if key in self._request_buckets:
+            return
+
+        config = self.limits.get(key) or self.default_limits
+        self._request_buckets[key] = TokenBucket(config["rpm"], config.get("burst"))
+        self._token_buckets[key] = TokenBucket(config["tpm"])
+
+        logger.debug(f"Rate limits for {key}: {config['rpm']} rpm, {config['tpm']} tpm")
+
+
+_shared_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RateLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Limiter shared by every engine on the running event loop
+
+    Concurrent protocol runs in one process draw from the same budget.
+    """
+    loop = asyncio.get_running_loop()
+    limiter = _shared_limiters.get(loop)
+    if limiter is None:
+        limiter = RateLimiter()
+        _shared_limiters[loop] = limiter
+    return limiter
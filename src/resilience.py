@@ -0,0 +1,280 @@
+"""
+Endpoint Resilience
+
+Per-model failure handling for turn execution:
+- Structured error classification (openai exception types first, then
+  exception names and status codes for other clients)
+- Retry-After / retry-after-ms honoring for rate limits and overloads
+- Circuit breakers: after consecutive endpoint failures a model fails
+  fast until a half-open probe succeeds
+- Adaptive timeouts from rolling latency percentiles
+
+Breakers and latencies are shared by every engine on an event loop, so
+parallel runs learn about an outage once.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .hedging import LatencyTracker
+
+try:
+    import openai
+except ImportError:  # Claude-only installs
+    openai = None
+
+logger = logging.getLogger(__name__)
+
+# Error kinds that mean the endpoint itself is unhealthy
+ENDPOINT_FAILURES = ("timeout", "connection", "server")
+# Error kinds that prove the endpoint is up (it answered)
+ENDPOINT_ANSWERED = ("rate_limit", "client", "auth")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open"""
+
+    def __init__(self, model: str, retry_in: float):
+        self.model = model
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {model} (next probe in {retry_in:.1f}s)")
+
+
+@dataclass
+class ErrorInfo:
+    """Classified model call failure"""
+    kind: str  # rate_limit, timeout, connection, server, client, auth, circuit_open, unknown
+    retryable: bool
+    status: Optional[int] = None
+    retry_after: Optional[float] = None  # Seconds the provider asked us to wait
+
+
+def _retry_after(response) -> Optional[float]:
+    """Seconds from Retry-After / retry-after-ms headers (None if absent)"""
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def classify_error(error: BaseException) -> ErrorInfo:
+    """Classify a model call failure"""
+    if isinstance(error, CircuitOpenError):
+        return ErrorInfo("circuit_open", retryable=False, retry_after=error.retry_in)
+    if isinstance(error, asyncio.TimeoutError):
+        return ErrorInfo("timeout", retryable=True)
+
+    if openai is not None and isinstance(error, openai.APIError):
+        if isinstance(error, openai.APITimeoutError):
+            return ErrorInfo("timeout", retryable=True)
+        if isinstance(error, openai.APIConnectionError):
+            return ErrorInfo("connection", retryable=True)
+        if isinstance(error, openai.APIStatusError):
+            status = error.status_code
+            retry_after = _retry_after(error.response)
+            if isinstance(error, openai.RateLimitError) or status == 429:
+                return ErrorInfo("rate_limit", True, status, retry_after)
+            if status in (401, 403):
+                return ErrorInfo("auth", False, status)
+            if status == 408:
+                return ErrorInfo("timeout", True, status, retry_after)
+            if status >= 500:
+                return ErrorInfo("server", True, status, retry_after)
+            return ErrorInfo("client", False, status)
+
+    # Other clients (Claude CLI, plain httpx): fall back to names and messages
+    name = type(error).__name__
+    message = str(error)
+    if "RateLimitError" in name or "429" in message:
+        return ErrorInfo("rate_limit", retryable=True)
+    if isinstance(error, TimeoutError) or "TimeoutError" in name:
+        return ErrorInfo("timeout", retryable=True)
+    if isinstance(error, ConnectionError) or "ConnectionError" in name:
+        return ErrorInfo("connection", retryable=True)
+    return ErrorInfo("unknown", retryable=False)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one model
+
+    closed -> open after failure_threshold endpoint failures in a row;
+    open -> half_open once recovery_timeout has passed, letting
+    half_open_max probe calls through; a probe success closes the
+    circuit, a probe failure reopens it. Probes that never report back
+    (e.g. cancelled) are written off after another recovery_timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max: int = 1
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max = half_open_max
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_started = 0.0
+
+    def check(self, model: str) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == "closed":
+            return
+
+        if self.state == "open":
+            remaining = self.opened_at + self.recovery_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(model, remaining)
+            self.state = "half_open"
+            self.probes = 0
+            logger.info(f"Circuit for {model} half-open: probing")
+
+        now = time.monotonic()
+        if self.probes >= self.half_open_max:
+            if now - self.probe_started < self.recovery_timeout:
+                raise CircuitOpenError(model, self.probe_started + self.recovery_timeout - now)
+            self.probes = 0
+        self.probes += 1
+        self.probe_started = now
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("Circuit closed after successful probe")
+        self.state = "closed"
+        self.failures = 0
+        self.probes = 0
+
+    def record_failure(self, model: str) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(
+                    f"Circuit opened for {model} after {self.failures} consecutive failures; "
+                    f"failing fast for {self.recovery_timeout:.0f}s"
+                )
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.probes = 0
+
+
+class EndpointGuard:
+    """
+    Circuit breakers and adaptive timeouts per model
+
+    timeout_for() gives timeout_multiplier x the timeout_percentile
+    latency seen for a model (at least min_timeout, at most the turn's
+    configured timeout), doubling per retry; until min_samples calls
+    have succeeded the configured timeout is used as-is.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max: int = 1,
+        timeout_percentile: float = 0.99,
+        timeout_multiplier: float = 3.0,
+        min_timeout: float = 10.0,
+        min_samples: int = 20,
+        max_retry_after: float = 60.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max = half_open_max
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.max_retry_after = max_retry_after
+        self.latencies = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def _key(model: str) -> str:
+        from .clients.grok import MODEL_IDS
+        return MODEL_IDS.get(model, model)
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        key = self._key(model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                self.failure_threshold, self.recovery_timeout, self.half_open_max
+            )
+        return breaker
+
+    def check(self, model: str) -> None:
+        """Raise CircuitOpenError if model is failing fast"""
+        self.breaker(model).check(model)
+
+    def record_success(self, model: str, latency: float) -> None:
+        self.breaker(model).record_success()
+        self.latencies.record(self._key(model), latency)
+
+    def record_failure(self, model: str, info: ErrorInfo) -> None:
+        """Count a failure against the model's circuit if the endpoint is at fault"""
+        if info.kind in ENDPOINT_FAILURES:
+            self.breaker(model).record_failure(model)
+        elif info.kind in ENDPOINT_ANSWERED:
+            self.breaker(model).record_success()
+
+    def timeout_for(self, model: str, ceiling: float, attempt: int = 0) -> float:
+        """Timeout for an attempt at calling model"""
+        key = self._key(model)
+        if self.latencies.count(key) < self.min_samples:
+            return ceiling
+        observed = self.latencies.percentile(key, self.timeout_percentile)
+        adaptive = max(self.min_timeout, self.timeout_multiplier * observed)
+        return min(ceiling, adaptive * 2 ** attempt)
+
+    def retry_delay(self, info: ErrorInfo, backoff: float) -> float:
+        """Provider-requested wait (capped) when given, else the backoff"""
+        if info.retry_after is not None:
+            return min(info.retry_after, self.max_retry_after)
+        return backoff
+
+
+_shared_guards: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EndpointGuard]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_shared_endpoint_guard() -> EndpointGuard:
+    """Guard shared by every engine on the running event loop"""
+    loop = asyncio.get_running_loop()
+    guard = _shared_guards.get(loop)
+    if guard is None:
+        guard = EndpointGuard()
+        _shared_guards[loop] = guard
+    return guard
@@ -0,0 +1,362 @@
+"""
+SQLite State Management
+
+SQLite-backed drop-in replacement for the JSON StateManager.
+Listing, filtering and cost roll-ups become index lookups instead of
+globbing and parsing every session file.
+"""
+
+import json
+import logging
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .state import StateManager
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT,
+    status TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    participant TEXT NOT NULL,
+    model TEXT NOT NULL,
+    cost REAL NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode ON sessions(mode);
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status);
+CREATE INDEX IF NOT EXISTS idx_turns_model ON turns(model);
+"""
+
+
+class SQLiteStateManager(StateManager):
+    """
+    Manages conversation state persistence in SQLite
+
+    Same API as StateManager. Sessions live in ``<sessions_dir>/sessions.db``;
+    each turn row keeps the full serialized Turn plus indexed columns
+    (model, cost, tokens) for roll-ups. Streaming partial checkpoints stay
+    file-based (inherited from StateManager).
+    """
+
+    DB_FILENAME = "sessions.db"
+
+    def __init__(self, sessions_dir: str = "sessions", db_path: Optional[str] = None):
+        super().__init__(sessions_dir)
+        self.db_path = Path(db_path) if db_path else self.sessions_dir / self.DB_FILENAME
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        logger.info(f"SQLite state store initialized: {self.db_path}")
+
+    def save_conversation(self, conversation) -> Path:
+        """
+        Save complete conversation (replaces any previously stored turns)
+
+        Args:
+            conversation: Conversation object
+
+        Returns:
+            Path to the database file
+        """
+        with self._conn:
+            self._upsert_session(conversation)
+            self._conn.execute(
+                "DELETE FROM turns WHERE session_id = ?", (conversation.session_id,)
+            )
+            self._conn.executemany(
+                "INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._turn_row(conversation.session_id, turn) for turn in conversation.turns]
+            )
+        self._clear_partials(conversation.session_id)
+
+        logger.info(f"Conversation saved: {conversation.session_id} -> {self.db_path}")
+        return self.db_path
+
+    def load_conversation(self, session_id: str):
+        """
+        Load conversation from the database
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Conversation object
+        """
+        from .protocol import Conversation, Turn
+
+        row = self._conn.execute(
+            "SELECT * FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+
+        if row is None:
+            raise FileNotFoundError(f"Session not found: {session_id}")
+
+        turn_rows = self._conn.execute(
+            "SELECT data FROM turns WHERE session_id = ? ORDER BY rowid", (session_id,)
+        ).fetchall()
+
+        conversation = Conversation(
+            session_id=row["session_id"],
+            mode=row["mode"],
+            topic=row["topic"],
+            turns=[Turn(**json.loads(r["data"])) for r in turn_rows],
+            metadata=json.loads(row["metadata"]),
+            started_at=row["started_at"],
+            completed_at=row["completed_at"]
+        )
+
+        logger.info(f"Conversation loaded: {session_id}")
+        return conversation
+
+    def start_session(self, conversation) -> None:
+        """
+        Record a new session's mode, topic and metadata before any turn runs
+
+        Args:
+            conversation: Conversation object (turns are not written)
+        """
+        with self._conn:
+            self._upsert_session(conversation)
+
+    def save_turn(self, session_id: str, turn) -> None:
+        """
+        Incrementally save a turn (single-row insert)
+
+        A turn number already saved is kept, unless that run failed: the
+        re-run replaces it.
+
+        Args:
+            session_id: Session identifier
+            turn: Turn object
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, "unknown", "", "{}", turn.timestamp, None, "in_progress")
+            )
+            self._conn.execute(
+                """
+                INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session_id, number) DO UPDATE SET
+                    participant = excluded.participant,
+                    model = excluded.model,
+                    cost = excluded.cost,
+                    total_tokens = excluded.total_tokens,
+                    data = excluded.data
+                WHERE json_extract(turns.data, '$.error') IS NOT NULL
+                """,
+                self._turn_row(session_id, turn)
+            )
+        self._clear_partials(session_id, turn.number)
+
+    def list_sessions(
+        self,
+        limit: int = 20,
+        mode: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[dict]:
+        """
+        List recent sessions (newest first by start time)
+
+        Args:
+            limit: Maximum number of sessions to return
+            mode: Only include sessions in this mode
+            status: Only include sessions with this status
+
+        Returns:
+            List of session metadata dicts
+        """
+        clauses, params = self._session_filters(mode, status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        rows = self._conn.execute(
+            f"""
+            SELECT s.*, (SELECT COUNT(*) FROM turns t WHERE t.session_id = s.session_id) AS turns
+            FROM sessions s {where}
+            ORDER BY s.started_at DESC
+            LIMIT ?
+            """,
+            (*params, limit)
+        ).fetchall()
+
+        return [
+            {
+                "session_id": row["session_id"],
+                "mode": row["mode"],
+                "topic": row["topic"],
+                "turns": row["turns"],
+                "started_at": row["started_at"],
+                "completed_at": row["completed_at"],
+                "status": row["status"]
+            }
+            for row in rows
+        ]
+
+    def delete_session(self, session_id: str) -> bool:
+        """
+        Delete a session and its turns
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if deleted, False if not found
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            )
+        self._clear_partials(session_id)
+
+        if cursor.rowcount:
+            logger.info(f"Session deleted: {session_id}")
+            return True
+
+        logger.warning(f"Session not found for deletion: {session_id}")
+        return False
+
+    def cost_summary(
+        self,
+        group_by: str = "model",
+        mode: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Roll up cost and token usage across sessions
+
+        Args:
+            group_by: "model", "participant" or "mode"
+            mode: Only include sessions in this mode
+            status: Only include sessions with this status
+
+        Returns:
+            List of dicts with key, turns, total_tokens and total_cost
+        """
+        columns = {"model": "t.model", "participant": "t.participant", "mode": "s.mode"}
+        if group_by not in columns:
+            raise ValueError(f"Unknown group_by: {group_by}")
+
+        clauses, params = self._session_filters(mode, status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        column = columns[group_by]
+
+        rows = self._conn.execute(
+            f"""
+            SELECT {column} AS key, COUNT(*) AS turns,
+                   SUM(t.total_tokens) AS total_tokens, SUM(t.cost) AS total_cost
+            FROM turns t JOIN sessions s ON s.session_id = t.session_id
+            {where}
+            GROUP BY {column}
+            ORDER BY total_cost DESC
+            """,
+            params
+        ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def migrate_from_json(self, json_dir: Optional[str] = None) -> int:
+        """
+        One-shot import of JSON sessions (snapshots and turn logs)
+
+        Args:
+            json_dir: Directory of JSON sessions (defaults to sessions_dir)
+
+        Returns:
+            Number of sessions imported
+        """
+        source = StateManager(json_dir or str(self.sessions_dir))
+        imported = 0
+
+        session_ids = {p.stem for p in source.sessions_dir.glob("*.json")}
+        session_ids.update(
+            p.name[:-len(source.TURN_LOG_SUFFIX)]
+            for p in source.sessions_dir.glob(f"*{source.TURN_LOG_SUFFIX}")
+        )
+
+        for session_id in sorted(session_ids):
+            try:
+                conversation = source.load_conversation(session_id)
+            except Exception as e:
+                logger.warning(f"Skipping session {session_id}: {e}")
+                continue
+
+            self.save_conversation(conversation)
+            imported += 1
+
+        logger.info(f"Migrated {imported} sessions from {source.sessions_dir}")
+        return imported
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self._conn.close()
+
+    def _upsert_session(self, conversation) -> None:
+        """Insert or update the session row for a conversation"""
+        status = "completed" if conversation.completed_at else "in_progress"
+        self._conn.execute(
+            """
+            INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                mode = excluded.mode,
+                topic = excluded.topic,
+                metadata = excluded.metadata,
+                started_at = excluded.started_at,
+                completed_at = excluded.completed_at,
+                status = excluded.status
+            """,
+            (
+                conversation.session_id,
+                conversation.mode,
+                conversation.topic,
+                json.dumps(conversation.metadata),
+                conversation.started_at,
+                conversation.completed_at,
+                status
+            )
+        )
+
+    @staticmethod
+    def _turn_row(session_id: str, turn) -> tuple:
+        """Build a turns table row from a Turn"""
+        return (
+            session_id,
+            turn.number,
+            turn.participant,
+            turn.model,
+            turn.cost,
+            turn.tokens.get("total", 0),
+            json.dumps(asdict(turn))
+        )
+
+    @staticmethod
+    def _session_filters(mode: Optional[str], status: Optional[str]):
+        """Build WHERE clauses for session filters"""
+        clauses, params = [], []
+        if mode:
+            clauses.append("s.mode = ?")
+            params.append(mode)
+        if status:
+            clauses.append("s.status = ?")
+            params.append(status)
+        return clauses, params
@@ -1,13 +1,19 @@
 """
 State Management
 
-Simple JSON-based conversation state persistence
+Simple JSON-based conversation state persistence.
+
+A session header (mode, topic, metadata) and then each turn are appended to
+a per-session JSONL write-ahead log as they complete; ``save_conversation``
+compacts the log into the final JSON snapshot.
+Streaming turns checkpoint their partial responses alongside.
 """
 
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from dataclasses import asdict
 
 logger = logging.getLogger(__name__)
@@ -19,11 +25,23 @@ class StateManager:
 
     Simple file-based approach using JSON. Can be enhanced
     with SQLite later if needed.
+
+    Layout per session:
+    - ``<session_id>.json``: full conversation snapshot
+    - ``<session_id>.turns.jsonl``: append-only turn log (session header line,
+      then one line per turn)
+    - ``<session_id>.partial``: partial responses of in-flight streaming turns
+      (JSON, but not named *.json so it is never taken for a session)
     """
 
+    TURN_LOG_SUFFIX = ".turns.jsonl"
+    PARTIAL_SUFFIX = ".partial"
+    SESSION_RECORD = "session"
+
     def __init__(self, sessions_dir: str = "sessions"):
         self.sessions_dir = Path(sessions_dir)
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self._partials: Dict[str, Dict[int, str]] = {}
         logger.info(f"State manager initialized: {self.sessions_dir}")
 
     def save_conversation(self, conversation) -> Path:
@@ -51,6 +69,12 @@ class StateManager:
         with open(file_path, "w") as f:
             json.dump(data, f, indent=2)
 
+        # Snapshot now holds every turn - compact the write-ahead log
+        log_path = self._turn_log_path(conversation.session_id)
+        if log_path.exists():
+            log_path.unlink()
+        self._clear_partials(conversation.session_id)
+
         logger.info(f"Conversation saved: {file_path}")
         return file_path
 
@@ -67,15 +91,32 @@ class StateManager:
         from .protocol import Conversation, Turn
 
         file_path = self.sessions_dir / f"{session_id}.json"
+        header, logged_turns = self._read_log(session_id)
 
-        if not file_path.exists():
+        if file_path.exists():
+            with open(file_path) as f:
+                data = json.load(f)
+        elif header:
+            # In-progress session: only the turn log exists so far
+            data = {**header, "turns": []}
+        elif logged_turns:
+            # Log written before session headers were recorded
+            data = {
+                "session_id": session_id,
+                "mode": "unknown",
+                "topic": "",
+                "metadata": {},
+                "started_at": logged_turns[0]["timestamp"],
+                "turns": [],
+            }
+        else:
             raise FileNotFoundError(f"Session not found: {session_id}")
 
-        with open(file_path) as f:
-            data = json.load(f)
+        # Replay snapshot + log (first occurrence of a turn number wins, failed turns are replaced)
+        turn_records = self._merge_turns(data["turns"], logged_turns)
 
         # Reconstruct conversation
-        turns = [Turn(**turn_data) for turn_data in data["turns"]]
+        turns = [Turn(**turn_data) for turn_data in turn_records]
 
         conversation = Conversation(
             session_id=data["session_id"],
@@ -90,69 +131,236 @@ class StateManager:
         logger.info(f"Conversation loaded: {session_id}")
         return conversation
 
+    def start_session(self, conversation) -> None:
+        """
+        Record a new session's mode, topic and metadata before any turn runs
+
+        Written as the first line of the turn log so an interrupted session
+        can be reloaded (and resumed) with its configuration.
+
+        Args:
+            conversation: Conversation object (turns are not written)
+        """
+        header = {
+            "type": self.SESSION_RECORD,
+            "session_id": conversation.session_id,
+            "mode": conversation.mode,
+            "topic": conversation.topic,
+            "metadata": conversation.metadata,
+            "started_at": conversation.started_at,
+        }
+
+        log_path = self._turn_log_path(conversation.session_id)
+        with open(log_path, "a") as f:
+            f.write(json.dumps(header) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        logger.debug(f"Session header written to {log_path}")
+
     def save_turn(self, session_id: str, turn) -> None:
         """
         Incrementally save a turn (for resumability)
 
+        Appends one fsync'd line to the session's turn log instead of
+        rewriting the whole session. When the log is replayed a turn
+        number's first record wins, unless it failed and was run again.
+
         Args:
             session_id: Session identifier
             turn: Turn object
         """
-        # Load existing conversation
-        try:
-            conversation = self.load_conversation(session_id)
-        except FileNotFoundError:
-            # First turn - create new conversation
-            from .protocol import Conversation
-            conversation = Conversation(
-                session_id=session_id,
-                mode="unknown",
-                topic="",
-                turns=[],
-                metadata={},
-                started_at=turn.timestamp
-            )
-
-        # Add turn if not already present
-        if not any(t.number == turn.number for t in conversation.turns):
-            conversation.turns.append(turn)
-
-        # Save
-        self.save_conversation(conversation)
-
-    def list_sessions(self, limit: int = 20) -> List[dict]:
+        log_path = self._turn_log_path(session_id)
+
+        with open(log_path, "a") as f:
+            f.write(json.dumps(asdict(turn)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        logger.debug(f"Turn {turn.number} appended to {log_path}")
+        self._clear_partials(session_id, turn.number)
+
+    def save_partial(self, session_id: str, turn_number: int, text: str) -> None:
+        """
+        Checkpoint the partial response of a turn that is still streaming
+
+        Args:
+            session_id: Session identifier
+            turn_number: Turn being streamed
+            text: Response text received so far
+        """
+        partials = self._partials.setdefault(session_id, {})
+        partials[turn_number] = text
+        self._write_partials(session_id)
+
+    def load_partials(self, session_id: str) -> Dict[int, str]:
+        """
+        Load checkpointed partial responses for a session
+
+        Returns:
+            Mapping of turn number -> partial response text
+        """
+        partial_path = self._partial_path(session_id)
+        if not partial_path.exists():
+            return {}
+
+        with open(partial_path) as f:
+            return {int(k): v for k, v in json.load(f).items()}
+
+    def _partial_path(self, session_id: str) -> Path:
+        """Path of the partial-response checkpoint for a session"""
+        return self.sessions_dir / f"{session_id}{self.PARTIAL_SUFFIX}"
+
+    def _write_partials(self, session_id: str) -> None:
+        """Atomically rewrite the partial checkpoint file (removed when empty)"""
+        partial_path = self._partial_path(session_id)
+        partials = self._partials.get(session_id)
+
+        if not partials:
+            self._partials.pop(session_id, None)
+            if partial_path.exists():
+                partial_path.unlink()
+            return
+
+        tmp_path = partial_path.with_name(partial_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(partials, f)
+        os.replace(tmp_path, partial_path)
+
+    def _clear_partials(self, session_id: str, turn_number: Optional[int] = None) -> None:
+        """Drop checkpointed partials for one turn (or all turns of a session)"""
+        if turn_number is None:
+            self._partials.pop(session_id, None)
+            self._write_partials(session_id)
+        elif turn_number in self._partials.get(session_id, {}):
+            del self._partials[session_id][turn_number]
+            self._write_partials(session_id)
+
+    def _turn_log_path(self, session_id: str) -> Path:
+        """Path of the append-only turn log for a session"""
+        return self.sessions_dir / f"{session_id}{self.TURN_LOG_SUFFIX}"
+
+    def _read_turn_log(self, session_id: str) -> List[Dict]:
+        """Read turn records from a session's turn log"""
+        return self._read_log(session_id)[1]
+
+    def _read_log(self, session_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Read a session's turn log
+
+        A torn final line (e.g. crash mid-write) is skipped with a warning.
+
+        Returns:
+            (session header or None, turn records)
+        """
+        log_path = self._turn_log_path(session_id)
+        if not log_path.exists():
+            return None, []
+
+        header = None
+        records = []
+        with open(log_path) as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt turn log line {line_num} in {log_path}")
+                    continue
+
+                if record.get("type") == self.SESSION_RECORD:
+                    header = {k: v for k, v in record.items() if k != "type"}
+                else:
+                    records.append(record)
+
+        return header, records
+
+    @staticmethod
+    def _merge_turns(snapshot_turns: List[Dict], logged_turns: List[Dict]) -> List[Dict]:
+        """
+        Merge snapshot and logged turn records, one per turn number
+
+        The first record of a number wins; a failed one (error set) is
+        replaced by a later record, i.e. the turn's re-run.
+        """
+        merged: Dict[int, Dict] = {}
+
+        for record in [*snapshot_turns, *logged_turns]:
+            current = merged.get(record["number"])
+            if current is None or current.get("error"):
+                merged[record["number"]] = record
+
+        return list(merged.values())
+
+    def list_sessions(
+        self,
+        limit: int = 20,
+        mode: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[dict]:
         """
         List recent sessions
 
         Args:
             limit: Maximum number of sessions to return
+            mode: Only include sessions in this mode
+            status: Only include sessions with this status
 
         Returns:
             List of session metadata dicts
         """
         sessions = []
 
-        # Get all session files, sorted by modification time
-        session_files = sorted(
-            self.sessions_dir.glob("*.json"),
-            key=lambda p: p.stat().st_mtime,
+        # Get all session files (snapshots and in-progress turn logs),
+        # sorted by modification time
+        session_files = {}
+        for file_path in self.sessions_dir.glob(f"*{self.TURN_LOG_SUFFIX}"):
+            session_files[file_path.name[:-len(self.TURN_LOG_SUFFIX)]] = file_path
+        for file_path in self.sessions_dir.glob("*.json"):
+            session_files[file_path.stem] = file_path
+
+        ordered = sorted(
+            session_files.items(),
+            key=lambda item: item[1].stat().st_mtime,
             reverse=True
         )
 
-        for file_path in session_files[:limit]:
-            try:
-                with open(file_path) as f:
-                    data = json.load(f)
+        for session_id, file_path in ordered:
+            if len(sessions) >= limit:
+                break
 
-                sessions.append({
+            try:
+                if file_path.suffix == ".json":
+                    with open(file_path) as f:
+                        data = json.load(f)
+                    turn_records = data["turns"]
+                    if self._turn_log_path(session_id).exists():
+                        turn_records = self._merge_turns(
+                            turn_records, self._read_turn_log(session_id)
+                        )
+                else:
+                    conversation = self.load_conversation(session_id)
+                    data = asdict(conversation)
+                    turn_records = data["turns"]
+
+                session = {
                     "session_id": data["session_id"],
                     "mode": data["mode"],
                     "topic": data["topic"],
-                    "turns": len(data["turns"]),
+                    "turns": len(turn_records),
                     "started_at": data["started_at"],
                     "completed_at": data.get("completed_at"),
                     "status": "completed" if data.get("completed_at") else "in_progress"
-                })
+                }
+
+                if mode and session["mode"] != mode:
+                    continue
+                if status and session["status"] != status:
+                    continue
+
+                sessions.append(session)
 
             except Exception as e:
                 logger.warning(f"Error loading session {file_path}: {e}")
@@ -171,9 +379,13 @@ class StateManager:
             True if deleted, False if not found
         """
         file_path = self.sessions_dir / f"{session_id}.json"
+        log_path = self._turn_log_path(session_id)
 
-        if file_path.exists():
-            file_path.unlink()
+        if file_path.exists() or log_path.exists():
+            for path in (file_path, log_path):
+                if path.exists():
+                    path.unlink()
+            self._clear_partials(session_id)
             logger.info(f"Session deleted: {session_id}")
             return True
         else:
@@ -205,3 +417,22 @@ class StateManager:
 
         logger.info(f"Markdown exported: {output_path}")
         return output_path
+
+
+def create_state_manager(backend: str = "json", sessions_dir: str = "sessions") -> StateManager:
+    """
+    Create a state manager for the given storage backend
+
+    Args:
+        backend: "json" (files per session) or "sqlite"
+        sessions_dir: Directory for session files / database
+
+    Returns:
+        StateManager instance
+    """
+    if backend == "json":
+        return StateManager(sessions_dir)
+    if backend == "sqlite":
+        from .sqlite_state import SQLiteStateManager
+        return SQLiteStateManager(sessions_dir)
+    raise ValueError(f"Unknown state backend: {backend}")
@@ -0,0 +1,153 @@
+"""
+Token Counting
+
+Local token counts for when a provider does not report usage.
+
+Uses tiktoken's cl100k_base encoding when the package (and its encoding
+file) is available - close to Claude's tokenizer for English text - and
+otherwise a regex pre-tokenizer that approximates BPE piece counts.
+Counts are cached per text, and batches are encoded in one call.
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+ENCODING_NAME = "cl100k_base"
+CACHE_SIZE = 4096
+
+# Words, numbers, single punctuation marks (BPE rarely merges across these)
+_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+_encoding = None
+_encoding_loaded = False
+_cache: "OrderedDict[str, int]" = OrderedDict()
+
+
+def _get_encoding():
+    """Lazily load the tiktoken encoding (None if unavailable)"""
+    global _encoding, _encoding_loaded
+
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(ENCODING_NAME)
+            logger.debug(f"Token counting with tiktoken {ENCODING_NAME}")
+        except Exception as e:
+            logger.debug(f"tiktoken unavailable ({e}); using heuristic token counts")
+            _encoding = None
+
+    return _encoding
+
+
+def _heuristic_count(text: str) -> int:
+    """Approximate BPE token count: long words split into ~4-char pieces"""
+    count = 0
+    for piece in _PIECE_PATTERN.findall(text):
+        count += (len(piece) + 3) // 4 if piece.isalpha() else 1
+    return count
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in a text
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Token count (0 for empty text)
+    """
+    return count_tokens_batch([text])[0]
+
+
+def count_tokens_batch(texts: Sequence[str]) -> List[int]:
+    """
+    Count tokens for many texts
+
+    Uncached texts are encoded together (tiktoken's batch encoder runs
+    them in parallel threads) and added to the LRU cache.
+
+    Args:
+        texts: Texts to count
+
+    Returns:
+        Token counts in input order
+    """
+    counts: Dict[str, int] = {}
+    missing = []
+    for text in dict.fromkeys(texts):
+        if not text:
+            continue
+        if text in _cache:
+            _cache.move_to_end(text)
+            counts[text] = _cache[text]
+        else:
+            missing.append(text)
+
+    if missing:
+        encoding = _get_encoding()
+        if encoding is None:
+            results = [_heuristic_count(text) for text in missing]
+        elif len(missing) == 1:
+            results = [len(encoding.encode(missing[0], disallowed_special=()))]
+        else:
+            results = [len(t) for t in encoding.encode_batch(missing, disallowed_special=())]
+
+        for text, count in zip(missing, results):
+            counts[text] = count
+            _cache[text] = count
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return [counts[text] if text else 0 for text in texts]
+
+
+def truncate_tokens(text: str, max_tokens: int, from_end: bool = False) -> str:
+    """
+    Cut a text down to at most max_tokens tokens
+
+    Args:
+        text: Text to cut
+        max_tokens: Tokens to keep
+        from_end: Keep the last tokens instead of the first
+
+    Returns:
+        The kept prefix (or suffix) of text
+    """
+    if max_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        kept = tokens[-max_tokens:] if from_end else tokens[:max_tokens]
+        return encoding.decode(kept)
+
+    pieces = list(_PIECE_PATTERN.finditer(text))
+    if from_end:
+        pieces.reverse()
+
+    count = 0
+    for piece in pieces:
+        word = piece.group()
+        count += (len(word) + 3) // 4 if word.isalpha() else 1
+        if count > max_tokens:
+            return text[piece.end():] if from_end else text[:piece.start()]
+    return text
+
+
+def usage_for(prompt: str, response: str) -> Dict[str, int]:
+    """Token usage dict (protocol format) counted locally"""
+    prompt_tokens, completion_tokens = count_tokens_batch([prompt, response])
+    return {
+        "prompt": prompt_tokens,
+        "completion": completion_tokens,
+        "total": prompt_tokens + completion_tokens
+    }
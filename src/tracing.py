@@ -0,0 +1,185 @@
+"""
+Tracing
+
+Lightweight OpenTelemetry-style spans for protocol execution:
+protocol run -> phase -> turn -> attempt -> client call.
+
+Parent/child links follow the async call tree through contextvars, so
+turns started with asyncio.gather/create_task nest under their run.
+Finished spans go to an exporter; JSONFileExporter writes one
+OTLP-shaped JSON object per line to a local file (no network).
+"""
+
+import contextvars
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """Timed unit of work with attributes"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "OK"
+        self.status_message = ""
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Span duration in seconds (None while open)"""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, message: str) -> None:
+        """Mark the span as failed"""
+        self.status = "ERROR"
+        self.status_message = message
+
+    def to_dict(self) -> Dict:
+        """OTLP/JSON-style span representation"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """Stand-in span used when tracing is disabled"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_error(self, message: str) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to an exporter
+
+    Usage:
+        tracer = Tracer(JSONFileExporter("trace.jsonl"))
+        with tracer.span("protocol.turn", turn=1) as span:
+            span.set_attribute("tokens.total", 42)
+
+    A Tracer without an exporter is disabled and yields no-op spans.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Open a child of the current span (or a new trace root)"""
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Span export failed: {e}")
+
+
+class JSONFileExporter:
+    """Append finished spans to a JSONL file (one OTLP-style span per line)"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+        logger.info(f"Tracing spans to {self.path}")
+
+    def export(self, span: Span) -> None:
+        self._file.write(json.dumps(span.to_dict()) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class InMemoryExporter:
+    """Keep finished spans in a list (tests and ad-hoc analysis)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def by_name(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+
+NOOP_TRACER = Tracer()
+
+
+def _otlp_value(value: Any) -> Dict:
+    """Wrap an attribute value in its OTLP AnyValue form"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
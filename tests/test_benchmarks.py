@@ -0,0 +1,89 @@
+"""
+Benchmark Suite Tests
+
+Smoke tests for the fake model clients and the benchmark runner.
+"""
+
+import json
+import random
+
+import pytest
+
+from benchmarks.fake_clients import FakeModelClient, LatencyProfile
+from benchmarks.run_benchmarks import build_config, compare, main, run_structure
+
+
+class TestFakeClients:
+    """Test deterministic fake model clients"""
+
+    def test_latency_sampling_is_seeded(self):
+        """Test that the same seed draws the same latencies"""
+        profile = LatencyProfile("lognormal", mean=0.1, spread=0.5)
+
+        first = [profile.sample(random.Random(7)) for _ in range(3)]
+        second = [profile.sample(random.Random(7)) for _ in range(3)]
+
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_failure_rate_raises_retryable_error(self):
+        """Test that simulated failures use a transient error type"""
+        client = FakeModelClient(failure_rate=1.0)
+
+        with pytest.raises(ConnectionError):
+            await client.chat("prompt")
+        assert client.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_reports_usage(self):
+        """Test that streamed chunks reassemble and usage is filled"""
+        client = FakeModelClient(response_chars=100, completion_tokens=25)
+        usage = {}
+
+        chunks = [chunk async for chunk in client.chat_stream("prompt", usage=usage)]
+
+        assert len("".join(chunks)) == 100
+        assert usage["completion"] == 25
+
+
+class TestBenchmarkRunner:
+    """Test scenario configs and result reporting"""
+
+    @pytest.mark.parametrize("structure", ["sequential", "parallel", "mixed", "dag"])
+    @pytest.mark.asyncio
+    async def test_every_structure_runs_all_turns(self, structure):
+        """Test that synthetic configs execute end to end"""
+        result = await run_structure(structure, 6, LatencyProfile())
+
+        assert result["turns"] == 6
+        assert result["calls"] == 6
+
+    def test_mixed_config_covers_all_turns(self):
+        """Test that mixed phases partition the turns"""
+        config = build_config("mixed", 5)
+        covered = [n for phase in config["phases"] for n in phase["turns"]]
+
+        assert covered == [1, 2, 3, 4, 5]
+
+    def test_compare_reports_changes(self):
+        """Test percentage diff against a baseline"""
+        baseline = {"meta": {"commit": "a"}, "results": {"dag": {"wall_time_s": 2.0}}}
+        current = {"meta": {"commit": "b"}, "results": {"dag": {"wall_time_s": 1.0}}}
+
+        lines = compare(current, baseline)
+
+        assert "-50.0%" in lines[1]
+
+    def test_quick_run_writes_json(self, tmp_path):
+        """Test the CLI entry point end to end"""
+        output = tmp_path / "results.json"
+
+        assert main(["--quick", "--latency-mean", "0", "--output", str(output)]) == 0
+
+        report = json.loads(output.read_text())
+        assert {"sequential", "parallel", "mixed", "dag", "dynamic_cycles",
+                "persistence_json", "persistence_sqlite"} <= set(report["results"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,229 @@
+"""
+Budget Tests
+
+Tests for cost prediction, soft-cap downgrades, hard caps enforced during
+turn execution, and per-run/per-batch/per-day budget scopes.
+"""
+
+import json
+import threading
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.budget import Budget, BudgetExceededError, BudgetGuard
+from src.protocol import ProtocolEngine
+from src.state import StateManager
+
+
+def grok_config(turns, structure="sequential", max_tokens=1000):
+    """Custom mode config with turns Grok turns"""
+    return {
+        "structure": structure,
+        "turns": turns,
+        "prompts": {
+            f"turn_{i}": {
+                "role": "r",
+                "participant": "grok",
+                "template": "P {topic}",
+                "grok_model": "grok-4-fast-reasoning-latest",
+                "max_tokens": max_tokens
+            }
+            for i in range(1, turns + 1)
+        }
+    }
+
+
+def mock_grok(completion_tokens=1000):
+    """Grok client mock reporting fixed usage, recording models used"""
+    client = AsyncMock()
+
+    async def fake_chat(prompt, model=None):
+        client.models.append(model)
+        return "ok", {
+            "prompt": 10, "completion": completion_tokens, "total": 10 + completion_tokens
+        }
+
+    client.models = []
+    client.chat = AsyncMock(side_effect=fake_chat)
+    return client
+
+
+class TestBudgetGuard:
+    """Test prediction, reservation and downgrades"""
+
+    def test_predict_cost_resolves_aliases(self):
+        """Test that aliases are priced like their API ids"""
+        guard = BudgetGuard()
+
+        # grok-4 -> grok-4-fast-reasoning-latest ($2 in / $10 out per 1M)
+        assert guard.predict_cost("grok-4", 1000, 1000) == pytest.approx(0.012)
+
+    def test_reserve_and_settle(self):
+        """Test that reservations count until replaced by actual cost"""
+        guard = BudgetGuard(per_run=1.0)
+        budget = guard.run_budget()
+
+        reservation = guard.reserve([budget], "grok-4-fast-reasoning", 0, 10_000)
+        assert budget.reserved == pytest.approx(0.1)
+
+        reservation.settle(0.03)
+        reservation.settle(0.03)  # idempotent
+
+        assert budget.reserved == pytest.approx(0.0)
+        assert budget.spent == pytest.approx(0.03)
+
+    def test_soft_cap_downgrades(self):
+        """Test that nearing the soft cap switches to the cheaper model"""
+        guard = BudgetGuard(per_run=0.1, soft_ratio=0.5)
+        budget = guard.run_budget(spent=0.04)
+
+        reservation = guard.reserve([budget], "grok-4-fast-reasoning-latest", 0, 2000)
+
+        assert reservation.downgraded
+        assert reservation.model == "grok-4-fast-non-reasoning-latest"
+        assert reservation.amount == pytest.approx(0.01)
+
+    def test_no_downgrade_when_disallowed(self):
+        """Test that allow_downgrade=False keeps the configured model"""
+        guard = BudgetGuard(per_run=0.1, soft_ratio=0.5)
+        budget = guard.run_budget(spent=0.04)
+
+        reservation = guard.reserve([budget], "grok-4-fast-reasoning-latest", 0, 2000,
+                                    allow_downgrade=False)
+
+        assert reservation.model == "grok-4-fast-reasoning-latest"
+
+    def test_hard_cap_raises(self):
+        """Test that a turn predicted past the hard cap is refused"""
+        guard = BudgetGuard(per_run=0.01)
+        budget = guard.run_budget()
+
+        with pytest.raises(BudgetExceededError) as exc_info:
+            guard.reserve([budget], "claude-3-opus-20240229", 1000, 4096)
+
+        assert exc_info.value.scope == "run"
+        assert budget.reserved == 0.0
+
+    def test_day_ledger_persists(self, tmp_path):
+        """Test that day spend survives a new guard via the ledger"""
+        ledger = tmp_path / "ledger.json"
+        guard = BudgetGuard(per_day=1.0, ledger_path=str(ledger))
+        guard.reserve([guard.day_budget()], "grok-4", 0, 100).settle(0.25)
+
+        restarted = BudgetGuard(per_day=1.0, ledger_path=str(ledger))
+
+        assert restarted.day_budget().spent == pytest.approx(0.25)
+        assert list(json.loads(ledger.read_text()).values()) == [pytest.approx(0.25)]
+
+    def test_day_cap_sees_other_process_spend(self, tmp_path):
+        """Test that reserve re-reads spend another guard wrote to the shared ledger"""
+        ledger = str(tmp_path / "ledger.json")
+        first = BudgetGuard(per_day=1.0, ledger_path=ledger)
+        second = BudgetGuard(per_day=1.0, ledger_path=ledger)
+        first.day_budget()
+
+        second.reserve([second.day_budget()], "grok-4", 0, 100).settle(0.999)
+
+        with pytest.raises(BudgetExceededError) as exc_info:
+            first.reserve([first.day_budget()], "grok-4", 0, 1000)
+        assert exc_info.value.scope == "day"
+        assert first.day_budget().spent == pytest.approx(0.999)
+
+    def test_concurrent_ledger_updates_not_lost(self, tmp_path):
+        """Test that spend recorded by guards sharing a ledger all lands"""
+        ledger = tmp_path / "ledger.json"
+        guards = [BudgetGuard(per_day=100.0, ledger_path=str(ledger)) for _ in range(4)]
+
+        def spend(guard):
+            for _ in range(25):
+                guard.record_day_spend(0.01)
+
+        threads = [threading.Thread(target=spend, args=(guard,)) for guard in guards]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert list(json.loads(ledger.read_text()).values()) == [pytest.approx(1.0)]
+
+    def test_exhausted(self):
+        """Test exhausted once committed spend reaches the hard cap"""
+        assert Budget("batch", hard_limit=1.0, spent=1.0).exhausted
+        assert not Budget("batch", hard_limit=1.0, spent=0.5).exhausted
+        assert not Budget("batch").exhausted
+
+
+class TestBudgetedExecution:
+    """Test budgets enforced by ProtocolEngine"""
+
+    @pytest.mark.asyncio
+    async def test_hard_cap_stops_run_and_persists(self, tmp_path):
+        """Test that a run stops at the hard cap with completed turns saved"""
+        state = StateManager(str(tmp_path))
+        # Each turn predicts $0.01 and costs ~$0.01
+        engine = ProtocolEngine(AsyncMock(), mock_grok(), state,
+                                budget=BudgetGuard(per_run=0.025, soft_ratio=1.0))
+
+        with pytest.raises(BudgetExceededError):
+            await engine.run_protocol(mode="custom", topic="T", custom_config=grok_config(5))
+
+        saved = state.load_conversation(engine.current_session_id)
+        assert len(saved.turns) == 2
+        assert saved.completed_at is None
+        assert "budget_exceeded" in saved.metadata
+
+    @pytest.mark.asyncio
+    async def test_soft_cap_downgrades_grok_turns(self, tmp_path):
+        """Test that later turns switch model once the soft cap is near"""
+        grok = mock_grok()
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                budget=BudgetGuard(per_run=0.1, soft_ratio=0.3))
+
+        conversation = await engine.run_protocol(mode="custom", topic="T",
+                                                 custom_config=grok_config(4))
+
+        assert grok.models[:2] == ["grok-4-fast-reasoning-latest"] * 2
+        assert grok.models[2:] == ["grok-4-fast-non-reasoning-latest"] * 2
+        assert conversation.turns[3].model == "grok-4-fast-non-reasoning-latest"
+        assert conversation.turns[3].cost < conversation.turns[0].cost
+
+    @pytest.mark.asyncio
+    async def test_parallel_keeps_paid_turns(self, tmp_path):
+        """Test that parallel turns within budget are kept when a sibling is refused"""
+        state = StateManager(str(tmp_path))
+        engine = ProtocolEngine(AsyncMock(), mock_grok(), state,
+                                budget=BudgetGuard(per_run=0.025, soft_ratio=1.0))
+
+        with pytest.raises(BudgetExceededError):
+            await engine.run_protocol(mode="custom", topic="T",
+                                      custom_config=grok_config(4, structure="parallel"))
+
+        assert len(state.load_conversation(engine.current_session_id).turns) == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_budget_spans_topics(self, tmp_path):
+        """Test that the batch cap covers all topics together"""
+        engine = ProtocolEngine(AsyncMock(), mock_grok(), StateManager(str(tmp_path)),
+                                budget=BudgetGuard(per_batch=0.035, soft_ratio=1.0))
+
+        results = await engine.run_many("custom", ["a", "b", "c"],
+                                        custom_config=grok_config(2), max_concurrent=1)
+
+        assert [isinstance(r, BudgetExceededError) for r in results] == [False, True, True]
+
+    @pytest.mark.asyncio
+    async def test_resume_counts_spent_turns(self, tmp_path):
+        """Test that a resumed run's budget includes turns already paid for"""
+        state = StateManager(str(tmp_path))
+        engine = ProtocolEngine(AsyncMock(), mock_grok(), state,
+                                budget=BudgetGuard(per_run=0.025, soft_ratio=1.0))
+
+        with pytest.raises(BudgetExceededError):
+            await engine.run_protocol(mode="custom", topic="T", custom_config=grok_config(5))
+        session_id = engine.current_session_id
+
+        with pytest.raises(BudgetExceededError):
+            await engine.resume_protocol(session_id)
+
+        assert len(state.load_conversation(session_id).turns) == 2
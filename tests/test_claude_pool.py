@@ -0,0 +1,175 @@
+"""
+Claude Worker Pool Tests
+
+Tests for persistent Claude CLI workers using a fake CLI that speaks the
+stream-json protocol (one JSON message per stdin line, result events out).
+"""
+
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from src.clients.claude import ClaudeClient
+from src.clients.claude_pool import ClaudeWorkerPool
+
+FAKE_CLI = textwrap.dedent("""
+    import json, os, sys, time
+
+    for line in sys.stdin:
+        content = json.loads(line)["message"]["content"]
+        print(json.dumps({"type": "system", "subtype": "init"}), flush=True)
+        if content == "crash":
+            sys.exit(1)
+        if content == "hang":
+            time.sleep(30)
+        print(json.dumps({
+            "type": "result",
+            "is_error": content == "fail",
+            "result": f"{os.getpid()}:{content}",
+            "usage": {"input_tokens": 10, "cache_read_input_tokens": 5, "output_tokens": 7},
+        }), flush=True)
+""")
+
+
+@pytest.fixture
+def fake_cli(tmp_path):
+    """Command line for a fake stream-json Claude CLI"""
+    script = tmp_path / "fake_claude.py"
+    script.write_text(FAKE_CLI)
+    return [sys.executable, str(script)]
+
+
+def pid_of(response):
+    return response.split(":", 1)[0]
+
+
+class TestClaudeWorkerPool:
+    """Test worker reuse, recycling and health checks"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_conversation_per_request(self, fake_cli):
+        """Test that by default each request gets a new, prestarted process"""
+        pool = ClaudeWorkerPool(size=1, command=fake_cli)
+        try:
+            first, _ = await pool.chat("hello")
+            await asyncio.sleep(0.2)
+            # The replacement is running before the next request arrives
+            assert pool._workers[0].is_alive
+            assert pool._workers[0].requests_served == 0
+            second, _ = await pool.chat("again")
+        finally:
+            await pool.close()
+
+        assert pid_of(first) != pid_of(second)
+        assert second.endswith(":again")
+
+    @pytest.mark.asyncio
+    async def test_workers_are_reused(self, fake_cli):
+        """Test that sequential requests hit the same warm process"""
+        pool = ClaudeWorkerPool(size=1, max_requests_per_worker=20, command=fake_cli)
+        try:
+            first, tokens = await pool.chat("hello")
+            second, _ = await pool.chat("again")
+        finally:
+            await pool.close()
+
+        assert first.endswith(":hello")
+        assert pid_of(first) == pid_of(second)
+        assert tokens == {"prompt": 15, "completion": 7, "total": 22, "cached": 5}
+
+    @pytest.mark.asyncio
+    async def test_workers_recycled_after_max_requests(self, fake_cli):
+        """Test that a worker is replaced after max_requests_per_worker"""
+        pool = ClaudeWorkerPool(size=1, max_requests_per_worker=2, command=fake_cli)
+        try:
+            pids = [pid_of((await pool.chat(f"p{i}"))[0]) for i in range(3)]
+        finally:
+            await pool.close()
+
+        assert pids[0] == pids[1]
+        assert pids[2] != pids[0]
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_is_respawned(self, fake_cli):
+        """Test that a crashed worker raises and is replaced on next request"""
+        pool = ClaudeWorkerPool(size=1, max_requests_per_worker=20, command=fake_cli)
+        try:
+            first, _ = await pool.chat("hello")
+            with pytest.raises(RuntimeError, match="Claude CLI error"):
+                await pool.chat("crash")
+            after, _ = await pool.chat("hello")
+        finally:
+            await pool.close()
+
+        assert pid_of(after) != pid_of(first)
+
+    @pytest.mark.asyncio
+    async def test_error_result_keeps_worker(self, fake_cli):
+        """Test that an error result raises without killing the worker"""
+        pool = ClaudeWorkerPool(size=1, max_requests_per_worker=20, command=fake_cli)
+        try:
+            first, _ = await pool.chat("hello")
+            with pytest.raises(RuntimeError, match="Claude CLI error"):
+                await pool.chat("fail")
+            after, _ = await pool.chat("hello")
+        finally:
+            await pool.close()
+
+        assert pid_of(after) == pid_of(first)
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_replaces_worker(self, fake_cli):
+        """Test that a timed-out request raises TimeoutError and recycles the worker"""
+        pool = ClaudeWorkerPool(
+            size=1, max_requests_per_worker=20, request_timeout=0.5, command=fake_cli
+        )
+        try:
+            first, _ = await pool.chat("hello")
+            with pytest.raises(TimeoutError, match="timed out"):
+                await pool.chat("hang")
+            after, _ = await pool.chat("hello")
+        finally:
+            await pool.close()
+
+        assert pid_of(after) != pid_of(first)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_kills_worker(self, fake_cli):
+        """Test that a cancelled request never hands its result to the next caller"""
+        pool = ClaudeWorkerPool(size=1, max_requests_per_worker=20, command=fake_cli)
+        try:
+            first, _ = await pool.chat("hello")
+            hung = asyncio.create_task(pool.chat("hang"))
+            await asyncio.sleep(0.3)
+            hung.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await hung
+            after, _ = await pool.chat("next")
+        finally:
+            await pool.close()
+
+        assert after.endswith(":next")
+        assert pid_of(after) != pid_of(first)
+
+    def test_invalid_pool_size(self):
+        """Test that an empty pool is rejected"""
+        with pytest.raises(ValueError, match="at least 1"):
+            ClaudeWorkerPool(size=0)
+
+    @pytest.mark.asyncio
+    async def test_claude_client_uses_pool(self, fake_cli):
+        """Test that ClaudeClient routes requests through its pool"""
+        client = ClaudeClient(pool=ClaudeWorkerPool(size=2, command=fake_cli))
+        try:
+            response, tokens = await client.chat("via client")
+        finally:
+            await client.close()
+
+        assert response.endswith(":via client")
+        assert tokens["completion"] == 7
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -9,7 +9,7 @@ from click.testing import CliRunner
 from pathlib import Path
 import json
 
-from cli import cli
+from cli import cli, _budget_guard, _load_topics, _resume_protocol
 
 
 @pytest.fixture
@@ -64,6 +64,33 @@ class TestCLIArguments:
         # Should fail because topic is required
         assert result.exit_code != 0
 
+    def test_batch_requires_topics(self, runner):
+        """Test batch command requires a topic file"""
+        result = runner.invoke(cli, ['batch', '--mode', 'loop'])
+
+        assert result.exit_code != 0
+        assert "topics" in result.output.lower()
+
+    def test_batch_modes_from_registry(self, runner):
+        """Test that batch offers the mode files, not removed modes"""
+        result = runner.invoke(cli, ['batch', '--help'])
+
+        assert "dynamic" in result.output
+        assert "synthesis" not in result.output
+
+    def test_load_topics_formats(self, tmp_path):
+        """Test topic files in JSONL, CSV and plain text"""
+        jsonl = tmp_path / "topics.jsonl"
+        jsonl.write_text('{"topic": "A"}\n\n{"topic": "B"}\n')
+        csv_file = tmp_path / "topics.csv"
+        csv_file.write_text("topic,notes\nA,x\nB,y\n")
+        txt = tmp_path / "topics.txt"
+        txt.write_text("A\n  \nB\n")
+
+        assert _load_topics(jsonl) == ["A", "B"]
+        assert _load_topics(csv_file) == ["A", "B"]
+        assert _load_topics(txt) == ["A", "B"]
+
     def test_modes_command(self, runner):
         """Test modes listing command"""
         result = runner.invoke(cli, ['modes'])
@@ -112,6 +139,19 @@ class TestCLIExecution:
 
         assert result.exit_code == 0
 
+    def test_list_command_sqlite_store(self, runner):
+        """Test list and migrate commands against the SQLite store"""
+        with runner.isolated_filesystem():
+            Path("sessions").mkdir()
+
+            result = runner.invoke(cli, ['--store', 'sqlite', 'migrate'])
+            assert result.exit_code == 0
+            assert "Migrated 0 sessions" in result.output
+
+            result = runner.invoke(cli, ['--store', 'sqlite', 'list', '--status', 'completed'])
+            assert result.exit_code == 0
+            assert "No sessions found" in result.output
+
     @pytest.mark.skip(reason="Requires existing session")
     def test_export_command(self, runner, temp_output_dir):
         """Test export command"""
@@ -180,6 +220,16 @@ class TestCLIErrorHandling:
         assert result.exit_code == 1
         assert "not found" in result.output.lower() or "error" in result.output.lower()
 
+    def test_resume_nonexistent_session_fails(self, runner):
+        """Test resume of nonexistent session fails gracefully"""
+        result = runner.invoke(cli, [
+            'resume',
+            'nonexistent-session-12345'
+        ])
+
+        assert result.exit_code == 1
+        assert "not found" in result.output.lower()
+
     def test_delete_nonexistent_session_fails(self, runner):
         """Test delete of nonexistent session fails gracefully"""
         result = runner.invoke(cli, [
@@ -229,6 +279,70 @@ class TestCLIOutputFormats:
         assert "session" in result.output.lower()
 
 
+class TestResumeSummary:
+    """Test the counts the resume command reports"""
+
+    def test_failed_turns_count_as_executed(self, tmp_path, monkeypatch, capsys):
+        """Test that re-run failed turns are reported as executed, not reused"""
+        import asyncio
+        from dataclasses import replace
+        from datetime import datetime
+
+        from src.protocol import ProtocolEngine, Turn
+        from src.state import StateManager
+
+        monkeypatch.setenv("XAI_API_KEY", "test-key")
+        state = StateManager(str(tmp_path))
+        ok = Turn(number=1, role="r", participant="grok", prompt="p", response="r",
+                  tokens={"prompt": 1, "completion": 1, "total": 2}, latency=1.0,
+                  timestamp=datetime.now().isoformat(), context_from=[])
+        state.save_turn("s1", ok)
+        state.save_turn("s1", replace(ok, number=2, response="[Error: x]", error="x"))
+
+        async def resume_protocol(self, session_id):
+            conversation = state.load_conversation(session_id)
+            conversation.turns = [ok, replace(ok, number=2), replace(ok, number=3)]
+            return conversation
+
+        monkeypatch.setattr(ProtocolEngine, "resume_protocol", resume_protocol)
+
+        asyncio.run(
+            _resume_protocol("s1", str(tmp_path / "out.md"), "sonnet", "grok-4-fast", state)
+        )
+
+        output = capsys.readouterr().out
+        assert "Turns reused: 1" in output
+        assert "Turns executed: 2" in output
+
+
+class TestBudgetLedger:
+    """Test that the --daily-budget ledger stays out of session storage"""
+
+    def test_ledger_not_taken_for_a_session(self, tmp_path, monkeypatch, caplog):
+        """Test listing and migrating sessions while the day ledger exists"""
+        from datetime import datetime
+
+        from src.protocol import Turn
+        from src.sqlite_state import SQLiteStateManager
+        from src.state import StateManager
+
+        monkeypatch.chdir(tmp_path)
+        _budget_guard(daily_budget=1.0).record_day_spend(0.1)
+        state = StateManager('sessions')
+        state.save_turn("real", Turn(
+            number=1, role="r", participant="grok", prompt="p", response="r",
+            tokens={"prompt": 1, "completion": 1, "total": 2}, latency=1.0,
+            timestamp=datetime.now().isoformat(), context_from=[]
+        ))
+
+        sessions = state.list_sessions()
+        imported = SQLiteStateManager(str(tmp_path / "db")).migrate_from_json('sessions')
+
+        assert [s["session_id"] for s in sessions] == ["real"]
+        assert imported == 1
+        assert "budget" not in caplog.text
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
@@ -0,0 +1,223 @@
+"""
+Context Budgeting Tests
+
+Tests for fitting injected turn context into per-model token budgets:
+allocation, truncation strategies, shared summaries and the engine's
+record of what was compressed.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.budget import BudgetExceededError, BudgetGuard
+from src.context import ContextBudgeter, client_summarizer
+from src.protocol import ProtocolEngine, calculate_cost
+from src.rate_limit import RateLimiter
+from src.state import StateManager
+from src.tokenizer import count_tokens
+
+LONG = " ".join(f"Sentence {i} explains functors and natural transformations." for i in range(200))
+SHORT = "Monads compose effects."
+
+
+class TestContextBudgeter:
+    """Test budget calculation and compression strategies"""
+
+    def test_budget_uses_smaller_of_cap_and_window(self):
+        """Test that the context window limits the budget below the cap"""
+        budgeter = ContextBudgeter(max_context_tokens=50_000, output_reserve=4096)
+
+        assert budgeter.budget_for("grok-4") == 50_000
+        vision_budget = budgeter.budget_for("grok-2-vision-latest", template_tokens=1000)
+        assert vision_budget == 32_768 - 4096 - 1000
+        assert budgeter.budget_for("grok-4", max_context_tokens=100) == 100
+
+    def test_no_cap_no_window_is_unlimited(self):
+        """Test that unknown models without a cap are left alone"""
+        assert ContextBudgeter().budget_for("local-model") is None
+
+    @pytest.mark.asyncio
+    async def test_fits_unchanged_returns_no_record(self):
+        """Test that context within budget is not touched"""
+        context = {"turn_1": SHORT, "turn_1_participant": "grok"}
+
+        fitted, record = await ContextBudgeter(max_context_tokens=100).fit(context, "grok-4")
+
+        assert fitted is context
+        assert record is None
+
+    @pytest.mark.asyncio
+    async def test_short_responses_kept_whole(self):
+        """Test that only responses over their share are compressed"""
+        context = {"turn_1": SHORT, "turn_2": LONG, "turn_2_participant": "claude"}
+        budgeter = ContextBudgeter(max_context_tokens=200)
+
+        fitted, record = await budgeter.fit(context, "grok-4")
+
+        assert fitted["turn_1"] == SHORT
+        assert fitted["turn_2_participant"] == "claude"
+        assert count_tokens(fitted["turn_2"]) <= 200 - count_tokens(SHORT)
+        assert list(record["turns"]) == ["turn_2"]
+        assert record["tokens"] <= record["budget"] < record["original_tokens"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("strategy", ["head", "tail", "head_tail", "extractive"])
+    async def test_strategies_respect_budget(self, strategy):
+        """Test that every local strategy stays within its allotment"""
+        text, method = await ContextBudgeter().compress(LONG, 120, strategy)
+
+        assert 0 < count_tokens(text) <= 120
+        assert method == strategy
+
+    @pytest.mark.asyncio
+    async def test_head_tail_keeps_both_ends(self):
+        """Test that head_tail keeps the opening and the conclusion"""
+        text, _ = await ContextBudgeter().compress(LONG, 120, "head_tail")
+
+        assert text.startswith("Sentence 0 ")
+        assert text.endswith("Sentence 199 explains functors and natural transformations.")
+        assert "tokens omitted" in text
+
+    @pytest.mark.asyncio
+    async def test_summary_shared_across_consumers(self):
+        """Test that concurrent consumers of one response share one summary"""
+        calls = []
+
+        async def summarizer(text, max_tokens):
+            calls.append(max_tokens)
+            await asyncio.sleep(0.01)
+            return "Functors map categories."
+
+        budgeter = ContextBudgeter(strategy="summary", summarizer=summarizer, summary_tokens=64)
+
+        results = await asyncio.gather(*(budgeter.compress(LONG, 100, "summary") for _ in range(3)))
+
+        assert calls == [64]
+        assert results == [("Functors map categories.", "summary")] * 3
+
+    @pytest.mark.asyncio
+    async def test_failed_summary_falls_back_and_retries(self):
+        """Test that a failing summarizer falls back to head_tail and is not cached"""
+        summarizer = AsyncMock(side_effect=RuntimeError("down"))
+        budgeter = ContextBudgeter(strategy="summary", summarizer=summarizer)
+
+        _, method = await budgeter.compress(LONG, 100, "summary")
+        await budgeter.compress(LONG, 100, "summary")
+
+        assert method == "head_tail"
+        assert summarizer.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_budget_refusal_not_swallowed(self):
+        """Test that a hard-cap refusal of the summary is not turned into a fallback"""
+        summarizer = AsyncMock(side_effect=BudgetExceededError("run", 0.01, 0.01, 0.02))
+        budgeter = ContextBudgeter(strategy="summary", summarizer=summarizer)
+
+        with pytest.raises(BudgetExceededError):
+            await budgeter.compress(LONG, 100, "summary")
+
+
+class TestContextBudgetedExecution:
+    """Test context budgeting in ProtocolEngine turns"""
+
+    @pytest.mark.asyncio
+    async def test_turn_records_compression(self, tmp_path):
+        """Test that downstream prompts shrink and the Turn records it"""
+        grok = AsyncMock()
+        grok.chat = AsyncMock(return_value=(LONG, {"prompt": 10, "completion": 10, "total": 20}))
+        config = {
+            "structure": "sequential",
+            "turns": 2,
+            "prompts": {
+                "turn_1": {"role": "a", "participant": "grok", "template": "Explain {topic}"},
+                "turn_2": {"role": "b", "participant": "grok", "template": "Critique:\n{turn_1}",
+                           "context_from": [1], "context_strategy": "head"},
+            }
+        }
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                context_budgeter=ContextBudgeter(max_context_tokens=100))
+
+        conversation = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+        first, second = conversation.turns
+
+        assert first.context_compression is None
+        assert second.context_compression["strategy"] == "head"
+        assert second.context_compression["turns"]["turn_1"]["tokens"] <= 100
+        assert count_tokens(second.prompt) < count_tokens(LONG)
+        assert "Context**: " in engine.export_to_markdown(conversation)
+
+    @pytest.mark.asyncio
+    async def test_client_summary_is_limited_and_charged(self, tmp_path):
+        """Test that client summaries go through the rate limiter and count toward cost"""
+        summary_usage = {"prompt": 2000, "completion": 100, "total": 2100}
+
+        async def chat(prompt, **kwargs):
+            if prompt.startswith("Summarize the following"):
+                return "Functors map categories.", summary_usage
+            return LONG, {"prompt": 10, "completion": 10, "total": 20}
+
+        grok = AsyncMock()
+        grok.chat = AsyncMock(side_effect=chat)
+        limiter = RateLimiter()
+        limited = []
+        limit = limiter.limit
+
+        def recording_limit(model, estimated_tokens=0):
+            limited.append(model)
+            return limit(model, estimated_tokens)
+
+        limiter.limit = recording_limit
+        config = {
+            "structure": "sequential",
+            "turns": 2,
+            "prompts": {
+                "turn_1": {"role": "a", "participant": "grok", "template": "Explain {topic}"},
+                "turn_2": {"role": "b", "participant": "grok", "template": "Critique:\n{turn_1}",
+                           "context_from": [1]},
+            }
+        }
+        budgeter = ContextBudgeter(
+            max_context_tokens=100,
+            strategy="summary",
+            summarizer=client_summarizer(grok, model="grok-4-fast-non-reasoning-latest")
+        )
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                context_budgeter=budgeter, rate_limiter=limiter,
+                                budget=BudgetGuard(per_run=10.0))
+
+        conversation = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+        first, second = conversation.turns
+        summary_cost = calculate_cost("grok-4-fast-non-reasoning-latest", summary_usage)
+
+        assert limited.count("grok-4-fast-non-reasoning-latest") == 1
+        assert second.context_compression["turns"]["turn_1"]["method"] == "summary"
+        assert second.context_compression["cost"] == summary_cost
+        assert second.cost == pytest.approx(first.cost + summary_cost)
+        assert conversation.total_cost == pytest.approx(2 * first.cost + summary_cost)
+
+    @pytest.mark.asyncio
+    async def test_summary_over_hard_cap_stops_run(self, tmp_path):
+        """Test that a summary the budget refuses stops the run instead of truncating"""
+        grok = AsyncMock()
+        grok.chat = AsyncMock(return_value=(LONG, {"prompt": 10, "completion": 10, "total": 20}))
+        config = {
+            "structure": "sequential",
+            "turns": 2,
+            "prompts": {
+                "turn_1": {"role": "a", "participant": "grok", "template": "Explain {topic}",
+                           "max_tokens": 10},
+                "turn_2": {"role": "b", "participant": "grok", "template": "Critique:\n{turn_1}",
+                           "context_from": [1], "max_tokens": 10},
+            }
+        }
+        budgeter = ContextBudgeter(max_context_tokens=100, strategy="summary",
+                                   summarizer=client_summarizer(grok), summary_tokens=100_000)
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                context_budgeter=budgeter, budget=BudgetGuard(per_run=0.01))
+
+        with pytest.raises(BudgetExceededError):
+            await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert grok.chat.await_count == 1
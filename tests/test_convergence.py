@@ -0,0 +1,127 @@
+"""
+Convergence Detection Tests
+
+Tests for MinHash and hashed cosine sketches, the incremental
+per-cycle tracker and convergence in cyclic runs.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.convergence import ConvergenceTracker, MinHashSketch, TermVectorSketch
+from src.dynamic_protocol import CycleConfig, DynamicProtocolEngine
+from src.protocol import Turn
+from src.state import StateManager
+
+WORDS = [f"w{i}" for i in range(200)]
+
+
+def _sketch(cls, *texts, **options):
+    sketch = cls(**options)
+    for text in texts:
+        sketch.update(text)
+    return sketch
+
+
+def _turn(number, response):
+    return Turn(number=number, role="r", participant="grok", prompt="p", response=response,
+                tokens={}, latency=0.0, timestamp=datetime.now().isoformat(), context_from=[])
+
+
+class FixedClient:
+    """Client answering with the same text every call"""
+
+    def __init__(self, answer="the same stable answer every single time"):
+        self.answer = answer
+
+    async def chat(self, prompt, **kwargs):
+        return self.answer, {"prompt": 10, "completion": 10, "total": 20}
+
+
+class TestSketches:
+    """Test similarity sketches"""
+
+    @pytest.mark.parametrize("cls", [MinHashSketch, TermVectorSketch])
+    def test_identical_and_disjoint(self, cls):
+        """Test that identical text scores 1 and disjoint text near 0"""
+        a = _sketch(cls, " ".join(WORDS[:100]))
+
+        assert _sketch(cls, " ".join(WORDS[:100])).similarity(a) == pytest.approx(1.0)
+        assert _sketch(cls, " ".join(WORDS[100:])).similarity(a) < 0.15
+
+    def test_minhash_estimates_jaccard(self):
+        """Test that the MinHash estimate tracks true shingle Jaccard"""
+        a = _sketch(MinHashSketch, " ".join(WORDS[:100]), shingle_size=1, num_perm=256)
+        b = _sketch(MinHashSketch, " ".join(WORDS[50:150]), shingle_size=1, num_perm=256)
+
+        assert a.similarity(b) == pytest.approx(50 / 150, abs=0.1)
+
+    def test_incremental_matches_batch(self):
+        """Test that updating turn by turn equals sketching all text at once"""
+        parts = [" ".join(WORDS[i:i + 20]) for i in range(0, 100, 20)]
+
+        incremental = _sketch(MinHashSketch, *parts, shingle_size=1)
+        batch = _sketch(MinHashSketch, " ".join(parts), shingle_size=1)
+
+        assert incremental.signature == batch.signature
+
+    def test_empty_text(self):
+        """Test that sketches without text are not similar to anything"""
+        assert MinHashSketch().similarity(_sketch(MinHashSketch, "text")) == 0.0
+        assert TermVectorSketch().similarity(TermVectorSketch()) == 0.0
+
+
+class TestConvergenceTracker:
+    """Test the per-cycle tracker"""
+
+    def test_consecutive_cycles_compared(self):
+        """Test that each cycle is compared with the one before it"""
+        tracker = ConvergenceTracker("cosine")
+        for text in ("alpha beta gamma", "delta epsilon", "delta epsilon"):
+            tracker.start_cycle()
+            tracker.add(text)
+            tracker.end_cycle()
+
+        assert tracker.similarities[0] is None
+        assert tracker.similarities[1] < 0.5
+        assert tracker.similarities[2] == 1.0
+
+    def test_metrics_pluggable(self):
+        """Test custom factories and unknown metric names"""
+        tracker = ConvergenceTracker(TermVectorSketch)
+
+        assert tracker.to_dict() == {"metric": "TermVectorSketch", "similarities": []}
+        with pytest.raises(ValueError, match="Unknown convergence metric"):
+            ConvergenceTracker("euclid")
+
+    def test_check_convergence_uses_last_two_cycles(self, tmp_path):
+        """Test that cycles split on turn number restarts"""
+        engine = DynamicProtocolEngine(FixedClient(), FixedClient(), StateManager(str(tmp_path)))
+        turns = [_turn(1, "early draft one"), _turn(2, "early draft two"),
+                 _turn(1, "final answer here"), _turn(2, "final answer now"),
+                 _turn(1, "final answer here"), _turn(2, "final answer now")]
+
+        assert engine._check_convergence(turns, threshold=0.99) is True
+        assert engine._check_convergence(turns[:4], threshold=0.5) is False
+
+
+class TestCyclicRuns:
+    """Test convergence in run_dynamic_protocol"""
+
+    @pytest.mark.asyncio
+    async def test_stops_when_cycles_converge(self, tmp_path):
+        """Test that identical cycles stop the run and similarities are reported"""
+        engine = DynamicProtocolEngine(FixedClient(), FixedClient(), StateManager(str(tmp_path)))
+
+        conversation = await engine.run_dynamic_protocol(
+            mode="pipeline",
+            task="T",
+            cycle_config=CycleConfig(max_cycles=5, convergence_threshold=0.9)
+        )
+
+        assert conversation.metadata["cycles"] == 2
+        assert conversation.metadata["convergence"] == {
+            "metric": "jaccard", "similarities": [None, 1.0]
+        }
+        assert len(conversation.turns) == 14
@@ -0,0 +1,408 @@
+"""
+Dynamic Generation Tests
+
+Tests for running dynamic.json end to end: decomposition, generated
+execution turns run as a bounded-concurrency dependency graph, and
+synthesis over every execution turn; plus incremental decomposition
+parsing and subtasks started while the decomposition streams.
+"""
+
+import asyncio
+import re
+
+import pytest
+
+from src.dynamic_protocol import DynamicProtocolEngine
+from src.intelligent_orchestrator import DecompositionParser, IntelligentOrchestrator
+from src.protocol import ProtocolEngine
+from src.state import StateManager
+
+DECOMPOSITION = """SUBTASKS:
+1. Research - Complexity: simple
+   Description: Gather facts
+   Dependencies: none
+
+2. Design - Complexity: simple
+   Description: Draft a {schema}
+   Dependencies: none
+
+3. Build - Complexity: simple
+   Description: Build it
+   Dependencies: Research, Design
+
+LOOP_STRATEGY: single_loop
+"""
+
+# What dynamic.json's complexity assessor writes: a refined list without
+# descriptions or dependencies and the strategy in its EXECUTION_PLAN
+ASSESSMENT = """The decomposition is sound, but Build needs a review pass.
+
+```
+VALIDATED_SUBTASKS:
+1. Research - Complexity: simple
+2. Design - Complexity: simple
+3. Build - Complexity: moderate
+
+EXECUTION_PLAN:
+- Strategy: mixed
+- Estimated total interactions: 6
+- Parallel opportunities: Research and Design
+
+PROCEED: yes
+IF_NO: n/a
+```
+"""
+
+CYCLIC_DECOMPOSITION = """SUBTASKS:
+1. Research - Complexity: simple
+   Description: Gather facts
+   Dependencies: none
+
+2. Draft - Complexity: simple
+   Description: Draft it
+   Dependencies: Review
+
+3. Review - Complexity: simple
+   Description: Review it
+   Dependencies: Draft
+"""
+
+MIXED_DECOMPOSITION = """LOOP_STRATEGY: mixed
+
+SUBTASKS:
+1. Outline - Complexity: simple
+   Description: Outline it
+   Dependencies: none
+
+2. Glossary - Complexity: simple
+   Description: List terms
+   Dependencies: none
+
+3. Chapter - Complexity: complex
+   Description: Write the chapter
+   Dependencies: Outline
+"""
+
+
+class PlanClient:
+    """Answers the decomposer with DECOMPOSITION, others by echoing the heading"""
+
+    def __init__(self, delay=0.05, decomposition=DECOMPOSITION, assessment=None):
+        self.delay = delay
+        self.decomposition = decomposition
+        self.assessment = assessment
+        self.prompts = []
+        self.running = 0
+        self.peak = 0
+        self.events = []
+
+    async def chat(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.events.append(("start", prompt.splitlines()[0]))
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        self.events.append(("end", prompt.splitlines()[0]))
+        if "TASK DECOMPOSITION" in prompt:
+            return self.decomposition, {"prompt": 10, "completion": 10, "total": 20}
+        if "COMPLEXITY ASSESSMENT" in prompt and self.assessment:
+            return self.assessment, {"prompt": 10, "completion": 10, "total": 20}
+        if "BATCH EXECUTION" in prompt:
+            names = re.findall(r"^\d+\. (\w+):", prompt, re.MULTILINE)
+            return "".join(f"### RESULT: {name}\nmade {name}\n" for name in names), {
+                "prompt": 10, "completion": 10, "total": 20
+            }
+        return f"done: {prompt.splitlines()[0]}", {"prompt": 10, "completion": 10, "total": 20}
+
+    async def chat_stream(self, prompt, usage=None, **kwargs):
+        response, tokens = await self.chat(prompt)
+        if usage is not None:
+            usage.update(tokens)
+        for line in response.splitlines(keepends=True):
+            yield line
+
+
+def _engine(cls, client, tmp_path, **options):
+    return cls(client, client, StateManager(str(tmp_path)), **options)
+
+
+class TestDynamicGeneration:
+    """Test the dynamic_generation executor"""
+
+    @pytest.mark.asyncio
+    async def test_runs_decomposition_execution_and_synthesis(self, tmp_path):
+        """Test that dynamic mode runs every phase with generated turns"""
+        client = PlanClient()
+        engine = _engine(ProtocolEngine, client, tmp_path)
+
+        conversation = await engine.run_protocol(mode="dynamic", topic="Ship a CLI")
+
+        roles = [t.role for t in conversation.turns]
+        assert roles == ["decomposer", "complexity_assessor", "execute_Research",
+                         "execute_Design", "execute_Build", "synthesizer"]
+        assert all(t.error is None for t in conversation.turns)
+        assert "Primary Task: Ship a CLI" in conversation.turns[0].prompt
+
+        build, synthesis = conversation.turns[4], conversation.turns[5]
+        assert build.context_from == [3, 4]
+        assert "done: **EXECUTE SUBTASK: Research**" in build.prompt
+        assert "Draft a {schema}" in conversation.turns[3].prompt
+        assert synthesis.context_from == [3, 4, 5]
+        assert "done: **EXECUTE SUBTASK: Build**" in synthesis.prompt
+
+        plan = conversation.metadata["execution_plan"]
+        assert plan["strategy"] == "single_loop"
+        assert plan["turns"] == [3, 4, 5]
+        assert [s["name"] for s in plan["subtasks"]] == ["Research", "Design", "Build"]
+        assert plan["levels"] == [["Research", "Design"], ["Build"]]
+        assert plan["critical_path"][-1] == "Build"
+
+    @pytest.mark.asyncio
+    async def test_independent_subtasks_run_concurrently(self, tmp_path):
+        """Test that subtasks without dependencies overlap, within the cap"""
+        client = PlanClient()
+        await _engine(ProtocolEngine, client, tmp_path).run_protocol(mode="dynamic", topic="T")
+
+        assert client.peak == 2
+
+        capped = PlanClient()
+        await _engine(ProtocolEngine, capped, tmp_path, max_parallel_subtasks=1).run_protocol(
+            mode="dynamic", topic="T"
+        )
+
+        assert capped.peak == 1
+
+    @pytest.mark.asyncio
+    async def test_mixed_strategy_runs_parallel_batches(self, tmp_path):
+        """Test that simple tasks batch in parallel and dependents get their section"""
+        client = PlanClient(decomposition=MIXED_DECOMPOSITION)
+        engine = _engine(ProtocolEngine, client, tmp_path)
+        # One task per batch, even scaled down
+        engine.subtask_output_stats["subtask_tokens"] = [3000]
+
+        conversation = await engine.run_protocol(mode="dynamic", topic="Write a book")
+
+        roles = [t.role for t in conversation.turns][2:]
+        assert roles == ["batch_simple_tasks", "batch_simple_tasks", "research_Chapter",
+                         "execute_Chapter", "validate_Chapter", "synthesizer"]
+        assert client.peak == 2
+        research = conversation.turns[4]
+        assert research.context_from == [3]
+        assert "### RESULT: Outline\nmade Outline" in research.prompt
+        assert "Glossary" not in research.prompt
+
+    @pytest.mark.asyncio
+    async def test_assessor_refinement_keeps_decomposer_details(self, tmp_path):
+        """Test that the assessor's list and strategy win, filled in from the decomposer"""
+        client = PlanClient(assessment=ASSESSMENT)
+
+        conversation = await _engine(ProtocolEngine, client, tmp_path).run_protocol(
+            mode="dynamic", topic="Ship a CLI"
+        )
+
+        plan = conversation.metadata["execution_plan"]
+        assert plan["strategy"] == "mixed"
+        subtasks = {s["name"]: s for s in plan["subtasks"]}
+        assert subtasks["Build"]["complexity"] == "moderate"
+        assert subtasks["Build"]["dependencies"] == ["Research", "Design"]
+        assert subtasks["Design"]["description"] == "Draft a {schema}"
+        assert [t.role for t in conversation.turns][2:] == [
+            "batch_simple_tasks", "research_Build", "execute_Build", "validate_Build", "synthesizer"
+        ]
+        assert conversation.turns[3].context_from == [3]
+
+    @pytest.mark.asyncio
+    async def test_unparseable_decomposition_runs_topic(self, tmp_path):
+        """Test that the topic becomes one subtask without SUBTASKS"""
+        client = PlanClient()
+
+        async def chat(prompt, **kwargs):
+            return "No structure here", {"prompt": 1, "completion": 1, "total": 2}
+
+        client.chat = chat
+        conversation = await _engine(ProtocolEngine, client, tmp_path).run_protocol(
+            mode="dynamic", topic="Write a haiku"
+        )
+
+        assert [t.role for t in conversation.turns][2:] == [
+            "execute_Complete task", "validate_Complete task", "synthesizer"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_dynamic_engine_substitutes_task(self, tmp_path):
+        """Test that the dynamic engine runs the mode with <TASK> filled in"""
+        client = PlanClient(delay=0)
+        engine = _engine(DynamicProtocolEngine, client, tmp_path)
+
+        conversation = await engine.run_dynamic_protocol(mode="dynamic", task="Ship a CLI")
+
+        assert len(conversation.turns) == 6
+        assert "Original Task: Ship a CLI" in conversation.turns[-1].prompt
+
+
+class TestDecompositionParser:
+    """Test incremental decomposition parsing"""
+
+    @pytest.mark.parametrize("size", [1, 7, 64, len(DECOMPOSITION)])
+    def test_any_chunking_matches_full_parse(self, size):
+        """Test that streamed parsing equals parsing the whole response"""
+        parser = DecompositionParser()
+        for i in range(0, len(DECOMPOSITION), size):
+            parser.feed(DECOMPOSITION[i:i + size])
+        parser.close()
+
+        subtasks, strategy = IntelligentOrchestrator().parse_decomposition(DECOMPOSITION)
+        assert [(s.name, s.complexity, s.description, s.dependencies) for s in parser.subtasks] == [
+            (s.name, s.complexity, s.description, s.dependencies) for s in subtasks
+        ]
+        assert parser.strategy_type == strategy.strategy_type == "single_loop"
+
+    def test_assessor_strategy_line(self):
+        """Test that an EXECUTION_PLAN "- Strategy:" line sets the strategy"""
+        parser = DecompositionParser()
+        parser.feed(ASSESSMENT)
+        parser.close()
+
+        assert (parser.strategy_type, parser.strategy_stated) == ("mixed", True)
+        assert [s.name for s in parser.subtasks] == ["Research", "Design", "Build"]
+        assert parser.stated_fields["Build"] == set()
+
+    def test_subtask_emitted_at_dependencies_line(self):
+        """Test that a block is returned as soon as its Dependencies line ends"""
+        parser = DecompositionParser()
+        head, _, rest = DECOMPOSITION.partition("   Dependencies: none\n")
+
+        assert parser.feed(head) == []
+        completed = parser.feed("   Dependencies: none\n")
+        assert [s.name for s in completed] == ["Research"]
+        assert completed[0].dependencies == []
+
+
+class TestStreamDecomposition:
+    """Test subtasks started while the decomposition phase runs"""
+
+    @pytest.mark.asyncio
+    async def test_dependency_free_subtasks_start_early(self, tmp_path):
+        """Test that Research and Design start before the assessor finishes"""
+        client = PlanClient()
+        engine = _engine(ProtocolEngine, client, tmp_path, stream_decomposition=True,
+                         stream_handler=lambda turn_num, chunk: None)
+
+        conversation = await engine.run_protocol(mode="dynamic", topic="Ship a CLI")
+
+        roles = [t.role for t in conversation.turns]
+        assert roles == ["decomposer", "complexity_assessor", "execute_Research",
+                         "execute_Design", "execute_Build", "synthesizer"]
+        assert [t.number for t in conversation.turns] == [1, 2, 3, 4, 5, 6]
+        assert all(t.error is None for t in conversation.turns)
+
+        # Both subtasks were sent while the assessor (turn 2) was running
+        assessed = client.events.index(("end", "**COMPLEXITY ASSESSMENT & VALIDATION**"))
+        assert ("start", "**EXECUTE SUBTASK: Research**") in client.events[:assessed]
+        assert ("start", "**EXECUTE SUBTASK: Design**") in client.events[:assessed]
+        assert client.peak == 3
+
+        stats = conversation.metadata["speculation"]
+        assert (stats["launched"], stats["wins"], stats["wasted"]) == (2, 2, 0)
+        assert conversation.turns[4].context_from == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_mixed_batches_start_when_decomposer_finishes(self, tmp_path):
+        """Test that a batch of simple subtasks starts before the assessor finishes"""
+        client = PlanClient(decomposition=MIXED_DECOMPOSITION)
+        engine = _engine(ProtocolEngine, client, tmp_path, stream_decomposition=True,
+                         stream_handler=lambda turn_num, chunk: None)
+
+        conversation = await engine.run_protocol(mode="dynamic", topic="Write a book")
+
+        roles = [t.role for t in conversation.turns]
+        assert roles[2:] == ["batch_simple_tasks", "research_Chapter", "execute_Chapter",
+                             "validate_Chapter", "synthesizer"]
+        assert all(t.error is None for t in conversation.turns)
+
+        assessed = client.events.index(("end", "**COMPLEXITY ASSESSMENT & VALIDATION**"))
+        batch_starts = [e for e in client.events if e[0] == "start" and "BATCH" in e[1]]
+        assert len(batch_starts) == 1
+        assert client.events.index(batch_starts[0]) < assessed
+
+        stats = conversation.metadata["speculation"]
+        assert (stats["launched"], stats["wins"], stats["wasted"]) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_mismatched_plan_discards_early_turns(self, tmp_path):
+        """Test that early turns the final plan does not contain are cancelled"""
+        client = PlanClient()
+        engine = _engine(ProtocolEngine, client, tmp_path, stream_decomposition=True)
+        real_plan = engine._plan_generated_turns
+
+        def renamed_plan(*args, **kwargs):
+            orchestrator, prompts = real_plan(*args, **kwargs)
+            for turn_config in prompts.values():
+                turn_config["template"] = "Changed: " + turn_config["template"]
+            return orchestrator, prompts
+
+        engine._plan_generated_turns = renamed_plan
+        conversation = await engine.run_protocol(mode="dynamic", topic="T")
+
+        assert all(t.error is None for t in conversation.turns)
+        assert conversation.turns[2].prompt.startswith("Changed: ")
+        stats = conversation.metadata["speculation"]
+        assert (stats["launched"], stats["wins"], stats["wasted"]) == (2, 0, 2)
+
+    @pytest.mark.asyncio
+    async def test_plan_source_same_as_without_streaming(self, tmp_path):
+        """Test that streaming does not change which decomposition is planned"""
+        plans = []
+        for stream in (False, True):
+            client = PlanClient(assessment=ASSESSMENT)
+            engine = _engine(ProtocolEngine, client, tmp_path, stream_decomposition=stream,
+                             stream_handler=lambda turn_num, chunk: None)
+            conversation = await engine.run_protocol(mode="dynamic", topic="Ship a CLI")
+            plans.append(conversation.metadata["execution_plan"])
+
+        assert plans[0] == plans[1]
+        assert plans[1]["strategy"] == "mixed"
+        # Early single-loop turns don't fit the assessor's mixed plan
+        stats = conversation.metadata["speculation"]
+        assert (stats["launched"], stats["wins"], stats["wasted"]) == (2, 0, 2)
+
+    @pytest.mark.asyncio
+    async def test_planning_error_cancels_early_turns(self, tmp_path):
+        """Test that early turns stop when the plan cannot be built"""
+        from src.intelligent_orchestrator import DependencyCycleError
+
+        client = PlanClient(decomposition=CYCLIC_DECOMPOSITION)
+        chat = client.chat
+
+        async def slow_subtasks(prompt, **kwargs):
+            if "EXECUTE SUBTASK" in prompt:
+                await asyncio.sleep(1)
+            return await chat(prompt, **kwargs)
+
+        client.chat = slow_subtasks
+        engine = _engine(ProtocolEngine, client, tmp_path, stream_decomposition=True,
+                         stream_handler=lambda turn_num, chunk: None)
+
+        with pytest.raises(DependencyCycleError):
+            await engine.run_protocol(mode="dynamic", topic="T")
+
+        # The early Research turn was stopped, not left running unowned
+        await asyncio.sleep(1.2)
+        assert ("end", "**EXECUTE SUBTASK: Research**") not in client.events
+        assert engine.speculation_stats["launched"] == 1
+
+    @pytest.mark.asyncio
+    async def test_early_turns_take_subtask_slots(self, tmp_path):
+        """Test that early turns respect max_parallel_subtasks"""
+        client = PlanClient()
+        engine = _engine(ProtocolEngine, client, tmp_path, stream_decomposition=True,
+                         max_parallel_subtasks=1, stream_handler=lambda turn_num, chunk: None)
+
+        conversation = await engine.run_protocol(mode="dynamic", topic="T")
+
+        # The assessor plus one early subtask; the second waits for the slot
+        assert client.peak == 2
+        assert conversation.metadata["speculation"]["wins"] == 2
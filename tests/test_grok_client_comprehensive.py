@@ -9,6 +9,12 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from src.clients.grok import GrokClient, MODEL_IDS
+from src.clients.transport import (
+    TransportConfig,
+    XAITransport,
+    close_shared_transport,
+    get_shared_transport,
+)
 from openai import AsyncOpenAI, APIError, RateLimitError, APIConnectionError
 
 
@@ -237,6 +243,27 @@ class TestGrokClientStreaming:
 
         await client.close()
 
+    @pytest.mark.asyncio
+    async def test_stream_reports_usage(self):
+        """Test that a usage dict is filled from the final usage chunk"""
+        client = GrokClient(api_key="test-key")
+
+        async def mock_stream():
+            yield Mock(choices=[Mock(delta=Mock(content="Hi"))], usage=None)
+            yield Mock(choices=[], usage=Mock(prompt_tokens=4, completion_tokens=1, total_tokens=5))
+
+        client.client.chat.completions.create = AsyncMock(return_value=mock_stream())
+
+        usage = {}
+        chunks = [chunk async for chunk in client.chat_stream("Test prompt", usage=usage)]
+
+        assert chunks == ["Hi"]
+        assert usage == {"prompt": 4, "completion": 1, "total": 5}
+        call_kwargs = client.client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["stream_options"] == {"include_usage": True}
+
+        await client.close()
+
     @pytest.mark.asyncio
     async def test_stream_error_handling(self):
         """Test error handling during streaming"""
@@ -312,6 +339,70 @@ class TestGrokClientLifecycle:
         assert client.client.close.call_count >= 1
 
 
+# ============= SHARED TRANSPORT TESTS =============
+
+class TestSharedTransport:
+    """Test pooled HTTP transport shared across xAI clients"""
+
+    @pytest.mark.asyncio
+    async def test_clients_share_one_pool(self):
+        """Test that Grok, Enhanced and Collections clients reuse one http client"""
+        from src.clients.grok_enhanced import EnhancedGrokClient
+
+        transport = XAITransport(TransportConfig(max_connections=5, http2=False))
+        grok = GrokClient(api_key="test-key", transport=transport)
+        enhanced = EnhancedGrokClient(api_key="test-key", transport=transport)
+
+        pool = transport.http_client
+        assert grok.client._client is pool
+        assert enhanced.client._client is pool
+        assert enhanced.collections.client._client is pool
+
+        await transport.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_close_keeps_pool_open(self):
+        """Test that closing one client does not tear down the shared pool"""
+        transport = XAITransport(TransportConfig(http2=False))
+        first = GrokClient(api_key="test-key", transport=transport)
+        second = GrokClient(api_key="test-key", transport=transport)
+
+        await first.close()
+
+        assert not second.client._client.is_closed
+
+        await transport.aclose()
+        assert second.client._client.is_closed
+
+    def test_default_transport_is_shared(self):
+        """Test that clients without an explicit transport use the process-wide one"""
+        first = GrokClient(api_key="test-key")
+        second = GrokClient(api_key="test-key")
+
+        assert first.transport is second.transport is get_shared_transport()
+
+    def test_default_transport_is_per_event_loop(self):
+        """Test that each event loop gets its own shared transport"""
+        async def build_pair():
+            return GrokClient(api_key="test-key"), GrokClient(api_key="test-key")
+
+        first_loop = asyncio.run(build_pair())
+        second_loop = asyncio.run(build_pair())
+
+        assert first_loop[0].transport is first_loop[1].transport
+        assert first_loop[0].transport is not second_loop[0].transport
+
+    @pytest.mark.asyncio
+    async def test_close_shared_transport_replaces_pool(self):
+        """Test that closing the loop's transport gives later clients a fresh one"""
+        first = GrokClient(api_key="test-key")
+
+        await close_shared_transport()
+
+        assert first.client._client.is_closed
+        assert GrokClient(api_key="test-key").transport is not first.transport
+
+
 # ============= MODEL RESOLUTION TESTS =============
 
 class TestGrokClientModelResolution:
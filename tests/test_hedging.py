@@ -0,0 +1,235 @@
+"""
+Hedged Request Tests
+
+Tests for latency percentiles, hedge timing, alternate models, the
+hedge spend cap, learning from turn history and engine integration.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.budget import DEFAULT_MAX_TOKENS, BudgetGuard
+from src.hedging import Hedger, LatencyTracker
+from src.protocol import ProtocolEngine, Turn, calculate_cost
+from src.state import StateManager
+from src.tokenizer import count_tokens
+
+
+def _hedger(samples=20, latency=0.05, **options):
+    hedger = Hedger(min_samples=samples, min_delay=0.0, **options)
+    for _ in range(samples):
+        hedger.record("grok-4", latency)
+    return hedger
+
+
+def _turn(latency, model="grok-4-fast-reasoning-latest", participant="grok", **fields):
+    return Turn(number=1, role="r", participant=participant, prompt="p", response="r",
+                tokens={}, latency=latency, timestamp="", context_from=[], model=model, **fields)
+
+
+class TestLatencyTracker:
+    """Test latency percentiles"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles over the window"""
+        tracker = LatencyTracker(window=100)
+        for seconds in range(1, 101):
+            tracker.record("m", float(seconds))
+
+        assert tracker.percentile("m", 0.95) == 95.0
+        assert tracker.percentile("m", 0.5) == 50.0
+        assert tracker.percentile("other", 0.5) is None
+
+    def test_window_forgets_old_samples(self):
+        """Test that only the most recent samples count"""
+        tracker = LatencyTracker(window=3)
+        for seconds in (100.0, 1.0, 1.0, 1.0):
+            tracker.record("m", seconds)
+
+        assert tracker.percentile("m", 0.99) == 1.0
+
+
+class TestHedger:
+    """Test hedging policy"""
+
+    def test_no_hedge_until_enough_samples(self):
+        """Test that hedging waits for min_samples latencies"""
+        hedger = _hedger(samples=5)
+        hedger.min_samples = 10
+
+        assert hedger.delay_for("grok-4") is None
+
+    def test_aliases_share_history(self):
+        """Test that aliases resolve to one model's latencies"""
+        hedger = _hedger(latency=2.0)
+
+        assert hedger.delay_for("grok-4-fast-reasoning-latest") == 2.0
+
+    def test_unknown_alternate_rejected(self):
+        """Test that alternates must be MODEL_IDS aliases"""
+        with pytest.raises(ValueError, match="Unknown alternate"):
+            Hedger(alternates={"grok-4": "gpt-5"})
+
+    @pytest.mark.asyncio
+    async def test_fast_call_not_hedged(self):
+        """Test that calls finishing before the percentile are left alone"""
+        hedger = _hedger(latency=0.2)
+        call = AsyncMock(return_value="ok")
+
+        result, model, hedges = await hedger.run("grok-4", call)
+
+        assert (result, model, hedges) == ("ok", "grok-4", 0)
+        call.assert_awaited_once_with("grok-4")
+
+    @pytest.mark.asyncio
+    async def test_slow_call_hedged_to_alternate(self):
+        """Test that a hung call is duplicated to the alternate and cancelled"""
+        hedger = _hedger(alternates={"grok-4": "grok-4-fast-non-reasoning"})
+        cancelled = []
+
+        async def call(model):
+            if model == "grok-4":
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(model)
+                    raise
+            return f"from {model}"
+
+        result, model, hedges = await hedger.run("grok-4", call, lambda m: 0.01)
+        await asyncio.sleep(0)
+
+        assert (result, model, hedges) == (
+            "from grok-4-fast-non-reasoning", "grok-4-fast-non-reasoning", 1
+        )
+        assert cancelled == ["grok-4"]
+        assert hedger.stats["hedge_wins"] == 1
+        assert hedger.stats["spend"] == 0.01
+
+    @pytest.mark.asyncio
+    async def test_spend_cap_stops_hedging(self):
+        """Test that no hedge is sent once it would pass max_spend"""
+        hedger = _hedger(max_spend=0.005)
+        calls = []
+
+        async def call(model):
+            calls.append(model)
+            await asyncio.sleep(0.1)
+            return "slow"
+
+        result, _, hedges = await hedger.run("grok-4", call, lambda m: 0.01)
+
+        assert (result, hedges) == ("slow", 0)
+        assert calls == ["grok-4"]
+
+    @pytest.mark.asyncio
+    async def test_loser_finished_cancelling_before_return(self):
+        """Test that the losing request has unwound by the time run returns"""
+        hedger = _hedger()
+        launched, unwound = [], []
+
+        async def call(model):
+            name = "hedge" if launched else "primary"
+            launched.append(name)
+            try:
+                await asyncio.sleep(10 if name == "primary" else 0)
+                return name
+            finally:
+                unwound.append(name)
+
+        result, _, hedges = await hedger.run("grok-4", call)
+
+        assert (result, hedges) == ("hedge", 1)
+        assert sorted(unwound) == ["hedge", "primary"]
+
+    @pytest.mark.asyncio
+    async def test_all_fail_raises_first_error(self):
+        """Test that the first error surfaces when every request fails"""
+        hedger = _hedger()
+
+        async def call(model):
+            await asyncio.sleep(0.1)
+            raise ConnectionError(f"down {model}")
+
+        with pytest.raises(ConnectionError, match="down"):
+            await hedger.run("grok-4", call)
+
+    def test_learn_from_turns(self):
+        """Test that successful Grok turn latencies are learned"""
+        hedger = Hedger(min_samples=2, min_delay=0.0)
+
+        learned = hedger.learn([
+            _turn(3.0), _turn(5.0),
+            _turn(99.0, error="Timeout"), _turn(99.0, cache_hit=True),
+            _turn(99.0, participant="claude", model="claude-3-sonnet-20240229"),
+        ])
+
+        assert learned == 2
+        assert hedger.delay_for("grok-4") == 5.0
+
+
+class TestEngineHedging:
+    """Test hedging inside turn execution"""
+
+    @pytest.mark.asyncio
+    async def test_hedged_turn_uses_alternate_answer(self, tmp_path):
+        """Test that a turn is completed by the hedge and billed to its model"""
+        async def chat(prompt, model=None, **kwargs):
+            if model == "grok-4-fast-reasoning-latest":
+                await asyncio.sleep(10)
+            return f"{model} answer", {"prompt": 10, "completion": 10, "total": 20}
+
+        grok = AsyncMock()
+        grok.chat = chat
+        hedger = Hedger(
+            min_samples=1, min_delay=0.0,
+            alternates={"grok-4-fast-reasoning-latest": "grok-4-fast-non-reasoning-latest"}
+        )
+        hedger.record("grok-4-fast-reasoning-latest", 0.05)
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)), hedger=hedger)
+        turn_config = {"role": "r", "participant": "grok", "template": "Q",
+                       "grok_model": "grok-4-fast-reasoning-latest"}
+
+        turn = await engine._execute_turn(1, turn_config, "T", {})
+
+        assert turn.response == "grok-4-fast-non-reasoning-latest answer"
+        assert turn.model == "grok-4-fast-non-reasoning-latest"
+        assert turn.error is None
+
+    @pytest.mark.asyncio
+    async def test_hedge_reserved_and_losers_charged(self, tmp_path):
+        """Test that hedges hold their worst case and the turn pays for the loser"""
+        usage = {"prompt": 10, "completion": 10, "total": 20}
+
+        async def chat(prompt, model=None, **kwargs):
+            if model == "grok-4-fast-reasoning-latest":
+                await asyncio.sleep(10)
+            return f"{model} answer", usage
+
+        grok = AsyncMock()
+        grok.chat = chat
+        hedger = Hedger(
+            min_samples=1, min_delay=0.0,
+            alternates={"grok-4-fast-reasoning-latest": "grok-4-fast-non-reasoning-latest"}
+        )
+        hedger.record("grok-4-fast-reasoning-latest", 0.05)
+        guard = BudgetGuard(per_day=10.0)
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                hedger=hedger, budget=guard)
+        turn_config = {"role": "r", "participant": "grok", "template": "Q",
+                       "grok_model": "grok-4-fast-reasoning-latest"}
+
+        turn = await engine._execute_turn(1, turn_config, "T", {})
+
+        prompt_tokens = count_tokens(turn.prompt)
+        loser = calculate_cost("grok-4-fast-reasoning-latest", {"prompt": prompt_tokens})
+        assert turn.cost == pytest.approx(calculate_cost(turn.model, usage) + loser)
+        assert hedger.stats["spend"] == calculate_cost(
+            "grok-4-fast-non-reasoning-latest",
+            {"prompt": prompt_tokens, "completion": DEFAULT_MAX_TOKENS}
+        )
+        day = guard.day_budget()
+        assert day.reserved == pytest.approx(0.0)
+        assert day.spent == pytest.approx(turn.cost)
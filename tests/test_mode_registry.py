@@ -0,0 +1,192 @@
+"""
+Mode Registry Tests
+
+Tests for compiled templates, mode validation, the mtime-keyed mode
+cache and engine use of validated configs.
+"""
+
+import json
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.mode_registry import ModeRegistry, ModeValidationError, compile_template, validate_mode
+from src.protocol import ProtocolEngine
+from src.state import StateManager
+
+
+def _config(**prompts):
+    return {"structure": "sequential", "turns": len(prompts), "prompts": prompts}
+
+
+class TestCompiledTemplate:
+    """Test precompiled template rendering"""
+
+    @pytest.mark.parametrize("source", [
+        "Explain {topic}",
+        "Critique {turn_1} by {turn_1_participant}",
+        "Literal {{braces}} and {topic}",
+        "No fields at all",
+        "Padded {topic:>10}",
+    ])
+    def test_render_matches_format(self, source):
+        """Test that rendering matches str.format"""
+        values = {"topic": "functors", "turn_1": "A {x} B", "turn_1_participant": "grok"}
+
+        assert compile_template(source).render(**values) == source.format(**values)
+
+    def test_fields_and_variables(self):
+        """Test that field and <VARIABLE> names are extracted"""
+        template = compile_template("<TASK>: {topic} after {turn_2} (<CYCLE>)")
+
+        assert template.fields == {"topic", "turn_2"}
+        assert template.variables == {"TASK", "CYCLE"}
+
+    def test_missing_field_raises_key_error(self):
+        """Test that a missing value fails like str.format"""
+        with pytest.raises(KeyError, match="turn_1"):
+            compile_template("{turn_1}").render(topic="T")
+
+    def test_compiled_once(self):
+        """Test that identical sources share one compiled template"""
+        assert compile_template("Cached {topic}") is compile_template("Cached {topic}")
+
+
+class TestValidation:
+    """Test mode validation"""
+
+    def test_builtin_modes_valid(self):
+        """Test that every shipped mode validates"""
+        assert ModeRegistry().preload() == {}
+
+    def test_unknown_context_from(self):
+        """Test that context_from must reference existing turns"""
+        config = _config(turn_1={"template": "{topic}", "context_from": [3]})
+
+        assert validate_mode(config) == ["turn_1: context_from references unknown turn 3"]
+
+    def test_field_without_context(self):
+        """Test that template fields must be provided by context_from"""
+        config = _config(
+            turn_1={"template": "{topic}"},
+            turn_2={"template": "{turn_1} {extra}"}
+        )
+
+        errors = validate_mode(config)
+
+        assert len(errors) == 1
+        assert "{extra}, {turn_1}" in errors[0]
+
+    def test_sequential_later_turn(self):
+        """Test that sequential turns cannot take context from later turns"""
+        config = _config(
+            turn_1={"template": "{turn_2}", "context_from": [2]},
+            turn_2={"template": "{topic}"}
+        )
+
+        assert "does not run before" in validate_mode(config)[0]
+
+    def test_parallel_turns_only_get_topic(self):
+        """Test that parallel structure templates cannot use turn context"""
+        config = {
+            "structure": "parallel",
+            "turns": 2,
+            "prompts": {
+                "turn_1": {"template": "{topic}"},
+                "turn_2": {"template": "{turn_1}", "context_from": [1]}
+            }
+        }
+
+        assert len(validate_mode(config)) == 2
+
+    def test_dag_cycle(self):
+        """Test that dependency cycles are reported"""
+        config = _config(
+            turn_1={"template": "{topic}", "context_from": [2]},
+            turn_2={"template": "{topic}", "context_from": [1]}
+        )
+        config["structure"] = "dag"
+
+        assert validate_mode(config) == ["Dependency cycle in context_from: 1 -> 2 -> 1"]
+
+    def test_malformed_template_and_participant(self):
+        """Test that bad templates and participants are reported together"""
+        config = _config(turn_1={"template": "Broken {topic", "participant": "gpt"})
+
+        errors = validate_mode(config)
+
+        assert errors[0] == "turn_1: unknown participant 'gpt'"
+        assert errors[1].startswith("turn_1: malformed template")
+
+
+class TestModeRegistry:
+    """Test the mtime-keyed registry"""
+
+    def _write(self, path, config, mtime):
+        path.write_text(json.dumps(config))
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_cached_until_file_changes(self, tmp_path):
+        """Test that a mode is recompiled only after its file changes"""
+        path = tmp_path / "solo.json"
+        self._write(path, _config(turn_1={"template": "A {topic}"}), 1_000_000_000)
+        registry = ModeRegistry(tmp_path)
+
+        first = registry.get("solo")
+        assert registry.get("solo") is first
+
+        self._write(path, _config(turn_1={"template": "B {topic}"}), 2_000_000_000)
+        second = registry.get("solo")
+
+        assert second is not first
+        assert second.templates[1].source == "B {topic}"
+
+    def test_dependency_graph_resolved(self):
+        """Test that the compiled mode carries dependencies and run order"""
+        mode = ModeRegistry().get("research-enhanced")
+
+        assert mode.dependencies[5] == [1, 2, 3, 4]
+        assert mode.order.index(4) < mode.order.index(5)
+
+    def test_invalid_and_missing_modes(self, tmp_path):
+        """Test errors for invalid JSON, invalid configs and missing files"""
+        (tmp_path / "bad.json").write_text("{not json")
+        self._write(tmp_path / "broken.json", _config(turn_1={"template": "{turn_9}"}), 1)
+        registry = ModeRegistry(tmp_path)
+
+        errors = registry.preload()
+
+        assert set(errors) == {"bad", "broken"}
+        assert errors["bad"][0].startswith("invalid JSON")
+        with pytest.raises(ValueError, match="not found"):
+            registry.get("missing")
+
+
+class TestEngineValidation:
+    """Test that engines reject invalid configs before any turn runs"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_custom_config_costs_nothing(self, tmp_path):
+        """Test that a bad context_from reference fails before dispatch"""
+        claude = AsyncMock()
+        engine = ProtocolEngine(claude, AsyncMock(), StateManager(str(tmp_path)))
+        config = _config(
+            turn_1={"template": "{topic}"},
+            turn_2={"template": "{turn_3}", "context_from": [3]}
+        )
+
+        with pytest.raises(ModeValidationError) as exc_info:
+            await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert exc_info.value.mode == "custom"
+        claude.chat.assert_not_called()
+
+    def test_load_mode_returns_copy(self, tmp_path):
+        """Test that callers cannot mutate the registry's compiled config"""
+        engine = ProtocolEngine(AsyncMock(), AsyncMock(), StateManager(str(tmp_path)))
+
+        config = engine.load_mode("loop")
+        config["prompts"]["turn_1"]["template"] = "changed"
+
+        assert engine.load_mode("loop")["prompts"]["turn_1"]["template"] != "changed"
@@ -417,6 +417,386 @@ class TestParallelExecution:
             assert mock_grok.chat.call_count == 2
 
 
+# ============= DAG SCHEDULING TESTS =============
+
+class TestDagExecution:
+    """Test dependency-graph scheduling built from context_from"""
+
+    @staticmethod
+    def _dag_config():
+        """Diamond graph: 1 -> (2, 3) -> 4"""
+        return {
+            "structure": "dag",
+            "turns": 4,
+            "prompts": {
+                "turn_1": {"role": "root", "participant": "grok",
+                           "template": "Root {topic}", "context_from": []},
+                "turn_2": {"role": "left", "participant": "grok",
+                           "template": "Left {turn_1}", "context_from": [1]},
+                "turn_3": {"role": "right", "participant": "grok",
+                           "template": "Right {turn_1}", "context_from": [1]},
+                "turn_4": {"role": "join", "participant": "grok",
+                           "template": "Join {turn_2} {turn_3}", "context_from": [2, 3]},
+            }
+        }
+
+    @pytest.mark.asyncio
+    async def test_dag_runs_independent_branches_concurrently(self):
+        """Test that sibling turns overlap and dependents see their context"""
+        running = 0
+        max_running = 0
+
+        async def fake_chat(prompt, model=None):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return f"out[{prompt}]", {"prompt": 1, "completion": 1, "total": 2}
+
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(side_effect=fake_chat)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(AsyncMock(), mock_grok, StateManager(tmpdir))
+            conversation = await engine.run_protocol(
+                mode="custom", topic="T", custom_config=self._dag_config()
+            )
+
+        assert [t.number for t in conversation.turns] == [1, 2, 3, 4]
+        assert max_running == 2  # turns 2 and 3 overlapped
+        assert "out[Left out[Root T]]" in conversation.turns[3].prompt
+        assert "out[Right out[Root T]]" in conversation.turns[3].prompt
+
+    def test_dag_cycle_detection(self):
+        """Test that cyclic context_from declarations are rejected"""
+        engine = ProtocolEngine(None, None, None)
+        config = self._dag_config()
+        config["prompts"]["turn_1"]["context_from"] = [4]
+
+        dependencies = engine._build_dependency_graph(config)
+
+        with pytest.raises(ValueError, match="Dependency cycle"):
+            engine._topological_order(dependencies)
+
+    def test_dag_ignores_unknown_dependencies(self):
+        """Test that references to missing turns are dropped from the graph"""
+        engine = ProtocolEngine(None, None, None)
+        config = self._dag_config()
+        config["prompts"]["turn_2"]["context_from"] = [1, 9]
+
+        dependencies = engine._build_dependency_graph(config)
+
+        assert dependencies[2] == [1]
+        assert engine._topological_order(dependencies) == [1, 2, 3, 4]
+
+
+# ============= RESUME TESTS =============
+
+class SimulatedCrash(BaseException):
+    """Stands in for a process crash mid-conversation"""
+
+
+class TestResumeExecution:
+    """Test resuming interrupted sessions from persisted turns"""
+
+    @staticmethod
+    def _sequential_config():
+        return {
+            "turns": 3,
+            "prompts": {
+                f"turn_{i}": {"role": "r", "participant": "grok",
+                              "template": f"Step {i} {{topic}} {{turn_{i - 1}}}" if i > 1
+                              else "Step 1 {topic}",
+                              "context_from": [i - 1] if i > 1 else []}
+                for i in range(1, 4)
+            }
+        }
+
+    @staticmethod
+    def _crashing_grok(crash_on_call):
+        calls = 0
+
+        async def fake_chat(prompt, model=None):
+            nonlocal calls
+            calls += 1
+            if calls == crash_on_call:
+                raise SimulatedCrash()
+            return f"out[{prompt}]", {"prompt": 1, "completion": 1, "total": 2}
+
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(side_effect=fake_chat)
+        return mock_grok
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_turns(self):
+        """Test that only missing turns run and context is rebuilt"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state = StateManager(tmpdir)
+            engine = ProtocolEngine(AsyncMock(), self._crashing_grok(3), state)
+
+            with pytest.raises(SimulatedCrash):
+                await engine.run_protocol(mode="custom", topic="T",
+                                          custom_config=self._sequential_config())
+            session_id = engine.current_session_id
+
+            interrupted = state.load_conversation(session_id)
+            assert interrupted.mode == "custom"
+            assert interrupted.topic == "T"
+            assert len(interrupted.turns) == 2
+
+            mock_grok = self._crashing_grok(crash_on_call=None)
+            engine = ProtocolEngine(AsyncMock(), mock_grok, state)
+            resumed = await engine.resume_protocol(session_id)
+
+        assert mock_grok.chat.call_count == 1
+        assert [t.number for t in resumed.turns] == [1, 2, 3]
+        assert resumed.turns[2].prompt.endswith(resumed.turns[1].response)
+        assert resumed.completed_at is not None
+
+    @pytest.mark.asyncio
+    async def test_resume_dag_session(self):
+        """Test that a DAG resumes with completed nodes satisfying dependencies"""
+        config = TestDagExecution._dag_config()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state = StateManager(tmpdir)
+            engine = ProtocolEngine(AsyncMock(), self._crashing_grok(4), state)
+
+            with pytest.raises(SimulatedCrash):
+                await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+            mock_grok = self._crashing_grok(crash_on_call=None)
+            resumed = await ProtocolEngine(AsyncMock(), mock_grok, state).resume_protocol(
+                engine.current_session_id
+            )
+
+        assert mock_grok.chat.call_count == 1
+        assert [t.number for t in resumed.turns] == [1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_resume_completed_session_rejected(self):
+        """Test that finished sessions are not re-run"""
+        mock_grok = self._crashing_grok(crash_on_call=None)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state = StateManager(tmpdir)
+            engine = ProtocolEngine(AsyncMock(), mock_grok, state)
+            conversation = await engine.run_protocol(mode="custom", topic="T",
+                                                     custom_config=self._sequential_config())
+            state.save_conversation(conversation)
+
+            with pytest.raises(ValueError, match="already completed"):
+                await engine.resume_protocol(conversation.session_id)
+
+    @pytest.mark.asyncio
+    async def test_resume_reruns_failed_turns(self):
+        """Test that errored turns count as not done and are replaced on resume"""
+        failing = AsyncMock()
+        failing.chat = AsyncMock(side_effect=[
+            ("out[1]", {"prompt": 1, "completion": 1, "total": 2}),
+            ValueError("bad request"),
+            ("out[3]", {"prompt": 1, "completion": 1, "total": 2}),
+        ])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state = StateManager(tmpdir)
+            engine = ProtocolEngine(AsyncMock(), failing, state, max_retries=1)
+            conversation = await engine.run_protocol(mode="custom", topic="T",
+                                                     custom_config=self._sequential_config())
+            state.save_conversation(conversation)
+            assert conversation.turns[1].error is not None
+
+            mock_grok = self._crashing_grok(crash_on_call=None)
+            resumed = await ProtocolEngine(AsyncMock(), mock_grok, state).resume_protocol(
+                conversation.session_id
+            )
+            reloaded = state.load_conversation(conversation.session_id)
+
+        assert mock_grok.chat.call_count == 1
+        assert [t.number for t in resumed.turns] == [1, 2, 3]
+        assert resumed.turns[1].error is None
+        assert [t.error for t in reloaded.turns] == [None, None, None]
+
+
+# ============= BATCH TESTS =============
+
+class TestBatchExecution:
+    """Test many-topic runs with bounded concurrency"""
+
+    @pytest.mark.asyncio
+    async def test_run_many_bounds_concurrency_and_saves(self):
+        """Test that at most max_concurrent protocols run and each is saved"""
+        running = 0
+        max_running = 0
+
+        async def fake_chat(prompt, model=None):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return f"out[{prompt}]", {"prompt": 1, "completion": 1, "total": 2}
+
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(side_effect=fake_chat)
+        config = {
+            "turns": 1,
+            "prompts": {"turn_1": {"role": "r", "participant": "grok", "template": "On {topic}"}}
+        }
+        completed = []
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state = StateManager(tmpdir)
+            engine = ProtocolEngine(AsyncMock(), mock_grok, state)
+
+            results = await engine.run_many(
+                "custom", ["A", "B", "C", "D", "E"], custom_config=config,
+                max_concurrent=2, on_complete=lambda i, c: completed.append(i)
+            )
+
+            assert [c.topic for c in results] == ["A", "B", "C", "D", "E"]
+            assert len({c.session_id for c in results}) == 5
+            assert sorted(completed) == [0, 1, 2, 3, 4]
+            assert max_running == 2
+            assert len(state.list_sessions(status="completed")) == 5
+
+    @pytest.mark.asyncio
+    async def test_run_many_isolates_failures(self):
+        """Test that one failing topic does not abort the batch"""
+        config = {
+            "turns": 1,
+            "prompts": {"turn_1": {"role": "r", "participant": "grok", "template": "On {topic}"}}
+        }
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(AsyncMock(), AsyncMock(), StateManager(tmpdir))
+            engine.grok.chat = AsyncMock(return_value=("ok", {"total": 1}))
+
+            original = engine._start_protocol
+
+            async def flaky_start(mode, topic, config, session_id=None):
+                if topic == "bad":
+                    raise RuntimeError("boom")
+                return await original(mode, topic, config, session_id=session_id)
+
+            engine._start_protocol = flaky_start
+            results = await engine.run_many("custom", ["good", "bad"], custom_config=config)
+
+        assert results[0].topic == "good"
+        assert isinstance(results[1], RuntimeError)
+
+
+# ============= STREAMING TESTS =============
+
+class TestStreamingExecution:
+    """Test token streaming through turn execution"""
+
+    @staticmethod
+    def _grok_streaming(chunks, reported_usage=None, delay=0.0):
+        """Grok mock whose chat_stream yields chunks and fills usage"""
+        async def chat_stream(prompt, model=None, usage=None):
+            for chunk in chunks:
+                await asyncio.sleep(delay)
+                yield chunk
+            if usage is not None:
+                usage.update(reported_usage or {})
+
+        mock_grok = Mock()
+        mock_grok.chat_stream = chat_stream
+        mock_grok.chat = AsyncMock()
+        return mock_grok
+
+    @pytest.mark.asyncio
+    async def test_tokens_pushed_to_handler(self):
+        """Test that chunks reach the handler and ttft is recorded"""
+        received = []
+        usage = {"prompt": 5, "completion": 3, "total": 8}
+        mock_grok = self._grok_streaming(["Hel", "lo", "!"], reported_usage=usage)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(
+                AsyncMock(), mock_grok, StateManager(tmpdir),
+                stream_handler=lambda n, chunk: received.append((n, chunk))
+            )
+            turn_config = {"role": "r", "participant": "grok", "template": "Hi {topic}"}
+
+            turn = await engine._execute_turn(1, turn_config, "T", {})
+
+        assert received == [(1, "Hel"), (1, "lo"), (1, "!")]
+        assert turn.response == "Hello!"
+        assert turn.tokens == usage
+        assert turn.ttft is not None and turn.ttft <= turn.latency
+        mock_grok.chat.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_handler_can_abort_generation(self):
+        """Test that returning False from the handler stops the turn early"""
+        mock_grok = self._grok_streaming(["a", "b", "c", "d"])
+
+        async def handler(turn_num, chunk):
+            return chunk != "b"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(AsyncMock(), mock_grok, StateManager(tmpdir),
+                                    stream_handler=handler)
+            turn_config = {"role": "r", "participant": "grok", "template": "Hi {topic}"}
+
+            turn = await engine._execute_turn(1, turn_config, "T", {})
+
+        assert turn.response == "ab"
+        assert turn.error == "Stream aborted by handler"
+        assert turn.retry_count == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_responses_checkpointed(self):
+        """Test that in-flight text is checkpointed and cleared once the turn is saved"""
+        mock_grok = self._grok_streaming(["one ", "two ", "three"], delay=0.01)
+        snapshots = []
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_manager = StateManager(tmpdir)
+            engine = ProtocolEngine(
+                AsyncMock(), mock_grok, state_manager,
+                stream_handler=lambda n, chunk: snapshots.append(
+                    state_manager.load_partials(engine.current_session_id)
+                ),
+                checkpoint_interval=0.0
+            )
+            config = {
+                "structure": "sequential",
+                "turns": 1,
+                "prompts": {"turn_1": {"role": "r", "participant": "grok",
+                                       "template": "Hi {topic}"}}
+            }
+
+            conversation = await engine.run_protocol(mode="custom", topic="T",
+                                                     custom_config=config)
+
+            assert snapshots[-1] == {1: "one two "}
+            assert state_manager.load_partials(conversation.session_id) == {}
+            assert engine.partial_responses == {}
+
+    @pytest.mark.asyncio
+    async def test_claude_turn_streams_single_chunk(self):
+        """Test that Claude turns deliver their full response as one chunk"""
+        received = []
+        mock_claude = AsyncMock()
+        mock_claude.chat = AsyncMock(
+            return_value=("Full", {"prompt": 0, "completion": 1, "total": 1})
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(mock_claude, Mock(), StateManager(tmpdir),
+                                    stream_handler=lambda n, chunk: received.append(chunk))
+            turn_config = {"role": "r", "participant": "claude", "template": "Hi {topic}"}
+
+            turn = await engine._execute_turn(2, turn_config, "T", {})
+
+        assert received == ["Full"]
+        assert turn.ttft is not None
+
+
 # ============= MARKDOWN EXPORT TESTS =============
 
 class TestMarkdownExportWithCosts:
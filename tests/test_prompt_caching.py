@@ -0,0 +1,153 @@
+"""
+Prompt Caching Tests
+
+Tests for prefix-stable prompt layout, Grok cache routing hints, and
+cached-token accounting in usage and cost.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.clients.grok import GrokClient
+from src.clients.grok_enhanced import EnhancedGrokClient
+from src.protocol import ProtocolEngine, calculate_cost
+from src.state import StateManager
+
+CONTEXT = {
+    "turn_1": "Functors map objects and arrows.",
+    "turn_1_participant": "claude",
+    "turn_2": "Natural transformations map functors.",
+    "turn_2_participant": "grok",
+}
+
+
+class TestCachedCost:
+    """Test cached prompt tokens in cost calculation"""
+
+    def test_cached_tokens_billed_at_cached_rate(self):
+        """Test that cached prompt tokens use the cached_input price"""
+        cost = calculate_cost(
+            "grok-4-fast-reasoning-latest",
+            {"prompt": 1_000_000, "cached": 600_000, "completion": 0}
+        )
+
+        # 400k * $2 + 600k * $0.5
+        assert cost == pytest.approx(1.1)
+
+    def test_models_without_cache_pricing(self):
+        """Test that models without cached_input bill cached tokens at input price"""
+        tokens = {"prompt": 1_000_000, "completion": 0}
+
+        assert calculate_cost("grok-2-vision-latest", {**tokens, "cached": 500_000}) == \
+            calculate_cost("grok-2-vision-latest", tokens)
+
+
+class TestPromptLayout:
+    """Test prefix-stable prompt layout"""
+
+    def _engine(self, prompt_caching=True):
+        return ProtocolEngine(AsyncMock(), AsyncMock(), AsyncMock(), prompt_caching=prompt_caching)
+
+    def test_default_layout_unchanged(self):
+        """Test that without prompt_caching the role instruction leads"""
+        turn_config = {"role_instruction": "Be brief.", "template": "Compare {turn_1} on {topic}"}
+
+        prompt = self._engine(False)._build_prompt(turn_config, "CT", CONTEXT)
+
+        assert prompt == "Be brief.\n\nCompare Functors map objects and arrows. on CT"
+
+    def test_shared_context_forms_common_prefix(self):
+        """Test that turns drawing on the same earlier turns share a prefix"""
+        engine = self._engine()
+        critic = {
+            "role_instruction": "You are a critic.", "template": "Critique {turn_2}, then {turn_1}"
+        }
+        editor = {"role_instruction": "You are an editor.", "template": "Edit {turn_1}"}
+
+        first = engine._build_prompt(critic, "CT", CONTEXT)
+        second = engine._build_prompt(editor, "CT", CONTEXT)
+        prefix = first.split("---")[0]
+
+        assert second.startswith(prefix)
+        assert prefix.index("=== Turn 1 (claude) ===") < prefix.index("=== Turn 2 (grok) ===")
+        assert first.endswith("You are a critic.\n\nCritique [Turn 2, above], then [Turn 1, above]")
+
+    def test_prefix_grows_by_appending(self):
+        """Test that adding later turns extends rather than reorders the prefix"""
+        engine = self._engine()
+        turn_config = {"template": "Summarize"}
+        earlier = {k: v for k, v in CONTEXT.items() if k.startswith("turn_1")}
+
+        short = engine._build_prompt(turn_config, "CT", earlier).split("---")[0].rstrip()
+        full = engine._build_prompt(turn_config, "CT", CONTEXT)
+
+        assert full.startswith(short)
+
+
+class TestGrokPromptCache:
+    """Test Grok cache hints and cached usage"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cls", [GrokClient, EnhancedGrokClient])
+    async def test_conversation_id_header_and_cached_usage(self, cls):
+        """Test that conversation_id is sent as x-grok-conv-id and cached tokens are read"""
+        client = cls(api_key="test-key")
+        client.client.chat.completions.create = AsyncMock(return_value=Mock(
+            choices=[Mock(message=Mock(content="ok"))],
+            usage=Mock(prompt_tokens=100, completion_tokens=10, total_tokens=110,
+                       prompt_tokens_details=Mock(cached_tokens=80))
+        ))
+
+        _, tokens = await client.chat("Hi", conversation_id="session-1")
+
+        call_kwargs = client.client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["extra_headers"] == {"x-grok-conv-id": "session-1"}
+        assert tokens == {"prompt": 100, "completion": 10, "total": 110, "cached": 80}
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_enhanced_client_streams_with_hint(self):
+        """Test that EnhancedGrokClient.chat_stream accepts the engine's cache hint"""
+        async def chunks():
+            yield Mock(choices=[Mock(delta=Mock(content="ok"))], usage=None)
+            yield Mock(choices=[], usage=Mock(
+                prompt_tokens=100, completion_tokens=10, total_tokens=110,
+                prompt_tokens_details=Mock(cached_tokens=80)
+            ))
+
+        client = EnhancedGrokClient(api_key="test-key")
+        client.client.chat.completions.create = AsyncMock(return_value=chunks())
+        usage = {}
+
+        stream = client.chat_stream("Hi", usage=usage, conversation_id="s")
+        text = "".join([c async for c in stream])
+
+        call_kwargs = client.client.chat.completions.create.call_args.kwargs
+        assert call_kwargs["extra_headers"] == {"x-grok-conv-id": "s"}
+        assert (text, usage["cached"]) == ("ok", 80)
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_engine_passes_session_hint_and_bills_cache(self, tmp_path):
+        """Test that engine Grok calls carry the session id and cheaper cached cost"""
+        grok = AsyncMock()
+        grok.chat = AsyncMock(return_value=(
+            "ok", {"prompt": 1000, "cached": 800, "completion": 100, "total": 1100}
+        ))
+        config = {
+            "structure": "sequential",
+            "turns": 1,
+            "prompts": {"turn_1": {"role": "r", "participant": "grok", "template": "P {topic}",
+                                   "grok_model": "grok-4-fast-reasoning-latest"}}
+        }
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)), prompt_caching=True)
+
+        conversation = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert grok.chat.call_args.kwargs["conversation_id"] == conversation.session_id
+        assert conversation.turns[0].cost < calculate_cost(
+            "grok-4-fast-reasoning-latest", {"prompt": 1000, "completion": 100}
+        )
@@ -357,6 +357,200 @@ class TestOrchestratorDependencies:
         assert "Task A" in parallel_groups[0]
         assert "Task B" in parallel_groups[0]
 
+    def test_parallel_groups_cover_every_level(self):
+        """Test Kahn layering into dependency levels"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator, Subtask
+
+        orchestrator = IntelligentOrchestrator()
+        subtasks = [
+            Subtask(name="D", description="", complexity="simple", dependencies=["C", "B"]),
+            Subtask(name="C", description="", complexity="simple", dependencies=["a"]),
+            Subtask(name="A", description="", complexity="simple", dependencies=[]),
+            Subtask(name="B", description="", complexity="simple",
+                    dependencies=["Subtask 3", "external API"]),
+        ]
+
+        assert orchestrator._identify_parallel_groups(subtasks) == [["A"], ["C", "B"], ["D"]]
+
+    def test_dependency_cycle_reported(self):
+        """Test that cyclic dependencies fail with the cycle spelled out"""
+        from src.intelligent_orchestrator import DependencyCycleError, IntelligentOrchestrator
+
+        decomposition = """
+        SUBTASKS:
+        1. Task A - Complexity: simple
+           Description: First task
+           Dependencies: Task C
+
+        2. Task B - Complexity: simple
+           Description: Second task
+           Dependencies: Task A
+
+        3. Task C - Complexity: simple
+           Description: Third task
+           Dependencies: Task B
+        """
+
+        with pytest.raises(DependencyCycleError, match="Task A -> Task C -> Task B -> Task A"):
+            IntelligentOrchestrator().parse_decomposition(decomposition)
+
+    def test_prompts_follow_dependency_order(self):
+        """Test that a subtask listed before its dependency runs after it"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator, Subtask
+
+        orchestrator = IntelligentOrchestrator()
+        orchestrator.plan([
+            Subtask(name="Report", description="", complexity="simple", dependencies=["Analysis"]),
+            Subtask(name="Analysis", description="", complexity="complex"),
+        ], "one_loop_per_task")
+
+        prompts = orchestrator.generate_execution_prompts()
+
+        roles = [p["role"] for p in prompts]
+        assert roles[:4] == [
+            "research_Analysis", "execute_Analysis", "validate_Analysis", "execute_Report"
+        ]
+        assert prompts[3]["context_from"] == [2]
+
+    def test_critical_path_uses_recorded_latencies(self):
+        """Test critical-path estimation from per-complexity turn latencies"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator, Subtask
+
+        orchestrator = IntelligentOrchestrator()
+        orchestrator.record_turn_latency("simple", 2.0)
+        orchestrator.record_turn_latency("complex", 10.0)
+
+        _, strategy = orchestrator.plan([
+            Subtask(name="A", description="", complexity="simple"),
+            Subtask(name="B", description="", complexity="complex"),
+            Subtask(name="C", description="", complexity="simple", dependencies=["A", "B"]),
+        ], "one_loop_per_task")
+
+        # B (3 turns x 10s) then C (1 turn x 2s); A overlaps B
+        assert strategy.critical_path == ["B", "C"]
+        assert strategy.critical_path_seconds == 32.0
+        assert strategy.parallel_groups == [["A", "B"], ["C"]]
+
+
+class TestOrchestratorBatching:
+    """Test packing simple subtasks into batch turns"""
+
+    def _simple(self, count, dependencies=None):
+        from src.intelligent_orchestrator import Subtask
+
+        return [
+            Subtask(name=f"S{i}", description="", complexity="simple",
+                    dependencies=dependencies or [])
+            for i in range(1, count + 1)
+        ]
+
+    def test_batches_sized_to_token_budget(self):
+        """Test that batch count follows output tokens over throughput"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator
+
+        # 400 tokens per task, 50 tokens/s for 30s = 1500 tokens per batch
+        orchestrator = IntelligentOrchestrator()
+        batches = orchestrator.pack_simple_batches(self._simple(7))
+
+        assert [[st.name for st in batch] for batch in batches] == [
+            ["S1", "S3", "S5", "S7"], ["S2", "S4", "S6"]
+        ]
+
+        orchestrator.output_stats["tokens_per_second"] = [200.0]
+        assert len(orchestrator.pack_simple_batches(self._simple(7))) == 1
+
+    def test_mixed_prompts_batch_per_level(self):
+        """Test parallel batches and per-subtask context for dependents"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator, Subtask
+
+        orchestrator = IntelligentOrchestrator(batch_seconds=16.0)  # 2 tasks per batch
+        _, strategy = orchestrator.plan(self._simple(3) + [
+            Subtask(name="C", description="", complexity="complex", dependencies=["S3"]),
+            Subtask(name="S4", description="", complexity="simple", dependencies=["S1", "C"]),
+        ], "mixed")
+
+        prompts = orchestrator.generate_execution_prompts()
+
+        roles = [p["role"] for p in prompts]
+        assert roles == ["batch_simple_tasks", "batch_simple_tasks", "research_C", "execute_C",
+                         "validate_C", "batch_simple_tasks", "final_synthesis"]
+        assert [p["batch_subtasks"] for p in prompts[:2]] == [["S1", "S3"], ["S2"]]
+        assert prompts[0]["context_from"] == prompts[1]["context_from"] == []
+        assert prompts[2]["context_from"] == [1]
+        assert prompts[2]["context_sections"] == {1: ["S3"]}
+        assert prompts[5]["context_from"] == [1, 4]
+        assert prompts[5]["context_sections"] == {1: ["S1"]}
+        assert strategy.total_estimated_turns == len(prompts)
+
+    def test_split_batch_results(self):
+        """Test splitting a batch response on RESULT headings"""
+        from src.intelligent_orchestrator import split_batch_results
+
+        text = "Intro\n### RESULT: Alpha\nfirst\n\n## **RESULT: Beta**\nsecond\nmore"
+
+        assert split_batch_results(text) == {"Alpha": "first", "Beta": "second\nmore"}
+        assert split_batch_results("no headings") == {}
+
+    def test_learns_throughput_from_batch_turns(self):
+        """Test that batch turns feed output rate and per-task tokens"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator
+        from src.protocol import Turn
+
+        turn = Turn(number=1, role="batch_simple_tasks", participant="grok", prompt="p",
+                    response="### RESULT: A\na\n### RESULT: B\nb",
+                    tokens={"prompt": 10, "completion": 600, "total": 610},
+                    latency=4.0, timestamp="t", context_from=[])
+        orchestrator = IntelligentOrchestrator()
+        orchestrator.learn_latencies([turn])
+
+        assert orchestrator.output_tokens_per_second() == 150.0
+        assert list(orchestrator.output_stats["subtask_tokens"]) == [300.0, 300.0]
+
+    def test_batch_turn_output_split_by_section_length(self):
+        """Test that longer RESULT sections are recorded as longer outputs"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator
+        from src.protocol import Turn
+
+        turn = Turn(number=1, role="batch_simple_tasks", participant="grok", prompt="p",
+                    response="### RESULT: A\n" + "a" * 300 + "\n### RESULT: B\n" + "b" * 100,
+                    tokens={"prompt": 10, "completion": 400, "total": 410},
+                    latency=4.0, timestamp="t", context_from=[])
+        orchestrator = IntelligentOrchestrator()
+        orchestrator.learn_latencies([turn])
+
+        assert list(orchestrator.output_stats["subtask_tokens"]) == [300.0, 100.0]
+
+    def test_estimate_scales_with_description(self):
+        """Test that per-subtask estimates follow description length, within bounds"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator, Subtask
+
+        orchestrator = IntelligentOrchestrator()
+
+        def estimate(words):
+            return orchestrator.estimate_output_tokens(
+                Subtask(name="S", description=" ".join(["word"] * words), complexity="simple")
+            )
+
+        assert estimate(0) == 400
+        assert estimate(25) == 400
+        assert estimate(30) == 480
+        assert estimate(5) == 200  # clamped at half
+        assert estimate(500) == 800  # clamped at double
+
+    def test_long_subtask_packed_alone(self):
+        """Test that bin-packing uses the per-subtask estimates"""
+        from src.intelligent_orchestrator import IntelligentOrchestrator, Subtask
+
+        orchestrator = IntelligentOrchestrator(batch_seconds=16.0)  # 800 tokens per batch
+        long_task = Subtask(name="Long", description=" ".join(["word"] * 50), complexity="simple")
+        subtasks = [long_task] + [
+            Subtask(name=f"S{i}", description="Short ask", complexity="simple") for i in range(1, 4)
+        ]
+
+        batches = orchestrator.pack_simple_batches(subtasks)
+
+        assert [[st.name for st in batch] for batch in batches] == [["Long"], ["S1", "S2", "S3"]]
+
 
 if __name__ == "__main__":
     # Run tests directly
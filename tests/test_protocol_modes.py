@@ -249,6 +249,7 @@ class TestResearchEnhancedMode:
         assert config["turns"] == 6
         assert "participants" in config
         assert config["participants"] == ["claude", "grok"]
+        assert config["structure"] == "dag"
 
     def test_research_enhanced_mode_features(self, protocol_engine):
         """Test research-enhanced mode special features"""
@@ -0,0 +1,117 @@
+"""
+Rate Limiter Tests
+
+Tests for token buckets, per-model limits, alias sharing and the global
+in-flight cap enforced during turn execution.
+"""
+
+import asyncio
+import tempfile
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.protocol import ProtocolEngine
+from src.rate_limit import RateLimiter, TokenBucket, get_shared_rate_limiter
+from src.state import StateManager
+
+
+class TestTokenBucket:
+    """Test token bucket refill and waiting"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_wait(self):
+        """Test that requests beyond capacity wait for refill"""
+        bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10/s
+
+        start = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        assert elapsed >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_consume_can_go_negative(self):
+        """Test that overspending delays the next acquire"""
+        bucket = TokenBucket(rate_per_minute=6000, capacity=100)  # 100/s
+
+        bucket.consume(150)
+        waited = await bucket.acquire(10)
+
+        assert waited == pytest.approx(0.6, abs=0.05)
+
+
+class TestRateLimiter:
+    """Test per-model limits and in-flight cap"""
+
+    @pytest.mark.asyncio
+    async def test_aliases_share_budget(self):
+        """Test that friendly aliases resolve to the same bucket"""
+        limiter = RateLimiter(limits={"grok-4-fast-reasoning-latest": {"rpm": 600, "tpm": 10_000,
+                                                                       "burst": 1}})
+
+        start = time.monotonic()
+        async with limiter.limit("grok-4"):
+            pass
+        async with limiter.limit("grok-4-fast-reasoning-latest"):
+            pass
+
+        assert time.monotonic() - start >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_unknown_model_uses_default_limits(self):
+        """Test fallback to default limits"""
+        limiter = RateLimiter(limits={}, default_limits={"rpm": 1000, "tpm": 1000})
+
+        async with limiter.limit("mystery-model", estimated_tokens=10):
+            pass
+
+        assert "mystery-model" in limiter._request_buckets
+
+    @pytest.mark.asyncio
+    async def test_shared_limiter_per_event_loop(self):
+        """Test that engines on one loop share the same limiter"""
+        assert get_shared_rate_limiter() is get_shared_rate_limiter()
+
+    @pytest.mark.asyncio
+    async def test_max_in_flight_enforced_in_execute_turn(self):
+        """Test that parallel turns never exceed the in-flight cap"""
+        running = 0
+        max_running = 0
+
+        async def fake_chat(prompt, model=None):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return "ok", {"prompt": 1, "completion": 1, "total": 2}
+
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(side_effect=fake_chat)
+
+        config = {
+            "structure": "parallel",
+            "turns": 4,
+            "prompts": {
+                f"turn_{i}": {"role": "r", "participant": "grok", "template": "P {topic}"}
+                for i in range(1, 5)
+            }
+        }
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(
+                AsyncMock(), mock_grok, StateManager(tmpdir),
+                rate_limiter=RateLimiter(max_in_flight=2)
+            )
+            conversation = await engine.run_protocol(mode="custom", topic="T",
+                                                     custom_config=config)
+
+        assert len(conversation.turns) == 4
+        assert max_running == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
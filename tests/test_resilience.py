@@ -0,0 +1,199 @@
+"""
+Endpoint Resilience Tests
+
+Tests for error classification, Retry-After handling, circuit breaker
+states, adaptive timeouts and engine fail-fast behavior.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import httpx
+import openai
+import pytest
+
+from src.protocol import ProtocolEngine
+from src.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointGuard,
+    ErrorInfo,
+    classify_error,
+)
+from src.state import StateManager
+
+
+def _status_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.x.ai/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    cls = openai.RateLimitError if status == 429 else openai.APIStatusError
+    return cls("error", response=response, body=None)
+
+
+class TestClassifyError:
+    """Test structured error classification"""
+
+    def test_rate_limit_retry_after_seconds(self):
+        """Test that 429s carry the provider's Retry-After"""
+        info = classify_error(_status_error(429, {"retry-after": "7"}))
+
+        assert (info.kind, info.retryable, info.status, info.retry_after) == (
+            "rate_limit", True, 429, 7.0
+        )
+
+    def test_retry_after_ms_preferred(self):
+        """Test that retry-after-ms wins over retry-after"""
+        info = classify_error(_status_error(503, {"retry-after-ms": "250", "retry-after": "9"}))
+
+        assert (info.kind, info.retry_after) == ("server", 0.25)
+
+    @pytest.mark.parametrize("status,kind,retryable", [
+        (400, "client", False),
+        (401, "auth", False),
+        (408, "timeout", True),
+        (500, "server", True),
+    ])
+    def test_status_codes(self, status, kind, retryable):
+        """Test status code classification"""
+        info = classify_error(_status_error(status))
+
+        assert (info.kind, info.retryable) == (kind, retryable)
+
+    def test_other_clients_by_name(self):
+        """Test the fallback for non-openai exceptions"""
+        assert classify_error(ConnectionError("reset")).kind == "connection"
+        assert classify_error(RuntimeError("HTTP 429 Too Many Requests")).kind == "rate_limit"
+        assert classify_error(ValueError("bad prompt")) == ErrorInfo("unknown", False)
+        assert classify_error(CircuitOpenError("grok-4", 3.0)).retryable is False
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the circuit"""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        breaker.record_failure("m")
+        breaker.check("m")
+        breaker.record_failure("m")
+
+        with pytest.raises(CircuitOpenError):
+            breaker.check("m")
+
+    def test_success_resets_count(self):
+        """Test that failures must be consecutive"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure("m")
+        breaker.record_success()
+        breaker.record_failure("m")
+
+        assert breaker.state == "closed"
+
+    def test_half_open_probe(self):
+        """Test that one probe is let through and its outcome decides"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.0)
+        breaker.record_failure("m")
+
+        breaker.check("m")  # probe admitted
+        assert breaker.state == "half_open"
+
+        breaker.record_failure("m")
+        assert breaker.state == "open"
+
+        breaker.check("m")
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_half_open_limits_probes(self):
+        """Test that concurrent callers fail fast while a probe is out"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure("m")
+        breaker.opened_at -= 60
+
+        breaker.check("m")
+        with pytest.raises(CircuitOpenError):
+            breaker.check("m")
+
+
+class TestEndpointGuard:
+    """Test per-model guards and adaptive timeouts"""
+
+    def test_only_endpoint_failures_count(self):
+        """Test that client errors do not open the circuit"""
+        guard = EndpointGuard(failure_threshold=1)
+        guard.record_failure("grok-4", ErrorInfo("client", False, 400))
+        guard.check("grok-4")
+
+        guard.record_failure("grok-4", ErrorInfo("server", True, 503))
+        with pytest.raises(CircuitOpenError):
+            guard.check("grok-4-fast-reasoning-latest")  # alias, same model
+        guard.check("grok-3")
+
+    def test_adaptive_timeout(self):
+        """Test that timeouts follow latency and double per retry"""
+        guard = EndpointGuard(min_samples=3, min_timeout=1.0, timeout_multiplier=3.0)
+
+        assert guard.timeout_for("grok-4", 120) == 120
+
+        for _ in range(3):
+            guard.record_success("grok-4", 2.0)
+
+        assert guard.timeout_for("grok-4", 120) == 6.0
+        assert guard.timeout_for("grok-4", 120, attempt=1) == 12.0
+        assert guard.timeout_for("grok-4", 8, attempt=1) == 8
+
+    def test_retry_delay_capped(self):
+        """Test that Retry-After replaces backoff up to max_retry_after"""
+        guard = EndpointGuard(max_retry_after=5.0)
+
+        assert guard.retry_delay(ErrorInfo("rate_limit", True, retry_after=2.0), 8.0) == 2.0
+        assert guard.retry_delay(ErrorInfo("rate_limit", True, retry_after=30.0), 8.0) == 5.0
+        assert guard.retry_delay(ErrorInfo("rate_limit", True), 8.0) == 8.0
+
+
+class TestEngineResilience:
+    """Test resilience inside turn execution"""
+
+    def _turn_config(self):
+        return {"role": "r", "participant": "grok", "template": "Q", "grok_model": "grok-4"}
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, tmp_path):
+        """Test that turns fail without calling a model whose circuit opened"""
+        grok = AsyncMock()
+        grok.chat.side_effect = ConnectionError("down")
+        guard = EndpointGuard(failure_threshold=2, recovery_timeout=60)
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                retry_backoff_base=0.01, endpoint_guard=guard)
+
+        first = await engine._execute_turn(1, self._turn_config(), "T", {})
+        second = await engine._execute_turn(2, self._turn_config(), "T", {})
+
+        # Two failures open the circuit; the third attempt is never sent
+        assert grok.chat.call_count == 2
+        assert first.error.startswith("Circuit open for grok-4")
+        assert second.error.startswith("Circuit open for grok-4")
+
+    @pytest.mark.asyncio
+    async def test_retry_after_honored(self, tmp_path, monkeypatch):
+        """Test that a 429's Retry-After sets the retry wait"""
+        waits = []
+        real_sleep = asyncio.sleep
+
+        async def sleep(seconds):
+            waits.append(seconds)
+            await real_sleep(0)
+
+        monkeypatch.setattr("src.protocol.asyncio.sleep", sleep)
+        grok = AsyncMock()
+        grok.chat.side_effect = [
+            _status_error(429, {"retry-after": "3"}),
+            ("ok", {"prompt": 1, "completion": 1, "total": 2}),
+        ]
+        engine = ProtocolEngine(AsyncMock(), grok, StateManager(str(tmp_path)),
+                                endpoint_guard=EndpointGuard())
+
+        turn = await engine._execute_turn(1, self._turn_config(), "T", {})
+
+        assert turn.response == "ok"
+        assert waits == [3.0]
@@ -0,0 +1,155 @@
+"""
+Response Cache Tests
+
+Tests for cache keys, TTL expiry, LRU eviction and cache hits during
+turn execution.
+"""
+
+import os
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.cache import ResponseCache
+from src.protocol import ProtocolEngine
+from src.state import StateManager
+
+
+class TestResponseCache:
+    """Test on-disk cache behaviour"""
+
+    def test_key_depends_on_all_parameters(self):
+        """Test that any request parameter change alters the key"""
+        base = dict(participant="grok", model="grok-4", prompt="P", temperature=0.7)
+        key = ResponseCache.make_key(**base)
+
+        assert key == ResponseCache.make_key(**base)
+        assert key != ResponseCache.make_key(**{**base, "prompt": "Q"})
+        assert key != ResponseCache.make_key(**{**base, "temperature": 0.2})
+        assert key != ResponseCache.make_key(**base, system_prompt="Be brief")
+
+    def test_put_and_get(self, tmp_path):
+        """Test round trip of response and token usage"""
+        cache = ResponseCache(str(tmp_path))
+        tokens = {"prompt": 5, "completion": 7, "total": 12}
+
+        cache.put("k", "hello", tokens)
+
+        assert cache.get("k") == ("hello", tokens)
+        assert cache.get("missing") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_ttl_expiry(self, tmp_path):
+        """Test that expired entries are dropped"""
+        cache = ResponseCache(str(tmp_path), ttl_seconds=0.01)
+        cache.put("k", "hello", {"total": 1})
+        time.sleep(0.02)
+
+        assert cache.get("k") is None
+        assert not (tmp_path / "k.json").exists()
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entry is evicted first"""
+        cache = ResponseCache(str(tmp_path), max_entries=2)
+        cache.put("a", "A", {"total": 1})
+        cache.put("b", "B", {"total": 1})
+
+        # Make "a" most recently used
+        os.utime(tmp_path / "b.json", (1, 1))
+        cache.get("a")
+        cache.put("c", "C", {"total": 1})
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_directory_scanned_only_when_over_limit(self, tmp_path, monkeypatch):
+        """Test that puts under the limits use running totals instead of a scan"""
+        cache = ResponseCache(str(tmp_path), max_entries=3)
+        scan = cache._scan
+        scans = []
+        monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+
+        for key in "abc":
+            cache.put(key, key.upper(), {"total": 1})
+        cache.put("a", "A2", {"total": 1})  # Overwrite, not a new entry
+
+        assert len(scans) == 1  # Initial count only
+        assert cache._entries == 3
+
+        cache.put("d", "D", {"total": 1})
+
+        assert len(scans) == 2
+        assert len(list(tmp_path.glob("*.json"))) == 3
+        assert (cache._entries, cache._bytes) == (
+            3, sum(p.stat().st_size for p in tmp_path.glob("*.json"))
+        )
+
+    def test_totals_track_expired_and_cleared_entries(self, tmp_path):
+        """Test that expiry and clear keep the running totals accurate"""
+        cache = ResponseCache(str(tmp_path), ttl_seconds=0.01)
+        cache.put("a", "A", {"total": 1})
+        cache.put("b", "B", {"total": 1})
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache._entries == 1
+        assert cache._bytes == (tmp_path / "b.json").stat().st_size
+
+        cache.clear()
+        assert (cache._entries, cache._bytes) == (0, 0)
+
+
+class TestCachedExecution:
+    """Test cache integration in ProtocolEngine"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_run_served_from_cache(self, tmp_path):
+        """Test that an identical second run skips the model and costs nothing"""
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(return_value=("Answer", {"prompt": 10, "completion": 20,
+                                                              "total": 30}))
+
+        config = {
+            "turns": 1,
+            "prompts": {"turn_1": {"role": "r", "participant": "grok", "template": "About {topic}"}}
+        }
+
+        engine = ProtocolEngine(
+            AsyncMock(), mock_grok, StateManager(str(tmp_path / "sessions")),
+            response_cache=ResponseCache(str(tmp_path / "cache"))
+        )
+
+        first = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+        second = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert mock_grok.chat.call_count == 1
+        assert not first.turns[0].cache_hit
+        assert second.turns[0].cache_hit
+        assert second.turns[0].response == "Answer"
+        assert second.turns[0].tokens["total"] == 30
+        assert second.turns[0].cost == 0.0
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, tmp_path):
+        """Test that failed turns are not stored"""
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(side_effect=ValueError("bad request"))
+
+        config = {
+            "turns": 1,
+            "prompts": {"turn_1": {"role": "r", "participant": "grok", "template": "About {topic}"}}
+        }
+
+        cache = ResponseCache(str(tmp_path / "cache"))
+        engine = ProtocolEngine(AsyncMock(), mock_grok, StateManager(str(tmp_path / "sessions")),
+                                response_cache=cache)
+
+        await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert list((tmp_path / "cache").glob("*.json")) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,224 @@
+"""
+Speculative Execution Tests
+
+Tests for starting sequential turns early, in-order commits, rerunning
+invalidated speculative turns, outcome branching and validator STATUS
+prediction.
+"""
+
+import asyncio
+import json
+import re
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.dynamic_protocol import DynamicProtocolEngine
+from src.intelligent_orchestrator import VALIDATION_STATUSES, IntelligentOrchestrator, Subtask
+from src.protocol import ProtocolEngine
+from src.state import StateManager
+
+
+class SlowClient:
+    """Client whose latency depends on the prompt, recording call order"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.events = []
+
+    async def chat(self, prompt, **kwargs):
+        name = prompt.split()[0]
+        self.events.append(("start", name))
+        await asyncio.sleep(self.delays.get(name, 0.01))
+        self.events.append(("end", name))
+        return f"{name} done", {"prompt": 10, "completion": 10, "total": 20}
+
+
+def _turn(template, context_from=(), role="r"):
+    return {
+        "role": role, "participant": "grok", "template": template,
+        "context_from": list(context_from)
+    }
+
+
+def _engine(cls, client, tmp_path, **options):
+    return cls(AsyncMock(), client, StateManager(str(tmp_path)), speculative=True, **options)
+
+
+class TestSpeculativeSequential:
+    """Test early starts in sequential modes"""
+
+    @pytest.mark.asyncio
+    async def test_independent_turn_starts_early_and_commits_in_order(self, tmp_path):
+        """Test that a turn not needing its predecessor runs alongside it"""
+        client = SlowClient({"one": 0.1})
+        config = {
+            "structure": "sequential",
+            "turns": 4,
+            "prompts": {
+                "turn_1": _turn("one {topic}"),
+                "turn_2": _turn("two {turn_1}", [1]),
+                "turn_3": _turn("three {topic}"),
+                "turn_4": _turn("four {turn_3}", [3]),
+            }
+        }
+        engine = _engine(ProtocolEngine, client, tmp_path)
+
+        conversation = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert client.events.index(("start", "three")) < client.events.index(("end", "one"))
+        assert [t.number for t in conversation.turns] == [1, 2, 3, 4]
+        assert conversation.turns[1].prompt == "two one done"
+        stats = conversation.metadata["speculation"]
+        assert stats["launched"] == 2  # turns 3 and 4 started before turn 2 committed
+        assert stats["wins"] == 2
+        assert stats["wasted"] == 0
+        assert stats["head_start_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_chained_turns_unchanged(self, tmp_path):
+        """Test that a fully chained mode runs exactly as before"""
+        client = SlowClient({})
+        config = {
+            "structure": "sequential",
+            "turns": 3,
+            "prompts": {
+                "turn_1": _turn("one {topic}"),
+                "turn_2": _turn("two {turn_1}", [1]),
+                "turn_3": _turn("three {turn_2}", [2]),
+            }
+        }
+        engine = _engine(ProtocolEngine, client, tmp_path)
+
+        conversation = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert [e for e in client.events if e[0] == "start"] == [
+            ("start", "one"), ("start", "two"), ("start", "three")
+        ]
+        assert "speculation" not in conversation.metadata
+
+    @pytest.mark.asyncio
+    async def test_invalidated_speculation_reruns(self, tmp_path):
+        """Test that a turn whose <VARIABLE> changed by commit time is rerun"""
+        client = SlowClient({"one": 0.05})
+        config = {
+            "structure": "sequential",
+            "turns": 2,
+            "prompts": {
+                "turn_1": _turn("one {topic}", role="critic"),
+                "turn_2": _turn("two after <LAST_CRITIC>"),
+            }
+        }
+        engine = _engine(DynamicProtocolEngine, client, tmp_path)
+
+        conversation = await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        assert conversation.turns[1].prompt == "two after one done"
+        stats = conversation.metadata["speculation"]
+        assert stats["launched"] == 1
+        assert stats["wins"] == 0
+        assert stats["wasted"] == 1
+        assert stats["wasted_cost"] == conversation.turns[1].cost
+
+
+class TestSpeculate:
+    """Test outcome branching with a pre-launched continuation"""
+
+    @pytest.mark.asyncio
+    async def test_win_overlaps_continuation(self, tmp_path):
+        """Test that the likely continuation runs alongside the decision"""
+        client = SlowClient({"validate": 0.05, "next": 0.05})
+        engine = _engine(ProtocolEngine, client, tmp_path)
+
+        result, outcome, continued = await engine.speculate(
+            client.chat("validate"),
+            resolve=lambda r: "complete",
+            continuations={"complete": lambda: client.chat("next"),
+                           "needs_refinement": lambda: client.chat("refine")},
+            likely="complete"
+        )
+
+        assert outcome == "complete"
+        assert continued[0] == "next done"
+        assert client.events.index(("start", "next")) < client.events.index(("end", "validate"))
+        assert engine.speculation_stats["wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_loss_cancels_and_runs_chosen(self, tmp_path):
+        """Test that a wrong guess is cancelled and the chosen branch runs"""
+        client = SlowClient({"validate": 0.02, "next": 1.0})
+        engine = _engine(ProtocolEngine, client, tmp_path)
+
+        _, outcome, continued = await engine.speculate(
+            client.chat("validate"),
+            resolve=lambda r: "needs_refinement",
+            continuations={"complete": lambda: client.chat("next"),
+                           "needs_refinement": lambda: client.chat("refine")},
+            likely="complete"
+        )
+
+        assert outcome == "needs_refinement"
+        assert continued[0] == "refine done"
+        assert ("end", "next") not in client.events
+        assert engine.speculation_stats["wasted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_runs_after_decision(self, tmp_path):
+        """Test that without speculation nothing starts early"""
+        client = SlowClient({})
+        engine = ProtocolEngine(AsyncMock(), client, StateManager(str(tmp_path)))
+
+        await engine.speculate(
+            client.chat("validate"),
+            resolve=lambda r: "complete",
+            continuations={"complete": lambda: client.chat("next")},
+            likely="complete"
+        )
+
+        assert client.events == [("start", "validate"), ("end", "validate"),
+                                 ("start", "next"), ("end", "next")]
+        assert engine.speculation_stats["launched"] == 0
+
+
+class TestStatusPrediction:
+    """Test validator STATUS parsing and prediction"""
+
+    def test_parse_status(self):
+        """Test that STATUS decisions are extracted"""
+        orchestrator = IntelligentOrchestrator()
+
+        parse = orchestrator.parse_validation_status
+        assert parse("```\nSTATUS: Needs_Refinement\n```") == "needs_refinement"
+        assert parse("STATUS: needs_rework\nNEXT: restart") == "needs_rework"
+        assert parse("No decision here") is None
+
+    def test_statuses_match_dynamic_mode(self):
+        """Test that parsed statuses are the ones the dynamic validator template offers"""
+        mode = json.loads((Path(__file__).parent.parent / "src/modes/dynamic.json").read_text())
+        template = next(
+            p["validator_template"] for p in mode["phases"] if "validator_template" in p
+        )
+
+        offered = re.search(r"STATUS: \[([^\]]+)\]", template).group(1)
+
+        assert tuple(s.strip() for s in offered.split("|")) == VALIDATION_STATUSES
+
+    def test_likely_status_learns_by_complexity(self):
+        """Test that predictions follow outcomes for the same complexity"""
+        orchestrator = IntelligentOrchestrator()
+        orchestrator.subtasks = [
+            Subtask("a", "", "complex"), Subtask("b", "", "complex"), Subtask("c", "", "simple")
+        ]
+
+        assert orchestrator.likely_status("a") == "complete"
+
+        orchestrator.record_validation("a", "needs_refinement")
+
+        assert orchestrator.likely_status("b") == "needs_refinement"
+        # No simple-task history yet: falls back to all outcomes
+        assert orchestrator.likely_status("c") == "needs_refinement"
+
+        orchestrator.record_validation("c", "complete")
+
+        assert orchestrator.likely_status("c") == "complete"
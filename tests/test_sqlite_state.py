@@ -0,0 +1,192 @@
+"""
+SQLiteStateManager Tests
+
+Tests for the SQLite session store: API parity with the JSON StateManager,
+indexed filtering, cost roll-ups and migration from JSON sessions.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.protocol import Conversation, Turn
+from src.sqlite_state import SQLiteStateManager
+from src.state import StateManager, create_state_manager
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    """Create SQLiteStateManager in a temporary directory"""
+    manager = SQLiteStateManager(sessions_dir=str(tmp_path / "sessions"))
+    yield manager
+    manager.close()
+
+
+def make_turn(number, participant="grok", model="grok-4-fast-reasoning-latest", cost=0.001):
+    """Create a Turn for testing"""
+    return Turn(
+        number=number,
+        role=f"role_{number}",
+        participant=participant,
+        prompt=f"Prompt {number}",
+        response=f"Response {number}",
+        tokens={"prompt": 100, "completion": 200, "total": 300},
+        latency=1.0,
+        timestamp=datetime.now().isoformat(),
+        context_from=[number - 1] if number > 1 else [],
+        cost=cost,
+        model=model
+    )
+
+
+def make_conversation(session_id, mode="loop", turns=None, completed=True):
+    """Create a Conversation for testing"""
+    return Conversation(
+        session_id=session_id,
+        mode=mode,
+        topic=f"Topic {session_id}",
+        turns=turns or [],
+        metadata={"source": "test"},
+        started_at=datetime.now().isoformat(),
+        completed_at=datetime.now().isoformat() if completed else None
+    )
+
+
+# ============= PERSISTENCE TESTS =============
+
+class TestSQLitePersistence:
+    """Test save/load parity with the JSON store"""
+
+    def test_save_and_load_conversation(self, sqlite_manager):
+        """Test complete save/load cycle"""
+        conv = make_conversation("s-001", turns=[make_turn(1), make_turn(2, "claude")])
+        sqlite_manager.save_conversation(conv)
+
+        loaded = sqlite_manager.load_conversation("s-001")
+
+        assert loaded.mode == "loop"
+        assert loaded.metadata == {"source": "test"}
+        assert [t.number for t in loaded.turns] == [1, 2]
+        assert loaded.turns[1].participant == "claude"
+        assert loaded.turns[0].tokens == {"prompt": 100, "completion": 200, "total": 300}
+
+    def test_failed_turn_replaced_by_rerun(self, sqlite_manager):
+        """Test that a re-run of a failed turn replaces its row, other duplicates do not"""
+        failed = make_turn(1)
+        failed.error = "timeout"
+        sqlite_manager.save_turn("rerun", failed)
+        sqlite_manager.save_turn("rerun", make_turn(1, cost=0.002))
+        sqlite_manager.save_turn("rerun", make_turn(1, cost=0.005))
+
+        turns = sqlite_manager.load_conversation("rerun").turns
+
+        assert [(t.error, t.cost) for t in turns] == [(None, 0.002)]
+
+    def test_save_turn_incremental_and_duplicates(self, sqlite_manager):
+        """Test incremental turn saves ignore duplicate turn numbers"""
+        sqlite_manager.save_turn("s-002", make_turn(1))
+        sqlite_manager.save_turn("s-002", make_turn(1))
+        sqlite_manager.save_turn("s-002", make_turn(2))
+
+        loaded = sqlite_manager.load_conversation("s-002")
+        assert len(loaded.turns) == 2
+        assert loaded.mode == "unknown"
+
+    def test_start_session_records_header(self, sqlite_manager):
+        """Test that turns saved after start_session keep mode and topic"""
+        sqlite_manager.start_session(make_conversation("s-004", mode="debate", completed=False))
+        sqlite_manager.save_turn("s-004", make_turn(1))
+
+        loaded = sqlite_manager.load_conversation("s-004")
+        assert loaded.mode == "debate"
+        assert loaded.completed_at is None
+        assert len(loaded.turns) == 1
+
+    def test_load_nonexistent_session_raises(self, sqlite_manager):
+        """Test that loading a missing session raises FileNotFoundError"""
+        with pytest.raises(FileNotFoundError, match="Session not found"):
+            sqlite_manager.load_conversation("missing")
+
+    def test_delete_session(self, sqlite_manager):
+        """Test deleting a session removes its turns"""
+        sqlite_manager.save_conversation(make_conversation("s-003", turns=[make_turn(1)]))
+
+        assert sqlite_manager.delete_session("s-003") is True
+        assert sqlite_manager.delete_session("s-003") is False
+        assert sqlite_manager.cost_summary() == []
+
+
+# ============= QUERY TESTS =============
+
+class TestSQLiteQueries:
+    """Test indexed listing, filtering and roll-ups"""
+
+    def test_list_sessions_filters(self, sqlite_manager):
+        """Test filtering by mode and status"""
+        sqlite_manager.save_conversation(make_conversation("a", mode="loop"))
+        sqlite_manager.save_conversation(make_conversation("b", mode="debate"))
+        sqlite_manager.save_conversation(make_conversation("c", mode="debate", completed=False))
+
+        assert len(sqlite_manager.list_sessions()) == 3
+        assert {s["session_id"] for s in sqlite_manager.list_sessions(mode="debate")} == {"b", "c"}
+
+        in_progress = sqlite_manager.list_sessions(status="in_progress")
+        assert [s["session_id"] for s in in_progress] == ["c"]
+        assert len(sqlite_manager.list_sessions(limit=1)) == 1
+
+    def test_cost_summary_by_model(self, sqlite_manager):
+        """Test cost roll-up grouped by model"""
+        turns = [
+            make_turn(1, model="grok-4", cost=0.01),
+            make_turn(2, participant="claude", model="claude-3-haiku-20240307", cost=0.002),
+            make_turn(3, model="grok-4", cost=0.03),
+        ]
+        sqlite_manager.save_conversation(make_conversation("costs", turns=turns))
+
+        summary = {row["key"]: row for row in sqlite_manager.cost_summary()}
+
+        assert summary["grok-4"]["turns"] == 2
+        assert summary["grok-4"]["total_cost"] == pytest.approx(0.04)
+        assert summary["grok-4"]["total_tokens"] == 600
+        assert summary["claude-3-haiku-20240307"]["turns"] == 1
+
+    def test_cost_summary_rejects_unknown_grouping(self, sqlite_manager):
+        """Test that unknown group_by values are rejected"""
+        with pytest.raises(ValueError, match="Unknown group_by"):
+            sqlite_manager.cost_summary(group_by="topic")
+
+
+# ============= MIGRATION TESTS =============
+
+class TestSQLiteMigration:
+    """Test one-shot migration from JSON sessions"""
+
+    def test_migrate_from_json(self, tmp_path, sqlite_manager):
+        """Test snapshots and in-progress turn logs are imported"""
+        json_dir = tmp_path / "json_sessions"
+        json_store = StateManager(str(json_dir))
+        json_store.save_conversation(make_conversation("done", turns=[make_turn(1)]))
+        json_store.save_turn("partial", make_turn(1))
+        json_store.save_partial("partial", 2, "streaming...")
+
+        imported = sqlite_manager.migrate_from_json(str(json_dir))
+
+        assert imported == 2
+        assert len(sqlite_manager.load_conversation("done").turns) == 1
+        assert sqlite_manager.list_sessions(status="in_progress")[0]["session_id"] == "partial"
+
+    def test_create_state_manager_backends(self, tmp_path):
+        """Test backend factory"""
+        assert type(create_state_manager("json", str(tmp_path))) is StateManager
+
+        manager = create_state_manager("sqlite", str(tmp_path))
+        assert isinstance(manager, SQLiteStateManager)
+        manager.close()
+
+        with pytest.raises(ValueError, match="Unknown state backend"):
+            create_state_manager("redis", str(tmp_path))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
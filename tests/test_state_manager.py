@@ -144,6 +144,18 @@ class TestStatePersistence:
         assert conversation.turns[1].number == 2
         assert conversation.turns[1].response == "Second response"
 
+    def test_failed_turn_replaced_by_rerun(self, state_manager, sample_turn):
+        """Test that a re-run of a failed turn replaces it when the log is replayed"""
+        from dataclasses import replace
+
+        state_manager.save_turn("rerun", replace(sample_turn, response="[Error: x]", error="x"))
+        state_manager.save_turn("rerun", sample_turn)
+        state_manager.save_turn("rerun", replace(sample_turn, response="Late duplicate"))
+
+        turns = state_manager.load_conversation("rerun").turns
+
+        assert [(t.response, t.error) for t in turns] == [("Test response", None)]
+
     def test_duplicate_turn_not_added(self, state_manager, sample_turn):
         """Test that duplicate turn numbers are not added"""
         session_id = "duplicate-test"
@@ -219,6 +231,106 @@ class TestStatePersistence:
         assert result is False
 
 
+# ============= TURN LOG TESTS =============
+
+class TestTurnLog:
+    """Test append-only turn log and snapshot compaction"""
+
+    def test_save_turn_appends_to_log(self, state_manager, sample_turn):
+        """Test that save_turn writes one JSONL line and no snapshot"""
+        state_manager.save_turn("log-session", sample_turn)
+
+        log_path = state_manager.sessions_dir / "log-session.turns.jsonl"
+        assert log_path.exists()
+        assert not (state_manager.sessions_dir / "log-session.json").exists()
+
+        lines = log_path.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["number"] == 1
+
+    def test_save_conversation_compacts_log(self, state_manager, sample_conversation, sample_turn):
+        """Test that saving the snapshot removes the turn log"""
+        state_manager.save_turn(sample_conversation.session_id, sample_turn)
+        state_manager.save_conversation(sample_conversation)
+
+        log_path = state_manager.sessions_dir / "test-session-001.turns.jsonl"
+        assert not log_path.exists()
+
+        loaded = state_manager.load_conversation("test-session-001")
+        assert len(loaded.turns) == 1
+        assert loaded.mode == "loop"
+
+    def test_load_replays_log_over_snapshot(self, state_manager, sample_conversation):
+        """Test that turns logged after a snapshot are replayed on load"""
+        state_manager.save_conversation(sample_conversation)
+
+        turn_2 = Turn(
+            number=2,
+            role="analysis",
+            participant="claude",
+            prompt="Second prompt",
+            response="Second response",
+            tokens={"prompt": 10, "completion": 20, "total": 30},
+            latency=0.5,
+            timestamp=datetime.now().isoformat(),
+            context_from=[1]
+        )
+        state_manager.save_turn("test-session-001", turn_2)
+
+        loaded = state_manager.load_conversation("test-session-001")
+        assert [t.number for t in loaded.turns] == [1, 2]
+        assert loaded.topic == "Test Topic"
+
+        sessions = state_manager.list_sessions()
+        assert sessions[0]["turns"] == 2
+
+    def test_session_header_recovers_mode_and_topic(self, state_manager, sample_conversation,
+                                                    sample_turn):
+        """Test that an in-progress session keeps its mode, topic and metadata"""
+        sample_conversation.turns = []
+        state_manager.start_session(sample_conversation)
+        state_manager.save_turn(sample_conversation.session_id, sample_turn)
+
+        loaded = state_manager.load_conversation(sample_conversation.session_id)
+        assert loaded.mode == "loop"
+        assert loaded.topic == "Test Topic"
+        assert loaded.metadata == sample_conversation.metadata
+        assert [t.number for t in loaded.turns] == [1]
+        assert loaded.completed_at is None
+
+    def test_torn_log_line_is_skipped(self, state_manager, sample_turn, temp_sessions_dir):
+        """Test that a partially written trailing line does not break replay"""
+        state_manager.save_turn("torn-session", sample_turn)
+
+        with open(temp_sessions_dir / "torn-session.turns.jsonl", "a") as f:
+            f.write('{"number": 2, "role": "trunc')
+
+        loaded = state_manager.load_conversation("torn-session")
+        assert len(loaded.turns) == 1
+
+    def test_in_progress_session_listed_and_deleted(self, state_manager, sample_turn):
+        """Test that log-only sessions are listed as in progress and deletable"""
+        state_manager.save_turn("in-progress", sample_turn)
+
+        sessions = state_manager.list_sessions()
+        assert len(sessions) == 1
+        assert sessions[0]["session_id"] == "in-progress"
+        assert sessions[0]["status"] == "in_progress"
+
+        assert state_manager.delete_session("in-progress") is True
+        assert state_manager.list_sessions() == []
+
+    def test_partial_checkpoint_not_listed_as_session(self, state_manager, sample_turn):
+        """Test that a streaming turn's checkpoint is not taken for a session"""
+        state_manager.save_turn("streaming", sample_turn)
+        state_manager.save_partial("streaming", 2, "half a resp")
+
+        sessions = state_manager.list_sessions()
+
+        assert [s["session_id"] for s in sessions] == ["streaming"]
+        assert state_manager.load_partials("streaming") == {2: "half a resp"}
+
+
 # ============= ERROR RECOVERY TESTS =============
 
 class TestStateRecovery:
@@ -0,0 +1,100 @@
+"""
+Token Counting Tests
+
+Tests for local token counts, the count cache, and Claude CLI usage
+parsing with tokenizer fallback.
+"""
+
+import json
+
+import pytest
+
+from src import tokenizer
+from src.clients.claude import ClaudeClient
+from src.tokenizer import count_tokens, count_tokens_batch, usage_for
+
+
+class TestCountTokens:
+    """Test local token counting"""
+
+    def test_empty_text(self):
+        """Test that empty text counts as zero tokens"""
+        assert count_tokens("") == 0
+
+    def test_longer_text_counts_more(self):
+        """Test that counts grow with text length"""
+        short = count_tokens("Category theory")
+        long = count_tokens("Category theory studies objects and morphisms between them.")
+
+        assert 0 < short < long
+
+    def test_heuristic_close_to_bpe(self):
+        """Test that the fallback heuristic lands near typical BPE counts"""
+        text = "The quick brown fox jumps over the lazy dog, 12345 times!"
+
+        # cl100k_base encodes this as 15 tokens
+        assert 12 <= tokenizer._heuristic_count(text) <= 18
+
+    def test_batch_matches_single(self):
+        """Test that batch counts match per-text counts in input order"""
+        texts = ["alpha beta", "", "gamma delta epsilon", "alpha beta"]
+
+        assert count_tokens_batch(texts) == [count_tokens(t) for t in texts]
+
+    def test_cache_is_bounded(self, monkeypatch):
+        """Test that the LRU cache evicts beyond its size"""
+        monkeypatch.setattr(tokenizer, "CACHE_SIZE", 3)
+        tokenizer._cache.clear()
+
+        count_tokens_batch([f"text {i}" for i in range(5)])
+
+        assert list(tokenizer._cache) == ["text 2", "text 3", "text 4"]
+
+    def test_usage_for(self):
+        """Test protocol-format usage dict"""
+        tokens = usage_for("Explain functors", "A functor maps categories.")
+
+        assert tokens["prompt"] == count_tokens("Explain functors")
+        assert tokens["completion"] == count_tokens("A functor maps categories.")
+        assert tokens["total"] == tokens["prompt"] + tokens["completion"]
+
+
+class TestClaudeUsageParsing:
+    """Test Claude CLI JSON output parsing"""
+
+    def test_uses_cli_usage(self):
+        """Test that reported usage (including cache reads) is used"""
+        output = json.dumps({
+            "type": "result",
+            "is_error": False,
+            "result": " Functors preserve structure. ",
+            "usage": {"input_tokens": 10, "cache_read_input_tokens": 5, "output_tokens": 7},
+        })
+
+        response, tokens = ClaudeClient()._parse_output(output, "Explain functors")
+
+        assert response == "Functors preserve structure."
+        assert tokens == {"prompt": 15, "completion": 7, "total": 22, "cached": 5}
+
+    def test_missing_usage_falls_back_to_tokenizer(self):
+        """Test that missing usage is counted locally, including the prompt"""
+        output = json.dumps({"type": "result", "is_error": False, "result": "Monads compose."})
+
+        _, tokens = ClaudeClient()._parse_output(output, "Explain monads")
+
+        assert tokens == usage_for("Explain monads", "Monads compose.")
+        assert tokens["prompt"] > 0
+
+    def test_plain_text_output(self):
+        """Test that non-JSON output is taken verbatim"""
+        response, tokens = ClaudeClient()._parse_output("Plain answer\n", "Question")
+
+        assert response == "Plain answer"
+        assert tokens == usage_for("Question", "Plain answer")
+
+    def test_error_result_raises(self):
+        """Test that is_error results surface as CLI errors"""
+        output = json.dumps({"type": "result", "is_error": True, "result": "Invalid model"})
+
+        with pytest.raises(RuntimeError, match="Invalid model"):
+            ClaudeClient()._parse_output(output, "Question")
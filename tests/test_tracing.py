@@ -0,0 +1,145 @@
+"""
+Tracing Tests
+
+Tests for span nesting, the JSON file exporter and the span hierarchy
+emitted during protocol execution.
+"""
+
+import json
+import tempfile
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.protocol import ProtocolEngine
+from src.state import StateManager
+from src.tracing import NOOP_TRACER, InMemoryExporter, JSONFileExporter, Tracer
+
+
+class TestTracer:
+    """Test span creation and export"""
+
+    def test_nested_spans_share_trace(self):
+        """Test that child spans link to their parent"""
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter)
+
+        with tracer.span("parent") as parent:
+            with tracer.span("child", answer=42):
+                pass
+
+        child, exported_parent = exporter.spans
+        assert exported_parent is parent
+        assert child.parent_id == parent.span_id
+        assert child.trace_id == parent.trace_id
+        assert child.attributes == {"answer": 42}
+        assert child.duration >= 0
+
+    def test_exception_marks_span_error(self):
+        """Test that an exception escaping a span records an error status"""
+        exporter = InMemoryExporter()
+
+        with pytest.raises(RuntimeError):
+            with Tracer(exporter).span("failing"):
+                raise RuntimeError("boom")
+
+        assert exporter.spans[0].status == "ERROR"
+        assert "boom" in exporter.spans[0].status_message
+
+    def test_noop_tracer_exports_nothing(self):
+        """Test that the default tracer is disabled"""
+        with NOOP_TRACER.span("ignored") as span:
+            span.set_attribute("key", "value")
+
+        assert not NOOP_TRACER.enabled
+
+    def test_json_file_exporter_writes_otlp_lines(self, tmp_path):
+        """Test OTLP-style JSON output"""
+        path = tmp_path / "trace.jsonl"
+        exporter = JSONFileExporter(str(path))
+
+        with Tracer(exporter).span("work", model="grok-4", tokens=10, cost=0.5, cached=False):
+            pass
+        exporter.close()
+
+        record = json.loads(path.read_text().splitlines()[0])
+        assert record["name"] == "work"
+        assert record["parentSpanId"] == ""
+        assert record["endTimeUnixNano"] >= record["startTimeUnixNano"]
+        assert {"key": "tokens", "value": {"intValue": 10}} in record["attributes"]
+        assert {"key": "cached", "value": {"boolValue": False}} in record["attributes"]
+
+
+class TestProtocolTracing:
+    """Test spans emitted by ProtocolEngine"""
+
+    @pytest.mark.asyncio
+    async def test_mixed_run_span_hierarchy(self):
+        """Test run -> phase -> turn -> attempt -> client call nesting"""
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(return_value=("ok", {"prompt": 3, "completion": 4, "total": 7}))
+
+        config = {
+            "structure": "mixed",
+            "turns": 3,
+            "phases": [
+                {"type": "parallel", "turns": [1, 2]},
+                {"type": "sequential", "turns": [3]},
+            ],
+            "prompts": {
+                f"turn_{i}": {"role": "r", "participant": "grok", "template": "P {topic}"}
+                for i in range(1, 4)
+            }
+        }
+
+        exporter = InMemoryExporter()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = ProtocolEngine(AsyncMock(), mock_grok, StateManager(tmpdir),
+                                    tracer=Tracer(exporter))
+            await engine.run_protocol(mode="custom", topic="T", custom_config=config)
+
+        spans = {span.span_id: span for span in exporter.spans}
+        [run] = exporter.by_name("protocol.run")
+        phases = exporter.by_name("protocol.phase")
+        turns = exporter.by_name("protocol.turn")
+        calls = exporter.by_name("client.call")
+
+        assert len(phases) == 2
+        assert all(phase.parent_id == run.span_id for phase in phases)
+        assert len(turns) == 3
+        assert all(spans[turn.parent_id].name == "protocol.phase" for turn in turns)
+        assert len(calls) == 3
+        for call in calls:
+            attempt = spans[call.parent_id]
+            assert attempt.name == "protocol.attempt"
+            assert "queue_wait_s" in attempt.attributes
+            assert spans[attempt.parent_id].name == "protocol.turn"
+        assert run.attributes["tokens.total"] == 21
+        assert turns[0].attributes["tokens.total"] == 7
+
+    @pytest.mark.asyncio
+    async def test_retries_produce_attempt_spans(self):
+        """Test that each retry is its own attempt span with backoff"""
+        mock_grok = AsyncMock()
+        mock_grok.chat = AsyncMock(side_effect=[
+            ConnectionError("reset"),
+            ("ok", {"prompt": 1, "completion": 1, "total": 2}),
+        ])
+
+        exporter = InMemoryExporter()
+        engine = ProtocolEngine(AsyncMock(), mock_grok, None, retry_backoff_base=0.01,
+                                tracer=Tracer(exporter))
+        turn_config = {"role": "r", "participant": "grok", "template": "P {topic}"}
+
+        turn = await engine._execute_turn(1, turn_config, "T", {})
+
+        attempts = exporter.by_name("protocol.attempt")
+        assert [a.attributes["attempt"] for a in attempts] == [1, 2]
+        assert attempts[0].status == "ERROR"
+        assert "backoff_s" in attempts[0].attributes
+        assert attempts[1].status == "OK"
+        assert exporter.by_name("protocol.turn")[0].attributes["retry_count"] == turn.retry_count
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])